@@ -0,0 +1,26 @@
+import json
+import os
+import subprocess
+import sys
+
+PROJECT_ROOT = os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+DASHBOARD_DIR = os.path.join(PROJECT_ROOT, "streamlit_dashboard")
+
+
+def run_dashboard_script(context, script: str, label: str) -> dict:
+    """Run one of the dashboard's batch scripts and return the JSON summary it prints last, raising if it failed."""
+    result = subprocess.run([sys.executable, script], cwd=DASHBOARD_DIR, check=False, capture_output=True, text=True)
+    context.log.info(f"{label} output: {result.stdout}")
+    if result.stderr:
+        context.log.warning(f"{label} log: {result.stderr}")
+
+    # Last stdout line is the JSON summary, also printed when some queries failed
+    lines = result.stdout.strip().splitlines()
+    try:
+        summary = json.loads(lines[-1]) if lines else {}
+    except json.JSONDecodeError:
+        summary = {}
+
+    if result.returncode != 0:
+        raise Exception(f"{label} failed with exit code {result.returncode}: {summary or result.stderr[-2000:]}")
+    return summary
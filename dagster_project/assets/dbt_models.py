@@ -1,20 +1,52 @@
-from dagster import asset
-import os, subprocess
-from dagster_project.assets.meltano_ingestion import meltano_ingestion
+import json
+import os
+import shutil
 from pathlib import Path
+from typing import Any, Dict, Iterator, List, Mapping, Set
 
-DBT_PROJECT_DIR = "dbt_project"
-STATE_DIR = Path(DBT_PROJECT_DIR) / "target"
+from dagster import (
+    AssetExecutionContext, AssetKey, AssetMaterialization, BackfillPolicy, Config, DailyPartitionsDefinition,
+    MaterializeResult, MetadataValue, Output, asset,
+)
+from dagster_dbt import (
+    DagsterDbtTranslator, DbtCliInvocation, DbtCliResource, DbtProject, dbt_assets, get_asset_key_for_model,
+)
+from dagster_project.resources.dbt_runner import DbtRunnerResource
+from dagster_project.resources.env_loader import load_dotenv  # Parsing resolves env_var() from .env
+
+PROJECT_ROOT = Path(__file__).resolve().parent.parent.parent
+DBT_PROJECT_DIR = PROJECT_ROOT / "dbt_project"
+# Manifest of the last successful full build, compared against for changed-only runs
+STATE_DIR = Path(os.getenv("DBT_STATE_DIR", str(PROJECT_ROOT / "artifacts" / "dbt_state")))
+
+# adapter_response fields BigQuery reports per node, recorded as materialization metadata
+ADAPTER_RESPONSE_METRICS = ("bytes_processed", "bytes_billed", "rows_affected", "slot_ms")
+
+# fact_sales is partitioned by day on order_purchase_ts (UTC); the first orders are from September 2016
+FACT_SALES_PARTITIONS = DailyPartitionsDefinition(start_date="2016-09-01")
+
+# Days of fact_sales rebuilt after each pipeline run; orders purchased earlier are only
+# updated by a backfill of their days
+FACT_SALES_LOOKBACK_DAYS = int(os.getenv("FACT_SALES_LOOKBACK_DAYS", "30"))
+
+# Loaded from target/manifest.json: `dagster dev` re-parses the project on start,
+# deployments run `dagster-dbt project prepare-and-package` (or `dbt parse`) first
+olist_dbt_project = DbtProject(project_dir=DBT_PROJECT_DIR, profiles_dir=DBT_PROJECT_DIR)
+olist_dbt_project.prepare_if_dev()
+
+
+class OlistDbtTranslator(DagsterDbtTranslator):
+    """Name dbt assets after their node, e.g. AssetKey("fact_sales"), and attach the raw sources to Meltano."""
+
+    def get_asset_key(self, dbt_resource_props: Mapping[str, Any]) -> AssetKey:
+        # Every source table is loaded by the single meltano_ingestion asset
+        if dbt_resource_props["resource_type"] == "source":
+            return AssetKey("meltano_ingestion")
+        return AssetKey(dbt_resource_props["name"])
+
+    def get_group_name(self, dbt_resource_props: Mapping[str, Any]) -> str:
+        return "Transformation"
 
-def _dbt_env():
-    overrides = {
-        "CREDENTIALS_PATH": os.getenv("CREDENTIALS_PATH", ""),
-        "PROJECT_ID": os.getenv("PROJECT_ID", ""),
-        "STAGING_DATASET_NAME": os.getenv("STAGING_DATASET_NAME", ""),
-        "SNAPSHOT_DATASET_NAME": os.getenv("SNAPSHOT_DATASET_NAME", ""),
-        "RAW_DATASET_NAME": os.getenv("RAW_DATASET_NAME", ""),
-    }
-    return {**os.environ, **{k: v for k, v in overrides.items() if v}}
 
 # run sql commands to delete table in raw dataset, if id is null
 # def _cleanup_raw_data():
@@ -66,76 +98,185 @@ def _dbt_env():
 #     query_job.result()
 #     print(f"Deleted {query_job.num_dml_affected_rows} rows from raw sellers table.")
 
-   
-@asset(deps=[meltano_ingestion], compute_kind="dbt", group_name="Transformation")
-def dbt_seed(context):
-    """Run dbt seed."""
-    env = _dbt_env()
-    context.log.info("Running dbt seed as a single materialization step")
-    result = subprocess.run(["dbt", "seed"], cwd=DBT_PROJECT_DIR, check=False, env=env, capture_output=True, text=True)
-    context.log.info(f"dbt seed output: {result.stdout}")
-    context.log.error(f"dbt seed errors: {result.stderr}")
-    if result.returncode != 0:
-        context.log.error(f"dbt seed errors:\n{result.stderr}")
-        raise Exception(f"dbt seed failed with exit code {result.returncode}")
-
-@asset(deps=[dbt_seed], compute_kind="dbt", group_name="Transformation")
-def dbt_staging(context):
-    """Run dbt staging."""
-    env = _dbt_env()
-    # _cleanup_raw_data()
-    context.log.info("Running dbt staging as a single materialization step")
-    result = subprocess.run(["dbt", "run", "-s", "staging"], cwd=DBT_PROJECT_DIR, check=False, env=env, capture_output=True, text=True)
-    context.log.info(f"dbt staging output: {result.stdout}")
-    context.log.error(f"dbt staging errors: {result.stderr}")
-    if result.returncode != 0:
-        context.log.error(f"dbt staging errors:\n{result.stderr}")
-        raise Exception(f"dbt staging failed with exit code {result.returncode}")
-
-@asset(deps=[meltano_ingestion], compute_kind="dbt", group_name="Transformation")
-def dbt_snapshot(context):
-    """Run dbt snapshot."""
-    env = _dbt_env()
-    context.log.info("Running dbt snapshot as a single materialization step")
-    result = subprocess.run(["dbt", "snapshot"], cwd=DBT_PROJECT_DIR, check=False, env=env, capture_output=True, text=True)
-    context.log.info(f"dbt snapshot output: {result.stdout}")
-    context.log.error(f"dbt snapshot errors: {result.stderr}")
-    if result.returncode != 0:
-        context.log.error(f"dbt snapshot errors:\n{result.stderr}")
-        raise Exception(f"dbt snapshot failed with exit code {result.returncode}")
-
-@asset(deps=[dbt_staging], compute_kind="dbt", group_name="Transformation")
-def dbt_dim(context):
-    """Run dbt dimensions."""
-    env = _dbt_env()
-    context.log.info("Running dbt dimensions as a single materialization step")
-    result = subprocess.run(["dbt", "run", "-s", "marts.dimensions"], cwd=DBT_PROJECT_DIR, check=False, env=env, capture_output=True, text=True)
-    context.log.info(f"dbt dimensions output: {result.stdout}")
-    context.log.error(f"dbt dimensions errors: {result.stderr}")
-    if result.returncode != 0:
-        context.log.error(f"dbt dimensions errors:\n{result.stderr}")
-        raise Exception(f"dbt dimensions failed with exit code {result.returncode}")
-
-@asset(deps=[dbt_dim], compute_kind="dbt", group_name="Transformation")
-def dbt_facts(context):
-    """Run dbt facts."""
-    env = _dbt_env()
-    context.log.info("Running dbt facts as a single materialization step")
-    result = subprocess.run(["dbt", "run", "-s", "marts.facts"], cwd=DBT_PROJECT_DIR, check=False, env=env, capture_output=True, text=True)
-    context.log.info(f"dbt facts output: {result.stdout}")
-    context.log.error(f"dbt facts errors: {result.stderr}")
-    if result.returncode != 0:
-        context.log.error(f"dbt facts errors:\n{result.stderr}")
-        raise Exception(f"dbt facts failed with exit code {result.returncode}")
-
-@asset(deps=[dbt_facts], compute_kind="dbt", group_name="Transformation")
-def dbt_test(context):
-    """Run dbt test."""
-    env = _dbt_env()
-    context.log.info("Running dbt test as a single materialization step")
-    result = subprocess.run(["dbt", "test"], cwd=DBT_PROJECT_DIR, check=False, env=env, capture_output=True, text=True)
-    context.log.info(f"dbt test output: {result.stdout}")
-    context.log.error(f"dbt test errors: {result.stderr}")
-    if result.returncode != 0:
-        context.log.error(f"dbt test errors:\n{result.stderr}")
-        raise Exception(f"dbt test failed with exit code {result.returncode}")
+
+class DbtBuildConfig(Config):
+    # Only build nodes whose definition changed since the last full build, and their
+    # descendants (state:modified+), deferring unbuilt parents to the existing tables.
+    # fact_sales and its descendants are not part of these assets' runs: the
+    # fact_sales_refresh run that follows every pipeline run rebuilds them
+    changed_only: bool = False
+
+
+def _modified_nodes(dbt_runner: DbtRunnerResource, logger) -> Set[str]:
+    """Names of the seeds, snapshots and models selected by state:modified+ against STATE_DIR."""
+    result = dbt_runner.invoke(
+        [
+            "ls",
+            "--select", "state:modified+", "--exclude", "package:elementary",
+            "--resource-type", "model", "--resource-type", "seed", "--resource-type", "snapshot",
+            "--state", str(STATE_DIR), "--output", "name",
+        ],
+        logger,
+    )
+    return set(result.result)
+
+
+def run_result_metadata(result: Mapping[str, Any]) -> Dict[str, MetadataValue]:
+    """Execution time and BigQuery usage of one node, from its run result (a NodeFinished event or run_results.json entry)."""
+    metadata = {"execution_time_seconds": MetadataValue.float(round(float(result.get("execution_time") or 0.0), 2))}
+    adapter_response = result.get("adapter_response") or {}
+    for name in ADAPTER_RESPONSE_METRICS:
+        if adapter_response.get(name) is not None:
+            metadata[name] = MetadataValue.int(int(adapter_response[name]))
+    if adapter_response.get("job_id"):
+        metadata["bigquery_job_id"] = MetadataValue.text(adapter_response["job_id"])
+    return metadata
+
+
+def run_results_summary(results: List[Mapping[str, Any]]) -> Dict[str, MetadataValue]:
+    """Totals over the run_results.json entries of one or more dbt invocations."""
+    totals = {name: 0 for name in ADAPTER_RESPONSE_METRICS}
+    for result in results:
+        adapter_response = result.get("adapter_response") or {}
+        for name in totals:
+            totals[name] += int(adapter_response.get(name) or 0)
+
+    return {
+        "nodes": MetadataValue.int(len(results)),
+        "failed_nodes": MetadataValue.int(sum(result.get("status") in ("error", "fail") for result in results)),
+        "execution_time_seconds": MetadataValue.float(
+            round(sum(float(result.get("execution_time") or 0.0) for result in results), 2)
+        ),
+        **{name: MetadataValue.int(total) for name, total in totals.items()},
+    }
+
+
+def _with_run_metadata(event, run_metadata: Dict[str, MetadataValue]):
+    """A materialization event with a node's run metadata added."""
+    if isinstance(event, Output):
+        return event.with_metadata({**event.metadata, **run_metadata})
+    return AssetMaterialization(
+        asset_key=event.asset_key,
+        description=event.description,
+        metadata={**event.metadata, **run_metadata},
+        partition=event.partition,
+        tags=event.tags,
+    )
+
+
+def _stream_with_run_results(context, invocation: DbtCliInvocation) -> Iterator:
+    """Yield a dbt invocation's events with each model's timing and BigQuery usage attached, then raise if it failed."""
+    # Events are yielded as dbt emits them: a node's run result (execution time and
+    # adapter_response) comes with its own NodeFinished event. The invocation must not
+    # raise on error, or the totals and failures below would not be logged
+    for dbt_event in invocation.stream_raw_events():
+        run_metadata = {}
+        if dbt_event.raw_event["info"]["name"] == "NodeFinished":
+            run_metadata = run_result_metadata(dbt_event.raw_event["data"].get("run_result") or {})
+
+        for event in dbt_event.to_default_asset_events(
+            manifest=invocation.manifest,
+            dagster_dbt_translator=invocation.dagster_dbt_translator,
+            context=invocation.context,
+            target_path=invocation.target_path,
+        ):
+            if run_metadata and isinstance(event, (Output, AssetMaterialization)):
+                event = _with_run_metadata(event, run_metadata)
+            yield event
+
+    # run_results.json is written once dbt exits; it only feeds the run's totals
+    try:
+        results = invocation.get_artifact("run_results.json").get("results", [])
+    except FileNotFoundError:
+        context.log.warning("dbt wrote no run_results.json; no run totals to report")
+        results = []
+
+    summary = run_results_summary(results)
+    context.log.info(
+        f"dbt ran {summary['nodes'].value} node(s) in {summary['execution_time_seconds'].value}s, "
+        f"processing {summary['bytes_processed'].value:,} bytes ({summary['slot_ms'].value:,} slot ms)"
+    )
+    for result in results:
+        if result.get("status") in ("error", "fail"):
+            context.log.error(f"{result['unique_id']} {result['status']}: {result.get('message')}")
+
+    error = invocation.get_error()
+    if error:
+        raise error
+
+
+# One asset per seed, snapshot and model with the lineage of the dbt graph; a single
+# `dbt build` runs the selected nodes, independent ones in parallel (profile threads),
+# and a failing node only skips its own descendants. Tests run as asset checks.
+# Elementary's package models are built by the dbt_elementary_build asset, and the
+# partitioned fact_sales by fact_sales_assets.
+@dbt_assets(
+    manifest=olist_dbt_project.manifest_path,
+    dagster_dbt_translator=OlistDbtTranslator(),
+    exclude="package:elementary fact_sales",
+)
+def olist_dbt_assets(context: AssetExecutionContext, dbt: DbtCliResource, dbt_runner: DbtRunnerResource,
+                     config: DbtBuildConfig):
+    """Build the selected dbt seeds, snapshots and models."""
+    args = ["build"]
+
+    if config.changed_only and (STATE_DIR / "manifest.json").exists():
+        modified = _modified_nodes(dbt_runner, context.log)
+        # dagster-dbt adds the run's own --select; excluding the unchanged part of it
+        # leaves the intersection with state:modified+
+        unchanged = sorted(key.path[-1] for key in context.selected_asset_keys if key.path[-1] not in modified)
+        context.log.info(f"Changed-only build of {len(context.selected_asset_keys) - len(unchanged)} node(s), skipping {len(unchanged)}")
+        args += ["--defer", "--state", str(STATE_DIR)]
+        if unchanged:
+            args += ["--exclude", *unchanged]
+    elif config.changed_only:
+        context.log.warning(f"No state manifest in {STATE_DIR}; building every selected node")
+
+    yield from _stream_with_run_results(context, dbt.cli(args, context=context, raise_on_error=False))
+
+
+# fact_sales, partitioned like its table: every run passes its partition range to the model,
+# which overwrites only those days (insert_overwrite). A backfill of any date range runs
+# as a single run, so the unpartitioned assets downstream are refreshed once after it
+@dbt_assets(
+    manifest=olist_dbt_project.manifest_path,
+    dagster_dbt_translator=OlistDbtTranslator(),
+    select="fact_sales",
+    partitions_def=FACT_SALES_PARTITIONS,
+    backfill_policy=BackfillPolicy.single_run(),
+)
+def fact_sales_assets(context: AssetExecutionContext, dbt: DbtCliResource):
+    """Rebuild the fact_sales partitions of the run's time window."""
+    window = context.partition_time_window
+    dbt_vars = {
+        "partition_start": window.start.strftime("%Y-%m-%d"),
+        "partition_end": window.end.strftime("%Y-%m-%d"),
+    }
+    context.log.info(f"Overwriting fact_sales partitions from {dbt_vars['partition_start']} to {dbt_vars['partition_end']}")
+    # `run` rather than `build`: the table-wide tests would scan every partition; Elementary's
+    # test run downstream covers them
+    invocation = dbt.cli(["run", "--vars", json.dumps(dbt_vars)], context=context, raise_on_error=False)
+    yield from _stream_with_run_results(context, invocation)
+
+
+@asset(deps=[olist_dbt_assets], compute_kind="dbt", group_name="Transformation")
+def dbt_state(context):
+    """Save the deployed dbt manifest as the state changed-only runs compare against."""
+    # Runs only once every dbt asset of the run succeeded, so the tables match this manifest;
+    # runs that materialize a subset of the dbt assets should not select it
+    STATE_DIR.mkdir(parents=True, exist_ok=True)
+    tmp_path = STATE_DIR / ".manifest.json.tmp"
+    shutil.copyfile(olist_dbt_project.manifest_path, tmp_path)
+    os.replace(tmp_path, STATE_DIR / "manifest.json")
+    context.log.info(f"Saved dbt state to {STATE_DIR}")
+
+    return MaterializeResult(metadata={"state_path": MetadataValue.path(str(STATE_DIR / "manifest.json"))})
+
+
+def dbt_model_keys(*model_names: str) -> List[AssetKey]:
+    """Asset keys of dbt models, for assets that read their tables."""
+    return [get_asset_key_for_model([olist_dbt_assets, fact_sales_assets], name) for name in model_names]
+
+
+# Marts tables the dashboard queries: the fact table and the aggregates built from it
+DASHBOARD_MARTS = dbt_model_keys("fact_sales", "agg_sales_monthly_region", "agg_sales_monthly_payment", "agg_sales_yearly_sketches")
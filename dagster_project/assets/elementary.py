@@ -2,6 +2,8 @@
 import os, subprocess
 from pathlib import Path
 from dagster import asset, MaterializeResult, MetadataValue, AssetKey
+from dagster_project.assets.dbt_models import run_results_summary
+from dagster_project.resources.dbt_runner import DbtRunnerResource
 
 # Go up 2 level from the dbt_project folder
 PROJECT_ROOT = os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
@@ -39,7 +41,8 @@ def _run(cmd: str, logger=None, *, env: dict | None = None, cwd: str | None = No
     if logger and p.stdout:
         logger.info(p.stdout)
     if logger and p.stderr:
-        logger.error(p.stderr)
+        # Tools log progress to stderr; it is only an error when the command failed
+        (logger.error if p.returncode != 0 else logger.warning)(p.stderr)
 
     if p.returncode != 0:
         raise RuntimeError(
@@ -48,23 +51,24 @@ def _run(cmd: str, logger=None, *, env: dict | None = None, cwd: str | None = No
         )
 
 
-@asset(name="dbt_elementary_build", deps=[AssetKey("dbt_facts")], compute_kind="dbt", group_name="Data_Quality")
-def dbt_elementary_build(context):
+@asset(name="dbt_elementary_build", deps=[AssetKey("fact_sales")], compute_kind="dbt", group_name="Data_Quality")
+def dbt_elementary_build(context, dbt_runner: DbtRunnerResource):
     """Run dbt commands to build Elementary models and tests."""
-    _run(f"dbt deps --project-dir {DBT_PROJECT_DIR}", context.log)
+    dbt_runner.deps(context.log)
 
-    # Build Elementary package models into {{ STAGING_DATASET_NAME }}
-    _run(
-        f"dbt run --select elementary --full-refresh "
-        f"--project-dir {DBT_PROJECT_DIR} --profiles-dir {DBT_PROFILES_DIR} "
-        f"--profile elementary --target {DBT_TARGET}",
+    # Build Elementary package models into {{ STAGING_DATASET_NAME }}; the test run
+    # reuses the manifest parsed for it instead of parsing the project again
+    run = dbt_runner.invoke(
+        ["run", "--select", "elementary", "--full-refresh"],
         context.log,
+        profile="elementary",
+        target=DBT_TARGET,
     )
 
-    _run(
-        f"dbt test --project-dir {DBT_PROJECT_DIR} --profiles-dir {DBT_PROFILES_DIR} "
-        f"--profile elementary --target {DBT_TARGET}",
-        context.log,
+    test = dbt_runner.invoke(["test"], context.log, profile="elementary", target=DBT_TARGET)
+
+    return MaterializeResult(
+        metadata=run_results_summary(DbtRunnerResource.run_results(run) + DbtRunnerResource.run_results(test))
     )
 
 
@@ -1,17 +1,36 @@
+from dagster import AssetSelection, define_asset_job
+from dagster_project.assets.dbt_models import FACT_SALES_PARTITIONS, fact_sales_assets, olist_dbt_assets
 
-from dagster import define_asset_job
+# fact_sales (partitioned) and everything built from it: the aggregates, the dashboard
+# cache and extracts, and Elementary's models and tests
+FACT_SALES_REFRESH_SELECTION = AssetSelection.assets(fact_sales_assets).downstream() - AssetSelection.keys("dbt_state")
+
+# The unpartitioned rest of the pipeline; fact_sales_refresh runs after it
+PIPELINE_SELECTION = (
+    AssetSelection.keys("meltano_ingestion", "dbt_state")
+    | AssetSelection.assets(olist_dbt_assets)
+) - FACT_SALES_REFRESH_SELECTION
+
+# Run config for the dbt assets' changed-only (state:modified+) mode
+CHANGED_ONLY_CONFIG = {"ops": {"olist_dbt_assets": {"config": {"changed_only": True}}}}
 
 
 full_pipeline_job = define_asset_job(
     name="full_pipeline",
-    selection=[
-        "meltano_ingestion",
-        "dbt_snapshot",
-        "dbt_seed",
-        "dbt_staging",
-        "dbt_dim",
-        "dbt_facts",
-        "dbt_elementary_build",
-        "elementary_report",
-    ],
+    selection=PIPELINE_SELECTION,
+)
+
+# Same pipeline, rebuilding only dbt nodes changed since the last full build
+slim_pipeline_job = define_asset_job(
+    name="slim_pipeline",
+    selection=PIPELINE_SELECTION,
+    config=CHANGED_ONLY_CONFIG,
+)
+
+# Overwrite a range of fact_sales days, then rebuild what is built from it. Launched for
+# the latest days after every pipeline run; backfill it over older days to reprocess them
+fact_sales_refresh_job = define_asset_job(
+    name="fact_sales_refresh",
+    selection=FACT_SALES_REFRESH_SELECTION,
+    partitions_def=FACT_SALES_PARTITIONS,
 )
@@ -1,22 +1,27 @@
 from xml.etree.ElementPath import ops
 from dagster import Definitions
 from dagster_project.assets.meltano_ingestion import meltano_ingestion
-from dagster_project.assets.dbt_models import dbt_seed, dbt_snapshot, dbt_staging, dbt_dim, dbt_facts
+from dagster_project.assets.dbt_models import DBT_PROJECT_DIR, dbt_state, fact_sales_assets, olist_dbt_assets, olist_dbt_project
 from dagster_project.assets.elementary import dbt_elementary_build, elementary_report
-from dagster_project.jobs.pipeline import full_pipeline_job
-from dagster_project.schedules.daily_schedule import daily_pipeline_schedule
+from dagster_project.assets.cache_warmer import dashboard_cache_warmer
+from dagster_project.assets.dashboard_extracts import dashboard_extracts
+from dagster_project.jobs.pipeline import fact_sales_refresh_job, full_pipeline_job, slim_pipeline_job
+from dagster_project.schedules.daily_schedule import daily_pipeline_schedule, fact_sales_refresh_sensor
 from dagster_project.resources.bigquery import bigquery_resource
+from dagster_project.resources.dbt_runner import DbtRunnerResource
 from dagster_dbt import DbtCliResource
 from dagster_project.resources.env_loader import load_dotenv
 
 load_dotenv()  # Ensure .env is loaded for all resources
 
 defs = Definitions(
-    assets=[meltano_ingestion, dbt_snapshot, dbt_seed, dbt_staging, dbt_facts, dbt_dim, dbt_elementary_build, elementary_report],
-    jobs=[full_pipeline_job],
+    assets=[meltano_ingestion, olist_dbt_assets, fact_sales_assets, dbt_state, dashboard_cache_warmer, dashboard_extracts, dbt_elementary_build, elementary_report],
+    jobs=[full_pipeline_job, slim_pipeline_job, fact_sales_refresh_job],
     schedules=[daily_pipeline_schedule],
+    sensors=[fact_sales_refresh_sensor],
     resources={
         "bigquery": bigquery_resource,
-        "dbt": DbtCliResource(project_dir="dbt_project", profiles_dir="dbt_project"),
+        "dbt": DbtCliResource(project_dir=olist_dbt_project),
+        "dbt_runner": DbtRunnerResource(project_dir=str(DBT_PROJECT_DIR), profiles_dir=str(DBT_PROJECT_DIR)),
     },
 )
\ No newline at end of file
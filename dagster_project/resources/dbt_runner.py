@@ -0,0 +1,123 @@
+import threading
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Tuple
+
+from dagster import ConfigurableResource
+from dbt.cli.main import dbtRunner, dbtRunnerResult
+
+# Parsed manifests by (project dir, profile, target), shared by every invocation in this
+# process, each with the signature of the project files it was parsed from
+_manifests: Dict[Tuple[str, Optional[str], Optional[str]], Tuple[Tuple[int, int], Any]] = {}
+_runner_lock = threading.Lock()
+
+# Project files whose changes invalidate a parsed manifest
+_PROJECT_FILES = ("dbt_project.yml", "packages.yml", "dependencies.yml", "profiles.yml")
+_PROJECT_DIRS = ("models", "macros", "snapshots", "seeds", "tests", "analyses", "dbt_packages")
+
+# Package specs `dbt deps` installs from, and the stamp recording the specs it last installed
+_PACKAGE_FILES = ("packages.yml", "dependencies.yml", "package-lock.yml")
+_DEPS_STAMP = Path("dbt_packages") / ".deps_signature"
+
+
+class DbtRunnerResource(ConfigurableResource):
+    """Run dbt commands in-process with dbt's programmatic API, parsing the project once per profile.
+
+    The parsed manifest is reused by later invocations in the same process until a project
+    file changes, and partial parsing (target/partial_parse.msgpack) carries over between
+    processes. Only the auxiliary commands run here: the dbt assets' own build goes
+    through DbtCliResource, a dbt subprocess that still parses the project once per run
+    (partially, with partial_parse.msgpack).
+    """
+
+    project_dir: str
+    profiles_dir: str
+
+    def _project_args(self, profile: Optional[str], target: Optional[str]) -> List[str]:
+        args = ["--project-dir", self.project_dir, "--profiles-dir", self.profiles_dir]
+        if profile:
+            args += ["--profile", profile]
+        if target:
+            args += ["--target", target]
+        return args
+
+    def _files_signature(self) -> Tuple[int, int]:
+        """File count and latest modification time of the project files, to detect edits."""
+        root = Path(self.project_dir)
+        paths = [root / name for name in _PROJECT_FILES if (root / name).exists()]
+        for directory in _PROJECT_DIRS:
+            if (root / directory).is_dir():
+                paths += [path for path in (root / directory).rglob("*") if path.is_file()]
+        return len(paths), max((path.stat().st_mtime_ns for path in paths), default=0)
+
+    def _manifest(self, profile: Optional[str], target: Optional[str]):
+        key = (self.project_dir, profile, target)
+        signature = self._files_signature()
+        cached = _manifests.get(key)
+        if cached is None or cached[0] != signature:
+            # Re-parsed whenever a model, macro or package changed, so state:modified+
+            # never compares against stale code in a long-lived process
+            result = dbtRunner().invoke(["parse", *self._project_args(profile, target)])
+            if not result.success:
+                raise RuntimeError(f"dbt parse failed: {result.exception}")
+            _manifests[key] = (signature, result.result)
+        return _manifests[key][1]
+
+    def invoke(self, args: List[str], logger=None, *, profile: Optional[str] = None,
+               target: Optional[str] = None) -> dbtRunnerResult:
+        """Run a dbt command (e.g. ["test"]) against the cached manifest and raise if it fails."""
+        def forward(event):
+            # dbt prints its own log; surface warnings and errors in the Dagster run log too
+            if logger and event.info.level in ("warn", "error"):
+                getattr(logger, "warning" if event.info.level == "warn" else "error")(event.info.msg)
+
+        with _runner_lock:
+            if logger:
+                logger.info(f"Running in-process: dbt {' '.join(args)}")
+            runner = dbtRunner(manifest=self._manifest(profile, target), callbacks=[forward])
+            result = runner.invoke([*args, *self._project_args(profile, target)])
+
+        if not result.success:
+            raise RuntimeError(f"dbt {' '.join(args)} failed: {result.exception or 'see the dbt log above'}")
+        return result
+
+    @staticmethod
+    def run_results(result: dbtRunnerResult) -> List[Dict[str, Any]]:
+        """Per-node results of a run/test/build invocation, shaped like run_results.json entries."""
+        return [
+            {
+                "unique_id": node_result.node.unique_id,
+                "status": getattr(node_result.status, "value", node_result.status),
+                "execution_time": node_result.execution_time,
+                "adapter_response": node_result.adapter_response,
+                "message": node_result.message,
+            }
+            for node_result in getattr(result.result, "results", [])
+        ]
+
+    def _packages_signature(self) -> str:
+        """Modification time and size of each package spec, to tell whether dbt_packages is current."""
+        root = Path(self.project_dir)
+        return ";".join(
+            f"{name}:{(root / name).stat().st_mtime_ns}:{(root / name).stat().st_size}"
+            for name in _PACKAGE_FILES if (root / name).exists()
+        )
+
+    def deps(self, logger=None) -> None:
+        """Install dbt packages, unless dbt_packages already matches the package specs."""
+        stamp = Path(self.project_dir) / _DEPS_STAMP
+        with _runner_lock:
+            if stamp.exists() and stamp.read_text() == self._packages_signature():
+                if logger:
+                    logger.info("dbt packages are up to date; skipping dbt deps")
+                return
+
+            if logger:
+                logger.info("Running in-process: dbt deps")
+            result = dbtRunner().invoke(["deps", "--project-dir", self.project_dir, "--profiles-dir", self.profiles_dir])
+            if not result.success:
+                raise RuntimeError(f"dbt deps failed: {result.exception}")
+            # Written after the install, so it covers the package-lock.yml deps just wrote.
+            # Cached manifests need no clearing: the reinstalled dbt_packages files change
+            # their signature, so they are re-parsed on next use
+            stamp.parent.mkdir(exist_ok=True)
+            stamp.write_text(self._packages_signature())
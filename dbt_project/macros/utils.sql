@@ -11,3 +11,14 @@
   -- creates a stable string key for BigQuery merge unique_key
   concat({{ cols|map('string')|join(", '-' ,") }})
 {%- endmacro %}
+
+{% macro daily_partitions(start_date, end_date) -%}
+  {#- timestamp() literals of the days in [start_date, end_date), for a static insert_overwrite -#}
+  {%- set start = modules.datetime.date.fromisoformat(start_date) -%}
+  {%- set end = modules.datetime.date.fromisoformat(end_date) -%}
+  {%- set partitions = [] -%}
+  {%- for offset in range((end - start).days) -%}
+    {%- do partitions.append("timestamp('" ~ (start + modules.datetime.timedelta(days=offset)).isoformat() ~ "')") -%}
+  {%- endfor -%}
+  {{ return(partitions) }}
+{%- endmacro %}
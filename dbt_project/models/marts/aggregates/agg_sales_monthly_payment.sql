@@ -0,0 +1,48 @@
+{{ config(
+    materialized='table',
+    cluster_by=['year', 'customer_region', 'primary_payment_type']
+) }}
+
+-- Monthly sales per customer state, payment type and installment count.
+-- Grain columns are all order-level attributes, so each order falls into exactly
+-- one row and order_count stays additive. Payment attributes come from dim_payments
+-- (LEFT JOIN); has_payment is FALSE for orders without a payment record, which the
+-- payment queries exclude just like their INNER JOIN on dim_payments.
+SELECT
+  d.year,
+  d.month,
+  d.month_name,
+  c.customer_state,
+  c.customer_region,
+  p.payment_key IS NOT NULL as has_payment,
+  p.primary_payment_type,
+  p.total_installments,
+
+  MIN(d.full_date) as month_start_date,
+
+  -- Measures
+  COUNT(DISTINCT f.order_key) as order_count,
+  COUNT(f.order_item_sk) as item_count,
+  SUM(f.total_item_value) as total_item_value,
+  SUM(f.payment_value) as payment_value,
+  SUM(f.freight_value) as freight_value,
+  SUM(f.item_price) as item_price,
+
+  -- Item-level payment method counts and sums behind the payment averages
+  SUM(CASE WHEN p.uses_credit_card THEN 1 ELSE 0 END) as credit_card_items,
+  SUM(CASE WHEN p.uses_boleto THEN 1 ELSE 0 END) as boleto_items,
+  SUM(CASE WHEN p.uses_voucher THEN 1 ELSE 0 END) as voucher_items,
+  SUM(p.payment_methods_count) as payment_methods_count_sum,
+  COUNT(p.payment_methods_count) as payment_methods_count_n
+
+FROM {{ ref('fact_sales') }} f
+INNER JOIN {{ ref('dim_date') }} d
+  ON f.date_key = d.date_key
+INNER JOIN {{ ref('dim_customers') }} c
+  ON f.customer_key = c.customer_key
+LEFT JOIN {{ ref('dim_payments') }} p
+  ON f.payment_key = p.payment_key
+GROUP BY
+  d.year, d.month, d.month_name,
+  c.customer_state, c.customer_region,
+  has_payment, p.primary_payment_type, p.total_installments
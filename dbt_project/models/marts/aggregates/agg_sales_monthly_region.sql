@@ -0,0 +1,31 @@
+{{ config(
+    materialized='table',
+    cluster_by=['year', 'customer_region']
+) }}
+
+-- Monthly sales per customer region: the smallest aggregate, enough for the
+-- monthly sales trends with any year/region filter.
+-- Every measure is additive: an order has a single purchase date and customer,
+-- so it falls into exactly one row and order_count can be summed across rows.
+SELECT
+  d.year,
+  d.month,
+  d.month_name,
+  c.customer_region,
+
+  MIN(d.full_date) as month_start_date,
+
+  -- Measures
+  COUNT(DISTINCT f.order_key) as order_count,
+  COUNT(f.order_item_sk) as item_count,
+  SUM(f.total_item_value) as total_item_value,
+  SUM(f.payment_value) as payment_value,
+  SUM(f.freight_value) as freight_value,
+  SUM(f.item_price) as item_price
+
+FROM {{ ref('fact_sales') }} f
+INNER JOIN {{ ref('dim_date') }} d
+  ON f.date_key = d.date_key
+INNER JOIN {{ ref('dim_customers') }} c
+  ON f.customer_key = c.customer_key
+GROUP BY d.year, d.month, d.month_name, c.customer_region
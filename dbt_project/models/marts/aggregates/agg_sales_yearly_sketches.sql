@@ -0,0 +1,39 @@
+{{ config(
+    materialized='table',
+    cluster_by=['year', 'customer_region', 'seller_region']
+) }}
+
+-- Yearly sales per customer state, seller region and product category, with
+-- HyperLogLog++ sketches for the distinct counts. Unlike COUNT(DISTINCT ...),
+-- sketches merge across rows (HLL_COUNT.MERGE), so distinct orders, customers,
+-- sellers and products can be rolled up to any coarser grain and filter.
+SELECT
+  d.year,
+  c.customer_state,
+  c.customer_region,
+  s.seller_region,
+  p.product_category_english,
+
+  -- Additive measures
+  COUNT(f.order_item_sk) as item_count,
+  SUM(f.total_item_value) as total_item_value,
+  SUM(f.payment_value) as payment_value,
+  SUM(f.freight_value) as freight_value,
+  SUM(f.item_price) as item_price,
+
+  -- Distinct-count sketches (default precision 15, ~0.5% relative error)
+  HLL_COUNT.INIT(f.order_key) as order_sketch,
+  HLL_COUNT.INIT(f.customer_key) as customer_sketch,
+  HLL_COUNT.INIT(f.seller_key) as seller_sketch,
+  HLL_COUNT.INIT(f.product_key) as product_sketch
+
+FROM {{ ref('fact_sales') }} f
+INNER JOIN {{ ref('dim_date') }} d
+  ON f.date_key = d.date_key
+INNER JOIN {{ ref('dim_customers') }} c
+  ON f.customer_key = c.customer_key
+INNER JOIN {{ ref('dim_sellers') }} s
+  ON f.seller_key = s.seller_key
+INNER JOIN {{ ref('dim_products') }} p
+  ON f.product_key = p.product_key
+GROUP BY d.year, c.customer_state, c.customer_region, s.seller_region, p.product_category_english
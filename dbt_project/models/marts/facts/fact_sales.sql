@@ -1,13 +1,32 @@
+{#- With partition_start/partition_end vars (YYYY-MM-DD, end exclusive) only the purchase days
+    in that window are read and rebuilt, and their partitions overwritten; otherwise new and
+    modified rows are merged -#}
+{%- set partition_start = var('partition_start', none) -%}
+{%- set partition_end = var('partition_end', none) -%}
+
 {{ config(
     materialized='incremental',
-    incremental_strategy='merge',
+    incremental_strategy=('insert_overwrite' if partition_start else 'merge'),
+    partitions=(daily_partitions(partition_start, partition_end) if partition_start else none),
     unique_key='order_item_sk',
     on_schema_change='sync_all_columns',
     partition_by={"field":"order_purchase_ts","data_type":"timestamp","granularity":"day"},
     cluster_by=['order_key','customer_key','product_key','seller_key']
 ) }}
 
-WITH order_items_base AS (
+WITH
+{% if partition_start %}
+-- Orders purchased in the window; order items are semi-joined to them so a run only
+-- reads the window's items
+window_orders AS (
+  SELECT order_id
+  FROM {{ ref('stg_orders') }}
+  WHERE order_purchase_timestamp >= timestamp('{{ partition_start }}')
+    AND order_purchase_timestamp < timestamp('{{ partition_end }}')
+),
+
+{% endif %}
+order_items_base AS (
   SELECT
     -- Surrogate key: unique identifier for each order item
     CONCAT(order_id, '-', order_item_id) as order_item_sk,
@@ -28,7 +47,9 @@ WITH order_items_base AS (
     
   FROM {{ ref('stg_order_items') }}
   WHERE TRUE
-  {% if is_incremental() %}
+  {% if partition_start %}
+    AND order_id IN (SELECT order_id FROM window_orders)
+  {% elif is_incremental() %}
     AND modified_at >
       (select coalesce(max(modified_at), timestamp('1970-01-01')) from {{ this }})
   {% endif %}
@@ -56,7 +77,10 @@ enriched_orders AS (
   WHERE o.customer_id IS NOT NULL
     AND o.order_purchase_timestamp IS NOT NULL
     AND c.customer_unique_id IS NOT NULL
-  {% if is_incremental() %}
+  {% if partition_start %}
+    AND o.order_purchase_timestamp >= timestamp('{{ partition_start }}')
+    AND o.order_purchase_timestamp < timestamp('{{ partition_end }}')
+  {% elif is_incremental() %}
     AND o.modified_at >
       (select coalesce(max(o.modified_at), timestamp('1970-01-01')) from {{ this }})
     AND c.modified_at >
@@ -0,0 +1,96 @@
+#!/usr/bin/env python3
+"""
+Export every dashboard query result as versioned Parquet serving extracts
+
+Runs each data_queries.get_* function for every sidebar year x region combination
+(top-N queries at the largest N the dashboard offers) and stores the stacked results,
+tagged with their filter values, as one zstd-compressed Parquet file per function
+under SERVING_EXTRACTS_DIR/<marts_version>/. The CURRENT pointer is switched to the
+new set once it is complete.
+
+Usage:
+    python export_extracts.py
+
+Then run the dashboard with SERVING_EXTRACTS_ENABLED=true; it reads the extracts
+and needs no warehouse connection. The last line of output is a JSON summary
+(marts version, query counts, rows, duration).
+"""
+
+import inspect
+import json
+import sys
+import time
+
+import pandas as pd
+
+from utils.bigquery_client import QUERY_BACKEND, fetch_concurrently, get_marts_version
+from utils import serving_extracts
+from utils.data_queries import YEAR_OPTIONS, REGION_OPTIONS, query_functions, filter_combinations
+
+def _extract_calls():
+    """One zero-argument call per (function name, filter items) combination"""
+    calls = {}
+    for name, func in query_functions().items():
+        limit = {"limit": serving_extracts.EXTRACT_LIMIT} if "limit" in inspect.signature(func).parameters else {}
+        for kwargs in filter_combinations(func):
+            # Call the undecorated function so results come from the warehouse
+            # (or execute_query's disk cache), never from an older extract set
+            calls[(name, tuple(kwargs.items()))] = (
+                lambda func=func, kwargs=kwargs, limit=limit: func.__wrapped__(**kwargs, **limit)
+            )
+    return calls
+
+def export_extracts() -> dict:
+    """Run every dashboard query, write the results as a new extract set and return a summary"""
+    # Extracts are always built from the warehouse, whatever the dashboard settings are
+    serving_extracts.SERVING_EXTRACTS_ENABLED = False
+
+    if QUERY_BACKEND == "bigquery":
+        from fix_secrets import fix_secrets
+        fix_secrets()
+
+    start = time.perf_counter()
+    marts_version = get_marts_version(force_refresh=True)
+    results = fetch_concurrently(_extract_calls())
+
+    failed = sorted(f"{name}{dict(filters)}" for (name, filters), df in results.items() if len(df.columns) == 0)
+    for label in failed:
+        print(f"❌ {label}")
+
+    summary = {
+        "marts_version": marts_version,
+        "queries": len(results),
+        "failed": len(failed),
+        "rows": 0,
+        "seconds": 0.0,
+    }
+    if failed:
+        # A partial set would silently serve empty panels, so keep the previous one
+        summary["seconds"] = round(time.perf_counter() - start, 1)
+        return summary
+
+    stacked = {}
+    for (name, filters), df in results.items():
+        filters = dict(filters)
+        tagged = df.assign(
+            year_filter=filters.get("year_filter", YEAR_OPTIONS[0]),
+            region_filter=filters.get("region_filter", REGION_OPTIONS[0])
+        )
+        stacked.setdefault(name, []).append(tagged)
+    frames = {name: pd.concat(parts, ignore_index=True) for name, parts in stacked.items()}
+
+    target = serving_extracts.write_extract_set(
+        marts_version,
+        frames,
+        filters={"year_filter": YEAR_OPTIONS, "region_filter": REGION_OPTIONS}
+    )
+
+    summary["rows"] = sum(len(df) for df in frames.values())
+    summary["seconds"] = round(time.perf_counter() - start, 1)
+    print(f"✅ Exported {len(frames)} extracts ({summary['rows']} rows) to {target}")
+    return summary
+
+if __name__ == "__main__":
+    summary = export_extracts()
+    print(json.dumps(summary))
+    sys.exit(1 if summary["failed"] else 0)
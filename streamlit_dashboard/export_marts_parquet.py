@@ -0,0 +1,70 @@
+#!/usr/bin/env python3
+"""
+Export the marts tables to Parquet for the local DuckDB query backend
+
+Usage:
+    python export_marts_parquet.py [output_dir]
+
+Then run the dashboard with QUERY_BACKEND=duckdb (and DUCKDB_PARQUET_DIR=output_dir
+if a custom directory was used).
+"""
+
+import os
+import sys
+from pathlib import Path
+
+import pyarrow.parquet as pq
+from dotenv import load_dotenv
+from google.api_core.exceptions import NotFound
+from google.cloud import bigquery
+
+from utils.query_backends import AGGREGATE_TABLES, MARTS_TABLES
+
+# Load .env from the parent directory
+env_path = Path(__file__).resolve().parent.parent / ".env"
+if env_path.exists():
+    load_dotenv(dotenv_path=env_path)
+else:
+    # fallback: try env_sample if .env does not exist
+    sample_env_path = Path(__file__).resolve().parent.parent / "env_sample"
+    if sample_env_path.exists():
+        load_dotenv(dotenv_path=sample_env_path)
+
+DEFAULT_OUTPUT_DIR = Path(__file__).resolve().parent / ".cache" / "marts_parquet"
+
+def export_marts(output_dir: Path):
+    """Download every marts table and write it to <output_dir>/<table>.parquet"""
+
+    credentials_path = os.environ.get("CREDENTIALS_PATH")
+    if not credentials_path:
+        raise EnvironmentError("CREDENTIALS_PATH environment variable not set")
+    olis_marts = os.environ.get("MARTS_DATASET_NAME")
+    if not olis_marts:
+        raise EnvironmentError("MARTS_DATASET_NAME environment variable not set")
+    marts_dataset = olis_marts if olis_marts.endswith("_marts") else f"{olis_marts}_marts"
+
+    client = bigquery.Client.from_service_account_json(credentials_path)
+    output_dir.mkdir(parents=True, exist_ok=True)
+
+    for table_name in MARTS_TABLES + AGGREGATE_TABLES:
+        table_id = f"{client.project}.{marts_dataset}.{table_name}"
+
+        # Reading table data directly is free, unlike SELECT * queries
+        try:
+            table = client.list_rows(table_id).to_arrow(create_bqstorage_client=True)
+        except NotFound:
+            if table_name not in AGGREGATE_TABLES:
+                raise
+            print(f"⏭️ {table_name}: not built yet, skipped")
+            continue
+
+        # Write under a temporary name so a running dashboard never reads a partial file
+        target = output_dir / f"{table_name}.parquet"
+        tmp_target = output_dir / f".{table_name}.parquet.tmp"
+        pq.write_table(table, tmp_target, compression="zstd")
+        os.replace(tmp_target, target)
+
+        print(f"✅ {table_name}: {table.num_rows:,} rows → {target}")
+
+if __name__ == "__main__":
+    export_marts(Path(sys.argv[1]) if len(sys.argv) > 1 else DEFAULT_OUTPUT_DIR)
@@ -6,7 +6,7 @@ Provides additional data exploration and analysis capabilities
 import streamlit as st
 import pandas as pd
 from utils.bigquery_client import (
-    init_connection, 
+    get_backend, 
     test_connection, 
     get_table_info, 
     get_sample_data,
@@ -87,8 +87,8 @@ def main():
         st.header("Connection Info")
         
         try:
-            client = init_connection()
-            st.success(f"✅ Connected to: {client.project}")
+            backend = get_backend()
+            st.success(f"✅ Connected to: {backend.description}")
             
             # Get table info
             table_info = get_table_info()
@@ -0,0 +1,173 @@
+"""
+Performance Page for Olist Analytics Dashboard
+Shows latency, bytes billed, slot usage and cache hits of recent dashboard queries
+"""
+
+import streamlit as st
+from utils.bigquery_client import (
+    DRY_RUN_ENABLED,
+    MAX_BYTES_BILLED,
+    QUERY_BYTES_BUDGETS,
+    get_dry_run_estimates
+)
+from utils.query_telemetry import (
+    get_query_log,
+    summarize_query_log,
+    clear_query_log,
+    QUERY_TELEMETRY_MAX_ENTRIES
+)
+import plotly.express as px
+
+st.set_page_config(
+    page_title="Performance - Olist Analytics",
+    page_icon="⏱️",
+    layout="wide"
+)
+
+def main():
+    """Performance page main function"""
+
+    st.title("⏱️ Query Performance")
+    st.markdown(
+        f"Statistics for the last {QUERY_TELEMETRY_MAX_ENTRIES:,} queries run by this dashboard process"
+    )
+
+    # Sidebar for controls
+    with st.sidebar:
+        st.header("Performance Controls")
+
+        if st.button("🔄 Refresh"):
+            st.rerun()
+
+        if st.button("🗑️ Clear Query Log"):
+            clear_query_log()
+            st.success("Query log cleared")
+
+    query_log = get_query_log()
+
+    if query_log.empty:
+        st.info("No queries recorded yet. Open the main dashboard to run some queries.")
+        return
+
+    summary = summarize_query_log(query_log)
+    warehouse_queries = query_log[query_log['source'] == 'warehouse']
+
+    # Headline metrics
+    col1, col2, col3, col4 = st.columns(4)
+
+    with col1:
+        st.metric("Queries", f"{len(query_log):,}")
+
+    with col2:
+        disk_hit_rate = (query_log['source'] == 'disk_cache').mean() * 100
+        st.metric("Disk Cache Hit Rate", f"{disk_hit_rate:.1f}%")
+
+    with col3:
+        bytes_billed = warehouse_queries['total_bytes_billed'].fillna(0).sum()
+        st.metric("Bytes Billed", f"{bytes_billed / (1024 ** 3):,.2f} GiB")
+
+    with col4:
+        p95_ms = query_log['total_ms'].quantile(0.95)
+        st.metric("p95 Latency", f"{p95_ms:,.0f} ms")
+
+    # Per-function summary
+    st.markdown("---")
+    st.header("📊 By Query Function")
+
+    col1, col2 = st.columns(2)
+
+    with col1:
+        fig = px.bar(
+            summary.sort_values('bytes_billed'),
+            x='bytes_billed',
+            y='caller',
+            orientation='h',
+            title="Bytes Billed by Function",
+            labels={'bytes_billed': 'Bytes Billed', 'caller': 'Function'}
+        )
+        st.plotly_chart(fig, width="stretch")
+
+    with col2:
+        fig = px.bar(
+            summary.sort_values('p95_ms'),
+            x='p95_ms',
+            y='caller',
+            orientation='h',
+            title="p95 Latency by Function (ms)",
+            labels={'p95_ms': 'p95 Latency (ms)', 'caller': 'Function'}
+        )
+        st.plotly_chart(fig, width="stretch")
+
+    st.dataframe(summary, width="stretch")
+
+    # Time breakdown of warehouse queries
+    if not warehouse_queries.empty:
+        st.subheader("Where the Time Goes")
+        phases = warehouse_queries.groupby('caller')[
+            ['queue_ms', 'exec_ms', 'fetch_ms', 'conversion_ms']
+        ].mean().reset_index()
+        phases = phases.melt(id_vars='caller', var_name='phase', value_name='avg_ms')
+
+        fig = px.bar(
+            phases,
+            x='avg_ms',
+            y='caller',
+            color='phase',
+            orientation='h',
+            title="Average Time per Phase (ms)",
+            labels={'avg_ms': 'Average Time (ms)', 'caller': 'Function', 'phase': 'Phase'}
+        )
+        st.plotly_chart(fig, width="stretch")
+
+    # Byte budgets
+    st.subheader("💸 Byte Budgets")
+    budget_text = f"{MAX_BYTES_BILLED:,} bytes" if MAX_BYTES_BILLED else "unlimited"
+    st.markdown(
+        f"Default budget: **{budget_text}**, {len(QUERY_BYTES_BUDGETS)} per-function override(s). "
+        f"Dry runs are **{'on' if DRY_RUN_ENABLED else 'off'}**."
+    )
+
+    over_budget = query_log[query_log['over_budget']]
+    if not over_budget.empty:
+        st.error(f"{len(over_budget)} queries exceeded their byte budget")
+        st.dataframe(
+            over_budget[['started_at', 'caller', 'fingerprint', 'estimated_bytes', 'bytes_budget', 'error']],
+            width="stretch"
+        )
+
+    if DRY_RUN_ENABLED:
+        budgets = summary[['caller', 'max_estimated_bytes', 'bytes_budget', 'bytes_billed', 'over_budget']]
+        st.dataframe(budgets.sort_values('max_estimated_bytes', ascending=False), width="stretch")
+        with st.expander("Dry-run estimates by query fingerprint"):
+            st.dataframe(get_dry_run_estimates(), width="stretch")
+
+    # Failed queries
+    failed = query_log[query_log['error'].notna()]
+    if not failed.empty:
+        st.subheader("❌ Failed Queries")
+        st.dataframe(failed[['started_at', 'caller', 'fingerprint', 'error']], width="stretch")
+
+    # Raw log
+    st.markdown("---")
+    st.header("📋 Recent Queries")
+    st.dataframe(
+        query_log[[
+            'started_at', 'caller', 'template_id', 'fingerprint', 'backend', 'source',
+            'total_ms', 'queue_ms', 'exec_ms', 'fetch_ms', 'conversion_ms',
+            'total_bytes_processed', 'total_bytes_billed', 'estimated_bytes', 'bytes_budget',
+            'over_budget', 'attempts', 'hedged', 'slot_millis', 'cache_hit', 'rows', 'job_id'
+        ]],
+        width="stretch"
+    )
+
+    # Footer
+    st.markdown("---")
+    st.markdown(
+        "<div style='text-align: center; color: #666;'>"
+        "Query Performance | Olist Analytics Dashboard"
+        "</div>",
+        unsafe_allow_html=True
+    )
+
+if __name__ == "__main__":
+    main()
@@ -8,7 +8,13 @@ import pandas as pd
 import plotly.express as px
 import plotly.graph_objects as go
 from plotly.subplots import make_subplots
-from utils.bigquery_client import init_connection
+from utils.bigquery_client import (
+    init_connection,
+    QUERY_BACKEND,
+    fetch_concurrently,
+    get_marts_version,
+    get_marts_last_modified
+)
 from utils.data_queries import (
     get_monthly_sales_trends,
     get_top_products_categories,
@@ -26,9 +32,9 @@ from utils.data_queries import (
     get_reviews_sales_correlation,
     get_review_score_distribution,
     get_review_timing_analysis,
-    get_delivery_patterns,
-    get_delivery_time_distribution,
-    get_delivery_efficiency_analysis
+    get_delivery_tab,
+    YEAR_OPTIONS,
+    REGION_OPTIONS
 )
 from utils.visualization_helpers import (
     create_line_chart,
@@ -41,9 +47,13 @@ from utils.visualization_helpers import (
     create_customer_behavior_pie_chart,
     create_customer_value_pie_chart
 )
+from utils.serving_extracts import SERVING_EXTRACTS_ENABLED
 from fix_secrets import fix_secrets
 
-fix_secrets()
+# The local DuckDB backend reads Parquet replicas and serving extracts are local
+# files; neither needs a service account
+if QUERY_BACKEND == "bigquery" and not SERVING_EXTRACTS_ENABLED:
+    fix_secrets()
 
 # Page configuration
 st.set_page_config(
@@ -53,7 +63,7 @@ st.set_page_config(
     initial_sidebar_state="expanded"
 )
 
-# Custom CSS for better styling and responsive tabs
+# Custom CSS for better styling and responsive section navigation
 st.markdown("""
 <style>
     .main-header {
@@ -73,9 +83,10 @@ st.markdown("""
         padding: 1rem 0;
     }
     
-    /* Enhanced tab styling for better mobile experience */
-    .stTabs [data-baseweb="tab-list"] {
+    /* Section selector styling for better mobile experience */
+    div[role="radiogroup"] {
         gap: 4px;
+        flex-wrap: nowrap;
         overflow-x: auto;
         overflow-y: hidden;
         scrollbar-width: thin;
@@ -86,25 +97,25 @@ st.markdown("""
         -webkit-overflow-scrolling: touch;
     }
     
-    .stTabs [data-baseweb="tab-list"]::-webkit-scrollbar {
+    div[role="radiogroup"]::-webkit-scrollbar {
         height: 6px;
     }
     
-    .stTabs [data-baseweb="tab-list"]::-webkit-scrollbar-track {
+    div[role="radiogroup"]::-webkit-scrollbar-track {
         background: #f0f2f6;
         border-radius: 3px;
     }
     
-    .stTabs [data-baseweb="tab-list"]::-webkit-scrollbar-thumb {
+    div[role="radiogroup"]::-webkit-scrollbar-thumb {
         background: #d4d4d4;
         border-radius: 3px;
     }
     
-    .stTabs [data-baseweb="tab-list"]::-webkit-scrollbar-thumb:hover {
+    div[role="radiogroup"]::-webkit-scrollbar-thumb:hover {
         background: #b3b3b3;
     }
     
-    .stTabs [data-baseweb="tab"] {
+    div[role="radiogroup"] label {
         flex-shrink: 0;
         white-space: nowrap;
         min-width: fit-content;
@@ -114,12 +125,12 @@ st.markdown("""
     
     /* Mobile responsive adjustments */
     @media (max-width: 768px) {
-        .stTabs [data-baseweb="tab"] {
+        div[role="radiogroup"] label {
             font-size: 12px;
             padding: 6px 12px;
         }
         
-        .stTabs [data-baseweb="tab-list"] {
+        div[role="radiogroup"] {
             gap: 2px;
             padding: 2px 4px;
         }
@@ -130,7 +141,7 @@ st.markdown("""
     }
     
     @media (max-width: 480px) {
-        .stTabs [data-baseweb="tab"] {
+        div[role="radiogroup"] label {
             font-size: 10px;
             padding: 4px 8px;
         }
@@ -139,99 +150,118 @@ st.markdown("""
             font-size: 1.5rem;
         }
     }
-    
-    /* Scroll hint for mobile */
-    .stTabs::before {
-        content: "";
-        position: absolute;
-        top: 0;
-        right: 0;
-        width: 20px;
-        height: 100%;
-        background: linear-gradient(to left, rgba(255,255,255,0.8), transparent);
-        pointer-events: none;
-        z-index: 1;
-    }
-    
-    @media (min-width: 769px) {
-        .stTabs::before {
-            display: none;
-        }
-    }
 </style>
 """, unsafe_allow_html=True)
 
-def main():
-    """Main dashboard application"""
-    
-    # Header
-    st.markdown('<h1 class="main-header">Olist E-commerce Analytics Dashboard</h1>', unsafe_allow_html=True)
-    
-    # Mobile scroll hint
-    if st.session_state.get('show_mobile_hint', True):
-        col1, col2, col3 = st.columns([1, 2, 1])
-        with col2:
-            st.info("📱 On mobile? Swipe left/right on tabs to navigate all sections", icon="💡")
-        if st.button("Got it!", key="dismiss_hint"):
-            st.session_state.show_mobile_hint = False
-            st.rerun()
+def render_monthly_sales_trends(selected_year: str, selected_region: str):
+    """Section 1: Monthly sales trends"""
+    st.header("Monthly Sales Trends")
+    st.markdown("Analyze sales revenue, order volume, and average order values over time")
     
-    # Sidebar
-    with st.sidebar:
-        st.header("Dashboard Controls")
-        
-        # Data refresh button
-        if st.button("🔄 Refresh Data", type="primary"):
-            st.cache_data.clear()
-            st.success("Cache cleared! Data will refresh on next query.")
-        
-        st.markdown("---")
-        
-        # Filter options
-        st.subheader("Filters")
-        selected_year = st.selectbox(
-            "Select Year",
-            options=["All Years", "2016", "2017", "2018"],
-            index=0
-        )
+    try:
+        # Get data with filtering
+        sales_data = get_monthly_sales_trends(year_filter=selected_year, region_filter=selected_region)
         
-        selected_region = st.selectbox(
-            "Select Region",
-            options=["All Regions", "North", "Northeast", "Southeast", "South", "Central-West"],
-            index=0
-        )
+        # Display active filters
+        if selected_year != "All Years" or selected_region != "All Regions":
+            filter_text = []
+            if selected_year != "All Years":
+                filter_text.append(f"Year: {selected_year}")
+            if selected_region != "All Regions":
+                filter_text.append(f"Region: {selected_region}")
+            st.info(f"🎯 Active filters: {' | '.join(filter_text)}")
         
-        st.markdown("---")
+        if not sales_data.empty:
+            # Calculate summary metrics
+            total_sales = sales_data['total_sales'].sum()
+            total_orders = sales_data['total_orders'].sum()
+            total_items = sales_data['total_items'].sum()
+            avg_order_value = total_sales / total_orders if total_orders > 0 else 0
+            
+            # Display KPI metrics
+            col1, col2, col3, col4 = st.columns(4)
+            with col1:
+                st.metric(
+                    "Total Sales", 
+                    f"${total_sales:,.2f}",
+                    help="Total revenue from all orders"
+                )
+            with col2:
+                st.metric(
+                    "Total Orders", 
+                    f"{total_orders:,}",
+                    help="Total number of orders"
+                )
+            with col3:
+                st.metric(
+                    "Total Items", 
+                    f"{total_items:,}",
+                    help="Total number of items sold"
+                )
+            with col4:
+                st.metric(
+                    "Avg Order Value", 
+                    f"${avg_order_value:.2f}",
+                    help="Average value per order"
+                )
+            
+            # Create comprehensive sales trend chart
+            st.subheader("Sales Performance Over Time")
+            sales_chart = create_sales_trend_chart(sales_data)
+            st.plotly_chart(sales_chart, width="stretch")
+            
+            # Detailed data table
+            st.subheader("Detailed Monthly Breakdown")
+            
+            # Format the data for display
+            display_data = sales_data.copy()
+            display_data['total_sales'] = display_data['total_sales'].apply(lambda x: f"${x:,.2f}")
+            display_data['avg_order_value'] = display_data['avg_order_value'].apply(lambda x: f"${x:.2f}")
+            display_data['total_orders'] = display_data['total_orders'].apply(lambda x: f"{x:,}")
+            display_data['total_items'] = display_data['total_items'].apply(lambda x: f"{x:,}")
+            
+            # Select and rename columns for display
+            display_columns = {
+                'month_year': 'Month',
+                'month_name': 'Month Name',
+                'year': 'Year',
+                'total_sales': 'Total Sales',
+                'total_orders': 'Total Orders',
+                'total_items': 'Total Items',
+                'avg_order_value': 'Avg Order Value'
+            }
+            
+            st.dataframe(
+                display_data[list(display_columns.keys())].rename(columns=display_columns),
+                width="stretch",
+                hide_index=True
+            )
+            
+            # Download option
+            csv = sales_data.to_csv(index=False)
+            st.download_button(
+                label="📥 Download Monthly Sales Data",
+                data=csv,
+                file_name=f"monthly_sales_trends_{selected_year if selected_year != 'All Years' else 'all_years'}.csv",
+                mime="text/csv"
+            )
+            
+        else:
+            st.warning("No sales data available for the selected filters.")
         
-        # Data info
-        st.subheader("Data Info")
-        st.info("""
-        **Last Updated**: Data refreshed from BigQuery marts
-        **Data Source**: Olist e-commerce transactions
-        **Cache TTL**: 10 minutes
-        """)
-    
-    # Main content tabs
-    tab1, tab2, tab3, tab4, tab5, tab6, tab7, tab8 = st.tabs([
-        "📈 Monthly Sales Trends",
-        "🏷️ Top Products & Categories", 
-        "🌍 Geographic Sales Distribution",
-        "👥 Customer Purchase Behavior",
-        "💳 Payment Method Impact",
-        "🏪 Seller Performance Analysis",
-        "⭐ Reviews & Sales Correlation",
-        "🚚 Delivery Time Patterns"
-    ])
+    except Exception as e:
+        st.error(f"Error loading sales trends data: {str(e)}")
+        st.info("Please check your BigQuery connection and data availability.")
+
+def render_top_products_categories(selected_year: str, selected_region: str):
+    """Section 2: Top products and categories"""
+    st.header("Top Products & Categories")
+    st.markdown("Identify highest revenue and sales volume product categories")
     
-    # Tab 1: Monthly Sales Trends
-    with tab1:
-        st.header("Monthly Sales Trends")
-        st.markdown("Analyze sales revenue, order volume, and average order values over time")
-        
-        try:
-            # Get data with filtering
-            sales_data = get_monthly_sales_trends(year_filter=selected_year, region_filter=selected_region)
-            
+    try:
+        # Controls for this tab
+        col1, col2 = st.columns([3, 1])
+        with col1:
             # Display active filters
             if selected_year != "All Years" or selected_region != "All Regions":
                 filter_text = []
@@ -240,1559 +270,1571 @@ def main():
                 if selected_region != "All Regions":
                     filter_text.append(f"Region: {selected_region}")
                 st.info(f"🎯 Active filters: {' | '.join(filter_text)}")
+        
+        with col2:
+            # Number of categories to show
+            top_n = st.selectbox(
+                "Top N Categories",
+                options=[10, 15, 20, 25, 30],
+                index=2,  # Default to 20
+                help="Number of top categories to display"
+            )
+        
+        # Get data with filtering
+        categories_data = get_top_products_categories(
+            limit=top_n, 
+            year_filter=selected_year, 
+            region_filter=selected_region,
+            approximate=st.session_state.get('approximate_counts', False)
+        )
+        
+        if not categories_data.empty:
+            # Summary KPIs
+            total_categories = len(categories_data)
+            total_revenue = categories_data['total_revenue'].sum()
+            total_products = categories_data['unique_products'].sum()
+            total_items_sold = categories_data['items_sold'].sum()
             
-            if not sales_data.empty:
-                # Calculate summary metrics
-                total_sales = sales_data['total_sales'].sum()
-                total_orders = sales_data['total_orders'].sum()
-                total_items = sales_data['total_items'].sum()
-                avg_order_value = total_sales / total_orders if total_orders > 0 else 0
-                
-                # Display KPI metrics
-                col1, col2, col3, col4 = st.columns(4)
-                with col1:
-                    st.metric(
-                        "Total Sales", 
-                        f"${total_sales:,.2f}",
-                        help="Total revenue from all orders"
-                    )
-                with col2:
-                    st.metric(
-                        "Total Orders", 
-                        f"{total_orders:,}",
-                        help="Total number of orders"
-                    )
-                with col3:
-                    st.metric(
-                        "Total Items", 
-                        f"{total_items:,}",
-                        help="Total number of items sold"
-                    )
-                with col4:
-                    st.metric(
-                        "Avg Order Value", 
-                        f"${avg_order_value:.2f}",
-                        help="Average value per order"
-                    )
-                
-                # Create comprehensive sales trend chart
-                st.subheader("Sales Performance Over Time")
-                sales_chart = create_sales_trend_chart(sales_data)
-                st.plotly_chart(sales_chart, width="stretch")
-                
-                # Detailed data table
-                st.subheader("Detailed Monthly Breakdown")
-                
-                # Format the data for display
-                display_data = sales_data.copy()
-                display_data['total_sales'] = display_data['total_sales'].apply(lambda x: f"${x:,.2f}")
-                display_data['avg_order_value'] = display_data['avg_order_value'].apply(lambda x: f"${x:.2f}")
-                display_data['total_orders'] = display_data['total_orders'].apply(lambda x: f"{x:,}")
-                display_data['total_items'] = display_data['total_items'].apply(lambda x: f"{x:,}")
-                
-                # Select and rename columns for display
-                display_columns = {
-                    'month_year': 'Month',
-                    'month_name': 'Month Name',
-                    'year': 'Year',
-                    'total_sales': 'Total Sales',
-                    'total_orders': 'Total Orders',
-                    'total_items': 'Total Items',
-                    'avg_order_value': 'Avg Order Value'
-                }
-                
-                st.dataframe(
-                    display_data[list(display_columns.keys())].rename(columns=display_columns),
-                    width="stretch",
-                    hide_index=True
+            # Display summary metrics
+            col1, col2, col3, col4 = st.columns(4)
+            with col1:
+                st.metric(
+                    "Categories Analyzed",
+                    f"{total_categories}",
+                    help="Number of product categories in results"
                 )
-                
-                # Download option
-                csv = sales_data.to_csv(index=False)
-                st.download_button(
-                    label="📥 Download Monthly Sales Data",
-                    data=csv,
-                    file_name=f"monthly_sales_trends_{selected_year if selected_year != 'All Years' else 'all_years'}.csv",
-                    mime="text/csv"
+            with col2:
+                st.metric(
+                    "Total Revenue",
+                    f"${total_revenue:,.2f}",
+                    help="Combined revenue from top categories"
+                )
+            with col3:
+                st.metric(
+                    "Unique Products",
+                    f"{total_products:,}",
+                    help="Total unique products in top categories"
+                )
+            with col4:
+                st.metric(
+                    "Items Sold",
+                    f"{total_items_sold:,}",
+                    help="Total items sold across top categories"
                 )
-                
-            else:
-                st.warning("No sales data available for the selected filters.")
             
-        except Exception as e:
-            st.error(f"Error loading sales trends data: {str(e)}")
-            st.info("Please check your BigQuery connection and data availability.")
-    
-    # Tab 2: Top Products & Categories
-    with tab2:
-        st.header("Top Products & Categories")
-        st.markdown("Identify highest revenue and sales volume product categories")
+            st.markdown("---")
+            
+            # Main visualizations
+            col1, col2 = st.columns([3, 2])
+            
+            with col1:
+                # Bar chart for top categories by revenue
+                st.subheader("Top Categories by Revenue")
+                revenue_chart = create_bar_chart(
+                    categories_data.head(15),  # Show top 15 for readability
+                    x_col='category',
+                    y_col='total_revenue',
+                    title='Category Revenue Performance',
+                    x_title='Product Category',
+                    y_title='Total Revenue ($)',
+                    height=500
+                )
+                # Rotate x-axis labels for better readability
+                revenue_chart.update_xaxes(tickangle=45)
+                st.plotly_chart(revenue_chart, width="stretch")
         
-        try:
-            # Controls for this tab
-            col1, col2 = st.columns([3, 1])
+            with col2:
+                # Pie chart for revenue distribution
+                st.subheader("Revenue Distribution")
+                top_10_for_pie = categories_data.head(10).copy()
+                if len(categories_data) > 10:
+                    others_revenue = categories_data.tail(len(categories_data) - 10)['total_revenue'].sum()
+                    others_row = pd.DataFrame({
+                        'category': ['Others'],
+                        'total_revenue': [others_revenue]
+                    })
+                    top_10_for_pie = pd.concat([top_10_for_pie[['category', 'total_revenue']], others_row], ignore_index=True)
+                
+                pie_chart = create_pie_chart(
+                    top_10_for_pie,
+                    names_col='category',
+                    values_col='total_revenue',
+                    title='Revenue Share by Category',
+                    height=500
+                )
+                st.plotly_chart(pie_chart, width="stretch")
+            
+            # Secondary visualizations
+            col1, col2 = st.columns(2)
+            
             with col1:
-                # Display active filters
-                if selected_year != "All Years" or selected_region != "All Regions":
-                    filter_text = []
-                    if selected_year != "All Years":
-                        filter_text.append(f"Year: {selected_year}")
-                    if selected_region != "All Regions":
-                        filter_text.append(f"Region: {selected_region}")
-                    st.info(f"🎯 Active filters: {' | '.join(filter_text)}")
+                # Items sold vs revenue scatter plot
+                st.subheader("Items Sold vs Revenue")
+                scatter_fig = px.scatter(
+                    categories_data,
+                    x='items_sold',
+                    y='total_revenue',
+                    size='unique_products',
+                    hover_name='category',
+                    title='Category Performance Matrix',
+                    labels={
+                        'items_sold': 'Items Sold',
+                        'total_revenue': 'Total Revenue ($)',
+                        'unique_products': 'Unique Products'
+                    },
+                    height=400
+                )
+                scatter_fig.update_layout(
+                    title_x=0.5,
+                    plot_bgcolor='white',
+                    paper_bgcolor='white'
+                )
+                st.plotly_chart(scatter_fig, width="stretch")
             
             with col2:
-                # Number of categories to show
-                top_n = st.selectbox(
-                    "Top N Categories",
-                    options=[10, 15, 20, 25, 30],
-                    index=2,  # Default to 20
-                    help="Number of top categories to display"
+                # Average item value by category
+                st.subheader("Average Item Value by Category")
+                avg_value_chart = create_bar_chart(
+                    categories_data.head(10),
+                    x_col='category',
+                    y_col='avg_item_value',
+                    title='Average Item Value per Category',
+                    x_title='Product Category',
+                    y_title='Avg Item Value ($)',
+                    height=400
                 )
+                avg_value_chart.update_xaxes(tickangle=45)
+                st.plotly_chart(avg_value_chart, width="stretch")
+            
+            # Detailed performance table
+            st.subheader("Detailed Category Performance")
             
-            # Get data with filtering
-            categories_data = get_top_products_categories(
-                limit=top_n, 
-                year_filter=selected_year, 
-                region_filter=selected_region
+            # Format data for display
+            display_data = categories_data.copy()
+            display_data['total_revenue'] = display_data['total_revenue'].apply(lambda x: f"${x:,.2f}")
+            display_data['avg_item_value'] = display_data['avg_item_value'].apply(lambda x: f"${x:.2f}")
+            display_data['total_freight'] = display_data['total_freight'].apply(lambda x: f"${x:,.2f}")
+            display_data['total_item_price'] = display_data['total_item_price'].apply(lambda x: f"${x:,.2f}")
+            display_data['items_sold'] = display_data['items_sold'].apply(lambda x: f"{x:,}")
+            display_data['unique_products'] = display_data['unique_products'].apply(lambda x: f"{x:,}")
+            
+            # Select and rename columns for display
+            display_columns = {
+                'category': 'Category',
+                'total_revenue': 'Total Revenue',
+                'items_sold': 'Items Sold',
+                'unique_products': 'Unique Products',
+                'avg_item_value': 'Avg Item Value',
+                'total_item_price': 'Total Item Price',
+                'total_freight': 'Total Freight'
+            }
+            
+            st.dataframe(
+                display_data[list(display_columns.keys())].rename(columns=display_columns),
+                width="stretch",
+                hide_index=True
             )
             
-            if not categories_data.empty:
-                # Summary KPIs
-                total_categories = len(categories_data)
-                total_revenue = categories_data['total_revenue'].sum()
-                total_products = categories_data['unique_products'].sum()
-                total_items_sold = categories_data['items_sold'].sum()
-                
-                # Display summary metrics
-                col1, col2, col3, col4 = st.columns(4)
-                with col1:
-                    st.metric(
-                        "Categories Analyzed",
-                        f"{total_categories}",
-                        help="Number of product categories in results"
-                    )
-                with col2:
-                    st.metric(
-                        "Total Revenue",
-                        f"${total_revenue:,.2f}",
-                        help="Combined revenue from top categories"
-                    )
-                with col3:
-                    st.metric(
-                        "Unique Products",
-                        f"{total_products:,}",
-                        help="Total unique products in top categories"
-                    )
-                with col4:
-                    st.metric(
-                        "Items Sold",
-                        f"{total_items_sold:,}",
-                        help="Total items sold across top categories"
-                    )
+            # Download option
+            csv = categories_data.to_csv(index=False)
+            st.download_button(
+                label="📥 Download Category Performance Data",
+                data=csv,
+                file_name=f"top_categories_{selected_year if selected_year != 'All Years' else 'all_years'}_{selected_region if selected_region != 'All Regions' else 'all_regions'}.csv",
+                mime="text/csv"
+            )
+            
+        else:
+            st.warning("No category data available for the selected filters.")
+            
+    except Exception as e:
+        st.error(f"Error loading product data: {str(e)}")
+        st.info("Please check your BigQuery connection and data availability.")
+
+def render_geographic_distribution(selected_year: str, selected_region: str):
+    """Section 3: Geographic sales distribution"""
+    st.header("Geographic Sales Distribution")
+    st.markdown("Analyze sales patterns across Brazilian regions, states, and cities")
+    
+    try:
+        # Display active filters
+        if selected_year != "All Years":
+            st.info(f"🎯 Active filter: Year: {selected_year}")
+        
+        # Get regional data (queries run concurrently)
+        approximate = st.session_state.get('approximate_counts', False)
+        results = fetch_concurrently({
+            'regional': lambda: get_sales_by_region(year_filter=selected_year, approximate=approximate),
+            'state': lambda: get_sales_by_state(year_filter=selected_year, region_filter=selected_region, approximate=approximate),
+            'flow': lambda: get_customer_seller_flow(year_filter=selected_year, approximate=approximate)
+        })
+        regional_data = results['regional']
+        state_data = results['state']
+        flow_data = results['flow']
+        
+        if not regional_data.empty:
+            # Summary metrics by region
+            customer_region_summary = regional_data.groupby('customer_region', observed=True).agg({
+                'total_sales': 'sum',
+                'total_orders': 'sum',
+                'unique_customers': 'sum'
+            }).reset_index()
+            
+            seller_region_summary = regional_data.groupby('seller_region', observed=True).agg({
+                'total_sales': 'sum',
+                'total_orders': 'sum', 
+                'unique_sellers': 'sum'
+            }).reset_index()
+            
+            # KPI metrics
+            col1, col2, col3, col4 = st.columns(4)
+            with col1:
+                st.metric(
+                    "Total Regions",
+                    len(customer_region_summary),
+                    help="Number of Brazilian regions in analysis"
+                )
+            with col2:
+                total_sales = regional_data['total_sales'].sum()
+                st.metric(
+                    "Total Sales",
+                    f"${total_sales:,.2f}",
+                    help="Combined sales across all regions"
+                )
+            with col3:
+                total_customers = customer_region_summary['unique_customers'].sum()
+                st.metric(
+                    "Total Customers",
+                    f"{total_customers:,}",
+                    help="Unique customers across all regions"
+                )
+            with col4:
+                total_sellers = seller_region_summary['unique_sellers'].sum()
+                st.metric(
+                    "Total Sellers",
+                    f"{total_sellers:,}",
+                    help="Unique sellers across all regions"
+                )
+            
+            # Analysis insights
+            col1, col2 = st.columns(2)
+            
+            with col1:
+                # Customer regions performance
+                st.subheader("Sales by Customer Region")
+                customer_chart = create_bar_chart(
+                    customer_region_summary.sort_values('total_sales', ascending=False),
+                    x_col='customer_region',
+                    y_col='total_sales',
+                    title='Sales Revenue by Customer Region',
+                    x_title='Customer Region',
+                    y_title='Total Sales ($)',
+                    height=400
+                )
+                st.plotly_chart(customer_chart, width="stretch")
+            
+            with col2:
+                # Seller regions performance
+                st.subheader("Sales by Seller Region")
+                seller_chart = create_bar_chart(
+                    seller_region_summary.sort_values('total_sales', ascending=False),
+                    x_col='seller_region',
+                    y_col='total_sales',
+                    title='Sales Revenue by Seller Region',
+                    x_title='Seller Region',
+                    y_title='Total Sales ($)',
+                    height=400
+                )
+                st.plotly_chart(seller_chart, width="stretch")
+            
+            # Customer-Seller Flow Analysis
+            if not flow_data.empty:
+                st.subheader("Customer-Seller Transaction Flow")
                 
-                st.markdown("---")
+                # Same vs Cross region analysis
+                flow_summary = flow_data.groupby('transaction_type', observed=True).agg({
+                    'total_sales': 'sum',
+                    'total_orders': 'sum'
+                }).reset_index()
                 
-                # Main visualizations
-                col1, col2 = st.columns([3, 2])
+                col1, col2 = st.columns(2)
                 
                 with col1:
-                    # Bar chart for top categories by revenue
-                    st.subheader("Top Categories by Revenue")
-                    revenue_chart = create_bar_chart(
-                        categories_data.head(15),  # Show top 15 for readability
-                        x_col='category',
-                        y_col='total_revenue',
-                        title='Category Revenue Performance',
-                        x_title='Product Category',
-                        y_title='Total Revenue ($)',
-                        height=500
-                    )
-                    # Rotate x-axis labels for better readability
-                    revenue_chart.update_xaxes(tickangle=45)
-                    st.plotly_chart(revenue_chart, width="stretch")
-            
-                with col2:
-                    # Pie chart for revenue distribution
-                    st.subheader("Revenue Distribution")
-                    top_10_for_pie = categories_data.head(10).copy()
-                    if len(categories_data) > 10:
-                        others_revenue = categories_data.tail(len(categories_data) - 10)['total_revenue'].sum()
-                        others_row = pd.DataFrame({
-                            'category': ['Others'],
-                            'total_revenue': [others_revenue]
-                        })
-                        top_10_for_pie = pd.concat([top_10_for_pie[['category', 'total_revenue']], others_row], ignore_index=True)
-                    
+                    # Transaction type pie chart
                     pie_chart = create_pie_chart(
-                        top_10_for_pie,
-                        names_col='category',
-                        values_col='total_revenue',
-                        title='Revenue Share by Category',
-                        height=500
+                        flow_summary,
+                        names_col='transaction_type',
+                        values_col='total_sales',
+                        title='Sales: Same vs Cross-Region Transactions',
+                        height=400
                     )
                     st.plotly_chart(pie_chart, width="stretch")
                 
-                # Secondary visualizations
-                col1, col2 = st.columns(2)
+                with col2:
+                    # Cross-region flow details
+                    cross_region = flow_data[flow_data['transaction_type'] == 'Cross Region'].head(10)
+                    if not cross_region.empty:
+                        st.write("**Top Cross-Region Flows**")
+                        cross_region_display = cross_region.copy()
+                        cross_region_display['Flow'] = cross_region_display['customer_region'].astype(str) + ' → ' + cross_region_display['seller_region'].astype(str)
+                        cross_region_display['total_sales'] = cross_region_display['total_sales'].apply(lambda x: f"${x:,.2f}")
+                        
+                        st.dataframe(
+                            cross_region_display[['Flow', 'total_sales', 'total_orders']].rename(columns={
+                                'Flow': 'Customer → Seller',
+                                'total_sales': 'Sales',
+                                'total_orders': 'Orders'
+                            }),
+                            width="stretch",
+                            hide_index=True
+                        )
+            
+            # Regional heatmap
+            st.subheader("Customer-Seller Regional Flow")
+            st.markdown("Heatmap showing sales flow between customer and seller regions")
+            
+            heatmap_chart = create_regional_heatmap(regional_data)
+            st.plotly_chart(heatmap_chart, width="stretch")
+            
+            # State-level breakdown
+            if not state_data.empty:
+                st.subheader("State-Level Performance Breakdown")
+                
+                # Top states by sales
+                col1, col2 = st.columns([2, 1])
                 
                 with col1:
-                    # Items sold vs revenue scatter plot
-                    st.subheader("Items Sold vs Revenue")
-                    scatter_fig = px.scatter(
-                        categories_data,
-                        x='items_sold',
-                        y='total_revenue',
-                        size='unique_products',
-                        hover_name='category',
-                        title='Category Performance Matrix',
-                        labels={
-                            'items_sold': 'Items Sold',
-                            'total_revenue': 'Total Revenue ($)',
-                            'unique_products': 'Unique Products'
-                        },
-                        height=400
-                    )
-                    scatter_fig.update_layout(
-                        title_x=0.5,
-                        plot_bgcolor='white',
-                        paper_bgcolor='white'
+                    top_states_chart = create_bar_chart(
+                        state_data.head(15),
+                        x_col='customer_state',
+                        y_col='total_sales',
+                        title='Top 15 States by Sales Revenue',
+                        x_title='State',
+                        y_title='Total Sales ($)',
+                        height=450
                     )
-                    st.plotly_chart(scatter_fig, width="stretch")
+                    top_states_chart.update_xaxes(tickangle=45)
+                    st.plotly_chart(top_states_chart, width="stretch")
                 
                 with col2:
-                    # Average item value by category
-                    st.subheader("Average Item Value by Category")
-                    avg_value_chart = create_bar_chart(
-                        categories_data.head(10),
-                        x_col='category',
-                        y_col='avg_item_value',
-                        title='Average Item Value per Category',
-                        x_title='Product Category',
-                        y_title='Avg Item Value ($)',
-                        height=400
+                    # Regional distribution of states
+                    region_state_count = state_data.groupby('customer_region', observed=True).size().reset_index(name='state_count')
+                    region_pie = create_pie_chart(
+                        region_state_count,
+                        names_col='customer_region',
+                        values_col='state_count',
+                        title='States by Region',
+                        height=450
                     )
-                    avg_value_chart.update_xaxes(tickangle=45)
-                    st.plotly_chart(avg_value_chart, width="stretch")
+                    st.plotly_chart(region_pie, width="stretch")
                 
-                # Detailed performance table
-                st.subheader("Detailed Category Performance")
-                
-                # Format data for display
-                display_data = categories_data.copy()
-                display_data['total_revenue'] = display_data['total_revenue'].apply(lambda x: f"${x:,.2f}")
-                display_data['avg_item_value'] = display_data['avg_item_value'].apply(lambda x: f"${x:.2f}")
-                display_data['total_freight'] = display_data['total_freight'].apply(lambda x: f"${x:,.2f}")
-                display_data['total_item_price'] = display_data['total_item_price'].apply(lambda x: f"${x:,.2f}")
-                display_data['items_sold'] = display_data['items_sold'].apply(lambda x: f"{x:,}")
-                display_data['unique_products'] = display_data['unique_products'].apply(lambda x: f"{x:,}")
+                # Detailed state data table
+                if selected_region != "All Regions":
+                    st.write(f"**Detailed breakdown for {selected_region} region:**")
+                else:
+                    st.write("**Detailed state performance data:**")
+                
+                # Format state data for display
+                display_state_data = state_data.copy()
+                display_state_data['total_sales'] = display_state_data['total_sales'].apply(lambda x: f"${x:,.2f}")
+                display_state_data['avg_order_value'] = display_state_data['avg_order_value'].apply(lambda x: f"${x:.2f}")
+                display_state_data['total_orders'] = display_state_data['total_orders'].apply(lambda x: f"{x:,}")
+                display_state_data['total_items'] = display_state_data['total_items'].apply(lambda x: f"{x:,}")
+                display_state_data['unique_customers'] = display_state_data['unique_customers'].apply(lambda x: f"{x:,}")
                 
-                # Select and rename columns for display
                 display_columns = {
-                    'category': 'Category',
-                    'total_revenue': 'Total Revenue',
-                    'items_sold': 'Items Sold',
-                    'unique_products': 'Unique Products',
-                    'avg_item_value': 'Avg Item Value',
-                    'total_item_price': 'Total Item Price',
-                    'total_freight': 'Total Freight'
+                    'customer_state': 'State',
+                    'customer_region': 'Region',
+                    'total_sales': 'Total Sales',
+                    'total_orders': 'Total Orders',
+                    'total_items': 'Total Items',
+                    'unique_customers': 'Customers',
+                    'avg_order_value': 'Avg Order Value'
                 }
                 
                 st.dataframe(
-                    display_data[list(display_columns.keys())].rename(columns=display_columns),
+                    display_state_data[list(display_columns.keys())].rename(columns=display_columns),
                     width="stretch",
                     hide_index=True
                 )
-                
-                # Download option
-                csv = categories_data.to_csv(index=False)
+            
+            # Download options
+            col1, col2 = st.columns(2)
+            with col1:
+                regional_csv = regional_data.to_csv(index=False)
                 st.download_button(
-                    label="📥 Download Category Performance Data",
-                    data=csv,
-                    file_name=f"top_categories_{selected_year if selected_year != 'All Years' else 'all_years'}_{selected_region if selected_region != 'All Regions' else 'all_regions'}.csv",
+                    label="📥 Download Regional Data",
+                    data=regional_csv,
+                    file_name=f"regional_sales_{selected_year if selected_year != 'All Years' else 'all_years'}.csv",
                     mime="text/csv"
                 )
-                
-            else:
-                st.warning("No category data available for the selected filters.")
-                
-        except Exception as e:
-            st.error(f"Error loading product data: {str(e)}")
-            st.info("Please check your BigQuery connection and data availability.")
-    
-    # Tab 3: Geographic Sales Distribution
-    with tab3:
-        st.header("Geographic Sales Distribution")
-        st.markdown("Analyze sales patterns across Brazilian regions, states, and cities")
+            
+            with col2:
+                if not state_data.empty:
+                    state_csv = state_data.to_csv(index=False)
+                    st.download_button(
+                        label="📥 Download State Data", 
+                        data=state_csv,
+                        file_name=f"state_sales_{selected_year if selected_year != 'All Years' else 'all_years'}_{selected_region if selected_region != 'All Regions' else 'all_regions'}.csv",
+                        mime="text/csv"
+                    )
+            
+        else:
+            st.warning("No geographic data available for the selected filters.")
         
-        try:
-            # Display active filters
+    except Exception as e:
+        st.error(f"Error loading geographic data: {str(e)}")
+        st.info("Please check your BigQuery connection and data availability.")
+
+def render_customer_behavior(selected_year: str, selected_region: str):
+    """Section 4: Customer purchase behavior"""
+    st.header("Customer Purchase Behavior")
+    st.markdown("Understand customer purchasing patterns, frequency, and lifetime value")
+    
+    try:
+        # Display active filters
+        if selected_year != "All Years" or selected_region != "All Regions":
+            filter_text = []
             if selected_year != "All Years":
-                st.info(f"🎯 Active filter: Year: {selected_year}")
+                filter_text.append(f"Year: {selected_year}")
+            if selected_region != "All Regions":
+                filter_text.append(f"Region: {selected_region}")
+            st.info(f"🎯 Active filters: {' | '.join(filter_text)}")
+        
+        # Get customer behavior data (queries run concurrently)
+        results = fetch_concurrently({
+            'behavior': lambda: get_customer_behavior(year_filter=selected_year, region_filter=selected_region),
+            'segmentation': lambda: get_customer_segmentation(year_filter=selected_year, region_filter=selected_region),
+            'frequency': lambda: get_customer_frequency_analysis(year_filter=selected_year, region_filter=selected_region)
+        })
+        behavior_data = results['behavior']
+        segmentation_data = results['segmentation']
+        frequency_data = results['frequency']
+        
+        if not behavior_data.empty:
+            # Summary KPI metrics
+            total_customers = behavior_data['customer_count'].sum()
+            total_one_time = behavior_data['one_time_customers'].sum()
+            total_repeat = behavior_data['repeat_customers'].sum()
+            avg_lifetime_value = behavior_data['avg_customer_lifetime_value'].mean()
+            repeat_rate = (total_repeat / total_customers * 100) if total_customers > 0 else 0
+            
+            # Display KPIs
+            col1, col2, col3, col4 = st.columns(4)
+            with col1:
+                st.metric("Total Customers", f"{total_customers:,}", help="Total unique customers")
+            with col2:
+                st.metric("Avg Lifetime Value", f"${avg_lifetime_value:.2f}", help="Average customer lifetime value")
+            with col3:
+                st.metric("Repeat Rate", f"{repeat_rate:.1f}%", help="Percentage of repeat customers")
+            with col4:
+                st.metric("One-Time Customers", f"{total_one_time:,}", help="Single purchase customers")
             
-            # Get regional data
-            regional_data = get_sales_by_region(year_filter=selected_year)
-            state_data = get_sales_by_state(year_filter=selected_year, region_filter=selected_region)
-            flow_data = get_customer_seller_flow(year_filter=selected_year)
+            st.markdown("---")
             
-            if not regional_data.empty:
-                # Summary metrics by region
-                customer_region_summary = regional_data.groupby('customer_region').agg({
-                    'total_sales': 'sum',
-                    'total_orders': 'sum',
-                    'unique_customers': 'sum'
-                }).reset_index()
+            # Regional behavior analysis
+            col1, col2 = st.columns(2)
+            with col1:
+                st.subheader("Lifetime Value by Region")
+                ltv_chart = create_bar_chart(
+                    behavior_data.sort_values('avg_customer_lifetime_value', ascending=False),
+                    x_col='customer_region', y_col='avg_customer_lifetime_value',
+                    title='Average Customer Lifetime Value by Region',
+                    x_title='Region', y_title='Avg Lifetime Value ($)', height=400
+                )
+                st.plotly_chart(ltv_chart, width="stretch")
+            
+            with col2:
+                st.subheader("Customer Distribution by Behavior")
+                if not segmentation_data.empty:
+                    behavior_segments = segmentation_data.groupby('customer_segment', observed=True)['customer_count'].sum().reset_index()
+                    seg_pie = create_customer_behavior_pie_chart(behavior_segments, 'customer_segment', 'customer_count', 
+                                             'Customer Distribution by Behavior', height=400)
+                    st.plotly_chart(seg_pie, width="stretch")
+                else:
+                    st.info("No segmentation data available")
+            
+            # Customer Retention and Value Analysis
+            col1, col2 = st.columns(2)
+            with col1:
+                st.subheader("Customer Retention by Region")
+                behavior_display = behavior_data.copy()
                 
-                seller_region_summary = regional_data.groupby('seller_region').agg({
-                    'total_sales': 'sum',
-                    'total_orders': 'sum', 
-                    'unique_sellers': 'sum'
-                }).reset_index()
+                # Calculate retention rate
+                behavior_display['retention_rate'] = (behavior_display['repeat_customers'] / behavior_display['customer_count'] * 100)
                 
-                # KPI metrics
-                col1, col2, col3, col4 = st.columns(4)
-                with col1:
-                    st.metric(
-                        "Total Regions",
-                        len(customer_region_summary),
-                        help="Number of Brazilian regions in analysis"
-                    )
-                with col2:
-                    total_sales = regional_data['total_sales'].sum()
-                    st.metric(
-                        "Total Sales",
-                        f"${total_sales:,.2f}",
-                        help="Combined sales across all regions"
-                    )
-                with col3:
-                    total_customers = customer_region_summary['unique_customers'].sum()
-                    st.metric(
-                        "Total Customers",
-                        f"{total_customers:,}",
-                        help="Unique customers across all regions"
-                    )
-                with col4:
-                    total_sellers = seller_region_summary['unique_sellers'].sum()
-                    st.metric(
-                        "Total Sellers",
-                        f"{total_sellers:,}",
-                        help="Unique sellers across all regions"
-                    )
+                retention_chart = create_bar_chart(
+                    behavior_display.sort_values('retention_rate', ascending=False),
+                    x_col='customer_region', y_col='retention_rate',
+                    title='Customer Retention Rate by Region',
+                    x_title='Region', y_title='Retention Rate (%)', height=400
+                )
+                st.plotly_chart(retention_chart, width="stretch")
+            
+            with col2:
+                st.subheader("Revenue by Customer Value Segment")
+                if not segmentation_data.empty:
+                    value_segments = segmentation_data.groupby('value_segment', observed=True)['segment_total_value'].sum().reset_index()
+                    val_pie = create_customer_value_pie_chart(value_segments, 'value_segment', 'segment_total_value',
+                                             'Revenue by Customer Value Segment', height=400)
+                    st.plotly_chart(val_pie, width="stretch")
+                else:
+                    st.info("No segmentation data available")
+            
+            # Purchase Frequency Analysis
+            if not frequency_data.empty:
+                st.subheader("Purchase Frequency Distribution")
                 
-                # Analysis insights
-                col1, col2 = st.columns(2)
+                # Ensure order_count is treated as categorical
+                frequency_display = frequency_data.copy()
+                frequency_display['order_count'] = frequency_display['order_count'].astype(str)
                 
-                with col1:
-                    # Customer regions performance
-                    st.subheader("Sales by Customer Region")
-                    customer_chart = create_bar_chart(
-                        customer_region_summary.sort_values('total_sales', ascending=False),
-                        x_col='customer_region',
-                        y_col='total_sales',
-                        title='Sales Revenue by Customer Region',
-                        x_title='Customer Region',
-                        y_title='Total Sales ($)',
-                        height=400
-                    )
-                    st.plotly_chart(customer_chart, width="stretch")
+                freq_chart = create_bar_chart(
+                    frequency_display.head(10), 'order_count', 'customer_count',
+                    'Customer Count by Purchase Frequency', 'Number of Orders', 'Customer Count', height=400
+                )
                 
-                with col2:
-                    # Seller regions performance
-                    st.subheader("Sales by Seller Region")
-                    seller_chart = create_bar_chart(
-                        seller_region_summary.sort_values('total_sales', ascending=False),
-                        x_col='seller_region',
-                        y_col='total_sales',
-                        title='Sales Revenue by Seller Region',
-                        x_title='Seller Region',
-                        y_title='Total Sales ($)',
-                        height=400
-                    )
-                    st.plotly_chart(seller_chart, width="stretch")
+                # Force x-axis to be categorical
+                freq_chart.update_xaxes(type='category')
                 
-                # Customer-Seller Flow Analysis
-                if not flow_data.empty:
-                    st.subheader("Customer-Seller Transaction Flow")
-                    
-                    # Same vs Cross region analysis
-                    flow_summary = flow_data.groupby('transaction_type').agg({
-                        'total_sales': 'sum',
-                        'total_orders': 'sum'
-                    }).reset_index()
-                    
-                    col1, col2 = st.columns(2)
-                    
-                    with col1:
-                        # Transaction type pie chart
-                        pie_chart = create_pie_chart(
-                            flow_summary,
-                            names_col='transaction_type',
-                            values_col='total_sales',
-                            title='Sales: Same vs Cross-Region Transactions',
-                            height=400
-                        )
-                        st.plotly_chart(pie_chart, width="stretch")
-                    
-                    with col2:
-                        # Cross-region flow details
-                        cross_region = flow_data[flow_data['transaction_type'] == 'Cross Region'].head(10)
-                        if not cross_region.empty:
-                            st.write("**Top Cross-Region Flows**")
-                            cross_region_display = cross_region.copy()
-                            cross_region_display['Flow'] = cross_region_display['customer_region'] + ' → ' + cross_region_display['seller_region']
-                            cross_region_display['total_sales'] = cross_region_display['total_sales'].apply(lambda x: f"${x:,.2f}")
-                            
-                            st.dataframe(
-                                cross_region_display[['Flow', 'total_sales', 'total_orders']].rename(columns={
-                                    'Flow': 'Customer → Seller',
-                                    'total_sales': 'Sales',
-                                    'total_orders': 'Orders'
-                                }),
-                                width="stretch",
-                                hide_index=True
-                            )
+                st.plotly_chart(freq_chart, width="stretch")
                 
-                # Regional heatmap
-                st.subheader("Customer-Seller Regional Flow")
-                st.markdown("Heatmap showing sales flow between customer and seller regions")
+                # Interactive Purchase Frequency Details Table
+                st.markdown("**Purchase Frequency Details**")
                 
-                heatmap_chart = create_regional_heatmap(regional_data)
-                st.plotly_chart(heatmap_chart, width="stretch")
+                # Get available order counts and find the one with highest customer count
+                available_orders = frequency_data['order_count'].tolist()
+                default_order = frequency_data.loc[frequency_data['customer_count'].idxmax(), 'order_count']
                 
-                # State-level breakdown
-                if not state_data.empty:
-                    st.subheader("State-Level Performance Breakdown")
-                    
-                    # Top states by sales
-                    col1, col2 = st.columns([2, 1])
-                    
-                    with col1:
-                        top_states_chart = create_bar_chart(
-                            state_data.head(15),
-                            x_col='customer_state',
-                            y_col='total_sales',
-                            title='Top 15 States by Sales Revenue',
-                            x_title='State',
-                            y_title='Total Sales ($)',
-                            height=450
-                        )
-                        top_states_chart.update_xaxes(tickangle=45)
-                        st.plotly_chart(top_states_chart, width="stretch")
-                    
-                    with col2:
-                        # Regional distribution of states
-                        region_state_count = state_data.groupby('customer_region').size().reset_index(name='state_count')
-                        region_pie = create_pie_chart(
-                            region_state_count,
-                            names_col='customer_region',
-                            values_col='state_count',
-                            title='States by Region',
-                            height=450
-                        )
-                        st.plotly_chart(region_pie, width="stretch")
-                    
-                    # Detailed state data table
-                    if selected_region != "All Regions":
-                        st.write(f"**Detailed breakdown for {selected_region} region:**")
-                    else:
-                        st.write("**Detailed state performance data:**")
-                    
-                    # Format state data for display
-                    display_state_data = state_data.copy()
-                    display_state_data['total_sales'] = display_state_data['total_sales'].apply(lambda x: f"${x:,.2f}")
-                    display_state_data['avg_order_value'] = display_state_data['avg_order_value'].apply(lambda x: f"${x:.2f}")
-                    display_state_data['total_orders'] = display_state_data['total_orders'].apply(lambda x: f"{x:,}")
-                    display_state_data['total_items'] = display_state_data['total_items'].apply(lambda x: f"{x:,}")
-                    display_state_data['unique_customers'] = display_state_data['unique_customers'].apply(lambda x: f"{x:,}")
+                # Create dropdown selector
+                col1, col2 = st.columns([2, 3])
+                with col1:
+                    selected_order_count = st.selectbox(
+                        "Select Number of Orders to View Details:",
+                        options=available_orders,
+                        index=available_orders.index(default_order),
+                        help="Choose an order count to see detailed customer information"
+                    )
+                
+                with col2:
+                    st.markdown(f"**Showing details for customers with {selected_order_count} order{'s' if selected_order_count != 1 else ''}**")
+                
+                # Filter data for selected order count
+                selected_data = frequency_data[frequency_data['order_count'] == selected_order_count]
+                
+                # Display the table
+                if not selected_data.empty:
+                    display_freq_data = selected_data.copy()
+                    display_freq_data['customer_count'] = display_freq_data['customer_count'].apply(lambda x: f"{x:,}")
+                    display_freq_data['avg_customer_value'] = display_freq_data['avg_customer_value'].apply(lambda x: f"${x:.2f}")
+                    display_freq_data['total_segment_value'] = display_freq_data['total_segment_value'].apply(lambda x: f"${x:,.2f}")
+                    display_freq_data['percentage_of_customers'] = display_freq_data['percentage_of_customers'].apply(lambda x: f"{x}%")
                     
+                    # Rename columns for display
                     display_columns = {
-                        'customer_state': 'State',
-                        'customer_region': 'Region',
-                        'total_sales': 'Total Sales',
-                        'total_orders': 'Total Orders',
-                        'total_items': 'Total Items',
-                        'unique_customers': 'Customers',
-                        'avg_order_value': 'Avg Order Value'
+                        'order_count': 'Number of Orders',
+                        'customer_count': 'Customer Count', 
+                        'percentage_of_customers': 'Percentage',
+                        'avg_customer_value': 'Avg Customer Value',
+                        'total_segment_value': 'Total Segment Value'
                     }
                     
                     st.dataframe(
-                        display_state_data[list(display_columns.keys())].rename(columns=display_columns),
+                        display_freq_data[list(display_columns.keys())].rename(columns=display_columns),
                         width="stretch",
                         hide_index=True
                     )
-                
-                # Download options
-                col1, col2 = st.columns(2)
-                with col1:
-                    regional_csv = regional_data.to_csv(index=False)
-                    st.download_button(
-                        label="📥 Download Regional Data",
-                        data=regional_csv,
-                        file_name=f"regional_sales_{selected_year if selected_year != 'All Years' else 'all_years'}.csv",
-                        mime="text/csv"
-                    )
-                
-                with col2:
-                    if not state_data.empty:
-                        state_csv = state_data.to_csv(index=False)
-                        st.download_button(
-                            label="📥 Download State Data", 
-                            data=state_csv,
-                            file_name=f"state_sales_{selected_year if selected_year != 'All Years' else 'all_years'}_{selected_region if selected_region != 'All Regions' else 'all_regions'}.csv",
-                            mime="text/csv"
-                        )
-                
-            else:
-                st.warning("No geographic data available for the selected filters.")
+                else:
+                    st.info(f"No data available for {selected_order_count} orders")
             
-        except Exception as e:
-            st.error(f"Error loading geographic data: {str(e)}")
-            st.info("Please check your BigQuery connection and data availability.")
-    
-    # Tab 4: Customer Purchase Behavior
-    with tab4:
-        st.header("Customer Purchase Behavior")
-        st.markdown("Understand customer purchasing patterns, frequency, and lifetime value")
-        
-        try:
-            # Display active filters
-            if selected_year != "All Years" or selected_region != "All Regions":
-                filter_text = []
-                if selected_year != "All Years":
-                    filter_text.append(f"Year: {selected_year}")
-                if selected_region != "All Regions":
-                    filter_text.append(f"Region: {selected_region}")
-                st.info(f"🎯 Active filters: {' | '.join(filter_text)}")
+            # Data tables
+            st.subheader("Regional Behavior Summary")
+            display_data = behavior_data.copy()
+            display_data['avg_customer_lifetime_value'] = display_data['avg_customer_lifetime_value'].apply(lambda x: f"${x:.2f}")
+            display_data['avg_order_value'] = display_data['avg_order_value'].apply(lambda x: f"${x:.2f}")
+            display_data['customer_count'] = display_data['customer_count'].apply(lambda x: f"{x:,}")
             
-            # Get customer behavior data
-            behavior_data = get_customer_behavior(year_filter=selected_year, region_filter=selected_region)
-            segmentation_data = get_customer_segmentation(year_filter=selected_year, region_filter=selected_region)
-            frequency_data = get_customer_frequency_analysis(year_filter=selected_year, region_filter=selected_region)
-            
-            if not behavior_data.empty:
-                # Summary KPI metrics
-                total_customers = behavior_data['customer_count'].sum()
-                total_one_time = behavior_data['one_time_customers'].sum()
-                total_repeat = behavior_data['repeat_customers'].sum()
-                avg_lifetime_value = behavior_data['avg_customer_lifetime_value'].mean()
-                repeat_rate = (total_repeat / total_customers * 100) if total_customers > 0 else 0
-                
-                # Display KPIs
-                col1, col2, col3, col4 = st.columns(4)
-                with col1:
-                    st.metric("Total Customers", f"{total_customers:,}", help="Total unique customers")
-                with col2:
-                    st.metric("Avg Lifetime Value", f"${avg_lifetime_value:.2f}", help="Average customer lifetime value")
-                with col3:
-                    st.metric("Repeat Rate", f"{repeat_rate:.1f}%", help="Percentage of repeat customers")
-                with col4:
-                    st.metric("One-Time Customers", f"{total_one_time:,}", help="Single purchase customers")
-                
-                st.markdown("---")
-                
-                # Regional behavior analysis
-                col1, col2 = st.columns(2)
-                with col1:
-                    st.subheader("Lifetime Value by Region")
-                    ltv_chart = create_bar_chart(
-                        behavior_data.sort_values('avg_customer_lifetime_value', ascending=False),
-                        x_col='customer_region', y_col='avg_customer_lifetime_value',
-                        title='Average Customer Lifetime Value by Region',
-                        x_title='Region', y_title='Avg Lifetime Value ($)', height=400
-                    )
-                    st.plotly_chart(ltv_chart, width="stretch")
-                
-                with col2:
-                    st.subheader("Customer Distribution by Behavior")
-                    if not segmentation_data.empty:
-                        behavior_segments = segmentation_data.groupby('customer_segment')['customer_count'].sum().reset_index()
-                        seg_pie = create_customer_behavior_pie_chart(behavior_segments, 'customer_segment', 'customer_count', 
-                                                 'Customer Distribution by Behavior', height=400)
-                        st.plotly_chart(seg_pie, width="stretch")
-                    else:
-                        st.info("No segmentation data available")
-                
-                # Customer Retention and Value Analysis
-                col1, col2 = st.columns(2)
-                with col1:
-                    st.subheader("Customer Retention by Region")
-                    behavior_display = behavior_data.copy()
-                    
-                    # Calculate retention rate
-                    behavior_display['retention_rate'] = (behavior_display['repeat_customers'] / behavior_display['customer_count'] * 100)
-                    
-                    retention_chart = create_bar_chart(
-                        behavior_display.sort_values('retention_rate', ascending=False),
-                        x_col='customer_region', y_col='retention_rate',
-                        title='Customer Retention Rate by Region',
-                        x_title='Region', y_title='Retention Rate (%)', height=400
-                    )
-                    st.plotly_chart(retention_chart, width="stretch")
-                
-                with col2:
-                    st.subheader("Revenue by Customer Value Segment")
-                    if not segmentation_data.empty:
-                        value_segments = segmentation_data.groupby('value_segment')['segment_total_value'].sum().reset_index()
-                        val_pie = create_customer_value_pie_chart(value_segments, 'value_segment', 'segment_total_value',
-                                                 'Revenue by Customer Value Segment', height=400)
-                        st.plotly_chart(val_pie, width="stretch")
-                    else:
-                        st.info("No segmentation data available")
-                
-                # Purchase Frequency Analysis
-                if not frequency_data.empty:
-                    st.subheader("Purchase Frequency Distribution")
-                    
-                    # Ensure order_count is treated as categorical
-                    frequency_display = frequency_data.copy()
-                    frequency_display['order_count'] = frequency_display['order_count'].astype(str)
-                    
-                    freq_chart = create_bar_chart(
-                        frequency_display.head(10), 'order_count', 'customer_count',
-                        'Customer Count by Purchase Frequency', 'Number of Orders', 'Customer Count', height=400
-                    )
-                    
-                    # Force x-axis to be categorical
-                    freq_chart.update_xaxes(type='category')
-                    
-                    st.plotly_chart(freq_chart, width="stretch")
-                    
-                    # Interactive Purchase Frequency Details Table
-                    st.markdown("**Purchase Frequency Details**")
-                    
-                    # Get available order counts and find the one with highest customer count
-                    available_orders = frequency_data['order_count'].tolist()
-                    default_order = frequency_data.loc[frequency_data['customer_count'].idxmax(), 'order_count']
-                    
-                    # Create dropdown selector
-                    col1, col2 = st.columns([2, 3])
-                    with col1:
-                        selected_order_count = st.selectbox(
-                            "Select Number of Orders to View Details:",
-                            options=available_orders,
-                            index=available_orders.index(default_order),
-                            help="Choose an order count to see detailed customer information"
-                        )
-                    
-                    with col2:
-                        st.markdown(f"**Showing details for customers with {selected_order_count} order{'s' if selected_order_count != 1 else ''}**")
-                    
-                    # Filter data for selected order count
-                    selected_data = frequency_data[frequency_data['order_count'] == selected_order_count]
-                    
-                    # Display the table
-                    if not selected_data.empty:
-                        display_freq_data = selected_data.copy()
-                        display_freq_data['customer_count'] = display_freq_data['customer_count'].apply(lambda x: f"{x:,}")
-                        display_freq_data['avg_customer_value'] = display_freq_data['avg_customer_value'].apply(lambda x: f"${x:.2f}")
-                        display_freq_data['total_segment_value'] = display_freq_data['total_segment_value'].apply(lambda x: f"${x:,.2f}")
-                        display_freq_data['percentage_of_customers'] = display_freq_data['percentage_of_customers'].apply(lambda x: f"{x}%")
-                        
-                        # Rename columns for display
-                        display_columns = {
-                            'order_count': 'Number of Orders',
-                            'customer_count': 'Customer Count', 
-                            'percentage_of_customers': 'Percentage',
-                            'avg_customer_value': 'Avg Customer Value',
-                            'total_segment_value': 'Total Segment Value'
-                        }
-                        
-                        st.dataframe(
-                            display_freq_data[list(display_columns.keys())].rename(columns=display_columns),
-                            width="stretch",
-                            hide_index=True
-                        )
-                    else:
-                        st.info(f"No data available for {selected_order_count} orders")
-                
-                # Data tables
-                st.subheader("Regional Behavior Summary")
-                display_data = behavior_data.copy()
-                display_data['avg_customer_lifetime_value'] = display_data['avg_customer_lifetime_value'].apply(lambda x: f"${x:.2f}")
-                display_data['avg_order_value'] = display_data['avg_order_value'].apply(lambda x: f"${x:.2f}")
-                display_data['customer_count'] = display_data['customer_count'].apply(lambda x: f"{x:,}")
-                
-                st.dataframe(display_data[['customer_region', 'customer_count', 'avg_orders_per_customer', 
-                                         'avg_customer_lifetime_value', 'avg_order_value']].rename(columns={
-                    'customer_region': 'Region', 'customer_count': 'Customers', 
-                    'avg_orders_per_customer': 'Avg Orders', 'avg_customer_lifetime_value': 'Avg LTV',
-                    'avg_order_value': 'Avg Order Value'
-                }), width="stretch", hide_index=True)
-                
-                # Download option
-                csv = behavior_data.to_csv(index=False)
-                st.download_button("📥 Download Customer Behavior Data", data=csv,
-                                 file_name=f"customer_behavior_{selected_year if selected_year != 'All Years' else 'all_years'}.csv",
-                                 mime="text/csv")
-                
-            else:
-                st.warning("No customer behavior data available for the selected filters.")
+            st.dataframe(display_data[['customer_region', 'customer_count', 'avg_orders_per_customer', 
+                                     'avg_customer_lifetime_value', 'avg_order_value']].rename(columns={
+                'customer_region': 'Region', 'customer_count': 'Customers', 
+                'avg_orders_per_customer': 'Avg Orders', 'avg_customer_lifetime_value': 'Avg LTV',
+                'avg_order_value': 'Avg Order Value'
+            }), width="stretch", hide_index=True)
             
-        except Exception as e:
-            st.error(f"Error loading customer data: {str(e)}")
-            st.info("Please check your BigQuery connection and data availability.")
+            # Download option
+            csv = behavior_data.to_csv(index=False)
+            st.download_button("📥 Download Customer Behavior Data", data=csv,
+                             file_name=f"customer_behavior_{selected_year if selected_year != 'All Years' else 'all_years'}.csv",
+                             mime="text/csv")
+            
+        else:
+            st.warning("No customer behavior data available for the selected filters.")
+        
+    except Exception as e:
+        st.error(f"Error loading customer data: {str(e)}")
+        st.info("Please check your BigQuery connection and data availability.")
+
+def render_payment_methods(selected_year: str, selected_region: str):
+    """Section 5: Payment method impact"""
+    st.header("Payment Method Impact")
+    st.markdown("Analyze how payment methods affect sales volumes and order values")
     
-    # Tab 5: Payment Method Impact
-    with tab5:
-        st.header("Payment Method Impact")
-        st.markdown("Analyze how payment methods affect sales volumes and order values")
+    try:
+        # Display active filters
+        if selected_year != "All Years" or selected_region != "All Regions":
+            filter_text = []
+            if selected_year != "All Years":
+                filter_text.append(f"Year: {selected_year}")
+            if selected_region != "All Regions":
+                filter_text.append(f"Region: {selected_region}")
+            st.info(f"🎯 Active filters: {' | '.join(filter_text)}")
         
-        try:
-            # Display active filters
-            if selected_year != "All Years" or selected_region != "All Regions":
-                filter_text = []
-                if selected_year != "All Years":
-                    filter_text.append(f"Year: {selected_year}")
-                if selected_region != "All Regions":
-                    filter_text.append(f"Region: {selected_region}")
-                st.info(f"🎯 Active filters: {' | '.join(filter_text)}")
+        # Get payment data (queries run concurrently)
+        results = fetch_concurrently({
+            'payment': lambda: get_payment_analysis(year_filter=selected_year, region_filter=selected_region),
+            'installment': lambda: get_installment_analysis(year_filter=selected_year, region_filter=selected_region)
+        })
+        payment_data = results['payment']
+        installment_data = results['installment']
+        
+        if not payment_data.empty:
+            # Summary KPI metrics
+            total_orders = payment_data['total_orders'].sum()
+            total_sales = payment_data['total_sales'].sum()
+            total_payments = payment_data['total_payments'].sum()
+            avg_installments = payment_data['avg_installments'].mean()
             
-            # Get payment data
-            payment_data = get_payment_analysis(year_filter=selected_year, region_filter=selected_region)
-            installment_data = get_installment_analysis(year_filter=selected_year, region_filter=selected_region)
+            # Display KPIs
+            col1, col2, col3, col4 = st.columns(4)
+            with col1:
+                st.metric("Total Orders", f"{total_orders:,}", help="Total orders analyzed")
+            with col2:
+                st.metric("Total Sales", f"${total_sales:,.2f}", help="Total sales value")
+            with col3:
+                st.metric("Total Payments", f"${total_payments:,.2f}", help="Total payment value")
+            with col4:
+                st.metric("Avg Installments", f"{avg_installments:.1f}", help="Average installments per order")
             
-            if not payment_data.empty:
-                # Summary KPI metrics
-                total_orders = payment_data['total_orders'].sum()
-                total_sales = payment_data['total_sales'].sum()
-                total_payments = payment_data['total_payments'].sum()
-                avg_installments = payment_data['avg_installments'].mean()
-                
-                # Display KPIs
-                col1, col2, col3, col4 = st.columns(4)
-                with col1:
-                    st.metric("Total Orders", f"{total_orders:,}", help="Total orders analyzed")
-                with col2:
-                    st.metric("Total Sales", f"${total_sales:,.2f}", help="Total sales value")
-                with col3:
-                    st.metric("Total Payments", f"${total_payments:,.2f}", help="Total payment value")
-                with col4:
-                    st.metric("Avg Installments", f"{avg_installments:.1f}", help="Average installments per order")
-                
-                st.markdown("---")
-                
-                # Payment method analysis charts
-                st.subheader("Payment Method Performance")
-                payment_chart = create_payment_method_chart(payment_data)
-                st.plotly_chart(payment_chart, width="stretch")
+            st.markdown("---")
+            
+            # Payment method analysis charts
+            st.subheader("Payment Method Performance")
+            payment_chart = create_payment_method_chart(payment_data)
+            st.plotly_chart(payment_chart, width="stretch")
+            
+            # Payment method comparison
+            col1, col2 = st.columns(2)
+            
+            with col1:
+                st.subheader("Order Volume by Payment Type")
+                orders_chart = create_bar_chart(
+                    payment_data.sort_values('total_orders', ascending=False),
+                    x_col='primary_payment_type', y_col='total_orders',
+                    title='Orders by Payment Method',
+                    x_title='Payment Method', y_title='Number of Orders', height=400
+                )
+                orders_chart.update_xaxes(tickangle=45)
+                st.plotly_chart(orders_chart, width="stretch")
+            
+            with col2:
+                st.subheader("Average Order Value by Payment Type")
+                aov_chart = create_bar_chart(
+                    payment_data.sort_values('avg_order_value', ascending=False),
+                    x_col='primary_payment_type', y_col='avg_order_value',
+                    title='Avg Order Value by Payment Method',
+                    x_title='Payment Method', y_title='Avg Order Value ($)', height=400
+                )
+                aov_chart.update_xaxes(tickangle=45)
+                st.plotly_chart(aov_chart, width="stretch")
+                           
+            # Installment analysis
+            if not installment_data.empty:
+                st.subheader("Installment Usage Analysis")
                 
-                # Payment method comparison
                 col1, col2 = st.columns(2)
                 
                 with col1:
-                    st.subheader("Order Volume by Payment Type")
-                    orders_chart = create_bar_chart(
-                        payment_data.sort_values('total_orders', ascending=False),
-                        x_col='primary_payment_type', y_col='total_orders',
-                        title='Orders by Payment Method',
-                        x_title='Payment Method', y_title='Number of Orders', height=400
+                    st.write("**Order Distribution by Installments**")
+                    installment_chart = create_bar_chart(
+                        installment_data.head(12),  # Show up to 12 installments
+                        x_col='total_installments', y_col='order_count',
+                        title='Orders by Number of Installments',
+                        x_title='Number of Installments', y_title='Order Count', height=400
                     )
-                    orders_chart.update_xaxes(tickangle=45)
-                    st.plotly_chart(orders_chart, width="stretch")
+                    st.plotly_chart(installment_chart, width="stretch")
                 
                 with col2:
-                    st.subheader("Average Order Value by Payment Type")
-                    aov_chart = create_bar_chart(
-                        payment_data.sort_values('avg_order_value', ascending=False),
-                        x_col='primary_payment_type', y_col='avg_order_value',
-                        title='Avg Order Value by Payment Method',
-                        x_title='Payment Method', y_title='Avg Order Value ($)', height=400
+                    st.write("**Average Order Value by Installments**")
+                    installment_value_chart = create_bar_chart(
+                        installment_data.head(12),
+                        x_col='total_installments', y_col='avg_order_value',
+                        title='Avg Order Value by Installments',
+                        x_title='Number of Installments', y_title='Avg Order Value ($)', height=400
                     )
-                    aov_chart.update_xaxes(tickangle=45)
-                    st.plotly_chart(aov_chart, width="stretch")
-                               
-                # Installment analysis
-                if not installment_data.empty:
-                    st.subheader("Installment Usage Analysis")
-                    
-                    col1, col2 = st.columns(2)
-                    
-                    with col1:
-                        st.write("**Order Distribution by Installments**")
-                        installment_chart = create_bar_chart(
-                            installment_data.head(12),  # Show up to 12 installments
-                            x_col='total_installments', y_col='order_count',
-                            title='Orders by Number of Installments',
-                            x_title='Number of Installments', y_title='Order Count', height=400
-                        )
-                        st.plotly_chart(installment_chart, width="stretch")
-                    
-                    with col2:
-                        st.write("**Average Order Value by Installments**")
-                        installment_value_chart = create_bar_chart(
-                            installment_data.head(12),
-                            x_col='total_installments', y_col='avg_order_value',
-                            title='Avg Order Value by Installments',
-                            x_title='Number of Installments', y_title='Avg Order Value ($)', height=400
-                        )
-                        st.plotly_chart(installment_value_chart, width="stretch")
-                
-                # Detailed payment data table
-                st.subheader("Payment Method Performance Summary")
-                display_data = payment_data.copy()
-                display_data['total_sales'] = display_data['total_sales'].apply(lambda x: f"${x:,.2f}")
-                display_data['avg_order_value'] = display_data['avg_order_value'].apply(lambda x: f"${x:.2f}")
-                display_data['total_payments'] = display_data['total_payments'].apply(lambda x: f"${x:,.2f}")
-                display_data['total_orders'] = display_data['total_orders'].apply(lambda x: f"{x:,}")
-                
-                payment_columns = {
-                    'primary_payment_type': 'Payment Method',
-                    'total_orders': 'Total Orders',
+                    st.plotly_chart(installment_value_chart, width="stretch")
+            
+            # Detailed payment data table
+            st.subheader("Payment Method Performance Summary")
+            display_data = payment_data.copy()
+            display_data['total_sales'] = display_data['total_sales'].apply(lambda x: f"${x:,.2f}")
+            display_data['avg_order_value'] = display_data['avg_order_value'].apply(lambda x: f"${x:.2f}")
+            display_data['total_payments'] = display_data['total_payments'].apply(lambda x: f"${x:,.2f}")
+            display_data['total_orders'] = display_data['total_orders'].apply(lambda x: f"{x:,}")
+            
+            payment_columns = {
+                'primary_payment_type': 'Payment Method',
+                'total_orders': 'Total Orders',
+                'total_sales': 'Total Sales',
+                'avg_order_value': 'Avg Order Value',
+                'avg_installments': 'Avg Installments',
+                'total_payments': 'Total Payments'
+            }
+            
+            st.dataframe(
+                display_data[list(payment_columns.keys())].rename(columns=payment_columns),
+                width="stretch", hide_index=True
+            )
+            
+            # Installment summary table
+            if not installment_data.empty:
+                st.subheader("Installment Usage Summary")
+                installment_display = installment_data.head(10).copy()
+                installment_display['total_sales'] = installment_display['total_sales'].apply(lambda x: f"${x:,.2f}")
+                installment_display['avg_order_value'] = installment_display['avg_order_value'].apply(lambda x: f"${x:.2f}")
+                installment_display['order_count'] = installment_display['order_count'].apply(lambda x: f"{x:,}")
+                
+                installment_columns = {
+                    'total_installments': 'Installments',
+                    'order_count': 'Order Count',
                     'total_sales': 'Total Sales',
                     'avg_order_value': 'Avg Order Value',
-                    'avg_installments': 'Avg Installments',
-                    'total_payments': 'Total Payments'
+                    'percentage_of_orders': 'Percentage of Orders'
                 }
                 
                 st.dataframe(
-                    display_data[list(payment_columns.keys())].rename(columns=payment_columns),
+                    installment_display[list(installment_columns.keys())].rename(columns=installment_columns),
                     width="stretch", hide_index=True
                 )
-                
-                # Installment summary table
+            
+            # Download options
+            col1, col2 = st.columns(2)
+            with col1:
+                payment_csv = payment_data.to_csv(index=False)
+                st.download_button(
+                    "📥 Download Payment Analysis", data=payment_csv,
+                    file_name=f"payment_analysis_{selected_year if selected_year != 'All Years' else 'all_years'}.csv",
+                    mime="text/csv"
+                )
+            
+            with col2:
                 if not installment_data.empty:
-                    st.subheader("Installment Usage Summary")
-                    installment_display = installment_data.head(10).copy()
-                    installment_display['total_sales'] = installment_display['total_sales'].apply(lambda x: f"${x:,.2f}")
-                    installment_display['avg_order_value'] = installment_display['avg_order_value'].apply(lambda x: f"${x:.2f}")
-                    installment_display['order_count'] = installment_display['order_count'].apply(lambda x: f"{x:,}")
-                    
-                    installment_columns = {
-                        'total_installments': 'Installments',
-                        'order_count': 'Order Count',
-                        'total_sales': 'Total Sales',
-                        'avg_order_value': 'Avg Order Value',
-                        'percentage_of_orders': 'Percentage of Orders'
-                    }
-                    
-                    st.dataframe(
-                        installment_display[list(installment_columns.keys())].rename(columns=installment_columns),
-                        width="stretch", hide_index=True
-                    )
-                
-                # Download options
-                col1, col2 = st.columns(2)
-                with col1:
-                    payment_csv = payment_data.to_csv(index=False)
+                    installment_csv = installment_data.to_csv(index=False)
                     st.download_button(
-                        "📥 Download Payment Analysis", data=payment_csv,
-                        file_name=f"payment_analysis_{selected_year if selected_year != 'All Years' else 'all_years'}.csv",
+                        "📥 Download Installment Analysis", data=installment_csv,
+                        file_name=f"installment_analysis_{selected_year if selected_year != 'All Years' else 'all_years'}.csv",
                         mime="text/csv"
                     )
-                
-                with col2:
-                    if not installment_data.empty:
-                        installment_csv = installment_data.to_csv(index=False)
-                        st.download_button(
-                            "📥 Download Installment Analysis", data=installment_csv,
-                            file_name=f"installment_analysis_{selected_year if selected_year != 'All Years' else 'all_years'}.csv",
-                            mime="text/csv"
-                        )
-                
-            else:
-                st.warning("No payment data available for the selected filters.")
             
-        except Exception as e:
-            st.error(f"Error loading payment data: {str(e)}")
-            st.info("Please check your BigQuery connection and data availability.")
+        else:
+            st.warning("No payment data available for the selected filters.")
+        
+    except Exception as e:
+        st.error(f"Error loading payment data: {str(e)}")
+        st.info("Please check your BigQuery connection and data availability.")
+
+def render_seller_performance(selected_year: str, selected_region: str):
+    """Section 6: Seller performance analysis"""
+    st.header("Seller Performance Analysis")
+    st.markdown("Evaluate seller performance by region and revenue generation")
     
-    # Tab 6: Seller Performance Analysis
-    with tab6:
-        st.header("Seller Performance Analysis")
-        st.markdown("Evaluate seller performance by region and revenue generation")
+    try:
+        # Display active filters
+        if selected_year != "All Years" or selected_region != "All Regions":
+            filter_text = []
+            if selected_year != "All Years":
+                filter_text.append(f"Year: {selected_year}")
+            if selected_region != "All Regions":
+                filter_text.append(f"Region: {selected_region}")
+            st.info(f"🎯 Active filters: {' | '.join(filter_text)}")
         
-        try:
-            # Display active filters
-            if selected_year != "All Years" or selected_region != "All Regions":
-                filter_text = []
-                if selected_year != "All Years":
-                    filter_text.append(f"Year: {selected_year}")
-                if selected_region != "All Regions":
-                    filter_text.append(f"Region: {selected_region}")
-                st.info(f"🎯 Active filters: {' | '.join(filter_text)}")
+        # Controls for this tab
+        col1, col2 = st.columns([3, 1])
+        with col2:
+            top_n = st.selectbox("Top N Sellers", options=[10, 15, 20, 25, 30], index=2, help="Number of top sellers to display")
+        
+        # Get seller data (queries run concurrently)
+        approximate = st.session_state.get('approximate_counts', False)
+        results = fetch_concurrently({
+            'seller': lambda: get_seller_performance(year_filter=selected_year, region_filter=selected_region, approximate=approximate),
+            'top_sellers': lambda: get_top_sellers(limit=top_n, year_filter=selected_year, region_filter=selected_region),
+            'diversity': lambda: get_seller_product_diversity(year_filter=selected_year, region_filter=selected_region)
+        })
+        seller_data = results['seller']
+        top_sellers_data = results['top_sellers']
+        diversity_data = results['diversity']
+        
+        if not seller_data.empty:
+            # Summary KPI metrics
+            total_sellers = seller_data['unique_sellers'].sum()
+            total_revenue = seller_data['total_revenue'].sum()
+            avg_revenue_per_seller = total_revenue / total_sellers if total_sellers > 0 else 0
+            total_products = seller_data['unique_products_sold'].sum()
             
-            # Controls for this tab
-            col1, col2 = st.columns([3, 1])
+            # Display KPIs
+            col1, col2, col3, col4 = st.columns(4)
+            with col1:
+                st.metric("Total Sellers", f"{total_sellers:,}", help="Total unique sellers")
             with col2:
-                top_n = st.selectbox("Top N Sellers", options=[10, 15, 20, 25, 30], index=2, help="Number of top sellers to display")
-            
-            # Get seller data
-            seller_data = get_seller_performance(year_filter=selected_year, region_filter=selected_region)
-            top_sellers_data = get_top_sellers(limit=top_n, year_filter=selected_year, region_filter=selected_region)
-            diversity_data = get_seller_product_diversity(year_filter=selected_year, region_filter=selected_region)
-            
-            if not seller_data.empty:
-                # Summary KPI metrics
-                total_sellers = seller_data['unique_sellers'].sum()
-                total_revenue = seller_data['total_revenue'].sum()
-                avg_revenue_per_seller = total_revenue / total_sellers if total_sellers > 0 else 0
-                total_products = seller_data['unique_products_sold'].sum()
-                
-                # Display KPIs
-                col1, col2, col3, col4 = st.columns(4)
-                with col1:
-                    st.metric("Total Sellers", f"{total_sellers:,}", help="Total unique sellers")
-                with col2:
-                    st.metric("Total Revenue", f"${total_revenue:,.2f}", help="Combined seller revenue")
-                with col3:
-                    st.metric("Avg Revenue/Seller", f"${avg_revenue_per_seller:,.2f}", help="Average revenue per seller")
-                with col4:
-                    st.metric("Total Products", f"{total_products:,}", help="Total unique products sold")
-                
-                st.markdown("---")
+                st.metric("Total Revenue", f"${total_revenue:,.2f}", help="Combined seller revenue")
+            with col3:
+                st.metric("Avg Revenue/Seller", f"${avg_revenue_per_seller:,.2f}", help="Average revenue per seller")
+            with col4:
+                st.metric("Total Products", f"{total_products:,}", help="Total unique products sold")
+            
+            st.markdown("---")
+            
+            # Regional seller performance
+            col1, col2 = st.columns(2)
+            
+            with col1:
+                st.subheader("Revenue by Seller Region")
+                revenue_chart = create_bar_chart(
+                    seller_data.sort_values('total_revenue', ascending=False),
+                    x_col='seller_region', y_col='total_revenue',
+                    title='Total Revenue by Seller Region',
+                    x_title='Seller Region', y_title='Total Revenue ($)', height=400
+                )
+                st.plotly_chart(revenue_chart, width="stretch")
+            
+            with col2:
+                st.subheader("Revenue per Seller by Region")
+                efficiency_chart = create_bar_chart(
+                    seller_data.sort_values('revenue_per_seller', ascending=False),
+                    x_col='seller_region', y_col='revenue_per_seller',
+                    title='Average Revenue per Seller by Region',
+                    x_title='Seller Region', y_title='Revenue per Seller ($)', height=400
+                )
+                st.plotly_chart(efficiency_chart, width="stretch")
+            
+            # Seller distribution analysis
+            col1, col2 = st.columns(2)
+            
+            with col1:
+                st.subheader("Seller Distribution")
+                seller_pie = create_pie_chart(
+                    seller_data, 'seller_region', 'unique_sellers',
+                    'Seller Count by Region', height=400
+                )
+                st.plotly_chart(seller_pie, width="stretch")
+            
+            with col2:
+                st.subheader("Product Diversity by Region")
+                products_chart = create_bar_chart(
+                    seller_data.sort_values('unique_products_sold', ascending=False),
+                    x_col='seller_region', y_col='unique_products_sold',
+                    title='Unique Products Sold by Region',
+                    x_title='Seller Region', y_title='Unique Products', height=400
+                )
+                st.plotly_chart(products_chart, width="stretch")
+            
+            # Top sellers analysis
+            if not top_sellers_data.empty:
+                st.subheader(f"Top {top_n} Sellers Performance")
                 
-                # Regional seller performance
                 col1, col2 = st.columns(2)
                 
                 with col1:
-                    st.subheader("Revenue by Seller Region")
-                    revenue_chart = create_bar_chart(
-                        seller_data.sort_values('total_revenue', ascending=False),
-                        x_col='seller_region', y_col='total_revenue',
-                        title='Total Revenue by Seller Region',
-                        x_title='Seller Region', y_title='Total Revenue ($)', height=400
+                    st.write("**Revenue Leaders**")
+                    top_revenue_chart = create_bar_chart(
+                        top_sellers_data.head(15), 'seller_key', 'total_revenue',
+                        'Top Sellers by Revenue', 'Seller ID', 'Revenue ($)', height=400
                     )
-                    st.plotly_chart(revenue_chart, width="stretch")
+                    top_revenue_chart.update_xaxes(tickangle=45)
+                    st.plotly_chart(top_revenue_chart, width="stretch")
                 
                 with col2:
-                    st.subheader("Revenue per Seller by Region")
-                    efficiency_chart = create_bar_chart(
-                        seller_data.sort_values('revenue_per_seller', ascending=False),
-                        x_col='seller_region', y_col='revenue_per_seller',
-                        title='Average Revenue per Seller by Region',
-                        x_title='Seller Region', y_title='Revenue per Seller ($)', height=400
+                    st.write("**Regional Distribution of Top Sellers**")
+                    top_sellers_region = top_sellers_data.groupby('seller_region', observed=True).size().reset_index(name='seller_count')
+                    top_region_pie = create_pie_chart(
+                        top_sellers_region, 'seller_region', 'seller_count',
+                        'Top Sellers by Region', height=400
                     )
-                    st.plotly_chart(efficiency_chart, width="stretch")
+                    st.plotly_chart(top_region_pie, width="stretch")
+            
+            # Seller diversity analysis
+            if not diversity_data.empty:
+                st.subheader("Seller Product Diversity Analysis")
                 
-                # Seller distribution analysis
                 col1, col2 = st.columns(2)
                 
                 with col1:
-                    st.subheader("Seller Distribution")
-                    seller_pie = create_pie_chart(
-                        seller_data, 'seller_region', 'unique_sellers',
-                        'Seller Count by Region', height=400
+                    st.write("**Average Categories per Seller**")
+                    diversity_chart = create_bar_chart(
+                        diversity_data.sort_values('avg_categories_per_seller', ascending=False),
+                        x_col='seller_region', y_col='avg_categories_per_seller',
+                        title='Avg Product Categories per Seller',
+                        x_title='Seller Region', y_title='Avg Categories', height=400
                     )
-                    st.plotly_chart(seller_pie, width="stretch")
+                    st.plotly_chart(diversity_chart, width="stretch")
                 
                 with col2:
-                    st.subheader("Product Diversity by Region")
-                    products_chart = create_bar_chart(
-                        seller_data.sort_values('unique_products_sold', ascending=False),
-                        x_col='seller_region', y_col='unique_products_sold',
-                        title='Unique Products Sold by Region',
-                        x_title='Seller Region', y_title='Unique Products', height=400
-                    )
-                    st.plotly_chart(products_chart, width="stretch")
-                
-                # Top sellers analysis
-                if not top_sellers_data.empty:
-                    st.subheader(f"Top {top_n} Sellers Performance")
-                    
-                    col1, col2 = st.columns(2)
+                    st.write("**Seller Specialization Analysis**")
+                    # Create specialization vs diversification chart
+                    specialization_data = diversity_data.copy()
+                    specialization_data['specialization_rate'] = (specialization_data['single_category_sellers'] / specialization_data['seller_count'] * 100)
                     
-                    with col1:
-                        st.write("**Revenue Leaders**")
-                        top_revenue_chart = create_bar_chart(
-                            top_sellers_data.head(15), 'seller_key', 'total_revenue',
-                            'Top Sellers by Revenue', 'Seller ID', 'Revenue ($)', height=400
-                        )
-                        top_revenue_chart.update_xaxes(tickangle=45)
-                        st.plotly_chart(top_revenue_chart, width="stretch")
-                    
-                    with col2:
-                        st.write("**Regional Distribution of Top Sellers**")
-                        top_sellers_region = top_sellers_data.groupby('seller_region').size().reset_index(name='seller_count')
-                        top_region_pie = create_pie_chart(
-                            top_sellers_region, 'seller_region', 'seller_count',
-                            'Top Sellers by Region', height=400
-                        )
-                        st.plotly_chart(top_region_pie, width="stretch")
-                
-                # Seller diversity analysis
-                if not diversity_data.empty:
-                    st.subheader("Seller Product Diversity Analysis")
-                    
-                    col1, col2 = st.columns(2)
-                    
-                    with col1:
-                        st.write("**Average Categories per Seller**")
-                        diversity_chart = create_bar_chart(
-                            diversity_data.sort_values('avg_categories_per_seller', ascending=False),
-                            x_col='seller_region', y_col='avg_categories_per_seller',
-                            title='Avg Product Categories per Seller',
-                            x_title='Seller Region', y_title='Avg Categories', height=400
-                        )
-                        st.plotly_chart(diversity_chart, width="stretch")
-                    
-                    with col2:
-                        st.write("**Seller Specialization Analysis**")
-                        # Create specialization vs diversification chart
-                        specialization_data = diversity_data.copy()
-                        specialization_data['specialization_rate'] = (specialization_data['single_category_sellers'] / specialization_data['seller_count'] * 100)
-                        
-                        spec_chart = create_bar_chart(
-                            specialization_data.sort_values('specialization_rate', ascending=False),
-                            x_col='seller_region', y_col='specialization_rate',
-                            title='Single-Category Seller Rate by Region',
-                            x_title='Seller Region', y_title='Specialization Rate (%)', height=400
-                        )
-                        st.plotly_chart(spec_chart, width="stretch")
-                
-                # Performance correlation analysis
-                st.subheader("Seller Performance Correlation")
-                if not top_sellers_data.empty:
-                    correlation_fig = px.scatter(
-                        top_sellers_data, x='unique_products_sold', y='total_revenue',
-                        size='total_orders', color='seller_region',
-                        hover_name='seller_key',
-                        title='Product Diversity vs Revenue (Top Sellers)',
-                        labels={'unique_products_sold': 'Unique Products Sold', 'total_revenue': 'Total Revenue ($)', 'total_orders': 'Orders'},
-                        height=500
+                    spec_chart = create_bar_chart(
+                        specialization_data.sort_values('specialization_rate', ascending=False),
+                        x_col='seller_region', y_col='specialization_rate',
+                        title='Single-Category Seller Rate by Region',
+                        x_title='Seller Region', y_title='Specialization Rate (%)', height=400
                     )
-                    correlation_fig.update_layout(title_x=0.5, plot_bgcolor='white', paper_bgcolor='white')
-                    st.plotly_chart(correlation_fig, width="stretch")
-                
-                # Detailed data tables
-                st.subheader("Regional Seller Performance Summary")
-                display_data = seller_data.copy()
-                display_data['total_revenue'] = display_data['total_revenue'].apply(lambda x: f"${x:,.2f}")
-                display_data['revenue_per_seller'] = display_data['revenue_per_seller'].apply(lambda x: f"${x:,.2f}")
-                display_data['avg_item_value'] = display_data['avg_item_value'].apply(lambda x: f"${x:.2f}")
-                display_data['total_freight_revenue'] = display_data['total_freight_revenue'].apply(lambda x: f"${x:,.2f}")
-                display_data['unique_sellers'] = display_data['unique_sellers'].apply(lambda x: f"{x:,}")
-                display_data['total_orders'] = display_data['total_orders'].apply(lambda x: f"{x:,}")
-                
-                regional_columns = {
+                    st.plotly_chart(spec_chart, width="stretch")
+            
+            # Performance correlation analysis
+            st.subheader("Seller Performance Correlation")
+            if not top_sellers_data.empty:
+                correlation_fig = px.scatter(
+                    top_sellers_data, x='unique_products_sold', y='total_revenue',
+                    size='total_orders', color='seller_region',
+                    hover_name='seller_key',
+                    title='Product Diversity vs Revenue (Top Sellers)',
+                    labels={'unique_products_sold': 'Unique Products Sold', 'total_revenue': 'Total Revenue ($)', 'total_orders': 'Orders'},
+                    height=500
+                )
+                correlation_fig.update_layout(title_x=0.5, plot_bgcolor='white', paper_bgcolor='white')
+                st.plotly_chart(correlation_fig, width="stretch")
+            
+            # Detailed data tables
+            st.subheader("Regional Seller Performance Summary")
+            display_data = seller_data.copy()
+            display_data['total_revenue'] = display_data['total_revenue'].apply(lambda x: f"${x:,.2f}")
+            display_data['revenue_per_seller'] = display_data['revenue_per_seller'].apply(lambda x: f"${x:,.2f}")
+            display_data['avg_item_value'] = display_data['avg_item_value'].apply(lambda x: f"${x:.2f}")
+            display_data['total_freight_revenue'] = display_data['total_freight_revenue'].apply(lambda x: f"${x:,.2f}")
+            display_data['unique_sellers'] = display_data['unique_sellers'].apply(lambda x: f"{x:,}")
+            display_data['total_orders'] = display_data['total_orders'].apply(lambda x: f"{x:,}")
+            
+            regional_columns = {
+                'seller_region': 'Region',
+                'unique_sellers': 'Sellers',
+                'total_revenue': 'Total Revenue',
+                'revenue_per_seller': 'Revenue/Seller',
+                'total_orders': 'Orders',
+                'unique_products_sold': 'Products',
+                'avg_item_value': 'Avg Item Value'
+            }
+            
+            st.dataframe(
+                display_data[list(regional_columns.keys())].rename(columns=regional_columns),
+                width="stretch", hide_index=True
+            )
+            
+            # Top sellers detailed table
+            if not top_sellers_data.empty:
+                st.subheader(f"Top {min(10, len(top_sellers_data))} Sellers Details")
+                top_display = top_sellers_data.head(10).copy()
+                top_display['total_revenue'] = top_display['total_revenue'].apply(lambda x: f"${x:,.2f}")
+                top_display['avg_item_value'] = top_display['avg_item_value'].apply(lambda x: f"${x:.2f}")
+                top_display['total_orders'] = top_display['total_orders'].apply(lambda x: f"{x:,}")
+                top_display['unique_products_sold'] = top_display['unique_products_sold'].apply(lambda x: f"{x:,}")
+                
+                top_columns = {
+                    'seller_key': 'Seller ID',
                     'seller_region': 'Region',
-                    'unique_sellers': 'Sellers',
-                    'total_revenue': 'Total Revenue',
-                    'revenue_per_seller': 'Revenue/Seller',
+                    'seller_state': 'State',
+                    'total_revenue': 'Revenue',
                     'total_orders': 'Orders',
                     'unique_products_sold': 'Products',
                     'avg_item_value': 'Avg Item Value'
                 }
                 
                 st.dataframe(
-                    display_data[list(regional_columns.keys())].rename(columns=regional_columns),
+                    top_display[list(top_columns.keys())].rename(columns=top_columns),
                     width="stretch", hide_index=True
                 )
-                
-                # Top sellers detailed table
+            
+            # Download options
+            col1, col2 = st.columns(2)
+            with col1:
+                seller_csv = seller_data.to_csv(index=False)
+                st.download_button(
+                    "📥 Download Regional Performance", data=seller_csv,
+                    file_name=f"seller_performance_{selected_year if selected_year != 'All Years' else 'all_years'}.csv",
+                    mime="text/csv"
+                )
+            
+            with col2:
                 if not top_sellers_data.empty:
-                    st.subheader(f"Top {min(10, len(top_sellers_data))} Sellers Details")
-                    top_display = top_sellers_data.head(10).copy()
-                    top_display['total_revenue'] = top_display['total_revenue'].apply(lambda x: f"${x:,.2f}")
-                    top_display['avg_item_value'] = top_display['avg_item_value'].apply(lambda x: f"${x:.2f}")
-                    top_display['total_orders'] = top_display['total_orders'].apply(lambda x: f"{x:,}")
-                    top_display['unique_products_sold'] = top_display['unique_products_sold'].apply(lambda x: f"{x:,}")
-                    
-                    top_columns = {
-                        'seller_key': 'Seller ID',
-                        'seller_region': 'Region',
-                        'seller_state': 'State',
-                        'total_revenue': 'Revenue',
-                        'total_orders': 'Orders',
-                        'unique_products_sold': 'Products',
-                        'avg_item_value': 'Avg Item Value'
-                    }
-                    
-                    st.dataframe(
-                        top_display[list(top_columns.keys())].rename(columns=top_columns),
-                        width="stretch", hide_index=True
-                    )
-                
-                # Download options
-                col1, col2 = st.columns(2)
-                with col1:
-                    seller_csv = seller_data.to_csv(index=False)
+                    top_csv = top_sellers_data.to_csv(index=False)
                     st.download_button(
-                        "📥 Download Regional Performance", data=seller_csv,
-                        file_name=f"seller_performance_{selected_year if selected_year != 'All Years' else 'all_years'}.csv",
+                        "📥 Download Top Sellers", data=top_csv,
+                        file_name=f"top_sellers_{selected_year if selected_year != 'All Years' else 'all_years'}.csv",
                         mime="text/csv"
                     )
-                
-                with col2:
-                    if not top_sellers_data.empty:
-                        top_csv = top_sellers_data.to_csv(index=False)
-                        st.download_button(
-                            "📥 Download Top Sellers", data=top_csv,
-                            file_name=f"top_sellers_{selected_year if selected_year != 'All Years' else 'all_years'}.csv",
-                            mime="text/csv"
-                        )
-                
-            else:
-                st.warning("No seller data available for the selected filters.")
             
-        except Exception as e:
-            st.error(f"Error loading seller data: {str(e)}")
-            st.info("Please check your BigQuery connection and data availability.")
+        else:
+            st.warning("No seller data available for the selected filters.")
+        
+    except Exception as e:
+        st.error(f"Error loading seller data: {str(e)}")
+        st.info("Please check your BigQuery connection and data availability.")
+
+def render_reviews_correlation(selected_year: str, selected_region: str):
+    """Section 7: Reviews and sales correlation"""
+    st.header("Product Reviews & Sales Correlation")
+    st.markdown("Analyze how customer reviews impact sales performance")
     
-    # Tab 7: Reviews & Sales Correlation
-    with tab7:
-        st.header("Product Reviews & Sales Correlation")
-        st.markdown("Analyze how customer reviews impact sales performance")
+    try:
+        # Display active filters
+        if selected_year != "All Years" or selected_region != "All Regions":
+            filter_text = []
+            if selected_year != "All Years":
+                filter_text.append(f"Year: {selected_year}")
+            if selected_region != "All Regions":
+                filter_text.append(f"Region: {selected_region}")
+            st.info(f"🎯 Active filters: {' | '.join(filter_text)}")
         
-        try:
-            # Display active filters
-            if selected_year != "All Years" or selected_region != "All Regions":
-                filter_text = []
-                if selected_year != "All Years":
-                    filter_text.append(f"Year: {selected_year}")
-                if selected_region != "All Regions":
-                    filter_text.append(f"Region: {selected_region}")
-                st.info(f"🎯 Active filters: {' | '.join(filter_text)}")
+        # Get review data (queries run concurrently)
+        results = fetch_concurrently({
+            'correlation': lambda: get_reviews_sales_correlation(year_filter=selected_year, region_filter=selected_region),
+            'score_distribution': lambda: get_review_score_distribution(year_filter=selected_year, region_filter=selected_region),
+            'timing': lambda: get_review_timing_analysis(year_filter=selected_year, region_filter=selected_region)
+        })
+        correlation_data = results['correlation']
+        score_distribution = results['score_distribution']
+        timing_data = results['timing']
+        
+        if not correlation_data.empty:
+            # Summary KPI metrics
+            total_items = correlation_data['total_items'].sum()
+            total_sales = correlation_data['total_sales'].sum()
+            total_reviews = correlation_data['reviews_count'].sum()
+            no_reviews = correlation_data['no_review_count'].sum()
+            review_coverage = (total_reviews / (total_reviews + no_reviews) * 100) if (total_reviews + no_reviews) > 0 else 0
             
-            # Get review data
-            correlation_data = get_reviews_sales_correlation(year_filter=selected_year, region_filter=selected_region)
-            score_distribution = get_review_score_distribution(year_filter=selected_year, region_filter=selected_region)
-            timing_data = get_review_timing_analysis(year_filter=selected_year, region_filter=selected_region)
-            
-            if not correlation_data.empty:
-                # Summary KPI metrics
-                total_items = correlation_data['total_items'].sum()
-                total_sales = correlation_data['total_sales'].sum()
-                total_reviews = correlation_data['reviews_count'].sum()
-                no_reviews = correlation_data['no_review_count'].sum()
-                review_coverage = (total_reviews / (total_reviews + no_reviews) * 100) if (total_reviews + no_reviews) > 0 else 0
-                
-                # Display KPIs
-                col1, col2, col3, col4 = st.columns(4)
-                with col1:
-                    st.metric("Total Items", f"{total_items:,}", help="Total items analyzed")
-                with col2:
-                    st.metric("Total Sales", f"${total_sales:,.2f}", help="Total sales value")
-                with col3:
-                    st.metric("Review Coverage", f"{review_coverage:.1f}%", help="Percentage of orders with reviews")
-                with col4:
-                    st.metric("Total Reviews", f"{total_reviews:,}", help="Number of actual reviews")
-                
-                st.markdown("---")
+            # Display KPIs
+            col1, col2, col3, col4 = st.columns(4)
+            with col1:
+                st.metric("Total Items", f"{total_items:,}", help="Total items analyzed")
+            with col2:
+                st.metric("Total Sales", f"${total_sales:,.2f}", help="Total sales value")
+            with col3:
+                st.metric("Review Coverage", f"{review_coverage:.1f}%", help="Percentage of orders with reviews")
+            with col4:
+                st.metric("Total Reviews", f"{total_reviews:,}", help="Number of actual reviews")
+            
+            st.markdown("---")
+            
+            # Review impact analysis
+            st.subheader("Review Impact on Sales Performance")
+            col1, col2 = st.columns(2)
+            
+            with col1:
+                st.write("**Sales by Review Category**")
+                sales_chart = create_bar_chart(
+                    correlation_data.sort_values('total_sales', ascending=False),
+                    x_col='review_category', y_col='total_sales',
+                    title='Total Sales by Review Category',
+                    x_title='Review Category', y_title='Total Sales ($)', height=400
+                )
+                sales_chart.update_xaxes(tickangle=45)
+                st.plotly_chart(sales_chart, width="stretch")
+            
+            with col2:
+                st.write("**Average Item Value by Review Category**")
+                value_chart = create_bar_chart(
+                    correlation_data.sort_values('avg_item_value', ascending=False),
+                    x_col='review_category', y_col='avg_item_value',
+                    title='Avg Item Value by Review Category',
+                    x_title='Review Category', y_title='Avg Item Value ($)', height=400
+                )
+                value_chart.update_xaxes(tickangle=45)
+                st.plotly_chart(value_chart, width="stretch")
+            
+            # Review availability analysis
+            col1, col2 = st.columns(2)
+            
+            with col1:
+                st.subheader("Review Availability Distribution")
+                # Create availability data
+                availability_data = pd.DataFrame({
+                    'category': ['Has Reviews', 'No Reviews'],
+                    'items': [total_reviews, no_reviews],
+                    'sales': [
+                        correlation_data[correlation_data['review_category'] != 'No Review']['total_sales'].sum(),
+                        correlation_data[correlation_data['review_category'] == 'No Review']['total_sales'].sum()
+                    ]
+                })
+                
+                availability_pie = create_pie_chart(
+                    availability_data, 'category', 'items',
+                    'Item Distribution by Review Availability', height=400
+                )
+                st.plotly_chart(availability_pie, width="stretch")
+            
+            with col2:
+                st.subheader("Sales Distribution by Review Availability")
+                sales_pie = create_pie_chart(
+                    availability_data, 'category', 'sales',
+                    'Sales Distribution by Review Availability', height=400
+                )
+                st.plotly_chart(sales_pie, width="stretch")
+            
+            # Detailed review score analysis
+            if not score_distribution.empty:
+                st.subheader("Detailed Review Score Distribution")
                 
-                # Review impact analysis
-                st.subheader("Review Impact on Sales Performance")
                 col1, col2 = st.columns(2)
                 
                 with col1:
-                    st.write("**Sales by Review Category**")
-                    sales_chart = create_bar_chart(
-                        correlation_data.sort_values('total_sales', ascending=False),
-                        x_col='review_category', y_col='total_sales',
-                        title='Total Sales by Review Category',
-                        x_title='Review Category', y_title='Total Sales ($)', height=400
+                    st.write("**Item Count by Review Score**")
+                    score_chart = create_bar_chart(
+                        score_distribution, 'review_score', 'total_items',
+                        'Items by Review Score (0 = No Review)',
+                        'Review Score', 'Total Items', height=400
                     )
-                    sales_chart.update_xaxes(tickangle=45)
-                    st.plotly_chart(sales_chart, width="stretch")
+                    st.plotly_chart(score_chart, width="stretch")
                 
                 with col2:
-                    st.write("**Average Item Value by Review Category**")
-                    value_chart = create_bar_chart(
-                        correlation_data.sort_values('avg_item_value', ascending=False),
-                        x_col='review_category', y_col='avg_item_value',
-                        title='Avg Item Value by Review Category',
-                        x_title='Review Category', y_title='Avg Item Value ($)', height=400
+                    st.write("**Sales Value by Review Score**")
+                    score_sales_chart = create_bar_chart(
+                        score_distribution, 'review_score', 'total_sales',
+                        'Sales by Review Score (0 = No Review)',
+                        'Review Score', 'Total Sales ($)', height=400
                     )
-                    value_chart.update_xaxes(tickangle=45)
-                    st.plotly_chart(value_chart, width="stretch")
+                    st.plotly_chart(score_sales_chart, width="stretch")
+            
+            # Review timing analysis
+            if not timing_data.empty:
+                st.subheader("Review Timing Impact Analysis")
                 
-                # Review availability analysis
                 col1, col2 = st.columns(2)
                 
                 with col1:
-                    st.subheader("Review Availability Distribution")
-                    # Create availability data
-                    availability_data = pd.DataFrame({
-                        'category': ['Has Reviews', 'No Reviews'],
-                        'items': [total_reviews, no_reviews],
-                        'sales': [
-                            correlation_data[correlation_data['review_category'] != 'No Review']['total_sales'].sum(),
-                            correlation_data[correlation_data['review_category'] == 'No Review']['total_sales'].sum()
-                        ]
-                    })
-                    
-                    availability_pie = create_pie_chart(
-                        availability_data, 'category', 'items',
-                        'Item Distribution by Review Availability', height=400
+                    st.write("**Review Score by Timing**")
+                    timing_score_chart = create_bar_chart(
+                        timing_data, 'timing_category', 'avg_review_score',
+                        'Average Review Score by Review Timing',
+                        'Review Timing', 'Avg Review Score', height=400
                     )
-                    st.plotly_chart(availability_pie, width="stretch")
+                    timing_score_chart.update_xaxes(tickangle=45)
+                    st.plotly_chart(timing_score_chart, width="stretch")
                 
                 with col2:
-                    st.subheader("Sales Distribution by Review Availability")
-                    sales_pie = create_pie_chart(
-                        availability_data, 'category', 'sales',
-                        'Sales Distribution by Review Availability', height=400
+                    st.write("**Sales Value by Review Timing**")
+                    timing_sales_chart = create_bar_chart(
+                        timing_data, 'timing_category', 'total_sales',
+                        'Total Sales by Review Timing',
+                        'Review Timing', 'Total Sales ($)', height=400
                     )
-                    st.plotly_chart(sales_pie, width="stretch")
-                
-                # Detailed review score analysis
-                if not score_distribution.empty:
-                    st.subheader("Detailed Review Score Distribution")
-                    
-                    col1, col2 = st.columns(2)
-                    
-                    with col1:
-                        st.write("**Item Count by Review Score**")
-                        score_chart = create_bar_chart(
-                            score_distribution, 'review_score', 'total_items',
-                            'Items by Review Score (0 = No Review)',
-                            'Review Score', 'Total Items', height=400
-                        )
-                        st.plotly_chart(score_chart, width="stretch")
-                    
-                    with col2:
-                        st.write("**Sales Value by Review Score**")
-                        score_sales_chart = create_bar_chart(
-                            score_distribution, 'review_score', 'total_sales',
-                            'Sales by Review Score (0 = No Review)',
-                            'Review Score', 'Total Sales ($)', height=400
-                        )
-                        st.plotly_chart(score_sales_chart, width="stretch")
-                
-                # Review timing analysis
-                if not timing_data.empty:
-                    st.subheader("Review Timing Impact Analysis")
-                    
-                    col1, col2 = st.columns(2)
-                    
-                    with col1:
-                        st.write("**Review Score by Timing**")
-                        timing_score_chart = create_bar_chart(
-                            timing_data, 'timing_category', 'avg_review_score',
-                            'Average Review Score by Review Timing',
-                            'Review Timing', 'Avg Review Score', height=400
-                        )
-                        timing_score_chart.update_xaxes(tickangle=45)
-                        st.plotly_chart(timing_score_chart, width="stretch")
-                    
-                    with col2:
-                        st.write("**Sales Value by Review Timing**")
-                        timing_sales_chart = create_bar_chart(
-                            timing_data, 'timing_category', 'total_sales',
-                            'Total Sales by Review Timing',
-                            'Review Timing', 'Total Sales ($)', height=400
-                        )
-                        timing_sales_chart.update_xaxes(tickangle=45)
-                        st.plotly_chart(timing_sales_chart, width="stretch")
-                
-                # Review correlation insights
-                st.subheader("Review-Sales Correlation Insights")
-                
-                # Create correlation matrix visualization
-                if len(correlation_data) > 1:
-                    correlation_fig = px.scatter(
-                        correlation_data[correlation_data['review_category'] != 'No Review'], 
-                        x='avg_review_score', y='avg_item_value',
-                        size='total_items', color='review_category',
-                        hover_name='review_category',
-                        title='Review Score vs Item Value Correlation',
-                        labels={'avg_review_score': 'Avg Review Score', 'avg_item_value': 'Avg Item Value ($)', 'total_items': 'Items'},
-                        height=500
-                    )
-                    correlation_fig.update_layout(title_x=0.5, plot_bgcolor='white', paper_bgcolor='white')
-                    st.plotly_chart(correlation_fig, width="stretch")
-                
-                # Detailed data tables
-                st.subheader("Review Category Performance Summary")
-                display_data = correlation_data.copy()
-                display_data['total_sales'] = display_data['total_sales'].apply(lambda x: f"${x:,.2f}")
-                display_data['avg_item_value'] = display_data['avg_item_value'].apply(lambda x: f"${x:.2f}")
-                display_data['total_items'] = display_data['total_items'].apply(lambda x: f"{x:,}")
-                display_data['reviews_count'] = display_data['reviews_count'].apply(lambda x: f"{x:,}")
-                display_data['no_review_count'] = display_data['no_review_count'].apply(lambda x: f"{x:,}")
-                
-                review_columns = {
-                    'review_category': 'Review Category',
+                    timing_sales_chart.update_xaxes(tickangle=45)
+                    st.plotly_chart(timing_sales_chart, width="stretch")
+            
+            # Review correlation insights
+            st.subheader("Review-Sales Correlation Insights")
+            
+            # Create correlation matrix visualization
+            if len(correlation_data) > 1:
+                correlation_fig = px.scatter(
+                    correlation_data[correlation_data['review_category'] != 'No Review'], 
+                    x='avg_review_score', y='avg_item_value',
+                    size='total_items', color='review_category',
+                    hover_name='review_category',
+                    title='Review Score vs Item Value Correlation',
+                    labels={'avg_review_score': 'Avg Review Score', 'avg_item_value': 'Avg Item Value ($)', 'total_items': 'Items'},
+                    height=500
+                )
+                correlation_fig.update_layout(title_x=0.5, plot_bgcolor='white', paper_bgcolor='white')
+                st.plotly_chart(correlation_fig, width="stretch")
+            
+            # Detailed data tables
+            st.subheader("Review Category Performance Summary")
+            display_data = correlation_data.copy()
+            display_data['total_sales'] = display_data['total_sales'].apply(lambda x: f"${x:,.2f}")
+            display_data['avg_item_value'] = display_data['avg_item_value'].apply(lambda x: f"${x:.2f}")
+            display_data['total_items'] = display_data['total_items'].apply(lambda x: f"{x:,}")
+            display_data['reviews_count'] = display_data['reviews_count'].apply(lambda x: f"{x:,}")
+            display_data['no_review_count'] = display_data['no_review_count'].apply(lambda x: f"{x:,}")
+            
+            review_columns = {
+                'review_category': 'Review Category',
+                'total_items': 'Total Items',
+                'total_sales': 'Total Sales',
+                'avg_item_value': 'Avg Item Value',
+                'avg_review_score': 'Avg Review Score',
+                'reviews_count': 'Reviews Count',
+                'no_review_count': 'No Review Count'
+            }
+            
+            st.dataframe(
+                display_data[list(review_columns.keys())].rename(columns=review_columns),
+                width="stretch", hide_index=True
+            )
+            
+            # Score distribution table
+            if not score_distribution.empty:
+                st.subheader("Review Score Distribution Details")
+                score_display = score_distribution.copy()
+                score_display['total_sales'] = score_display['total_sales'].apply(lambda x: f"${x:,.2f}")
+                score_display['avg_item_value'] = score_display['avg_item_value'].apply(lambda x: f"${x:.2f}")
+                score_display['total_items'] = score_display['total_items'].apply(lambda x: f"{x:,}")
+                score_display['actual_reviews'] = score_display['actual_reviews'].apply(lambda x: f"{x:,}")
+                
+                score_columns = {
+                    'review_score': 'Review Score',
                     'total_items': 'Total Items',
                     'total_sales': 'Total Sales',
                     'avg_item_value': 'Avg Item Value',
-                    'avg_review_score': 'Avg Review Score',
-                    'reviews_count': 'Reviews Count',
-                    'no_review_count': 'No Review Count'
+                    'actual_reviews': 'Actual Reviews',
+                    'percentage_of_items': '% of Items'
                 }
                 
                 st.dataframe(
-                    display_data[list(review_columns.keys())].rename(columns=review_columns),
+                    score_display[list(score_columns.keys())].rename(columns=score_columns),
                     width="stretch", hide_index=True
                 )
-                
-                # Score distribution table
+            
+            # Download options
+            col1, col2 = st.columns(2)
+            with col1:
+                correlation_csv = correlation_data.to_csv(index=False)
+                st.download_button(
+                    "📥 Download Review Correlation", data=correlation_csv,
+                    file_name=f"review_correlation_{selected_year if selected_year != 'All Years' else 'all_years'}.csv",
+                    mime="text/csv"
+                )
+            
+            with col2:
                 if not score_distribution.empty:
-                    st.subheader("Review Score Distribution Details")
-                    score_display = score_distribution.copy()
-                    score_display['total_sales'] = score_display['total_sales'].apply(lambda x: f"${x:,.2f}")
-                    score_display['avg_item_value'] = score_display['avg_item_value'].apply(lambda x: f"${x:.2f}")
-                    score_display['total_items'] = score_display['total_items'].apply(lambda x: f"{x:,}")
-                    score_display['actual_reviews'] = score_display['actual_reviews'].apply(lambda x: f"{x:,}")
-                    
-                    score_columns = {
-                        'review_score': 'Review Score',
-                        'total_items': 'Total Items',
-                        'total_sales': 'Total Sales',
-                        'avg_item_value': 'Avg Item Value',
-                        'actual_reviews': 'Actual Reviews',
-                        'percentage_of_items': '% of Items'
-                    }
-                    
-                    st.dataframe(
-                        score_display[list(score_columns.keys())].rename(columns=score_columns),
-                        width="stretch", hide_index=True
-                    )
-                
-                # Download options
-                col1, col2 = st.columns(2)
-                with col1:
-                    correlation_csv = correlation_data.to_csv(index=False)
+                    score_csv = score_distribution.to_csv(index=False)
                     st.download_button(
-                        "📥 Download Review Correlation", data=correlation_csv,
-                        file_name=f"review_correlation_{selected_year if selected_year != 'All Years' else 'all_years'}.csv",
+                        "📥 Download Score Distribution", data=score_csv,
+                        file_name=f"review_scores_{selected_year if selected_year != 'All Years' else 'all_years'}.csv",
                         mime="text/csv"
                     )
-                
-                with col2:
-                    if not score_distribution.empty:
-                        score_csv = score_distribution.to_csv(index=False)
-                        st.download_button(
-                            "📥 Download Score Distribution", data=score_csv,
-                            file_name=f"review_scores_{selected_year if selected_year != 'All Years' else 'all_years'}.csv",
-                            mime="text/csv"
-                        )
-                
-            else:
-                st.warning("No review data available for the selected filters.")
             
-        except Exception as e:
-            st.error(f"Error loading review data: {str(e)}")
-            st.info("Please check your BigQuery connection and data availability.")
+        else:
+            st.warning("No review data available for the selected filters.")
+        
+    except Exception as e:
+        st.error(f"Error loading review data: {str(e)}")
+        st.info("Please check your BigQuery connection and data availability.")
+
+def render_delivery_patterns(selected_year: str, selected_region: str):
+    """Section 8: Delivery time patterns"""
+    st.header("Delivery Time Patterns")
+    st.markdown("Examine delivery performance metrics across regions")
     
-    # Tab 8: Delivery Time Patterns
-    with tab8:
-        st.header("Delivery Time Patterns")
-        st.markdown("Examine delivery performance metrics across regions")
+    try:
+        # Display active filters
+        if selected_year != "All Years" or selected_region != "All Regions":
+            filter_text = []
+            if selected_year != "All Years":
+                filter_text.append(f"Year: {selected_year}")
+            if selected_region != "All Regions":
+                filter_text.append(f"Region: {selected_region}")
+            st.info(f"🎯 Active filters: {' | '.join(filter_text)}")
         
-        try:
-            # Display active filters
-            if selected_year != "All Years" or selected_region != "All Regions":
-                filter_text = []
-                if selected_year != "All Years":
-                    filter_text.append(f"Year: {selected_year}")
-                if selected_region != "All Regions":
-                    filter_text.append(f"Region: {selected_region}")
-                st.info(f"🎯 Active filters: {' | '.join(filter_text)}")
+        # Get delivery data (uncached queries run as one script job)
+        results = get_delivery_tab(year_filter=selected_year, region_filter=selected_region)
+        delivery_data = results['patterns']
+        distribution_data = results['distribution']
+        efficiency_data = results['efficiency']
+        
+        if not delivery_data.empty:
+            # Summary KPI metrics
+            total_orders = delivery_data['total_orders'].sum()
+            total_sales = delivery_data['total_sales'].sum()
+            avg_delivery_days = (delivery_data['avg_delivery_days'] * delivery_data['total_orders']).sum() / total_orders if total_orders > 0 else 0
+            overall_on_time_rate = (delivery_data['on_time_deliveries'].sum() / total_orders * 100) if total_orders > 0 else 0
             
-            # Get delivery data
-            delivery_data = get_delivery_patterns(year_filter=selected_year, region_filter=selected_region)
-            distribution_data = get_delivery_time_distribution(year_filter=selected_year, region_filter=selected_region)
-            efficiency_data = get_delivery_efficiency_analysis(year_filter=selected_year, region_filter=selected_region)
-            
-            if not delivery_data.empty:
-                # Summary KPI metrics
-                total_orders = delivery_data['total_orders'].sum()
-                total_sales = delivery_data['total_sales'].sum()
-                avg_delivery_days = (delivery_data['avg_delivery_days'] * delivery_data['total_orders']).sum() / total_orders if total_orders > 0 else 0
-                overall_on_time_rate = (delivery_data['on_time_deliveries'].sum() / total_orders * 100) if total_orders > 0 else 0
-                
-                # Display KPIs
-                col1, col2, col3, col4 = st.columns(4)
-                with col1:
-                    st.metric("Total Orders", f"{total_orders:,}", help="Total orders with delivery data")
-                with col2:
-                    st.metric("Total Sales", f"${total_sales:,.2f}", help="Total sales value")
-                with col3:
-                    st.metric("Avg Delivery Time", f"{avg_delivery_days:.1f} days", help="Average delivery time across regions")
-                with col4:
-                    st.metric("On-Time Rate", f"{overall_on_time_rate:.1f}%", help="Overall on-time delivery rate")
-                
-                st.markdown("---")
+            # Display KPIs
+            col1, col2, col3, col4 = st.columns(4)
+            with col1:
+                st.metric("Total Orders", f"{total_orders:,}", help="Total orders with delivery data")
+            with col2:
+                st.metric("Total Sales", f"${total_sales:,.2f}", help="Total sales value")
+            with col3:
+                st.metric("Avg Delivery Time", f"{avg_delivery_days:.1f} days", help="Average delivery time across regions")
+            with col4:
+                st.metric("On-Time Rate", f"{overall_on_time_rate:.1f}%", help="Overall on-time delivery rate")
+            
+            st.markdown("---")
+            
+            # Regional delivery performance
+            st.subheader("Regional Delivery Performance")
+            col1, col2 = st.columns(2)
+            
+            with col1:
+                st.write("**Average Delivery Time by Region**")
+                delivery_chart = create_bar_chart(
+                    delivery_data.sort_values('avg_delivery_days', ascending=True),
+                    x_col='customer_region', y_col='avg_delivery_days',
+                    title='Average Delivery Days by Region',
+                    x_title='Customer Region', y_title='Average Days', height=400
+                )
+                st.plotly_chart(delivery_chart, width="stretch")
+            
+            with col2:
+                st.write("**On-Time Delivery Rate by Region**")
+                ontime_chart = create_bar_chart(
+                    delivery_data.sort_values('on_time_delivery_rate', ascending=False),
+                    x_col='customer_region', y_col='on_time_delivery_rate',
+                    title='On-Time Delivery Rate by Region',
+                    x_title='Customer Region', y_title='On-Time Rate (%)', height=400
+                )
+                st.plotly_chart(ontime_chart, width="stretch")
+            
+            # Delivery performance distribution
+            col1, col2 = st.columns(2)
+            
+            with col1:
+                st.subheader("Order Volume Distribution")
+                volume_pie = create_pie_chart(
+                    delivery_data, 'customer_region', 'total_orders',
+                    'Order Volume by Region', height=400
+                )
+                st.plotly_chart(volume_pie, width="stretch")
+            
+            with col2:
+                st.subheader("Delivery vs Estimate Performance")
+                estimate_chart = create_bar_chart(
+                    delivery_data.sort_values('avg_delivery_vs_estimate', ascending=True),
+                    x_col='customer_region', y_col='avg_delivery_vs_estimate',
+                    title='Delivery vs Estimate (Negative = Early)',
+                    x_title='Customer Region', y_title='Days vs Estimate', height=400
+                )
+                st.plotly_chart(estimate_chart, width="stretch")
+            
+            # Delivery time distribution analysis
+            if not distribution_data.empty:
+                st.subheader("Delivery Time Distribution Analysis")
                 
-                # Regional delivery performance
-                st.subheader("Regional Delivery Performance")
                 col1, col2 = st.columns(2)
                 
                 with col1:
-                    st.write("**Average Delivery Time by Region**")
-                    delivery_chart = create_bar_chart(
-                        delivery_data.sort_values('avg_delivery_days', ascending=True),
-                        x_col='customer_region', y_col='avg_delivery_days',
-                        title='Average Delivery Days by Region',
-                        x_title='Customer Region', y_title='Average Days', height=400
+                    st.write("**Order Count by Delivery Speed**")
+                    speed_chart = create_bar_chart(
+                        distribution_data, 'delivery_speed_category', 'total_orders',
+                        'Orders by Delivery Speed Category',
+                        'Delivery Speed', 'Total Orders', height=400
                     )
-                    st.plotly_chart(delivery_chart, width="stretch")
+                    speed_chart.update_xaxes(tickangle=45)
+                    st.plotly_chart(speed_chart, width="stretch")
                 
                 with col2:
-                    st.write("**On-Time Delivery Rate by Region**")
-                    ontime_chart = create_bar_chart(
-                        delivery_data.sort_values('on_time_delivery_rate', ascending=False),
-                        x_col='customer_region', y_col='on_time_delivery_rate',
-                        title='On-Time Delivery Rate by Region',
-                        x_title='Customer Region', y_title='On-Time Rate (%)', height=400
+                    st.write("**On-Time Rate by Delivery Speed**")
+                    speed_ontime_chart = create_bar_chart(
+                        distribution_data, 'delivery_speed_category', 'on_time_rate',
+                        'On-Time Rate by Delivery Speed',
+                        'Delivery Speed', 'On-Time Rate (%)', height=400
                     )
-                    st.plotly_chart(ontime_chart, width="stretch")
+                    speed_ontime_chart.update_xaxes(tickangle=45)
+                    st.plotly_chart(speed_ontime_chart, width="stretch")
+            
+            # Same vs cross-region delivery efficiency
+            if not efficiency_data.empty:
+                st.subheader("Delivery Efficiency: Same vs Cross-Region")
+                
+                # Aggregate by delivery type
+                efficiency_summary = efficiency_data.groupby('delivery_type', observed=True).agg({
+                    'total_orders': 'sum',
+                    'avg_delivery_days': lambda x: (x * efficiency_data.loc[x.index, 'total_orders']).sum() / efficiency_data.loc[x.index, 'total_orders'].sum(),
+                    'on_time_rate': lambda x: (efficiency_data.loc[x.index, 'on_time_rate'] * efficiency_data.loc[x.index, 'total_orders']).sum() / efficiency_data.loc[x.index, 'total_orders'].sum(),
+                    'total_sales': 'sum',
+                    'avg_freight_cost': lambda x: (x * efficiency_data.loc[x.index, 'total_orders']).sum() / efficiency_data.loc[x.index, 'total_orders'].sum()
+                }).round(1).reset_index()
                 
-                # Delivery performance distribution
                 col1, col2 = st.columns(2)
                 
                 with col1:
-                    st.subheader("Order Volume Distribution")
-                    volume_pie = create_pie_chart(
-                        delivery_data, 'customer_region', 'total_orders',
-                        'Order Volume by Region', height=400
+                    st.write("**Delivery Time: Same vs Cross-Region**")
+                    efficiency_chart = create_bar_chart(
+                        efficiency_summary, 'delivery_type', 'avg_delivery_days',
+                        'Average Delivery Days by Type',
+                        'Delivery Type', 'Avg Days', height=400
                     )
-                    st.plotly_chart(volume_pie, width="stretch")
+                    st.plotly_chart(efficiency_chart, width="stretch")
                 
                 with col2:
-                    st.subheader("Delivery vs Estimate Performance")
-                    estimate_chart = create_bar_chart(
-                        delivery_data.sort_values('avg_delivery_vs_estimate', ascending=True),
-                        x_col='customer_region', y_col='avg_delivery_vs_estimate',
-                        title='Delivery vs Estimate (Negative = Early)',
-                        x_title='Customer Region', y_title='Days vs Estimate', height=400
-                    )
-                    st.plotly_chart(estimate_chart, width="stretch")
-                
-                # Delivery time distribution analysis
-                if not distribution_data.empty:
-                    st.subheader("Delivery Time Distribution Analysis")
-                    
-                    col1, col2 = st.columns(2)
-                    
-                    with col1:
-                        st.write("**Order Count by Delivery Speed**")
-                        speed_chart = create_bar_chart(
-                            distribution_data, 'delivery_speed_category', 'total_orders',
-                            'Orders by Delivery Speed Category',
-                            'Delivery Speed', 'Total Orders', height=400
-                        )
-                        speed_chart.update_xaxes(tickangle=45)
-                        st.plotly_chart(speed_chart, width="stretch")
-                    
-                    with col2:
-                        st.write("**On-Time Rate by Delivery Speed**")
-                        speed_ontime_chart = create_bar_chart(
-                            distribution_data, 'delivery_speed_category', 'on_time_rate',
-                            'On-Time Rate by Delivery Speed',
-                            'Delivery Speed', 'On-Time Rate (%)', height=400
-                        )
-                        speed_ontime_chart.update_xaxes(tickangle=45)
-                        st.plotly_chart(speed_ontime_chart, width="stretch")
-                
-                # Same vs cross-region delivery efficiency
-                if not efficiency_data.empty:
-                    st.subheader("Delivery Efficiency: Same vs Cross-Region")
-                    
-                    # Aggregate by delivery type
-                    efficiency_summary = efficiency_data.groupby('delivery_type').agg({
-                        'total_orders': 'sum',
-                        'avg_delivery_days': lambda x: (x * efficiency_data.loc[x.index, 'total_orders']).sum() / efficiency_data.loc[x.index, 'total_orders'].sum(),
-                        'on_time_rate': lambda x: (efficiency_data.loc[x.index, 'on_time_rate'] * efficiency_data.loc[x.index, 'total_orders']).sum() / efficiency_data.loc[x.index, 'total_orders'].sum(),
-                        'total_sales': 'sum',
-                        'avg_freight_cost': lambda x: (x * efficiency_data.loc[x.index, 'total_orders']).sum() / efficiency_data.loc[x.index, 'total_orders'].sum()
-                    }).round(1).reset_index()
-                    
-                    col1, col2 = st.columns(2)
-                    
-                    with col1:
-                        st.write("**Delivery Time: Same vs Cross-Region**")
-                        efficiency_chart = create_bar_chart(
-                            efficiency_summary, 'delivery_type', 'avg_delivery_days',
-                            'Average Delivery Days by Type',
-                            'Delivery Type', 'Avg Days', height=400
-                        )
-                        st.plotly_chart(efficiency_chart, width="stretch")
-                    
-                    with col2:
-                        st.write("**Freight Cost: Same vs Cross-Region**")
-                        freight_chart = create_bar_chart(
-                            efficiency_summary, 'delivery_type', 'avg_freight_cost',
-                            'Average Freight Cost by Type',
-                            'Delivery Type', 'Avg Freight Cost ($)', height=400
-                        )
-                        st.plotly_chart(freight_chart, width="stretch")
-                
-                # Performance correlation analysis
-                st.subheader("Delivery Performance Correlation")
-                if len(delivery_data) > 1:
-                    correlation_fig = px.scatter(
-                        delivery_data, x='avg_delivery_days', y='on_time_delivery_rate',
-                        size='total_orders', color='customer_region',
-                        hover_name='customer_region',
-                        title='Delivery Time vs On-Time Rate Correlation',
-                        labels={'avg_delivery_days': 'Avg Delivery Days', 'on_time_delivery_rate': 'On-Time Rate (%)', 'total_orders': 'Orders'},
-                        height=500
+                    st.write("**Freight Cost: Same vs Cross-Region**")
+                    freight_chart = create_bar_chart(
+                        efficiency_summary, 'delivery_type', 'avg_freight_cost',
+                        'Average Freight Cost by Type',
+                        'Delivery Type', 'Avg Freight Cost ($)', height=400
                     )
-                    correlation_fig.update_layout(title_x=0.5, plot_bgcolor='white', paper_bgcolor='white')
-                    st.plotly_chart(correlation_fig, width="stretch")
-                
-                # Detailed data tables
-                st.subheader("Regional Delivery Performance Summary")
-                display_data = delivery_data.copy()
-                display_data['total_sales'] = display_data['total_sales'].apply(lambda x: f"${x:,.2f}")
-                display_data['total_orders'] = display_data['total_orders'].apply(lambda x: f"{x:,}")
-                display_data['on_time_deliveries'] = display_data['on_time_deliveries'].apply(lambda x: f"{x:,}")
-                display_data['late_deliveries'] = display_data['late_deliveries'].apply(lambda x: f"{x:,}")
-                
-                delivery_columns = {
-                    'customer_region': 'Region',
+                    st.plotly_chart(freight_chart, width="stretch")
+            
+            # Performance correlation analysis
+            st.subheader("Delivery Performance Correlation")
+            if len(delivery_data) > 1:
+                correlation_fig = px.scatter(
+                    delivery_data, x='avg_delivery_days', y='on_time_delivery_rate',
+                    size='total_orders', color='customer_region',
+                    hover_name='customer_region',
+                    title='Delivery Time vs On-Time Rate Correlation',
+                    labels={'avg_delivery_days': 'Avg Delivery Days', 'on_time_delivery_rate': 'On-Time Rate (%)', 'total_orders': 'Orders'},
+                    height=500
+                )
+                correlation_fig.update_layout(title_x=0.5, plot_bgcolor='white', paper_bgcolor='white')
+                st.plotly_chart(correlation_fig, width="stretch")
+            
+            # Detailed data tables
+            st.subheader("Regional Delivery Performance Summary")
+            display_data = delivery_data.copy()
+            display_data['total_sales'] = display_data['total_sales'].apply(lambda x: f"${x:,.2f}")
+            display_data['total_orders'] = display_data['total_orders'].apply(lambda x: f"{x:,}")
+            display_data['on_time_deliveries'] = display_data['on_time_deliveries'].apply(lambda x: f"{x:,}")
+            display_data['late_deliveries'] = display_data['late_deliveries'].apply(lambda x: f"{x:,}")
+            
+            delivery_columns = {
+                'customer_region': 'Region',
+                'total_orders': 'Total Orders',
+                'total_sales': 'Total Sales',
+                'avg_delivery_days': 'Avg Delivery Days',
+                'on_time_delivery_rate': 'On-Time Rate (%)',
+                'avg_delivery_vs_estimate': 'Vs Estimate (Days)',
+                'min_delivery_days': 'Min Days',
+                'max_delivery_days': 'Max Days'
+            }
+            
+            st.dataframe(
+                display_data[list(delivery_columns.keys())].rename(columns=delivery_columns),
+                width="stretch", hide_index=True
+            )
+            
+            # Speed distribution table
+            if not distribution_data.empty:
+                st.subheader("Delivery Speed Distribution Details")
+                speed_display = distribution_data.copy()
+                speed_display['total_sales'] = speed_display['total_sales'].apply(lambda x: f"${x:,.2f}")
+                speed_display['total_orders'] = speed_display['total_orders'].apply(lambda x: f"{x:,}")
+                speed_display['on_time_orders'] = speed_display['on_time_orders'].apply(lambda x: f"{x:,}")
+                
+                speed_columns = {
+                    'delivery_speed_category': 'Speed Category',
                     'total_orders': 'Total Orders',
                     'total_sales': 'Total Sales',
-                    'avg_delivery_days': 'Avg Delivery Days',
-                    'on_time_delivery_rate': 'On-Time Rate (%)',
-                    'avg_delivery_vs_estimate': 'Vs Estimate (Days)',
-                    'min_delivery_days': 'Min Days',
-                    'max_delivery_days': 'Max Days'
+                    'avg_days_in_category': 'Avg Days',
+                    'on_time_rate': 'On-Time Rate (%)',
+                    'avg_vs_estimate': 'Vs Estimate (Days)'
                 }
                 
                 st.dataframe(
-                    display_data[list(delivery_columns.keys())].rename(columns=delivery_columns),
+                    speed_display[list(speed_columns.keys())].rename(columns=speed_columns),
                     width="stretch", hide_index=True
                 )
-                
-                # Speed distribution table
+            
+            # Download options
+            col1, col2 = st.columns(2)
+            with col1:
+                delivery_csv = delivery_data.to_csv(index=False)
+                st.download_button(
+                    "📥 Download Regional Performance", data=delivery_csv,
+                    file_name=f"delivery_performance_{selected_year if selected_year != 'All Years' else 'all_years'}.csv",
+                    mime="text/csv"
+                )
+            
+            with col2:
                 if not distribution_data.empty:
-                    st.subheader("Delivery Speed Distribution Details")
-                    speed_display = distribution_data.copy()
-                    speed_display['total_sales'] = speed_display['total_sales'].apply(lambda x: f"${x:,.2f}")
-                    speed_display['total_orders'] = speed_display['total_orders'].apply(lambda x: f"{x:,}")
-                    speed_display['on_time_orders'] = speed_display['on_time_orders'].apply(lambda x: f"{x:,}")
-                    
-                    speed_columns = {
-                        'delivery_speed_category': 'Speed Category',
-                        'total_orders': 'Total Orders',
-                        'total_sales': 'Total Sales',
-                        'avg_days_in_category': 'Avg Days',
-                        'on_time_rate': 'On-Time Rate (%)',
-                        'avg_vs_estimate': 'Vs Estimate (Days)'
-                    }
-                    
-                    st.dataframe(
-                        speed_display[list(speed_columns.keys())].rename(columns=speed_columns),
-                        width="stretch", hide_index=True
-                    )
-                
-                # Download options
-                col1, col2 = st.columns(2)
-                with col1:
-                    delivery_csv = delivery_data.to_csv(index=False)
+                    distribution_csv = distribution_data.to_csv(index=False)
                     st.download_button(
-                        "📥 Download Regional Performance", data=delivery_csv,
-                        file_name=f"delivery_performance_{selected_year if selected_year != 'All Years' else 'all_years'}.csv",
+                        "📥 Download Speed Distribution", data=distribution_csv,
+                        file_name=f"delivery_distribution_{selected_year if selected_year != 'All Years' else 'all_years'}.csv",
                         mime="text/csv"
                     )
-                
-                with col2:
-                    if not distribution_data.empty:
-                        distribution_csv = distribution_data.to_csv(index=False)
-                        st.download_button(
-                            "📥 Download Speed Distribution", data=distribution_csv,
-                            file_name=f"delivery_distribution_{selected_year if selected_year != 'All Years' else 'all_years'}.csv",
-                            mime="text/csv"
-                        )
-                
-            else:
-                st.warning("No delivery data available for the selected filters.")
-                
-        except Exception as e:
-            st.error(f"Error loading delivery data: {str(e)}")
-            st.info("Please check your BigQuery connection and data availability.")
+            
+        else:
+            st.warning("No delivery data available for the selected filters.")
+            
+    except Exception as e:
+        st.error(f"Error loading delivery data: {str(e)}")
+        st.info("Please check your BigQuery connection and data availability.")
+
+# Dashboard sections, in navigation order
+SECTIONS = {
+    "📈 Monthly Sales Trends": render_monthly_sales_trends,
+    "🏷️ Top Products & Categories": render_top_products_categories,
+    "🌍 Geographic Sales Distribution": render_geographic_distribution,
+    "👥 Customer Purchase Behavior": render_customer_behavior,
+    "💳 Payment Method Impact": render_payment_methods,
+    "🏪 Seller Performance Analysis": render_seller_performance,
+    "⭐ Reviews & Sales Correlation": render_reviews_correlation,
+    "🚚 Delivery Time Patterns": render_delivery_patterns
+}
+
+def main():
+    """Main dashboard application"""
+    
+    # Header
+    st.markdown('<h1 class="main-header">Olist E-commerce Analytics Dashboard</h1>', unsafe_allow_html=True)
+    
+    # Mobile scroll hint
+    if st.session_state.get('show_mobile_hint', True):
+        col1, col2, col3 = st.columns([1, 2, 1])
+        with col2:
+            st.info("📱 On mobile? Swipe left/right on the section selector to navigate all sections", icon="💡")
+        if st.button("Got it!", key="dismiss_hint"):
+            st.session_state.show_mobile_hint = False
+            st.rerun()
+    
+    # Sidebar
+    with st.sidebar:
+        st.header("Dashboard Controls")
+        
+        # Data refresh button - re-checks the marts tables instead of dropping every cached result
+        if st.button("🔄 Refresh Data", type="primary"):
+            get_marts_version(force_refresh=True)
+            st.success("Checked for new data! Results refresh whenever the marts tables change.")
+        
+        st.markdown("---")
+        
+        # Filter options
+        st.subheader("Filters")
+        selected_year = st.selectbox(
+            "Select Year",
+            options=YEAR_OPTIONS,
+            index=0
+        )
+        
+        selected_region = st.selectbox(
+            "Select Region",
+            options=REGION_OPTIONS,
+            index=0
+        )
+        
+        st.toggle(
+            "Approximate distinct counts",
+            value=False,
+            key="approximate_counts",
+            help="Estimate distinct orders, customers, sellers and products from pre-aggregated "
+                 "HyperLogLog sketches (about 0.5% error). Much cheaper on large data."
+        )
+        
+        st.markdown("---")
+        
+        # Data info
+        last_modified = get_marts_last_modified()
+        last_updated = last_modified.strftime("%Y-%m-%d %H:%M UTC") if last_modified is not None else "Unknown"
+        st.subheader("Data Info")
+        st.info(f"""
+        **Last Updated**: {last_updated}
+        **Data Source**: Olist e-commerce transactions
+        **Cache**: Kept until the marts tables change
+        """)
+    
+    # Section navigation - only the active section is rendered, so a filter change
+    # runs that section's queries instead of the queries behind all eight tabs
+    active_section = st.radio(
+        "Section",
+        options=list(SECTIONS.keys()),
+        horizontal=True,
+        key="active_section",
+        label_visibility="collapsed"
+    )
+    
+    SECTIONS[active_section](selected_year, selected_region)
     
     # Footer
     st.markdown("---")
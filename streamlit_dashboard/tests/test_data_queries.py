@@ -0,0 +1,86 @@
+import pandas as pd
+
+from utils import data_queries
+from utils.data_queries import (
+    RESULT_SCHEMAS, _merge_customer_frequency, _merge_monthly_sales_trends, _merge_review_score_distribution,
+    concat_slices,
+)
+from utils.result_dtypes import compact_dtypes
+
+
+def test_concat_slices_resorts_and_reapplies_the_limit():
+    merge = concat_slices("revenue", ascending=False)
+    frames = [pd.DataFrame({"seller": ["a", "b"], "revenue": [5.0, 1.0]}),
+              pd.DataFrame({"seller": ["c"], "revenue": [3.0]})]
+    merged = merge(frames, {"limit": 2})
+    assert merged["seller"].tolist() == ["a", "c"]
+    assert merged.index.tolist() == [0, 1]
+
+
+def test_merge_monthly_sales_trends_sums_regions_and_recomputes_averages():
+    columns = dict(year=[2017], month=[1], month_name=["January"], month_year=["2017-01"])
+    north = pd.DataFrame({**columns, "total_orders": [2], "total_items": [3], "total_sales": [100.0],
+                          "total_payments": [110.0], "avg_order_value": [50.0], "avg_payment_value": [55.0]})
+    south = pd.DataFrame({**columns, "total_orders": [3], "total_items": [4], "total_sales": [50.0],
+                          "total_payments": [40.0], "avg_order_value": [16.67], "avg_payment_value": [13.33]})
+    merged = _merge_monthly_sales_trends([north, south], {})
+    row = merged.iloc[0]
+    assert (row["total_orders"], row["total_items"]) == (5, 7)
+    assert row["avg_order_value"] == 30.0
+    assert row["avg_payment_value"] == 30.0
+
+
+def test_merge_monthly_sales_trends_accepts_compacted_slices():
+    schema = RESULT_SCHEMAS["get_monthly_sales_trends"]
+    frame = pd.DataFrame({"month_year": ["2017-01", "2017-02"], "year": [2017, 2017], "month": [1, 2],
+                          "month_name": ["January", "February"], "total_orders": [1, 2], "total_items": [1, 2],
+                          "total_sales": [10.0, 20.0], "total_payments": [10.0, 20.0],
+                          "avg_order_value": [10.0, 10.0], "avg_payment_value": [10.0, 10.0]})
+    merged = _merge_monthly_sales_trends([compact_dtypes(frame, schema), compact_dtypes(frame.iloc[:1], schema)], {})
+    assert merged["month"].tolist() == [1, 2]
+    assert merged["total_orders"].tolist() == [2, 2]
+
+
+def test_merge_customer_frequency_sums_counts_and_recomputes_shares():
+    north = pd.DataFrame({"order_count": [1, 2], "customer_count": [6, 2], "total_segment_value": [60.0, 40.0],
+                          "avg_customer_value": [10.0, 20.0], "percentage_of_customers": [75.0, 25.0]})
+    south = pd.DataFrame({"order_count": [1], "customer_count": [2], "total_segment_value": [20.0],
+                          "avg_customer_value": [10.0], "percentage_of_customers": [100.0]})
+    merged = _merge_customer_frequency([north, south], {})
+    assert merged["customer_count"].tolist() == [8, 2]
+    assert merged["percentage_of_customers"].tolist() == [80.0, 20.0]
+    assert merged["avg_customer_value"].tolist() == [10.0, 20.0]
+
+
+def test_merge_review_score_distribution_sums_slices():
+    frame = pd.DataFrame({"review_score": [5, 1], "total_items": [3, 1], "total_sales": [30.0, 5.0],
+                          "avg_item_value": [10.0, 5.0], "total_orders": [2, 1], "actual_reviews": [2, 1],
+                          "percentage_of_items": [75.0, 25.0]})
+    merged = _merge_review_score_distribution([frame, frame], {})
+    assert merged["review_score"].tolist() == [1, 5]
+    assert merged["total_items"].tolist() == [2, 6]
+    assert merged["percentage_of_items"].tolist() == [25.0, 75.0]
+
+
+# Largest values each declared narrow integer column can take in the Olist data
+_DECLARED_INTEGER_MAXIMA = {
+    "year": 2100,
+    "month": 12,
+    "order_count": 1000,
+    "total_installments": 24,
+    "review_score": 5,
+}
+
+
+def test_declared_integer_widths_hold_their_columns_domain():
+    for function_name, schema in RESULT_SCHEMAS.items():
+        for column, dtype in schema.items():
+            if dtype == "category":
+                continue
+            assert column in _DECLARED_INTEGER_MAXIMA, f"{function_name}.{column} has no known maximum"
+            frame = pd.DataFrame({column: [0, _DECLARED_INTEGER_MAXIMA[column]]})
+            assert str(compact_dtypes(frame, schema)[column].dtype) == dtype
+
+
+def test_every_schema_belongs_to_a_query_function():
+    assert set(RESULT_SCHEMAS) <= set(data_queries.query_functions())
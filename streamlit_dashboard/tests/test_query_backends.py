@@ -0,0 +1,48 @@
+import pytest
+
+from utils.query_backends import bigquery_to_duckdb
+
+
+def test_backticked_names_are_reduced_to_the_table():
+    sql = bigquery_to_duckdb("SELECT * FROM `project.olist_marts.fact_sales` f JOIN `olist_marts.dim_date` d ON TRUE")
+    assert 'FROM "fact_sales" f' in sql
+    assert 'JOIN "dim_date" d' in sql
+
+
+def test_named_parameters_use_duckdb_syntax():
+    assert bigquery_to_duckdb("WHERE year = @year AND region = @region") == "WHERE year = $year AND region = $region"
+
+
+def test_format_date_swaps_its_arguments():
+    assert bigquery_to_duckdb("FORMAT_DATE('%Y-%m', d.full_date)") == "strftime(d.full_date, '%Y-%m')"
+
+
+def test_date_diff_becomes_duckdb_date_diff():
+    sql = bigquery_to_duckdb("DATE_DIFF(delivered_date, purchase_date, DAY)")
+    assert sql == "date_diff('day', purchase_date, delivered_date)"
+
+
+def test_nested_calls_are_rewritten():
+    sql = bigquery_to_duckdb("FORMAT_DATE('%Y', DATE_DIFF(a, b, DAY))")
+    assert sql == "strftime(date_diff('day', b, a), '%Y')"
+
+
+def test_commas_inside_strings_and_nested_calls_do_not_split_arguments():
+    sql = bigquery_to_duckdb("FORMAT_DATE('%Y, %m', COALESCE(a, b))")
+    assert sql == "strftime(COALESCE(a, b), '%Y, %m')"
+
+
+def test_unbalanced_call_is_rejected():
+    with pytest.raises(ValueError):
+        bigquery_to_duckdb("FORMAT_DATE('%Y', d")
+
+
+def test_translated_sql_runs_on_duckdb():
+    duckdb = pytest.importorskip("duckdb")
+    conn = duckdb.connect()
+    conn.execute("CREATE TABLE dim_date AS SELECT DATE '2017-03-05' AS full_date, 2017 AS year")
+    sql = bigquery_to_duckdb(
+        "SELECT FORMAT_DATE('%Y-%m', full_date) AS month, DATE_DIFF(full_date, DATE '2017-03-01', DAY) AS days "
+        "FROM `olist_marts.dim_date` WHERE year = @year"
+    )
+    assert conn.execute(sql, {"year": 2017}).fetchall() == [("2017-03", 4)]
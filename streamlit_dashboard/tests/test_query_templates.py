@@ -0,0 +1,42 @@
+from utils.query_templates import ParameterizedQuery, as_parameterized, bind_query, region_param, year_param
+
+
+def test_bind_query_keeps_only_referenced_parameters():
+    query = bind_query("t", "SELECT 1 FROM x WHERE year = @year", year=2017, region=None)
+    assert query.params == {"year": 2017}
+
+
+def test_bind_query_matches_whole_parameter_names():
+    query = bind_query("t", "SELECT 1 WHERE d >= @year_start", year=2017, year_start="2017-01-01")
+    assert query.params == {"year_start": "2017-01-01"}
+
+
+def test_fingerprint_ignores_whitespace():
+    a = ParameterizedQuery("t", "SELECT  a\n FROM x", {"year": 1})
+    b = ParameterizedQuery("t", "SELECT a FROM x", {"year": 1})
+    assert a.fingerprint == b.fingerprint
+
+
+def test_fingerprint_depends_on_parameters_and_template():
+    base = ParameterizedQuery("t", "SELECT a FROM x WHERE y = @year", {"year": 2017})
+    assert base.fingerprint != ParameterizedQuery("t", base.sql, {"year": 2018}).fingerprint
+    assert base.fingerprint != ParameterizedQuery("u", base.sql, base.params).fingerprint
+
+
+def test_fingerprint_ignores_parameter_order():
+    a = ParameterizedQuery("t", "SELECT 1", {"year": 2017, "region": "North"})
+    b = ParameterizedQuery("t", "SELECT 1", {"region": "North", "year": 2017})
+    assert a.fingerprint == b.fingerprint
+
+
+def test_as_parameterized_wraps_plain_sql():
+    query = as_parameterized("SELECT 1")
+    assert query.template_id == "adhoc" and query.params == {}
+    assert as_parameterized(query) is query
+
+
+def test_filter_params_treat_all_options_as_no_filter():
+    assert year_param("All Years") is None and year_param(None) is None
+    assert year_param("2017") == 2017
+    assert region_param("All Regions") is None
+    assert region_param("North") == "North"
@@ -0,0 +1,82 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+from utils.result_dtypes import CATEGORY_MAX_UNIQUE, STRING_DTYPE, _cast, compact_dtypes
+
+
+def test_integers_are_narrowed_to_32_bits_at_most():
+    df = pd.DataFrame({"orders": np.array([1, 2, 3], dtype="int64")})
+    assert compact_dtypes(df)["orders"].dtype == np.dtype("int32")
+
+
+def test_integers_outside_32_bits_are_kept():
+    df = pd.DataFrame({"bytes": np.array([1, 2**40], dtype="int64")})
+    assert compact_dtypes(df)["bytes"].dtype == np.dtype("int64")
+
+
+@pytest.mark.parametrize("dtype, value", [("int8", 127), ("int16", 2018), ("int16", 32767)])
+def test_declared_narrow_integers_are_cast(dtype, value):
+    df = pd.DataFrame({"value": np.array([0, value], dtype="int64")})
+    result = compact_dtypes(df, {"value": dtype})
+    assert result["value"].dtype == np.dtype(dtype)
+    assert result["value"].tolist() == [0, value]
+
+
+@pytest.mark.parametrize("dtype, value", [("int8", 128), ("int8", -129), ("int16", 40000)])
+def test_declared_width_too_narrow_keeps_the_column_instead_of_wrapping(dtype, value):
+    df = pd.DataFrame({"value": np.array([1, value], dtype="int64")})
+    result = compact_dtypes(df, {"value": dtype})
+    assert result["value"].dtype == np.dtype("int64")
+    assert result["value"].tolist() == [1, value]
+
+
+def test_cast_refuses_integer_overflow():
+    with pytest.raises(OverflowError):
+        _cast(pd.Series([300]), "int8")
+
+
+def test_declared_integer_with_nulls_becomes_nullable():
+    df = pd.DataFrame({"value": [1.0, None, 5.0]})
+    result = compact_dtypes(df, {"value": "int8"})
+    assert result["value"].dtype == pd.Int8Dtype()
+    assert result["value"].isna().tolist() == [False, True, False]
+
+
+def test_repeated_strings_become_categoricals():
+    df = pd.DataFrame({"region": ["North", "South", "North", "South"]})
+    result = compact_dtypes(df)
+    assert isinstance(result["region"].dtype, pd.CategoricalDtype)
+    assert result["region"].tolist() == df["region"].tolist()
+
+
+def test_unique_or_high_cardinality_strings_use_the_string_dtype():
+    unique = pd.DataFrame({"seller": ["a", "b", "c"]})
+    assert compact_dtypes(unique)["seller"].dtype == pd.api.types.pandas_dtype(STRING_DTYPE)
+
+    many = [f"v{i % (CATEGORY_MAX_UNIQUE + 1)}" for i in range(4 * (CATEGORY_MAX_UNIQUE + 1))]
+    assert compact_dtypes(pd.DataFrame({"v": many}))["v"].dtype == pd.api.types.pandas_dtype(STRING_DTYPE)
+
+
+def test_declared_category_is_applied_to_a_single_row():
+    df = pd.DataFrame({"customer_region": ["North"]})
+    assert isinstance(compact_dtypes(df, {"customer_region": "category"})["customer_region"].dtype, pd.CategoricalDtype)
+
+
+def test_categoricals_drop_unused_categories():
+    region = pd.Categorical(["North"], categories=["North", "South"])
+    result = compact_dtypes(pd.DataFrame({"region": region}))
+    assert list(result["region"].cat.categories) == ["North"]
+
+
+def test_floats_and_bools_are_left_alone():
+    df = pd.DataFrame({"amount": [1.25, 2.5], "flag": [True, False]})
+    result = compact_dtypes(df)
+    assert result["amount"].dtype == np.dtype("float64")
+    assert result["flag"].dtype == np.dtype("bool")
+
+
+def test_input_frame_is_not_modified():
+    df = pd.DataFrame({"orders": np.array([1, 2], dtype="int64")})
+    compact_dtypes(df, {"orders": "int8"})
+    assert df["orders"].dtype == np.dtype("int64")
@@ -0,0 +1,59 @@
+import pandas as pd
+import pytest
+
+from utils import serving_extracts
+
+FILTERS = {"year_filter": ["All Years", "2017"], "region_filter": ["All Regions", "North"]}
+
+
+@pytest.fixture
+def extracts(tmp_path, monkeypatch):
+    monkeypatch.setattr(serving_extracts, "SERVING_EXTRACTS_ENABLED", True)
+    monkeypatch.setattr(serving_extracts, "SERVING_EXTRACTS_DIR", tmp_path)
+    monkeypatch.setattr(serving_extracts, "_extract_state",
+                        {"pointer_mtime": None, "version": None, "manifest": {}, "frames": {}})
+    frame = pd.DataFrame({
+        "seller": ["a", "b", "c", "d"],
+        "revenue": [4.0, 3.0, 2.0, 1.0],
+        "year_filter": ["All Years", "All Years", "2017", "2017"],
+        "region_filter": ["All Regions", "All Regions", "North", "North"],
+    })
+    serving_extracts.write_extract_set("v1", {"get_top_sellers": frame}, FILTERS)
+    return tmp_path
+
+
+def test_read_extract_filters_rows_and_drops_filter_columns(extracts):
+    df = serving_extracts.read_extract("get_top_sellers", {"year_filter": "2017", "region_filter": "North"})
+    assert df["seller"].tolist() == ["c", "d"]
+    assert list(df.columns) == ["seller", "revenue"]
+
+
+def test_missing_filter_reads_the_all_option(extracts):
+    df = serving_extracts.read_extract("get_top_sellers", {"year_filter": None, "region_filter": None})
+    assert df["seller"].tolist() == ["a", "b"]
+
+
+def test_limit_is_reapplied_and_larger_limits_fall_through(extracts):
+    df = serving_extracts.read_extract("get_top_sellers", {"year_filter": None, "region_filter": None, "limit": 1})
+    assert df["seller"].tolist() == ["a"]
+    too_large = {"year_filter": None, "region_filter": None, "limit": serving_extracts.EXTRACT_LIMIT + 1}
+    assert serving_extracts.read_extract("get_top_sellers", too_large) is None
+
+
+def test_uncovered_calls_fall_through(extracts):
+    assert serving_extracts.read_extract("get_top_sellers", {"year_filter": "2016", "region_filter": None}) is None
+    assert serving_extracts.read_extract("get_sales_by_state", {}) is None
+
+
+def test_disabled_extracts_are_never_read(extracts, monkeypatch):
+    monkeypatch.setattr(serving_extracts, "SERVING_EXTRACTS_ENABLED", False)
+    assert serving_extracts.read_extract("get_top_sellers", {"year_filter": None, "region_filter": None}) is None
+
+
+def test_new_set_replaces_the_current_one(extracts):
+    frame = pd.DataFrame({"seller": ["z"], "revenue": [9.0], "year_filter": ["All Years"],
+                          "region_filter": ["All Regions"]})
+    serving_extracts.write_extract_set("v2", {"get_top_sellers": frame}, FILTERS)
+    assert serving_extracts.current_extract_version() == "v2"
+    df = serving_extracts.read_extract("get_top_sellers", {"year_filter": None, "region_filter": None})
+    assert df["seller"].tolist() == ["z"]
@@ -4,14 +4,32 @@ Handles authentication, connection management, and query execution
 """
 
 import streamlit as st
+from google.api_core import exceptions as api_exceptions
 from google.cloud import bigquery
 from google.oauth2 import service_account
 import pandas as pd
+import pyarrow as pa
 import logging
-from typing import Optional, Dict, Any
+import hashlib
+import random
+import tempfile
+import threading
+import time
+from collections import OrderedDict
+from concurrent.futures import Future, ThreadPoolExecutor
+from typing import Optional, Dict, Any, Callable, List, Tuple, TypeVar, Union
 import os
 from pathlib import Path
 from dotenv import load_dotenv
+from streamlit.runtime.scriptrunner import add_script_run_ctx, get_script_run_ctx
+from .query_backends import QueryBackend, BigQueryBackend, DuckDBBackend
+from .query_templates import ParameterizedQuery, as_parameterized, bind_query
+from .query_telemetry import QueryStats, calling_function, job_latency_percentile, record_query
+
+try:
+    from google.cloud import bigquery_storage
+except ImportError:  # Optional: results are downloaded over the REST API instead
+    bigquery_storage = None
 
 # Configure logging
 logging.basicConfig(level=logging.INFO)
@@ -29,6 +47,9 @@ for p in env_candidates:
 else:
     logger.warning("No .env file found; relying on existing environment variables")
 
+# Reads its settings at import time, so it is imported once .env is loaded
+from .serving_extracts import current_extract_version
+
 PROJECT_ID = os.getenv("PROJECT_ID")  # or your project var
 # --- Resolve marts dataset name robustly ---
 RAW_NAME = os.getenv("MARTS_DATASET_NAME", "").strip()
@@ -46,6 +67,114 @@ except EnvironmentError as e:
     logger.error(str(e))
     raise
 
+# Upper bound on BigQuery jobs submitted at once by a single fan-out call
+MAX_CONCURRENT_QUERIES = int(os.getenv("MAX_CONCURRENT_QUERIES", "8"))
+
+# How often (in seconds) the marts' last-modified time is re-checked per process
+MARTS_VERSION_POLL_SECONDS = int(os.getenv("MARTS_VERSION_POLL_SECONDS", "300"))
+
+_marts_version_lock = threading.Lock()
+_marts_version_state: Dict[str, Any] = {"version": None, "checked_at": 0.0}
+_aggregate_tables_state: Dict[str, Any] = {"version": None, "tables": {}}
+
+# On-disk result cache shared by every Streamlit process on this host
+DISK_CACHE_ENABLED = os.getenv("DISK_CACHE_ENABLED", "true").lower() in ("1", "true", "yes")
+RESULT_CACHE_DIR = Path(os.getenv("RESULT_CACHE_DIR", str(Path(__file__).resolve().parents[1] / ".cache" / "query_results")))
+RESULT_CACHE_MAX_BYTES = int(os.getenv("RESULT_CACHE_MAX_BYTES", str(512 * 1024 * 1024)))
+
+# Fetch results as Arrow record batches and convert them to pandas without per-row Python objects
+USE_ARROW_FETCH = os.getenv("USE_ARROW_FETCH", "true").lower() in ("1", "true", "yes")
+
+# Results with fewer rows than this are downloaded over REST; opening a Storage Read API
+# session costs more than it saves for small aggregates
+STORAGE_API_MIN_ROWS = int(os.getenv("STORAGE_API_MIN_ROWS", "10000"))
+
+# Engine that runs the dashboard's SQL: "bigquery" (default) or "duckdb" over local Parquet replicas
+QUERY_BACKEND = os.getenv("QUERY_BACKEND", "bigquery").strip().lower()
+DUCKDB_PARQUET_DIR = os.getenv("DUCKDB_PARQUET_DIR", str(Path(__file__).resolve().parents[1] / ".cache" / "marts_parquet"))
+DUCKDB_THREADS = int(os.getenv("DUCKDB_THREADS", "0"))
+
+# Materialize the fact rows of a year/region selection once (as an expiring table in a
+# scratch dataset, or a DuckDB table) and run that selection's queries against the slice
+# instead of fact_sales
+FILTER_SLICE_ENABLED = os.getenv("FILTER_SLICE_ENABLED", "false").lower() in ("1", "true", "yes")
+FILTER_SLICE_MAX_ENTRIES = int(os.getenv("FILTER_SLICE_MAX_ENTRIES", "4"))
+FACT_SLICE_DATASET = os.getenv("FACT_SLICE_DATASET", "olist_scratch")
+FACT_SLICE_EXPIRATION_HOURS = int(os.getenv("FACT_SLICE_EXPIRATION_HOURS", "6"))
+
+FACT_SALES_TABLE = "`olist_marts.fact_sales`"
+FACT_SLICE_PREFIX = "fact_slice_"
+
+# Slices are rebuilt after half their lifetime, so no query reads one about to expire
+_FACT_SLICE_REUSE_SECONDS = FACT_SLICE_EXPIRATION_HOURS * 3600 / 2
+
+# Slice table futures by selection, with their creation times; a future is resolved by
+# the caller that builds the slice and awaited by callers needing it meanwhile
+_fact_slices: "OrderedDict[Tuple, Tuple[Future, float]]" = OrderedDict()
+_fact_slice_lock = threading.Lock()
+
+# Whether FACT_SLICE_DATASET exists (None until checked); slicing is disabled if it cannot be created
+_fact_slice_dataset_state: Dict[str, Optional[bool]] = {"ready": None}
+_fact_slice_dataset_lock = threading.Lock()
+
+# Dry-run warehouse queries before running them, to record their estimated bytes and
+# refuse those over budget without billing anything
+DRY_RUN_ENABLED = os.getenv("DRY_RUN_ENABLED", "false").lower() in ("1", "true", "yes")
+
+# maximum_bytes_billed for every query (0 = unlimited), overridden per call site by
+# QUERY_BYTES_BUDGETS, e.g. "get_sales_by_state=2000000000,get_sample_data=100000000"
+MAX_BYTES_BILLED = int(os.getenv("MAX_BYTES_BILLED", "0"))
+QUERY_BYTES_BUDGETS: Dict[str, int] = {
+    caller.strip(): int(budget)
+    for caller, budget in (
+        item.split("=", 1) for item in os.getenv("QUERY_BYTES_BUDGETS", "").split(",") if "=" in item
+    )
+}
+
+# Transient failures are retried with exponential backoff and full jitter: attempt n
+# waits a random time up to QUERY_RETRY_BACKOFF_SECONDS * 2**(n-1)
+QUERY_RETRY_ATTEMPTS = int(os.getenv("QUERY_RETRY_ATTEMPTS", "3"))
+QUERY_RETRY_BACKOFF_SECONDS = float(os.getenv("QUERY_RETRY_BACKOFF_SECONDS", "0.5"))
+
+# Seconds a query call may take in total, retries included, before its job is cancelled (0 = no limit)
+QUERY_DEADLINE_SECONDS = float(os.getenv("QUERY_DEADLINE_SECONDS", "120"))
+
+# Submit a second copy of a BigQuery job still running past its template's p95 job time;
+# the first to finish wins and the other is cancelled (the copy may be billed too)
+HEDGE_ENABLED = os.getenv("HEDGE_ENABLED", "false").lower() in ("1", "true", "yes")
+HEDGE_QUANTILE = float(os.getenv("HEDGE_QUANTILE", "0.95"))
+HEDGE_MIN_SAMPLES = int(os.getenv("HEDGE_MIN_SAMPLES", "20"))
+
+_RETRYABLE_ERRORS = (
+    api_exceptions.TooManyRequests,
+    api_exceptions.InternalServerError,
+    api_exceptions.BadGateway,
+    api_exceptions.ServiceUnavailable,
+    api_exceptions.GatewayTimeout,
+    ConnectionError,
+)
+_RETRYABLE_REASONS = ("rateLimitExceeded", "backendError", "internalError", "jobBackendError")
+
+T = TypeVar("T")
+
+# Dry-run estimates by (marts version, query fingerprint)
+_dry_run_estimates: Dict[Tuple[Optional[str], str], int] = {}
+_dry_run_lock = threading.Lock()
+
+# Identical queries already running in this process; later callers wait for the same result
+_inflight_queries: Dict[Tuple, Future] = {}
+_inflight_lock = threading.Lock()
+
+# Temp files older than this are leftovers from writers that died mid-write
+_STALE_TEMP_SECONDS = 3600
+
+def _service_account_credentials(service_account_info) -> service_account.Credentials:
+    """Create service account credentials scoped for BigQuery and the Storage Read API"""
+    return service_account.Credentials.from_service_account_info(
+        service_account_info,
+        scopes=["https://www.googleapis.com/auth/cloud-platform"]
+    )
+
 @st.cache_resource
 def init_connection() -> bigquery.Client:
     """
@@ -60,12 +189,7 @@ def init_connection() -> bigquery.Client:
     try:
         # Get service account credentials from Streamlit secrets
         service_account_info = st.secrets["gcp_service_account"]
-        
-        # Create credentials object
-        credentials = service_account.Credentials.from_service_account_info(
-            service_account_info,
-            scopes=["https://www.googleapis.com/auth/cloud-platform"]
-        )
+        credentials = _service_account_credentials(service_account_info)
         
         # Create BigQuery client
         client = bigquery.Client(
@@ -88,43 +212,841 @@ def init_connection() -> bigquery.Client:
         st.error(error_msg)
         raise Exception(error_msg)
 
-def execute_query(query: str, client: Optional[bigquery.Client] = None) -> pd.DataFrame:
+@st.cache_resource
+def init_storage_client() -> Optional["bigquery_storage.BigQueryReadClient"]:
     """
-    Execute a BigQuery SQL query and return results as pandas DataFrame
+    Initialize and cache a BigQuery Storage Read API client
+    
+    Returns:
+        bigquery_storage.BigQueryReadClient: Authenticated read client, or None if
+            google-cloud-bigquery-storage is not installed or the client cannot be created
+    """
+    if bigquery_storage is None:
+        logger.info("google-cloud-bigquery-storage not installed; results will be downloaded over REST")
+        return None
+    
+    try:
+        credentials = _service_account_credentials(st.secrets["gcp_service_account"])
+        client = bigquery_storage.BigQueryReadClient(credentials=credentials)
+        logger.info("BigQuery Storage Read API client initialized successfully")
+        return client
+        
+    except Exception as e:
+        logger.warning(f"Failed to initialize BigQuery Storage Read API client, using REST: {str(e)}")
+        return None
+
+def _arrow_types_mapper(arrow_type: pa.DataType):
+    """Map Arrow types to the nullable pandas dtypes that to_dataframe() produces"""
+    if pa.types.is_integer(arrow_type):
+        return pd.Int64Dtype()
+    if pa.types.is_boolean(arrow_type):
+        return pd.BooleanDtype()
+    return None
+
+def arrow_to_dataframe(table: pa.Table) -> pd.DataFrame:
+    """
+    Convert an Arrow table to a pandas DataFrame
+    
+    Columns are converted block by block and the Arrow buffers are released as they are
+    consumed, so peak memory stays close to the size of the resulting DataFrame.
+    The table must not be used after this call.
     
     Args:
-        query (str): SQL query to execute
-        client (bigquery.Client, optional): BigQuery client. If None, will initialize new one.
+        table (pa.Table): Query results as Arrow
         
     Returns:
         pd.DataFrame: Query results
+    """
+    return table.to_pandas(
+        split_blocks=True,
+        self_destruct=True,
+        types_mapper=_arrow_types_mapper
+    )
+
+def _result_cache_path(query: Union[str, ParameterizedQuery], marts_version: str) -> Path:
+    """Get the cache file path for a query and its parameters at a given marts version"""
+    fingerprint = as_parameterized(query).fingerprint
+    digest = hashlib.sha256(f"{marts_version}\n{fingerprint}".encode("utf-8")).hexdigest()
+    return RESULT_CACHE_DIR / f"{digest}.parquet"
+
+def read_cached_result(query: Union[str, ParameterizedQuery], marts_version: str) -> Optional[pd.DataFrame]:
+    """
+    Read a query result from the on-disk result cache
+    
+    Args:
+        query (str | ParameterizedQuery): SQL query, optionally with parameters
+        marts_version (str): Marts version the result must belong to
+        
+    Returns:
+        pd.DataFrame: Cached results, or None on a cache miss
+    """
+    path = _result_cache_path(query, marts_version)
+    try:
+        df = pd.read_parquet(path)
+    except FileNotFoundError:
+        return None
+    except Exception as e:
+        logger.warning(f"Discarding unreadable cache file {path.name}: {str(e)}")
+        path.unlink(missing_ok=True)
+        return None
+    
+    # Touch the file so eviction treats it as recently used
+    try:
+        os.utime(path)
+    except OSError:
+        pass
+    return df
+
+def write_cached_result(query: Union[str, ParameterizedQuery], marts_version: str, df: pd.DataFrame) -> None:
+    """
+    Store a query result in the on-disk result cache
+    
+    The file is written under a temporary name and renamed into place, so processes
+    sharing the cache directory never read a partially written file.
+    
+    Args:
+        query (str | ParameterizedQuery): SQL query, optionally with parameters
+        marts_version (str): Marts version the result belongs to
+        df (pd.DataFrame): Query results
+    """
+    path = _result_cache_path(query, marts_version)
+    tmp_path = None
+    try:
+        RESULT_CACHE_DIR.mkdir(parents=True, exist_ok=True)
+        fd, tmp_path = tempfile.mkstemp(dir=RESULT_CACHE_DIR, prefix=f".{path.stem}.", suffix=".tmp")
+        os.close(fd)
+        df.to_parquet(tmp_path, index=False)
+        os.replace(tmp_path, path)
+    except Exception as e:
+        logger.warning(f"Failed to write query result to disk cache: {str(e)}")
+        if tmp_path:
+            Path(tmp_path).unlink(missing_ok=True)
+        return
+    
+    _evict_result_cache()
+
+def _evict_result_cache() -> None:
+    """Delete least recently used cache files until the cache fits RESULT_CACHE_MAX_BYTES"""
+    now = time.time()
+    entries = []
+    for path in RESULT_CACHE_DIR.iterdir():
+        try:
+            stat = path.stat()
+        except FileNotFoundError:
+            continue  # Removed by another process
+        if path.suffix == ".tmp":
+            if now - stat.st_mtime > _STALE_TEMP_SECONDS:
+                path.unlink(missing_ok=True)
+            continue
+        if path.suffix == ".parquet":
+            entries.append((stat.st_mtime, stat.st_size, path))
+    
+    total_bytes = sum(size for _, size, _ in entries)
+    for _, size, path in sorted(entries):
+        if total_bytes <= RESULT_CACHE_MAX_BYTES:
+            break
+        path.unlink(missing_ok=True)
+        total_bytes -= size
+
+def clear_disk_cache() -> None:
+    """Delete every file in the on-disk result cache"""
+    if not RESULT_CACHE_DIR.exists():
+        return
+    for path in RESULT_CACHE_DIR.iterdir():
+        if path.suffix in (".parquet", ".tmp"):
+            path.unlink(missing_ok=True)
+
+@st.cache_resource
+def get_backend() -> QueryBackend:
+    """
+    Initialize and cache the query backend selected by QUERY_BACKEND
+    
+    Returns:
+        QueryBackend: BigQuery backend using the cached client, or a DuckDB backend
+            reading the Parquet replicas in DUCKDB_PARQUET_DIR
+        
+    Raises:
+        Exception: If the backend is unknown or cannot be created
+    """
+    if QUERY_BACKEND == "bigquery":
+        return BigQueryBackend(init_connection(), init_storage_client, STORAGE_API_MIN_ROWS)
+    
+    if QUERY_BACKEND == "duckdb":
+        try:
+            backend = DuckDBBackend(DUCKDB_PARQUET_DIR, threads=DUCKDB_THREADS or None)
+            logger.info(f"DuckDB backend initialized over {DUCKDB_PARQUET_DIR}")
+            return backend
+        except Exception as e:
+            error_msg = f"Failed to initialize DuckDB backend: {str(e)}"
+            logger.error(error_msg)
+            st.error(error_msg)
+            raise Exception(error_msg)
+    
+    raise Exception(f"Unknown QUERY_BACKEND '{QUERY_BACKEND}' (expected 'bigquery' or 'duckdb')")
+
+def _resolve_backend(client: Optional[bigquery.Client]) -> QueryBackend:
+    """Use an explicitly passed BigQuery client, otherwise the configured backend"""
+    if client is not None:
+        return BigQueryBackend(client, init_storage_client, STORAGE_API_MIN_ROWS)
+    return get_backend()
+
+def _new_query_stats(query: ParameterizedQuery) -> QueryStats:
+    """Start a telemetry record for a query issued by the current caller"""
+    return QueryStats(
+        caller=calling_function(),
+        template_id=query.template_id,
+        fingerprint=query.short_fingerprint
+    )
+
+class QueryBudgetExceeded(Exception):
+    """A query would bill, or billed, more bytes than its call site's budget"""
+
+def bytes_budget(caller: str) -> Optional[int]:
+    """
+    Get the maximum_bytes_billed for queries issued by a function
+    
+    Args:
+        caller (str): Calling function, e.g. "get_sales_by_state"
+        
+    Returns:
+        int: Byte budget from QUERY_BYTES_BUDGETS or MAX_BYTES_BILLED, or None if unlimited
+    """
+    return QUERY_BYTES_BUDGETS.get(caller, MAX_BYTES_BILLED) or None
+
+def estimate_query_bytes(query: Union[str, ParameterizedQuery], backend: Optional[QueryBackend] = None) -> Optional[int]:
+    """
+    Estimate the bytes a query processes with a dry run, remembered per marts version
+    
+    Args:
+        query (str | ParameterizedQuery): SQL query, optionally with parameters
+        backend (QueryBackend, optional): Backend to ask; defaults to the configured one
+        
+    Returns:
+        int: Estimated bytes processed, or None if the backend cannot estimate
+    """
+    query = as_parameterized(query)
+    # Read without get_marts_version(): its own lookup query goes through here
+    key = (_marts_version_state["version"], query.fingerprint)
+    with _dry_run_lock:
+        if key in _dry_run_estimates:
+            return _dry_run_estimates[key]
+    
+    estimate = (backend or get_backend()).dry_run(query.sql, query.params)
+    if estimate is not None:
+        with _dry_run_lock:
+            _dry_run_estimates[key] = estimate
+    return estimate
+
+def get_dry_run_estimates() -> pd.DataFrame:
+    """
+    Get the recorded dry-run estimates
+    
+    Returns:
+        pd.DataFrame: marts_version, fingerprint and estimated_bytes per estimated query
+    """
+    with _dry_run_lock:
+        rows = [
+            {"marts_version": version, "fingerprint": fingerprint[:12], "estimated_bytes": estimate}
+            for (version, fingerprint), estimate in _dry_run_estimates.items()
+        ]
+    return pd.DataFrame(rows, columns=["marts_version", "fingerprint", "estimated_bytes"])
+
+def _apply_budget(queries: List[ParameterizedQuery], backend: QueryBackend, stats: QueryStats,
+                  max_bytes_billed: Optional[int]) -> Optional[int]:
+    """
+    Resolve the byte budget of a request and, with DRY_RUN_ENABLED, check its estimate against it
+    
+    Args:
+        queries (List[ParameterizedQuery]): Queries billed together (one, or a script's statements)
+        backend (QueryBackend): Backend that will run them
+        stats (QueryStats): Telemetry record of the request
+        max_bytes_billed (int, optional): Explicit budget overriding the caller's
+        
+    Returns:
+        int: maximum_bytes_billed to submit the request with, or None if unlimited
+        
+    Raises:
+        QueryBudgetExceeded: If the dry run estimates more bytes than the budget
+    """
+    budget = max_bytes_billed if max_bytes_billed is not None else bytes_budget(stats.caller)
+    stats.bytes_budget = budget
+    
+    if DRY_RUN_ENABLED:
+        try:
+            estimates = [estimate_query_bytes(query, backend) for query in queries]
+            if all(estimate is not None for estimate in estimates):
+                stats.estimated_bytes = sum(estimates)
+        except Exception as e:
+            logger.warning(f"Dry run for {stats.caller} failed: {str(e)}")
+        
+        if budget and stats.estimated_bytes is not None and stats.estimated_bytes > budget:
+            stats.over_budget = True
+            message = (f"Query {stats.template_id} [{stats.fingerprint}] from {stats.caller} would process "
+                       f"{stats.estimated_bytes:,} bytes, over its budget of {budget:,} bytes")
+            logger.warning(message)
+            raise QueryBudgetExceeded(message)
+    
+    return budget
+
+def _note_budget_error(error: Exception, stats: QueryStats) -> None:
+    """Flag a job that BigQuery stopped for exceeding maximum_bytes_billed"""
+    if "bytesBilledLimitExceeded" in str(error):
+        stats.over_budget = True
+        logger.warning(f"Query from {stats.caller} exceeded its budget of {stats.bytes_budget} bytes")
+
+def is_retryable(error: Exception) -> bool:
+    """
+    Check whether a failed query is worth submitting again
+    
+    Args:
+        error (Exception): Error raised by the backend
+        
+    Returns:
+        bool: True for rate limits, server errors and dropped connections; False for
+            query errors, budget violations and deadline timeouts
+    """
+    if isinstance(error, (QueryBudgetExceeded, TimeoutError)):
+        return False
+    return isinstance(error, _RETRYABLE_ERRORS) or any(reason in str(error) for reason in _RETRYABLE_REASONS)
+
+def _with_retries(call: Callable[[Optional[float]], T], stats: QueryStats,
+                  deadline_seconds: float = QUERY_DEADLINE_SECONDS) -> T:
+    """
+    Run a backend call, retrying transient failures until the call's deadline
+    
+    Args:
+        call (Callable): Runs the query once, given the seconds left before the deadline (None if unlimited)
+        stats (QueryStats): Telemetry record; its attempts count is updated
+        deadline_seconds (float): Total time allowed for all attempts (0 = no limit)
+        
+    Returns:
+        The call's result
+        
+    Raises:
+        Exception: The last error, once it is not retryable, attempts run out or the deadline passes
+    """
+    deadline = time.monotonic() + deadline_seconds if deadline_seconds else None
+    while True:
+        remaining = None if deadline is None else deadline - time.monotonic()
+        if remaining is not None and remaining <= 0:
+            raise TimeoutError(f"Query deadline of {deadline_seconds:.0f}s passed")
+        try:
+            return call(remaining)
+        except Exception as e:
+            if stats.attempts >= QUERY_RETRY_ATTEMPTS or not is_retryable(e):
+                raise
+            delay = random.uniform(0, QUERY_RETRY_BACKOFF_SECONDS * 2 ** (stats.attempts - 1))
+            if deadline is not None and time.monotonic() + delay >= deadline:
+                raise
+            logger.warning(f"Attempt {stats.attempts} of {stats.template_id} [{stats.fingerprint}] failed, "
+                           f"retrying in {delay:.2f}s: {str(e)}")
+            time.sleep(delay)
+            stats.attempts += 1
+
+def _hedge_after(query: ParameterizedQuery) -> Optional[float]:
+    """Seconds after which a running job of this query is hedged, or None to never hedge"""
+    if not HEDGE_ENABLED:
+        return None
+    p95_ms = job_latency_percentile(query.template_id, HEDGE_QUANTILE, HEDGE_MIN_SAMPLES)
+    return None if p95_ms is None else p95_ms / 1000
+
+def _fact_slice_query(year: Optional[int], region: Optional[str]) -> ParameterizedQuery:
+    """
+    Build the SELECT materializing the fact rows of a year/region selection
+    
+    Queries filter region on either the customer or the seller, so the slice keeps rows
+    matching either; every query still applies its own filters on top of the slice.
+    """
+    joins, conditions = [], []
+    if year is not None:
+        joins.append("JOIN `olist_marts.dim_date` d ON f.date_key = d.date_key")
+        conditions.append("d.year = @year")
+    if region is not None:
+        joins.append("LEFT JOIN `olist_marts.dim_customers` c ON f.customer_key = c.customer_key")
+        joins.append("LEFT JOIN `olist_marts.dim_sellers` s ON f.seller_key = s.seller_key")
+        conditions.append("(c.customer_region = @region OR s.seller_region = @region)")
+    
+    query = f"""
+    SELECT f.*
+    FROM {FACT_SALES_TABLE} f
+    {" ".join(joins)}
+    WHERE {" AND ".join(conditions)}
+    """
+    return bind_query("fact_slice", query, year=year, region=region)
+
+def get_fact_slice(backend: QueryBackend, year: Optional[int], region: Optional[str]) -> str:
+    """
+    Get the slice table holding the fact rows of a filter selection, creating it if needed
+    
+    Slices are keyed by marts version, year and region; the least recently used ones
+    beyond FILTER_SLICE_MAX_ENTRIES are dropped. Concurrent callers for a selection
+    being built wait for that build; callers for other selections are not held up.
+    
+    Args:
+        backend (QueryBackend): Backend the slice lives in
+        year (int, optional): Year parameter of the selection
+        region (str, optional): Region parameter of the selection
+        
+    Returns:
+        str: Slice table name, qualified with FACT_SLICE_DATASET
+        
+    Raises:
+        Exception: If the slice cannot be created
+    """
+    key = (get_marts_version(), year, region)
+    with _fact_slice_lock:
+        entry = _fact_slices.get(key)
+        is_builder = entry is None or time.monotonic() - entry[1] > _FACT_SLICE_REUSE_SECONDS
+        if is_builder:
+            slice_future = Future()
+            _fact_slices[key] = (slice_future, time.monotonic())
+        else:
+            slice_future = entry[0]
+        _fact_slices.move_to_end(key)
+    
+    if not is_builder:
+        return slice_future.result()
+    
+    table = f"{FACT_SLICE_DATASET}.{FACT_SLICE_PREFIX}" + hashlib.sha256(repr(key).encode("utf-8")).hexdigest()[:16]
+    try:
+        slice_query = _fact_slice_query(year, region)
+        start = time.perf_counter()
+        backend.create_fact_slice(table, slice_query.sql, slice_query.params, FACT_SLICE_EXPIRATION_HOURS)
+        logger.info(f"Created fact slice {table} for year={year} region={region} in {(time.perf_counter() - start) * 1000:.0f} ms")
+    except Exception as e:
+        # Forget the failed build so the next caller tries again
+        with _fact_slice_lock:
+            if _fact_slices.get(key, (None,))[0] is slice_future:
+                del _fact_slices[key]
+        slice_future.set_exception(e)
+        raise
+    slice_future.set_result(table)
+    
+    evicted = []
+    with _fact_slice_lock:
+        while len(_fact_slices) > FILTER_SLICE_MAX_ENTRIES:
+            _, (old_future, _) = _fact_slices.popitem(last=False)
+            evicted.append(old_future)
+    for old_future in evicted:
+        # Slices still being built are left to expire
+        if old_future.done() and old_future.exception() is None:
+            try:
+                backend.drop_fact_slice(old_future.result())
+            except Exception as e:
+                logger.warning(f"Failed to drop fact slice {old_future.result()}: {str(e)}")
+    return table
+
+def reset_fact_slices() -> None:
+    """Forget every fact slice, e.g. after one expired or was dropped by another process"""
+    with _fact_slice_lock:
+        _fact_slices.clear()
+
+def _is_missing_fact_slice(error: Exception) -> bool:
+    """Whether a query failed because the fact slice it read no longer exists"""
+    if isinstance(error, (QueryBudgetExceeded, TimeoutError)):
+        return False
+    message = str(error)
+    return FACT_SLICE_PREFIX in message and (
+        isinstance(error, api_exceptions.NotFound) or "Not found" in message or "does not exist" in message
+    )
+
+def _remaining_deadline(started: float) -> float:
+    """Seconds left of QUERY_DEADLINE_SECONDS for a call started at ``started`` (0 = no limit)"""
+    if not QUERY_DEADLINE_SECONDS:
+        return 0
+    # A tiny positive value rather than 0, which would lift the limit
+    return max(QUERY_DEADLINE_SECONDS - (time.monotonic() - started), 1e-3)
+
+def _fact_slice_dataset_ready(backend: QueryBackend) -> bool:
+    """Create FACT_SLICE_DATASET on first use; False (with one warning) if it cannot be created"""
+    if _fact_slice_dataset_state["ready"] is not None:
+        return _fact_slice_dataset_state["ready"]
+    with _fact_slice_dataset_lock:
+        if _fact_slice_dataset_state["ready"] is None:
+            try:
+                backend.ensure_scratch_dataset(FACT_SLICE_DATASET, "olist_marts", FACT_SLICE_EXPIRATION_HOURS)
+                _fact_slice_dataset_state["ready"] = True
+            except Exception as e:
+                logger.warning(f"Fact slices disabled: cannot create dataset {FACT_SLICE_DATASET}: {str(e)}")
+                _fact_slice_dataset_state["ready"] = False
+    return _fact_slice_dataset_state["ready"]
+
+def _with_fact_slice(query: ParameterizedQuery, backend: QueryBackend) -> ParameterizedQuery:
+    """Point a filtered fact_sales query at its selection's slice, or return it unchanged"""
+    year, region = query.params.get("year"), query.params.get("region")
+    if not FILTER_SLICE_ENABLED or FACT_SALES_TABLE not in query.sql or (year is None and region is None):
+        return query
+    if not _fact_slice_dataset_ready(backend):
+        return query
+    
+    try:
+        table = get_fact_slice(backend, year, region)
+    except Exception as e:
+        logger.warning(f"Failed to create fact slice, querying fact_sales: {str(e)}")
+        return query
+    
+    return ParameterizedQuery(
+        template_id=query.template_id,
+        sql=query.sql.replace(FACT_SALES_TABLE, f"`{table}`"),
+        params=query.params
+    )
+
+def execute_query_arrow(query: Union[str, ParameterizedQuery], client: Optional[bigquery.Client] = None,
+                        max_bytes_billed: Optional[int] = None) -> pa.Table:
+    """
+    Execute a BigQuery SQL query and return results as a pyarrow Table
+    
+    On BigQuery, large results are read through the Storage Read API when it is available;
+    small ones (fewer than STORAGE_API_MIN_ROWS rows) are downloaded over REST.
+    
+    Args:
+        query (str | ParameterizedQuery): SQL query to execute, optionally with parameters
+        client (bigquery.Client, optional): BigQuery client. If None, the configured backend is used.
+        max_bytes_billed (int, optional): Byte budget; defaults to the caller's (see bytes_budget)
+        
+    Returns:
+        pa.Table: Query results
         
     Raises:
         Exception: If query execution fails
     """
+    query = as_parameterized(query)
+    stats = _new_query_stats(query)
+    start = time.perf_counter()
     try:
-        # Initialize client if not provided
-        if client is None:
-            client = init_connection()
+        backend = _resolve_backend(client)
+        stats.backend = backend.name
+        
+        budget = _apply_budget([query], backend, stats, max_bytes_billed)
+        logger.info(f"Executing query {query.template_id} [{query.short_fingerprint}] on {backend.name}: {query.sql[:100]}...")
+        table = _with_retries(
+            lambda timeout: backend.run_arrow(query.sql, query.params, stats, budget, timeout, _hedge_after(query)),
+            stats
+        )
+        logger.info(f"Query executed successfully. Returned {table.num_rows} rows.")
+        stats.rows = table.num_rows
+        return table
+        
+    except Exception as e:
+        stats.error = str(e)
+        _note_budget_error(e, stats)
+        error_msg = f"Query execution failed: {str(e)}"
+        logger.error(error_msg)
+        st.error(error_msg)
+        raise Exception(error_msg)
+    
+    finally:
+        stats.total_ms = (time.perf_counter() - start) * 1000
+        record_query(stats)
+
+def execute_query(query: Union[str, ParameterizedQuery], client: Optional[bigquery.Client] = None, use_cache: bool = False,
+                  use_arrow: bool = USE_ARROW_FETCH, max_bytes_billed: Optional[int] = None) -> pd.DataFrame:
+    """
+    Execute a BigQuery SQL query and return results as pandas DataFrame
+    
+    Concurrent calls for the same query (same fingerprint and byte budget) in this process
+    share one job: the first call runs it and the others wait for it and get a copy of its result.
+    
+    Args:
+        query (str | ParameterizedQuery): SQL query to execute, optionally with parameters
+        client (bigquery.Client, optional): BigQuery client. If None, the configured backend is used.
+        use_cache (bool): Serve from and store in the on-disk result cache, keyed by the
+            query fingerprint (normalized SQL and parameters) and the marts version
+        use_arrow (bool): Download results as Arrow record batches (Storage Read API for
+            large results) instead of paging rows through the REST API
+        max_bytes_billed (int, optional): Byte budget; defaults to the caller's (see bytes_budget).
+            With DRY_RUN_ENABLED, queries estimated over budget are refused before they run
         
-        # Execute query
-        logger.info(f"Executing query: {query[:100]}...")
-        query_job = client.query(query)
+    Returns:
+        pd.DataFrame: Query results
+        
+    Raises:
+        Exception: If query execution fails or the query exceeds its byte budget
+    """
+    query = as_parameterized(query)
+    stats = _new_query_stats(query)
+    start = time.perf_counter()
+    
+    marts_version = None
+    if use_cache and DISK_CACHE_ENABLED:
+        marts_version = get_marts_version()
+        cached = read_cached_result(query, marts_version)
+        if cached is not None:
+            logger.info(f"Serving query {query.template_id} [{query.short_fingerprint}] from disk cache")
+            stats.source = "disk_cache"
+            stats.rows = len(cached)
+            stats.total_ms = (time.perf_counter() - start) * 1000
+            record_query(stats)
+            return cached
+    
+    # Single flight: if the same query is already running under the same byte budget, wait
+    # for its result instead of submitting another job. The budget is part of the key, so
+    # a caller is never handed a result its own budget would have refused, nor another
+    # caller's over-budget failure
+    budget_key = max_bytes_billed if max_bytes_billed is not None else bytes_budget(stats.caller)
+    flight_key = (query.fingerprint, use_arrow, id(client) if client is not None else None, budget_key)
+    with _inflight_lock:
+        flight = _inflight_queries.get(flight_key)
+        is_leader = flight is None
+        if is_leader:
+            flight = Future()
+            _inflight_queries[flight_key] = flight
+    
+    if not is_leader:
+        logger.info(f"Waiting for in-flight query {query.template_id} [{query.short_fingerprint}]")
+        stats.source = "single_flight"
+        try:
+            df = flight.result().copy()
+            stats.rows = len(df)
+            return df
+        except Exception as e:
+            stats.error = str(e)
+            st.error(str(e))
+            raise Exception(str(e))
+        finally:
+            stats.total_ms = (time.perf_counter() - start) * 1000
+            record_query(stats)
+    
+    def _run(backend: QueryBackend, run_query: ParameterizedQuery, budget: Optional[int],
+             timeout: Optional[float]) -> pd.DataFrame:
+        logger.info(f"Executing query {query.template_id} [{query.short_fingerprint}] on {backend.name}: {run_query.sql[:100]}...")
+        hedge_after = _hedge_after(query)
+        if use_arrow:
+            table = backend.run_arrow(run_query.sql, run_query.params, stats, budget, timeout, hedge_after)
+            conversion_start = time.perf_counter()
+            df = arrow_to_dataframe(table)
+            stats.conversion_ms = (time.perf_counter() - conversion_start) * 1000
+            return df
+        # to_dataframe() downloads and converts in one step, counted as fetch time
+        return backend.run_dataframe(run_query.sql, run_query.params, stats, budget, timeout, hedge_after)
+    
+    try:
+        # Use the configured backend unless a BigQuery client was provided
+        backend = _resolve_backend(client)
+        stats.backend = backend.name
         
-        # Wait for completion and get results
-        results = query_job.result()
+        # Estimated on the query as written, so estimates are comparable with or without slices
+        budget = _apply_budget([query], backend, stats, max_bytes_billed)
         
-        # Convert to pandas DataFrame
-        df = results.to_dataframe()
+        # Execute query, against the selection's fact slice when there is one
+        run_started = time.monotonic()
+        run_query = _with_fact_slice(query, backend) if client is None else query
+        try:
+            df = _with_retries(lambda timeout: _run(backend, run_query, budget, timeout), stats)
+        except Exception as e:
+            if run_query is query or not _is_missing_fact_slice(e):
+                raise
+            # The slice expired or was dropped: rerun on fact_sales within what is left of the deadline
+            logger.warning(f"Fact slice is gone, retrying on fact_sales: {str(e)}")
+            reset_fact_slices()
+            df = _with_retries(lambda timeout: _run(backend, query, budget, timeout), stats,
+                               _remaining_deadline(run_started))
         
         logger.info(f"Query executed successfully. Returned {len(df)} rows.")
+        stats.rows = len(df)
+        
+        if marts_version is not None:
+            write_cached_result(query, marts_version, df)
+        
+        # Waiting callers get their own copies of a snapshot the caller cannot mutate
+        flight.set_result(df.copy())
         return df
         
     except Exception as e:
+        stats.error = str(e)
+        _note_budget_error(e, stats)
         error_msg = f"Query execution failed: {str(e)}"
         logger.error(error_msg)
         st.error(error_msg)
+        if not flight.done():
+            flight.set_exception(Exception(error_msg))
         raise Exception(error_msg)
+    
+    finally:
+        with _inflight_lock:
+            _inflight_queries.pop(flight_key, None)
+        stats.total_ms = (time.perf_counter() - start) * 1000
+        record_query(stats)
+
+def execute_script(queries: Dict[str, Union[str, ParameterizedQuery]], use_cache: bool = False) -> Dict[str, pd.DataFrame]:
+    """
+    Execute several SELECT queries as one multi-statement request and return each one's results
+    
+    On BigQuery the queries run as a single script job, so they are queued and scheduled
+    once instead of once per query; other backends run them one after another. Each
+    result is cached on disk under its own query's fingerprint, exactly as if it had
+    been run through execute_query. Concurrent calls for the same set of queries (same
+    fingerprints and byte budget) share one script job, like execute_query's single flight.
+    
+    Args:
+        queries (Dict[str, str | ParameterizedQuery]): Mapping of result name to query;
+            queries sharing a parameter name must bind the same value to it
+        use_cache (bool): Serve from and store in the on-disk result cache
+        
+    Returns:
+        Dict[str, pd.DataFrame]: Mapping of result name to query results
+        
+    Raises:
+        Exception: If the script fails
+    """
+    queries = {name: as_parameterized(query) for name, query in queries.items()}
+    results: Dict[str, pd.DataFrame] = {}
+    
+    marts_version = None
+    if use_cache and DISK_CACHE_ENABLED:
+        marts_version = get_marts_version()
+        for name, query in queries.items():
+            cached = read_cached_result(query, marts_version)
+            if cached is not None:
+                results[name] = cached
+    
+    pending = {name: query for name, query in queries.items() if name not in results}
+    if not pending:
+        return results
+    
+    script = ParameterizedQuery(
+        template_id="+".join(query.template_id for query in pending.values()),
+        sql=";\n".join(query.sql for query in pending.values()),
+        params={name: value for query in pending.values() for name, value in query.params.items()}
+    )
+    stats = _new_query_stats(script)
+    start = time.perf_counter()
+    
+    # Single flight over the whole script, keyed by its queries' fingerprints and the budget
+    flight_key = ("script", tuple(query.fingerprint for query in pending.values()), bytes_budget(stats.caller))
+    with _inflight_lock:
+        flight = _inflight_queries.get(flight_key)
+        is_leader = flight is None
+        if is_leader:
+            flight = Future()
+            _inflight_queries[flight_key] = flight
+    
+    if not is_leader:
+        logger.info(f"Waiting for in-flight script {script.template_id} [{script.short_fingerprint}]")
+        stats.source = "single_flight"
+        try:
+            shared = flight.result()
+            for name, query in pending.items():
+                results[name] = shared[query.fingerprint].copy()
+            stats.rows = sum(len(results[name]) for name in pending)
+            return results
+        except Exception as e:
+            stats.error = str(e)
+            st.error(str(e))
+            raise Exception(str(e))
+        finally:
+            stats.total_ms = (time.perf_counter() - start) * 1000
+            record_query(stats)
+    
+    try:
+        backend = get_backend()
+        stats.backend = backend.name
+        
+        # The script is billed as one job against the caller's budget
+        budget = _apply_budget(list(pending.values()), backend, stats, None)
+        
+        logger.info(f"Executing script {script.template_id} [{script.short_fingerprint}] on {backend.name}")
+        run_started = time.monotonic()
+        run_queries = [_with_fact_slice(query, backend) for query in pending.values()]
+        try:
+            tables = _with_retries(
+                lambda timeout: backend.run_script([(query.sql, query.params) for query in run_queries], stats, budget, timeout),
+                stats
+            )
+        except Exception as e:
+            if all(run is query for run, query in zip(run_queries, pending.values())) or not _is_missing_fact_slice(e):
+                raise
+            logger.warning(f"Fact slice is gone, retrying script on fact_sales: {str(e)}")
+            reset_fact_slices()
+            tables = _with_retries(
+                lambda timeout: backend.run_script([(query.sql, query.params) for query in pending.values()], stats, budget, timeout),
+                stats, _remaining_deadline(run_started)
+            )
+        
+        conversion_start = time.perf_counter()
+        for (name, query), table in zip(pending.items(), tables):
+            df = arrow_to_dataframe(table)
+            results[name] = df
+            if marts_version is not None:
+                write_cached_result(query, marts_version, df)
+        stats.conversion_ms = (time.perf_counter() - conversion_start) * 1000
+        stats.rows = sum(len(results[name]) for name in pending)
+        
+        logger.info(f"Script executed successfully. Returned {len(pending)} result sets.")
+        # Waiting callers get their own copies of a snapshot the caller cannot mutate
+        flight.set_result({query.fingerprint: results[name].copy() for name, query in pending.items()})
+        return results
+        
+    except Exception as e:
+        stats.error = str(e)
+        _note_budget_error(e, stats)
+        error_msg = f"Script execution failed: {str(e)}"
+        logger.error(error_msg)
+        st.error(error_msg)
+        if not flight.done():
+            flight.set_exception(Exception(error_msg))
+        raise Exception(error_msg)
+    
+    finally:
+        with _inflight_lock:
+            _inflight_queries.pop(flight_key, None)
+        stats.total_ms = (time.perf_counter() - start) * 1000
+        record_query(stats)
+
+def fetch_concurrently(calls: Dict[str, Callable[[], Any]]) -> Dict[str, Any]:
+    """
+    Run a set of independent data-loading callables concurrently and gather their results
+    
+    Each callable typically wraps one cached ``data_queries.get_*`` call, so a tab that
+    needs several result sets waits for the slowest query instead of the sum of all of them.
+    The Streamlit script context is attached to the worker threads so caching and
+    ``st.*`` messages keep working inside the callables.
+    
+    Args:
+        calls (Dict[str, Callable]): Mapping of result name to zero-argument callable
+        
+    Returns:
+        Dict[str, Any]: Mapping of result name to the callable's return value
+        
+    Raises:
+        Exception: Re-raises the first exception raised by any callable
+    """
+    if not calls:
+        return {}
+    
+    # Make sure the cached backend exists before the workers race to create it
+    get_backend()
+    
+    ctx = get_script_run_ctx()
+    
+    def _run(func: Callable[[], Any]) -> Any:
+        if ctx is not None:
+            add_script_run_ctx(threading.current_thread(), ctx)
+        return func()
+    
+    max_workers = min(len(calls), MAX_CONCURRENT_QUERIES)
+    with ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="bq-query") as pool:
+        futures = {name: pool.submit(_run, func) for name, func in calls.items()}
+        return {name: future.result() for name, future in futures.items()}
+
+def execute_queries(queries: Dict[str, str], client: Optional[bigquery.Client] = None) -> Dict[str, pd.DataFrame]:
+    """
+    Execute several BigQuery SQL queries concurrently and return their results
+    
+    Args:
+        queries (Dict[str, str]): Mapping of result name to SQL query
+        client (bigquery.Client, optional): BigQuery client. If None, the configured backend is used.
+        
+    Returns:
+        Dict[str, pd.DataFrame]: Mapping of result name to query results
+        
+    Raises:
+        Exception: If any of the queries fails
+    """
+    return fetch_concurrently({
+        name: (lambda query=query: execute_query(query))
+        for name, query in queries.items()
+    })
 
 def test_connection() -> bool:
     """
@@ -134,8 +1056,6 @@ def test_connection() -> bool:
         bool: True if connection successful, False otherwise
     """
     try:
-        client = init_connection()
-        
         # Simple test query
         test_query = f"""
         SELECT 
@@ -144,7 +1064,7 @@ def test_connection() -> bool:
         WHERE table_id LIKE 'dim_%' OR table_id LIKE 'fact_%'
         """
         
-        result = execute_query(test_query, client)
+        result = execute_query(test_query)
         
         if len(result) > 0 and result.iloc[0]['table_count'] > 0:
             st.success("✅ BigQuery connection successful! Found marts tables.")
@@ -157,6 +1077,102 @@ def test_connection() -> bool:
         st.error(f"❌ BigQuery connection failed: {str(e)}")
         return False
 
+def get_marts_version(force_refresh: bool = False) -> str:
+    """
+    Get a version token for the marts tables based on their last modification time
+    
+    The token is read from ``__TABLES__`` (a metadata-only query) at most once per
+    MARTS_VERSION_POLL_SECONDS in each process and reused in between. It changes only
+    when a dim_*, fact_* or agg_* table is rebuilt, so it can be part of a result cache key.
+    When SERVING_EXTRACTS_ENABLED is set, the version of the current extract set is
+    returned instead and the warehouse is not contacted.
+    
+    Args:
+        force_refresh (bool): Re-check the tables even if the poll interval has not elapsed
+        
+    Returns:
+        str: Latest last_modified_time (epoch millis) of the marts tables, or a token
+            that rolls over every poll interval if the lookup fails
+    """
+    extract_version = current_extract_version()
+    if extract_version is not None:
+        return extract_version
+    
+    with _marts_version_lock:
+        now = time.time()
+        state = _marts_version_state
+        if (not force_refresh and state["version"] is not None
+                and now - state["checked_at"] < MARTS_VERSION_POLL_SECONDS):
+            return state["version"]
+        
+        try:
+            query = f"""
+            SELECT MAX(last_modified_time) as last_modified_time
+            FROM `{PROJECT_ID}.{marts_dataset}.__TABLES__`
+            WHERE table_id LIKE 'dim_%' OR table_id LIKE 'fact_%' OR table_id LIKE 'agg_%'
+            """
+            
+            result = execute_query(query)
+            last_modified = result.iloc[0]['last_modified_time'] if len(result) > 0 else None
+            version = str(int(last_modified)) if pd.notna(last_modified) else "empty"
+            
+        except Exception as e:
+            # Fall back to time-based expiry so results are still refreshed eventually
+            logger.warning(f"Failed to read marts version, falling back to poll interval: {str(e)}")
+            version = f"poll-{int(now // MARTS_VERSION_POLL_SECONDS)}"
+        
+        if version != state["version"]:
+            logger.info(f"Marts version is now {version}")
+        state["version"] = version
+        state["checked_at"] = now
+        return version
+
+def get_marts_last_modified() -> Optional[pd.Timestamp]:
+    """
+    Get the last modification time of the marts tables
+    
+    Returns:
+        pd.Timestamp: UTC timestamp of the most recently rebuilt marts table, or None if unknown
+    """
+    version = get_marts_version()
+    if not version.isdigit():
+        return None
+    return pd.to_datetime(int(version), unit="ms", utc=True)
+
+def get_aggregate_tables() -> Dict[str, int]:
+    """
+    Get the pre-aggregated marts tables (agg_*) that currently exist
+    
+    The lookup is a metadata-only ``__TABLES__`` query, repeated only when the marts
+    version changes.
+    
+    Returns:
+        Dict[str, int]: Table name to size in bytes; empty if the lookup fails
+    """
+    version = get_marts_version()
+    with _marts_version_lock:
+        if _aggregate_tables_state["version"] == version:
+            return _aggregate_tables_state["tables"]
+    
+    try:
+        query = f"""
+        SELECT table_id, size_bytes
+        FROM `{PROJECT_ID}.{marts_dataset}.__TABLES__`
+        WHERE table_id LIKE 'agg_%'
+        """
+        
+        result = execute_query(query)
+        tables = {row.table_id: int(row.size_bytes) for row in result.itertuples(index=False)}
+        
+    except Exception as e:
+        logger.warning(f"Failed to list aggregate tables: {str(e)}")
+        return {}
+    
+    with _marts_version_lock:
+        _aggregate_tables_state["version"] = version
+        _aggregate_tables_state["tables"] = tables
+    return tables
+
 def get_table_info(dataset_id: str = f"{marts_dataset}") -> pd.DataFrame:
     """
     Get information about tables in the specified dataset
@@ -168,8 +1184,6 @@ def get_table_info(dataset_id: str = f"{marts_dataset}") -> pd.DataFrame:
         pd.DataFrame: Table information including name, row count, and size
     """
     try:
-        client = init_connection()
-        
         query = f"""
         SELECT 
             table_id,
@@ -181,7 +1195,7 @@ def get_table_info(dataset_id: str = f"{marts_dataset}") -> pd.DataFrame:
         ORDER BY table_id
         """
         
-        return execute_query(query, client)
+        return execute_query(query)
         
     except Exception as e:
         logger.error(f"Failed to get table info: {str(e)}")
@@ -199,15 +1213,13 @@ def get_sample_data(table_name: str, limit: int = 5) -> pd.DataFrame:
         pd.DataFrame: Sample data from the table
     """
     try:
-        client = init_connection()
-        
         query = f"""
         SELECT *
         FROM `{PROJECT_ID}.{marts_dataset}.{table_name}`
-        LIMIT {limit}
+        LIMIT @limit
         """
         
-        return execute_query(query, client)
+        return execute_query(ParameterizedQuery("sample_data", query, {"limit": int(limit)}))
         
     except Exception as e:
         logger.error(f"Failed to get sample data from {table_name}: {str(e)}")
@@ -225,15 +1237,15 @@ def validate_table_exists(table_name: str, dataset_id: str = marts_dataset) -> b
         bool: True if table exists, False otherwise
     """
     try:
-        client = init_connection()
-        
         query = f"""
         SELECT COUNT(*) as table_count
         FROM `{PROJECT_ID}.{dataset_id}.__TABLES__`
-        WHERE table_id = '{table_name}'
+        WHERE table_id = @table_name
         """
         
-        result = execute_query(query, client)
+        result = execute_query(
+            ParameterizedQuery("validate_table_exists", query, {"table_name": table_name})
+        )
         return result.iloc[0]['table_count'] > 0
         
     except Exception as e:
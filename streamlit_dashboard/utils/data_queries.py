@@ -3,17 +3,418 @@ Data Query Functions for Olist Analytics Dashboard
 Implements queries for all 8 critical business questions using BigQuery marts
 """
 
-import streamlit as st
 import pandas as pd
-from typing import Optional, Dict, Any, Tuple
-from .bigquery_client import execute_query, init_connection
+from typing import Optional, Dict, Any, Tuple, Callable, List
+from collections import OrderedDict
+import functools
+import inspect
+import os
+import threading
+from .bigquery_client import execute_query, execute_script, fetch_concurrently, init_connection, get_marts_version, get_aggregate_tables
+from .query_templates import ParameterizedQuery, bind_query, year_param, region_param
+from . import fact_cube, serving_extracts
+from .result_dtypes import compact_dtypes
 import logging
 
 # Configure logging
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
-@st.cache_data(ttl=600)
+# Maximum number of query results kept in the in-process result cache
+RESULT_CACHE_MAX_ENTRIES = int(os.getenv("RESULT_CACHE_MAX_ENTRIES", "256"))
+
+_result_cache: "OrderedDict[Tuple, pd.DataFrame]" = OrderedDict()
+_result_cache_lock = threading.Lock()
+
+# Sidebar filter options
+YEAR_OPTIONS = ["All Years", "2016", "2017", "2018"]
+REGION_OPTIONS = ["All Regions", "North", "Northeast", "Southeast", "South", "Central-West"]
+
+# Every region value in dim_customers/dim_sellers: the five regions plus the
+# 'Unknown' fallback for states missing from the seed
+REGION_PARTITION = REGION_OPTIONS[1:] + ["Unknown"]
+
+# An unfiltered result is assembled from cached per-slice results when at most this
+# many slices are missing (each missing slice costs its own warehouse query)
+COMPOSE_MAX_MISSING_SLICES = int(os.getenv("COMPOSE_MAX_MISSING_SLICES", "1"))
+
+# Function name -> {filter argument: merger rebuilding the unfiltered result from slices}
+SLICE_MERGERS: Dict[str, Dict[str, Callable[[List[pd.DataFrame], Dict[str, Any]], pd.DataFrame]]] = {}
+
+# Function name -> {column: dtype} applied to its results before they are cached
+RESULT_SCHEMAS: Dict[str, Dict[str, str]] = {}
+
+_data_years_state: Dict[str, Any] = {"version": None, "years": []}
+_data_years_lock = threading.Lock()
+
+# Send queries to the smallest pre-aggregated marts table that can answer them
+AGGREGATE_ROUTING_ENABLED = os.getenv("AGGREGATE_ROUTING_ENABLED", "true").lower() in ("1", "true", "yes")
+
+# Columns of the aggregate tables built by dbt (models/marts/aggregates)
+AGGREGATE_COLUMNS: Dict[str, frozenset] = {
+    "agg_sales_monthly_region": frozenset({
+        "year", "month", "month_name", "customer_region", "month_start_date",
+        "order_count", "item_count", "total_item_value", "payment_value",
+        "freight_value", "item_price"
+    }),
+    "agg_sales_monthly_payment": frozenset({
+        "year", "month", "month_name", "customer_state", "customer_region",
+        "has_payment", "primary_payment_type", "total_installments", "month_start_date",
+        "order_count", "item_count", "total_item_value", "payment_value",
+        "freight_value", "item_price", "credit_card_items", "boleto_items",
+        "voucher_items", "payment_methods_count_sum", "payment_methods_count_n"
+    }),
+    # HyperLogLog sketches; only used for queries run with approximate=True
+    "agg_sales_yearly_sketches": frozenset({
+        "year", "customer_state", "customer_region", "seller_region", "product_category_english",
+        "item_count", "total_item_value", "payment_value", "freight_value", "item_price",
+        "order_sketch", "customer_sketch", "seller_sketch", "product_sketch"
+    }),
+}
+
+def marts_cached(func: Callable[..., pd.DataFrame]) -> Callable[..., pd.DataFrame]:
+    """
+    Cache a query function's results until the marts tables change
+    
+    The cache key is the function name, its bound arguments and the current marts
+    version (see bigquery_client.get_marts_version), so entries stay valid between
+    pipeline runs and are bypassed as soon as the tables are rebuilt. Least recently
+    used entries are evicted beyond RESULT_CACHE_MAX_ENTRIES. Failed queries, which
+    return a DataFrame without columns, are not cached; empty results are.
+    
+    On a cache miss, results are read from the current serving extract set when
+    SERVING_EXTRACTS_ENABLED is set and the set covers the call. Otherwise an unfiltered ("All Regions"/"All Years") result of a function
+    registered with @composable is assembled from its cached per-slice results, filling
+    at most COMPOSE_MAX_MISSING_SLICES missing slices. Otherwise functions the in-memory
+    fact cube supports are answered locally when FACT_CUBE_ENABLED is set, and the rest
+    (or anything the cube fails on) runs against the warehouse. Whatever the source,
+    results are converted to compact dtypes (see @result_schema) before they are cached.
+    
+    Args:
+        func (Callable): Query function returning a DataFrame
+        
+    Returns:
+        Callable: Cached version of the function
+    """
+    signature = inspect.signature(func)
+    
+    @functools.wraps(func)
+    def wrapper(*args, **kwargs) -> pd.DataFrame:
+        bound = signature.bind(*args, **kwargs)
+        bound.apply_defaults()
+        key = (func.__name__, get_marts_version(), tuple(bound.arguments.items()))
+        
+        with _result_cache_lock:
+            cached = _result_cache.get(key)
+            if cached is not None:
+                _result_cache.move_to_end(key)
+                return cached.copy()
+        
+        df = None
+        if serving_extracts.SERVING_EXTRACTS_ENABLED:
+            df = serving_extracts.read_extract(func.__name__, dict(bound.arguments))
+        if df is None:
+            df = _compose_from_slices(wrapper, func.__name__, key[1], dict(bound.arguments))
+        if df is None and fact_cube.FACT_CUBE_ENABLED:
+            df = fact_cube.answer(func.__name__, dict(bound.arguments))
+        if df is None:
+            df = func(*args, **kwargs)
+        
+        df = compact_dtypes(df, RESULT_SCHEMAS.get(func.__name__))
+        if len(df.columns) > 0:
+            with _result_cache_lock:
+                _result_cache[key] = df.copy()
+                _result_cache.move_to_end(key)
+                while len(_result_cache) > RESULT_CACHE_MAX_ENTRIES:
+                    _result_cache.popitem(last=False)
+        
+        return df
+    
+    return wrapper
+
+def clear_query_cache() -> None:
+    """Drop all entries from the in-process result cache"""
+    with _result_cache_lock:
+        _result_cache.clear()
+
+def _cache_key(func: Callable[..., pd.DataFrame], **kwargs) -> Tuple:
+    """Result cache key of a @marts_cached function called with these arguments"""
+    bound = inspect.signature(func).bind(**kwargs)
+    bound.apply_defaults()
+    return (func.__name__, get_marts_version(), tuple(bound.arguments.items()))
+
+def is_query_cached(func: Callable[..., pd.DataFrame], **kwargs) -> bool:
+    """
+    Check whether a query function's result is in the in-process result cache
+    
+    Args:
+        func (Callable): @marts_cached query function
+        **kwargs: Arguments it would be called with
+        
+    Returns:
+        bool: True if calling it would not run a query
+    """
+    with _result_cache_lock:
+        return _cache_key(func, **kwargs) in _result_cache
+
+def prime_query_cache(func: Callable[..., pd.DataFrame], df: pd.DataFrame, **kwargs) -> None:
+    """
+    Store a result fetched outside a query function (e.g. by a batched script) as its cached result
+    
+    Args:
+        func (Callable): @marts_cached query function
+        df (pd.DataFrame): Its result for these arguments
+        **kwargs: Arguments the result belongs to
+    """
+    key = _cache_key(func, **kwargs)
+    df = compact_dtypes(df, RESULT_SCHEMAS.get(func.__name__))
+    with _result_cache_lock:
+        _result_cache[key] = df.copy()
+        _result_cache.move_to_end(key)
+        while len(_result_cache) > RESULT_CACHE_MAX_ENTRIES:
+            _result_cache.popitem(last=False)
+
+def query_functions() -> Dict[str, Callable[..., pd.DataFrame]]:
+    """
+    Get every dashboard query function cached with @marts_cached
+    
+    Returns:
+        Dict[str, Callable]: Function name to cached function; the undecorated
+            function is available as ``__wrapped__``
+    """
+    return {
+        name: func for name, func in globals().items()
+        if name.startswith("get_") and inspect.isfunction(func) and hasattr(func, "__wrapped__")
+    }
+
+def filter_combinations(func: Callable[..., pd.DataFrame]) -> List[Dict[str, str]]:
+    """
+    Get the distinct sidebar filter arguments a query function can be called with
+    
+    Args:
+        func (Callable): Query function
+        
+    Returns:
+        List[Dict[str, str]]: One dict of year_filter/region_filter values per
+            combination, limited to the filters the function accepts
+    """
+    parameters = inspect.signature(func).parameters
+    years = YEAR_OPTIONS if "year_filter" in parameters else [None]
+    regions = REGION_OPTIONS if "region_filter" in parameters else [None]
+    
+    combinations = []
+    for year in years:
+        for region in regions:
+            kwargs = {}
+            if year is not None:
+                kwargs["year_filter"] = year
+            if region is not None:
+                kwargs["region_filter"] = region
+            combinations.append(kwargs)
+    return combinations
+
+def composable(**mergers: Callable[[List[pd.DataFrame], Dict[str, Any]], pd.DataFrame]) -> Callable:
+    """
+    Register how a query function's unfiltered result is rebuilt from filtered slices
+    
+    Only register a filter when the slices partition the result exactly: either the
+    function groups by the filtered column, so slices are disjoint row sets, or every
+    merged measure is additive across slices (sums, and distinct counts of entities
+    that fall into a single slice, such as orders per customer region).
+    
+    Args:
+        **mergers: Filter argument name ("year_filter" or "region_filter") mapped to a
+            function taking the slice results and the call's arguments
+        
+    Returns:
+        Callable: Decorator returning the function unchanged
+    """
+    def decorator(func: Callable[..., pd.DataFrame]) -> Callable[..., pd.DataFrame]:
+        SLICE_MERGERS[func.__name__] = mergers
+        return func
+    return decorator
+
+def result_schema(**dtypes: str) -> Callable:
+    """
+    Declare the dtypes a query function's result columns are cached with
+    
+    Declare columns whose compact dtype cannot be inferred from a single result: dimension
+    columns that are categoricals in every result (a five-row region breakdown has no
+    repeated values to infer that from) and small integers narrower than the inferred
+    32 bits. Undeclared columns are compacted by result_dtypes.compact_dtypes.
+    
+    Args:
+        **dtypes: Column name mapped to a pandas dtype, e.g. customer_region="category"
+        
+    Returns:
+        Callable: Decorator returning the function unchanged
+    """
+    def decorator(func: Callable[..., pd.DataFrame]) -> Callable[..., pd.DataFrame]:
+        RESULT_SCHEMAS[func.__name__] = dtypes
+        return func
+    return decorator
+
+def concat_slices(sort_by, ascending=True) -> Callable[[List[pd.DataFrame], Dict[str, Any]], pd.DataFrame]:
+    """Merger for functions grouped by the filtered column: stack, re-sort and re-apply any limit"""
+    def merge(frames: List[pd.DataFrame], arguments: Dict[str, Any]) -> pd.DataFrame:
+        df = pd.concat(frames, ignore_index=True).sort_values(sort_by, ascending=ascending, kind="stable")
+        if "limit" in arguments:
+            df = df.head(arguments["limit"])
+        return df.reset_index(drop=True)
+    return merge
+
+def get_data_years() -> List[str]:
+    """
+    Get the years present in dim_date, as sidebar filter values
+    
+    Returns:
+        List[str]: Years such as "2017", or an empty list if the lookup fails
+    """
+    version = get_marts_version()
+    with _data_years_lock:
+        if _data_years_state["version"] == version:
+            return _data_years_state["years"]
+    
+    try:
+        result = execute_query("SELECT DISTINCT year FROM `olist_marts.dim_date` ORDER BY year")
+        years = [str(int(year)) for year in result["year"].dropna()]
+    except Exception as e:
+        logger.warning(f"Failed to list data years: {str(e)}")
+        return []
+    
+    with _data_years_lock:
+        _data_years_state["version"] = version
+        _data_years_state["years"] = years
+    return years
+
+def _filter_partition(filter_name: str) -> List[str]:
+    """Filter values whose slices together cover every row"""
+    if filter_name == "year_filter":
+        return get_data_years()
+    if filter_name == "region_filter":
+        return REGION_PARTITION
+    return []
+
+def _compose_from_slices(cached_func: Callable[..., pd.DataFrame], name: str, version: str,
+                         arguments: Dict[str, Any]) -> Optional[pd.DataFrame]:
+    """
+    Assemble an unfiltered result from cached per-slice results
+    
+    Args:
+        cached_func (Callable): marts_cached wrapper, used to fill missing slices
+        name (str): Query function name
+        version (str): Marts version of the cache key
+        arguments (Dict[str, Any]): Bound arguments of the call
+        
+    Returns:
+        pd.DataFrame: Merged result, or None if the function or filter is not
+            composable, too few slices are cached, or a slice fails
+    """
+    mergers = SLICE_MERGERS.get(name)
+    if not mergers or arguments.get("approximate"):
+        return None
+    
+    for filter_name, merge in mergers.items():
+        if filter_name not in arguments or arguments[filter_name] not in (None, "All Years", "All Regions"):
+            continue
+        
+        partition = _filter_partition(filter_name)
+        if not partition:
+            continue
+        
+        slice_arguments = [{**arguments, filter_name: value} for value in partition]
+        with _result_cache_lock:
+            cached = [
+                _result_cache.get((name, version, tuple(slice_args.items())))
+                for slice_args in slice_arguments
+            ]
+        
+        missing = sum(frame is None for frame in cached)
+        if missing == len(partition) or missing > COMPOSE_MAX_MISSING_SLICES:
+            continue
+        
+        frames = []
+        for slice_args, frame in zip(slice_arguments, cached):
+            if frame is None:
+                frame = cached_func(**slice_args)
+                if len(frame.columns) == 0:
+                    return None
+            frames.append(frame.copy())
+        
+        logger.info(f"Composed {name} from {len(partition) - missing}/{len(partition)} cached {filter_name} slices")
+        return merge([frame for frame in frames if not frame.empty] or frames[:1], arguments)
+    
+    return None
+
+def _merge_monthly_sales_trends(frames: List[pd.DataFrame], arguments: Dict[str, Any]) -> pd.DataFrame:
+    """Sum region slices of get_monthly_sales_trends; orders belong to a single region"""
+    df = pd.concat(frames, ignore_index=True).groupby(["year", "month", "month_name"], as_index=False, observed=True).agg(
+        month_year=("month_year", "min"),
+        total_orders=("total_orders", "sum"),
+        total_items=("total_items", "sum"),
+        total_sales=("total_sales", "sum"),
+        total_payments=("total_payments", "sum")
+    )
+    df["avg_order_value"] = (df["total_sales"] / df["total_orders"]).round(2)
+    df["avg_payment_value"] = (df["total_payments"] / df["total_orders"]).round(2)
+    df = df.round({"total_sales": 2, "total_payments": 2}).sort_values(["year", "month"])
+    return df[["month_year", "year", "month", "month_name", "total_orders", "total_items",
+               "total_sales", "total_payments", "avg_order_value", "avg_payment_value"]].reset_index(drop=True)
+
+def _merge_customer_frequency(frames: List[pd.DataFrame], arguments: Dict[str, Any]) -> pd.DataFrame:
+    """Sum region slices of get_customer_frequency_analysis; customers belong to a single region"""
+    df = pd.concat(frames, ignore_index=True).groupby("order_count", as_index=False, observed=True).agg(
+        customer_count=("customer_count", "sum"),
+        total_segment_value=("total_segment_value", "sum")
+    )
+    df["avg_customer_value"] = (df["total_segment_value"] / df["customer_count"]).round(2)
+    df["percentage_of_customers"] = (df["customer_count"] * 100.0 / df["customer_count"].sum()).round(1)
+    df["total_segment_value"] = df["total_segment_value"].round(2)
+    df = df.sort_values("order_count")
+    return df[["order_count", "customer_count", "avg_customer_value", "total_segment_value",
+               "percentage_of_customers"]].reset_index(drop=True)
+
+def _merge_review_score_distribution(frames: List[pd.DataFrame], arguments: Dict[str, Any]) -> pd.DataFrame:
+    """Sum year or region slices of get_review_score_distribution; orders fall into one slice"""
+    df = pd.concat(frames, ignore_index=True).groupby("review_score", as_index=False, observed=True).agg(
+        total_items=("total_items", "sum"),
+        total_sales=("total_sales", "sum"),
+        total_orders=("total_orders", "sum"),
+        actual_reviews=("actual_reviews", "sum")
+    )
+    df["avg_item_value"] = (df["total_sales"] / df["total_items"]).round(2)
+    df["percentage_of_items"] = (df["total_items"] * 100.0 / df["total_items"].sum()).round(1)
+    df["total_sales"] = df["total_sales"].round(2)
+    df = df.sort_values("review_score")
+    return df[["review_score", "total_items", "total_sales", "avg_item_value", "total_orders",
+               "actual_reviews", "percentage_of_items"]].reset_index(drop=True)
+
+def route_to_aggregate(columns) -> Optional[str]:
+    """
+    Pick the smallest aggregate table that carries every column a query needs
+    
+    Args:
+        columns (Iterable[str]): Grain, filter and measure columns the query reads
+        
+    Returns:
+        str: Aggregate table name, or None if the query must read fact_sales
+    """
+    if not AGGREGATE_ROUTING_ENABLED:
+        return None
+    
+    needed = set(columns)
+    available = get_aggregate_tables()
+    candidates = [
+        table for table, table_columns in AGGREGATE_COLUMNS.items()
+        if table in available and needed <= table_columns
+    ]
+    if not candidates:
+        return None
+    return min(candidates, key=lambda table: available[table])
+
+@marts_cached
+@result_schema(year="int16", month="int8", month_name="category")
+@composable(region_filter=_merge_monthly_sales_trends, year_filter=concat_slices(["year", "month"]))
 def get_monthly_sales_trends(year_filter: Optional[str] = None, region_filter: Optional[str] = None) -> pd.DataFrame:
     """
     Get monthly sales trends data for business question 1
@@ -31,38 +432,71 @@ def get_monthly_sales_trends(year_filter: Optional[str] = None, region_filter: O
             - total_items: Total items sold
     """
     try:
-        # Build query with optional filters
-        year_condition = f"AND d.year = {year_filter}" if year_filter and year_filter != "All Years" else ""
-        region_condition = f"AND c.customer_region = '{region_filter}'" if region_filter and region_filter != "All Regions" else ""
+        aggregate = route_to_aggregate([
+            "year", "month", "month_name", "customer_region", "month_start_date",
+            "order_count", "item_count", "total_item_value", "payment_value"
+        ])
+        
+        if aggregate:
+            year_condition = "AND a.year = @year" if year_filter and year_filter != "All Years" else ""
+            region_condition = "AND a.customer_region = @region" if region_filter and region_filter != "All Regions" else ""
+            
+            query = f"""
+            SELECT 
+                FORMAT_DATE('%Y-%m', MIN(a.month_start_date)) as month_year,
+                a.year,
+                a.month,
+                a.month_name,
+                SUM(a.order_count) as total_orders,
+                SUM(a.item_count) as total_items,
+                ROUND(SUM(a.total_item_value), 2) as total_sales,
+                ROUND(SUM(a.payment_value), 2) as total_payments,
+                ROUND(SUM(a.total_item_value) / SUM(a.order_count), 2) as avg_order_value,
+                ROUND(SUM(a.payment_value) / SUM(a.order_count), 2) as avg_payment_value
+            FROM `olist_marts.{aggregate}` a
+            WHERE 1=1 {year_condition} {region_condition}
+            GROUP BY a.year, a.month, a.month_name
+            ORDER BY a.year, a.month
+            """
+        else:
+            # Build query with optional filters
+            year_condition = "AND d.year = @year" if year_filter and year_filter != "All Years" else ""
+            region_condition = "AND c.customer_region = @region" if region_filter and region_filter != "All Regions" else ""
         
-        query = f"""
-        SELECT 
-            FORMAT_DATE('%Y-%m', MIN(d.full_date)) as month_year,
-            d.year,
-            d.month,
-            d.month_name,
-            COUNT(DISTINCT f.order_key) as total_orders,
-            COUNT(f.order_item_sk) as total_items,
-            ROUND(SUM(f.total_item_value), 2) as total_sales,
-            ROUND(SUM(f.payment_value), 2) as total_payments,
-            ROUND(SUM(f.total_item_value) / COUNT(DISTINCT f.order_key), 2) as avg_order_value,
-            ROUND(SUM(f.payment_value) / COUNT(DISTINCT f.order_key), 2) as avg_payment_value
-        FROM `olist_marts.fact_sales` f
-        JOIN `olist_marts.dim_date` d ON f.date_key = d.date_key
-        JOIN `olist_marts.dim_customers` c ON f.customer_key = c.customer_key
-        WHERE 1=1 {year_condition} {region_condition}
-        GROUP BY d.year, d.month, d.month_name
-        ORDER BY d.year, d.month
-        """
+            query = f"""
+            SELECT 
+                FORMAT_DATE('%Y-%m', MIN(d.full_date)) as month_year,
+                d.year,
+                d.month,
+                d.month_name,
+                COUNT(DISTINCT f.order_key) as total_orders,
+                COUNT(f.order_item_sk) as total_items,
+                ROUND(SUM(f.total_item_value), 2) as total_sales,
+                ROUND(SUM(f.payment_value), 2) as total_payments,
+                ROUND(SUM(f.total_item_value) / COUNT(DISTINCT f.order_key), 2) as avg_order_value,
+                ROUND(SUM(f.payment_value) / COUNT(DISTINCT f.order_key), 2) as avg_payment_value
+            FROM `olist_marts.fact_sales` f
+            JOIN `olist_marts.dim_date` d ON f.date_key = d.date_key
+            JOIN `olist_marts.dim_customers` c ON f.customer_key = c.customer_key
+            WHERE 1=1 {year_condition} {region_condition}
+            GROUP BY d.year, d.month, d.month_name
+            ORDER BY d.year, d.month
+            """
+        
+        query = bind_query(
+            "monthly_sales_trends", query,
+            year=year_param(year_filter), region=region_param(region_filter)
+        )
         
-        return execute_query(query)
+        return execute_query(query, use_cache=True)
         
     except Exception as e:
         logger.error(f"Failed to get monthly sales trends: {str(e)}")
         return pd.DataFrame()
 
-@st.cache_data(ttl=600)
-def get_top_products_categories(limit: int = 20, year_filter: Optional[str] = None, region_filter: Optional[str] = None) -> pd.DataFrame:
+@marts_cached
+def get_top_products_categories(limit: int = 20, year_filter: Optional[str] = None, region_filter: Optional[str] = None,
+                                approximate: bool = False) -> pd.DataFrame:
     """
     Get top products and categories performance for business question 2
     
@@ -70,196 +504,329 @@ def get_top_products_categories(limit: int = 20, year_filter: Optional[str] = No
         limit (int): Number of top categories to return
         year_filter (str, optional): Filter by specific year
         region_filter (str, optional): Filter by specific region
+        approximate (bool): Estimate distinct counts by merging HyperLogLog sketches
         
     Returns:
         pd.DataFrame: Category performance metrics
     """
     try:
-        # Build query with optional filters
-        year_condition = ""
-        region_condition = ""
-        joins = ["JOIN `olist_marts.dim_products` p ON f.product_key = p.product_key"]
-        
-        if year_filter and year_filter != "All Years":
-            joins.append("JOIN `olist_marts.dim_date` d ON f.date_key = d.date_key")
-            year_condition = f"AND d.year = {year_filter}"
+        aggregate = route_to_aggregate([
+            "year", "customer_region", "product_category_english", "product_sketch",
+            "item_count", "total_item_value", "freight_value", "item_price"
+        ]) if approximate else None
+        
+        if aggregate:
+            year_condition = "AND a.year = @year" if year_filter and year_filter != "All Years" else ""
+            region_condition = "AND a.customer_region = @region" if region_filter and region_filter != "All Regions" else ""
             
-        if region_filter and region_filter != "All Regions":
-            joins.append("JOIN `olist_marts.dim_customers` c ON f.customer_key = c.customer_key")
-            region_condition = f"AND c.customer_region = '{region_filter}'"
+            query = f"""
+            SELECT 
+                a.product_category_english as category,
+                HLL_COUNT.MERGE(a.product_sketch) as unique_products,
+                SUM(a.item_count) as items_sold,
+                ROUND(SUM(a.total_item_value), 2) as total_revenue,
+                ROUND(SUM(a.total_item_value) / SUM(a.item_count), 2) as avg_item_value,
+                ROUND(SUM(a.freight_value), 2) as total_freight,
+                ROUND(SUM(a.item_price), 2) as total_item_price
+            FROM `olist_marts.{aggregate}` a
+            WHERE a.product_category_english IS NOT NULL {year_condition} {region_condition}
+            GROUP BY a.product_category_english
+            ORDER BY total_revenue DESC
+            LIMIT @limit
+            """
+        else:
+            # Build query with optional filters
+            year_condition = ""
+            region_condition = ""
+            joins = ["JOIN `olist_marts.dim_products` p ON f.product_key = p.product_key"]
+        
+            if year_filter and year_filter != "All Years":
+                joins.append("JOIN `olist_marts.dim_date` d ON f.date_key = d.date_key")
+                year_condition = "AND d.year = @year"
+            
+            if region_filter and region_filter != "All Regions":
+                joins.append("JOIN `olist_marts.dim_customers` c ON f.customer_key = c.customer_key")
+                region_condition = "AND c.customer_region = @region"
         
-        query = f"""
-        SELECT 
-            p.product_category_english as category,
-            COUNT(DISTINCT p.product_key) as unique_products,
-            COUNT(f.order_item_sk) as items_sold,
-            ROUND(SUM(f.total_item_value), 2) as total_revenue,
-            ROUND(AVG(f.total_item_value), 2) as avg_item_value,
-            ROUND(SUM(f.freight_value), 2) as total_freight,
-            ROUND(SUM(f.item_price), 2) as total_item_price
-        FROM `olist_marts.fact_sales` f
-        {' '.join(joins)}
-        WHERE p.product_category_english IS NOT NULL {year_condition} {region_condition}
-        GROUP BY p.product_category_english
-        ORDER BY total_revenue DESC
-        LIMIT {limit}
-        """
+            query = f"""
+            SELECT 
+                p.product_category_english as category,
+                COUNT(DISTINCT p.product_key) as unique_products,
+                COUNT(f.order_item_sk) as items_sold,
+                ROUND(SUM(f.total_item_value), 2) as total_revenue,
+                ROUND(AVG(f.total_item_value), 2) as avg_item_value,
+                ROUND(SUM(f.freight_value), 2) as total_freight,
+                ROUND(SUM(f.item_price), 2) as total_item_price
+            FROM `olist_marts.fact_sales` f
+            {' '.join(joins)}
+            WHERE p.product_category_english IS NOT NULL {year_condition} {region_condition}
+            GROUP BY p.product_category_english
+            ORDER BY total_revenue DESC
+            LIMIT @limit
+            """
+        
+        query = bind_query(
+            "top_products_categories", query,
+            limit=limit, year=year_param(year_filter), region=region_param(region_filter)
+        )
         
-        return execute_query(query)
+        return execute_query(query, use_cache=True)
         
     except Exception as e:
         logger.error(f"Failed to get top products categories: {str(e)}")
         return pd.DataFrame()
 
-@st.cache_data(ttl=600)
-def get_sales_by_region(year_filter: Optional[str] = None) -> pd.DataFrame:
+@marts_cached
+@result_schema(customer_region="category", seller_region="category")
+def get_sales_by_region(year_filter: Optional[str] = None, approximate: bool = False) -> pd.DataFrame:
     """
     Get geographic sales distribution for business question 3
     
     Args:
         year_filter (str, optional): Filter by specific year
+        approximate (bool): Estimate distinct counts by merging HyperLogLog sketches
         
     Returns:
         pd.DataFrame: Regional sales metrics for customers and sellers
     """
     try:
-        # Build query with optional year filter
-        year_condition = ""
-        joins = [
-            "JOIN `olist_marts.dim_customers` c ON f.customer_key = c.customer_key",
-            "JOIN `olist_marts.dim_sellers` s ON f.seller_key = s.seller_key"
-        ]
+        aggregate = route_to_aggregate([
+            "year", "customer_region", "seller_region", "item_count", "total_item_value",
+            "order_sketch", "customer_sketch", "seller_sketch"
+        ]) if approximate else None
         
-        if year_filter and year_filter != "All Years":
-            joins.append("JOIN `olist_marts.dim_date` d ON f.date_key = d.date_key")
-            year_condition = f"AND d.year = {year_filter}"
-        
-        query = f"""
-        SELECT 
-            c.customer_region,
-            s.seller_region,
-            COUNT(DISTINCT f.order_key) as total_orders,
-            COUNT(f.order_item_sk) as total_items,
-            ROUND(SUM(f.total_item_value), 2) as total_sales,
-            ROUND(AVG(f.total_item_value), 2) as avg_order_value,
-            COUNT(DISTINCT c.customer_key) as unique_customers,
-            COUNT(DISTINCT s.seller_key) as unique_sellers
-        FROM `olist_marts.fact_sales` f
-        {' '.join(joins)}
-        WHERE c.customer_region IS NOT NULL AND s.seller_region IS NOT NULL {year_condition}
-        GROUP BY c.customer_region, s.seller_region
-        ORDER BY total_sales DESC
-        """
+        if aggregate:
+            year_condition = "AND a.year = @year" if year_filter and year_filter != "All Years" else ""
+            
+            query = f"""
+            SELECT 
+                a.customer_region,
+                a.seller_region,
+                HLL_COUNT.MERGE(a.order_sketch) as total_orders,
+                SUM(a.item_count) as total_items,
+                ROUND(SUM(a.total_item_value), 2) as total_sales,
+                ROUND(SUM(a.total_item_value) / SUM(a.item_count), 2) as avg_order_value,
+                HLL_COUNT.MERGE(a.customer_sketch) as unique_customers,
+                HLL_COUNT.MERGE(a.seller_sketch) as unique_sellers
+            FROM `olist_marts.{aggregate}` a
+            WHERE a.customer_region IS NOT NULL AND a.seller_region IS NOT NULL {year_condition}
+            GROUP BY a.customer_region, a.seller_region
+            ORDER BY total_sales DESC
+            """
+        else:
+            # Build query with optional year filter
+            year_condition = ""
+            joins = [
+                "JOIN `olist_marts.dim_customers` c ON f.customer_key = c.customer_key",
+                "JOIN `olist_marts.dim_sellers` s ON f.seller_key = s.seller_key"
+            ]
+        
+            if year_filter and year_filter != "All Years":
+                joins.append("JOIN `olist_marts.dim_date` d ON f.date_key = d.date_key")
+                year_condition = "AND d.year = @year"
+        
+            query = f"""
+            SELECT 
+                c.customer_region,
+                s.seller_region,
+                COUNT(DISTINCT f.order_key) as total_orders,
+                COUNT(f.order_item_sk) as total_items,
+                ROUND(SUM(f.total_item_value), 2) as total_sales,
+                ROUND(AVG(f.total_item_value), 2) as avg_order_value,
+                COUNT(DISTINCT c.customer_key) as unique_customers,
+                COUNT(DISTINCT s.seller_key) as unique_sellers
+            FROM `olist_marts.fact_sales` f
+            {' '.join(joins)}
+            WHERE c.customer_region IS NOT NULL AND s.seller_region IS NOT NULL {year_condition}
+            GROUP BY c.customer_region, s.seller_region
+            ORDER BY total_sales DESC
+            """
+        
+        query = bind_query(
+            "sales_by_region", query,
+            year=year_param(year_filter)
+        )
         
-        return execute_query(query)
+        return execute_query(query, use_cache=True)
         
     except Exception as e:
         logger.error(f"Failed to get sales by region: {str(e)}")
         return pd.DataFrame()
 
-@st.cache_data(ttl=600)
-def get_sales_by_state(year_filter: Optional[str] = None, region_filter: Optional[str] = None) -> pd.DataFrame:
+@marts_cached
+@result_schema(customer_state="category", customer_region="category")
+@composable(region_filter=concat_slices("total_sales", ascending=False))
+def get_sales_by_state(year_filter: Optional[str] = None, region_filter: Optional[str] = None,
+                       approximate: bool = False) -> pd.DataFrame:
     """
     Get state-level sales distribution for detailed geographic analysis
     
     Args:
         year_filter (str, optional): Filter by specific year
         region_filter (str, optional): Filter by specific region
+        approximate (bool): Estimate distinct counts by merging HyperLogLog sketches
         
     Returns:
         pd.DataFrame: State-level sales metrics
     """
     try:
-        # Build query with optional filters
-        conditions = ["c.customer_state IS NOT NULL"]
-        joins = ["JOIN `olist_marts.dim_customers` c ON f.customer_key = c.customer_key"]
+        aggregate = route_to_aggregate([
+            "year", "customer_state", "customer_region", "item_count", "total_item_value",
+            "order_sketch", "customer_sketch"
+        ]) if approximate else None
+        
+        if aggregate:
+            conditions = ["a.customer_state IS NOT NULL"]
+            if year_filter and year_filter != "All Years":
+                conditions.append("a.year = @year")
+            if region_filter and region_filter != "All Regions":
+                conditions.append("a.customer_region = @region")
+            
+            query = f"""
+            SELECT 
+                a.customer_state,
+                a.customer_region,
+                HLL_COUNT.MERGE(a.order_sketch) as total_orders,
+                SUM(a.item_count) as total_items,
+                ROUND(SUM(a.total_item_value), 2) as total_sales,
+                ROUND(SUM(a.total_item_value) / SUM(a.item_count), 2) as avg_order_value,
+                HLL_COUNT.MERGE(a.customer_sketch) as unique_customers
+            FROM `olist_marts.{aggregate}` a
+            WHERE {' AND '.join(conditions)}
+            GROUP BY a.customer_state, a.customer_region
+            ORDER BY total_sales DESC
+            """
+        else:
+            # Build query with optional filters
+            conditions = ["c.customer_state IS NOT NULL"]
+            joins = ["JOIN `olist_marts.dim_customers` c ON f.customer_key = c.customer_key"]
         
-        if year_filter and year_filter != "All Years":
-            joins.append("JOIN `olist_marts.dim_date` d ON f.date_key = d.date_key")
-            conditions.append(f"d.year = {year_filter}")
+            if year_filter and year_filter != "All Years":
+                joins.append("JOIN `olist_marts.dim_date` d ON f.date_key = d.date_key")
+                conditions.append("d.year = @year")
             
-        if region_filter and region_filter != "All Regions":
-            conditions.append(f"c.customer_region = '{region_filter}'")
+            if region_filter and region_filter != "All Regions":
+                conditions.append("c.customer_region = @region")
         
-        where_clause = "WHERE " + " AND ".join(conditions)
+            where_clause = "WHERE " + " AND ".join(conditions)
         
-        query = f"""
-        SELECT 
-            c.customer_state,
-            c.customer_region,
-            COUNT(DISTINCT f.order_key) as total_orders,
-            COUNT(f.order_item_sk) as total_items,
-            ROUND(SUM(f.total_item_value), 2) as total_sales,
-            ROUND(AVG(f.total_item_value), 2) as avg_order_value,
-            COUNT(DISTINCT c.customer_key) as unique_customers
-        FROM `olist_marts.fact_sales` f
-        {' '.join(joins)}
-        {where_clause}
-        GROUP BY c.customer_state, c.customer_region
-        ORDER BY total_sales DESC
-        """
+            query = f"""
+            SELECT 
+                c.customer_state,
+                c.customer_region,
+                COUNT(DISTINCT f.order_key) as total_orders,
+                COUNT(f.order_item_sk) as total_items,
+                ROUND(SUM(f.total_item_value), 2) as total_sales,
+                ROUND(AVG(f.total_item_value), 2) as avg_order_value,
+                COUNT(DISTINCT c.customer_key) as unique_customers
+            FROM `olist_marts.fact_sales` f
+            {' '.join(joins)}
+            {where_clause}
+            GROUP BY c.customer_state, c.customer_region
+            ORDER BY total_sales DESC
+            """
+        
+        query = bind_query(
+            "sales_by_state", query,
+            year=year_param(year_filter), region=region_param(region_filter)
+        )
         
-        return execute_query(query)
+        return execute_query(query, use_cache=True)
         
     except Exception as e:
         logger.error(f"Failed to get sales by state: {str(e)}")
         return pd.DataFrame()
 
-@st.cache_data(ttl=600)
-def get_customer_seller_flow(year_filter: Optional[str] = None) -> pd.DataFrame:
+@marts_cached
+@result_schema(transaction_type="category", customer_region="category", seller_region="category")
+def get_customer_seller_flow(year_filter: Optional[str] = None, approximate: bool = False) -> pd.DataFrame:
     """
     Get customer-seller regional flow analysis
     
     Args:
         year_filter (str, optional): Filter by specific year
+        approximate (bool): Estimate distinct counts by merging HyperLogLog sketches
         
     Returns:
         pd.DataFrame: Customer-seller flow metrics
     """
     try:
-        # Build query with optional year filter
-        year_condition = ""
-        joins = [
-            "JOIN `olist_marts.dim_customers` c ON f.customer_key = c.customer_key",
-            "JOIN `olist_marts.dim_sellers` s ON f.seller_key = s.seller_key"
-        ]
+        aggregate = route_to_aggregate([
+            "year", "customer_region", "seller_region", "total_item_value",
+            "order_sketch", "customer_sketch", "seller_sketch"
+        ]) if approximate else None
         
-        if year_filter and year_filter != "All Years":
-            joins.append("JOIN `olist_marts.dim_date` d ON f.date_key = d.date_key")
-            year_condition = f"AND d.year = {year_filter}"
-        
-        query = f"""
-        SELECT 
-            CASE 
-                WHEN c.customer_region = s.seller_region THEN 'Same Region'
-                ELSE 'Cross Region'
-            END as transaction_type,
-            c.customer_region,
-            s.seller_region,
-            COUNT(DISTINCT f.order_key) as total_orders,
-            ROUND(SUM(f.total_item_value), 2) as total_sales,
-            COUNT(DISTINCT c.customer_key) as unique_customers,
-            COUNT(DISTINCT s.seller_key) as unique_sellers
-        FROM `olist_marts.fact_sales` f
-        {' '.join(joins)}
-        WHERE c.customer_region IS NOT NULL AND s.seller_region IS NOT NULL {year_condition}
-        GROUP BY 
-            CASE 
-                WHEN c.customer_region = s.seller_region THEN 'Same Region'
-                ELSE 'Cross Region'
-            END,
-            c.customer_region, 
-            s.seller_region
-        ORDER BY total_sales DESC
-        """
+        if aggregate:
+            year_condition = "AND a.year = @year" if year_filter and year_filter != "All Years" else ""
+            
+            query = f"""
+            SELECT 
+                CASE 
+                    WHEN a.customer_region = a.seller_region THEN 'Same Region'
+                    ELSE 'Cross Region'
+                END as transaction_type,
+                a.customer_region,
+                a.seller_region,
+                HLL_COUNT.MERGE(a.order_sketch) as total_orders,
+                ROUND(SUM(a.total_item_value), 2) as total_sales,
+                HLL_COUNT.MERGE(a.customer_sketch) as unique_customers,
+                HLL_COUNT.MERGE(a.seller_sketch) as unique_sellers
+            FROM `olist_marts.{aggregate}` a
+            WHERE a.customer_region IS NOT NULL AND a.seller_region IS NOT NULL {year_condition}
+            GROUP BY transaction_type, a.customer_region, a.seller_region
+            ORDER BY total_sales DESC
+            """
+        else:
+            # Build query with optional year filter
+            year_condition = ""
+            joins = [
+                "JOIN `olist_marts.dim_customers` c ON f.customer_key = c.customer_key",
+                "JOIN `olist_marts.dim_sellers` s ON f.seller_key = s.seller_key"
+            ]
+        
+            if year_filter and year_filter != "All Years":
+                joins.append("JOIN `olist_marts.dim_date` d ON f.date_key = d.date_key")
+                year_condition = "AND d.year = @year"
+        
+            query = f"""
+            SELECT 
+                CASE 
+                    WHEN c.customer_region = s.seller_region THEN 'Same Region'
+                    ELSE 'Cross Region'
+                END as transaction_type,
+                c.customer_region,
+                s.seller_region,
+                COUNT(DISTINCT f.order_key) as total_orders,
+                ROUND(SUM(f.total_item_value), 2) as total_sales,
+                COUNT(DISTINCT c.customer_key) as unique_customers,
+                COUNT(DISTINCT s.seller_key) as unique_sellers
+            FROM `olist_marts.fact_sales` f
+            {' '.join(joins)}
+            WHERE c.customer_region IS NOT NULL AND s.seller_region IS NOT NULL {year_condition}
+            GROUP BY 
+                CASE 
+                    WHEN c.customer_region = s.seller_region THEN 'Same Region'
+                    ELSE 'Cross Region'
+                END,
+                c.customer_region, 
+                s.seller_region
+            ORDER BY total_sales DESC
+            """
+        
+        query = bind_query(
+            "customer_seller_flow", query,
+            year=year_param(year_filter)
+        )
         
-        return execute_query(query)
+        return execute_query(query, use_cache=True)
         
     except Exception as e:
         logger.error(f"Failed to get customer seller flow: {str(e)}")
         return pd.DataFrame()
 
-@st.cache_data(ttl=600)
+@marts_cached
+@result_schema(customer_region="category")
+@composable(region_filter=concat_slices("avg_customer_lifetime_value", ascending=False))
 def get_customer_behavior(year_filter: Optional[str] = None, region_filter: Optional[str] = None) -> pd.DataFrame:
     """
     Get customer purchase behavior analysis for business question 4
@@ -275,9 +842,9 @@ def get_customer_behavior(year_filter: Optional[str] = None, region_filter: Opti
         # Build query with optional filters
         conditions = []
         if year_filter and year_filter != "All Years":
-            conditions.append(f"d.year = {year_filter}")
+            conditions.append("d.year = @year")
         if region_filter and region_filter != "All Regions":
-            conditions.append(f"c.customer_region = '{region_filter}'")
+            conditions.append("c.customer_region = @region")
         
         where_clause = ""
         if conditions:
@@ -325,13 +892,19 @@ def get_customer_behavior(year_filter: Optional[str] = None, region_filter: Opti
         ORDER BY avg_customer_lifetime_value DESC
         """
         
-        return execute_query(query)
+        query = bind_query(
+            "customer_behavior", query,
+            year=year_param(year_filter), region=region_param(region_filter)
+        )
+        
+        return execute_query(query, use_cache=True)
         
     except Exception as e:
         logger.error(f"Failed to get customer behavior: {str(e)}")
         return pd.DataFrame()
 
-@st.cache_data(ttl=600)
+@marts_cached
+@result_schema(customer_segment="category", value_segment="category")
 def get_customer_segmentation(year_filter: Optional[str] = None, region_filter: Optional[str] = None) -> pd.DataFrame:
     """
     Get detailed customer segmentation analysis
@@ -347,9 +920,9 @@ def get_customer_segmentation(year_filter: Optional[str] = None, region_filter:
         # Build query with optional filters
         conditions = []
         if year_filter and year_filter != "All Years":
-            conditions.append(f"d.year = {year_filter}")
+            conditions.append("d.year = @year")
         if region_filter and region_filter != "All Regions":
-            conditions.append(f"c.customer_region = '{region_filter}'")
+            conditions.append("c.customer_region = @region")
         
         where_clause = ""
         if conditions:
@@ -399,13 +972,20 @@ def get_customer_segmentation(year_filter: Optional[str] = None, region_filter:
         ORDER BY segment_total_value DESC
         """
         
-        return execute_query(query)
+        query = bind_query(
+            "customer_segmentation", query,
+            year=year_param(year_filter), region=region_param(region_filter)
+        )
+        
+        return execute_query(query, use_cache=True)
         
     except Exception as e:
         logger.error(f"Failed to get customer segmentation: {str(e)}")
         return pd.DataFrame()
 
-@st.cache_data(ttl=600)
+@marts_cached
+@result_schema(order_count="int16")
+@composable(region_filter=_merge_customer_frequency)
 def get_customer_frequency_analysis(year_filter: Optional[str] = None, region_filter: Optional[str] = None) -> pd.DataFrame:
     """
     Get customer purchase frequency distribution
@@ -421,9 +1001,9 @@ def get_customer_frequency_analysis(year_filter: Optional[str] = None, region_fi
         # Build query with optional filters
         conditions = []
         if year_filter and year_filter != "All Years":
-            conditions.append(f"d.year = {year_filter}")
+            conditions.append("d.year = @year")
         if region_filter and region_filter != "All Regions":
-            conditions.append(f"c.customer_region = '{region_filter}'")
+            conditions.append("c.customer_region = @region")
         
         where_clause = ""
         if conditions:
@@ -452,13 +1032,19 @@ def get_customer_frequency_analysis(year_filter: Optional[str] = None, region_fi
         ORDER BY order_count
         """
         
-        return execute_query(query)
+        query = bind_query(
+            "customer_frequency_analysis", query,
+            year=year_param(year_filter), region=region_param(region_filter)
+        )
+        
+        return execute_query(query, use_cache=True)
         
     except Exception as e:
         logger.error(f"Failed to get customer frequency analysis: {str(e)}")
         return pd.DataFrame()
 
-@st.cache_data(ttl=600)
+@marts_cached
+@result_schema(primary_payment_type="category")
 def get_payment_analysis(year_filter: Optional[str] = None, region_filter: Optional[str] = None) -> pd.DataFrame:
     """
     Get payment method impact analysis for business question 5
@@ -471,48 +1057,89 @@ def get_payment_analysis(year_filter: Optional[str] = None, region_filter: Optio
         pd.DataFrame: Payment method usage and impact metrics
     """
     try:
-        # Build query with optional filters
-        conditions = []
-        joins = ["JOIN `olist_marts.dim_payments` p ON f.payment_key = p.payment_key"]
+        aggregate = route_to_aggregate([
+            "year", "customer_region", "has_payment", "primary_payment_type", "total_installments",
+            "order_count", "item_count", "total_item_value", "payment_value",
+            "credit_card_items", "boleto_items", "voucher_items",
+            "payment_methods_count_sum", "payment_methods_count_n"
+        ])
+        
+        if aggregate:
+            conditions = ["a.has_payment"]
+            if year_filter and year_filter != "All Years":
+                conditions.append("a.year = @year")
+            if region_filter and region_filter != "All Regions":
+                conditions.append("a.customer_region = @region")
+            
+            query = f"""
+            SELECT 
+                a.primary_payment_type,
+                SUM(a.order_count) as total_orders,
+                ROUND(SUM(a.total_item_value), 2) as total_sales,
+                ROUND(SUM(a.total_item_value) / SUM(a.item_count), 2) as avg_order_value,
+                ROUND(SAFE_DIVIDE(
+                    SUM(a.total_installments * a.item_count),
+                    SUM(CASE WHEN a.total_installments IS NOT NULL THEN a.item_count ELSE 0 END)
+                ), 1) as avg_installments,
+                SUM(a.credit_card_items) as credit_card_orders,
+                SUM(a.boleto_items) as boleto_orders,
+                SUM(a.voucher_items) as voucher_orders,
+                ROUND(SUM(a.payment_value), 2) as total_payments,
+                ROUND(SAFE_DIVIDE(SUM(a.payment_methods_count_sum), SUM(a.payment_methods_count_n)), 1) as avg_payment_methods_count
+            FROM `olist_marts.{aggregate}` a
+            WHERE {' AND '.join(conditions)}
+            GROUP BY a.primary_payment_type
+            ORDER BY total_sales DESC
+            """
+        else:
+            # Build query with optional filters
+            conditions = []
+            joins = ["JOIN `olist_marts.dim_payments` p ON f.payment_key = p.payment_key"]
         
-        if year_filter and year_filter != "All Years":
-            joins.append("JOIN `olist_marts.dim_date` d ON f.date_key = d.date_key")
-            conditions.append(f"d.year = {year_filter}")
+            if year_filter and year_filter != "All Years":
+                joins.append("JOIN `olist_marts.dim_date` d ON f.date_key = d.date_key")
+                conditions.append("d.year = @year")
             
-        if region_filter and region_filter != "All Regions":
-            joins.append("JOIN `olist_marts.dim_customers` c ON f.customer_key = c.customer_key")
-            conditions.append(f"c.customer_region = '{region_filter}'")
+            if region_filter and region_filter != "All Regions":
+                joins.append("JOIN `olist_marts.dim_customers` c ON f.customer_key = c.customer_key")
+                conditions.append("c.customer_region = @region")
         
-        where_clause = ""
-        if conditions:
-            where_clause = "WHERE " + " AND ".join(conditions)
+            where_clause = ""
+            if conditions:
+                where_clause = "WHERE " + " AND ".join(conditions)
         
-        query = f"""
-        SELECT 
-            p.primary_payment_type,
-            COUNT(DISTINCT f.order_key) as total_orders,
-            ROUND(SUM(f.total_item_value), 2) as total_sales,
-            ROUND(AVG(f.total_item_value), 2) as avg_order_value,
-            ROUND(AVG(p.total_installments), 1) as avg_installments,
-            SUM(CASE WHEN p.uses_credit_card THEN 1 ELSE 0 END) as credit_card_orders,
-            SUM(CASE WHEN p.uses_boleto THEN 1 ELSE 0 END) as boleto_orders,
-            SUM(CASE WHEN p.uses_voucher THEN 1 ELSE 0 END) as voucher_orders,
-            ROUND(SUM(f.payment_value), 2) as total_payments,
-            ROUND(AVG(p.payment_methods_count), 1) as avg_payment_methods_count
-        FROM `olist_marts.fact_sales` f
-        {' '.join(joins)}
-        {where_clause}
-        GROUP BY p.primary_payment_type
-        ORDER BY total_sales DESC
-        """
+            query = f"""
+            SELECT 
+                p.primary_payment_type,
+                COUNT(DISTINCT f.order_key) as total_orders,
+                ROUND(SUM(f.total_item_value), 2) as total_sales,
+                ROUND(AVG(f.total_item_value), 2) as avg_order_value,
+                ROUND(AVG(p.total_installments), 1) as avg_installments,
+                SUM(CASE WHEN p.uses_credit_card THEN 1 ELSE 0 END) as credit_card_orders,
+                SUM(CASE WHEN p.uses_boleto THEN 1 ELSE 0 END) as boleto_orders,
+                SUM(CASE WHEN p.uses_voucher THEN 1 ELSE 0 END) as voucher_orders,
+                ROUND(SUM(f.payment_value), 2) as total_payments,
+                ROUND(AVG(p.payment_methods_count), 1) as avg_payment_methods_count
+            FROM `olist_marts.fact_sales` f
+            {' '.join(joins)}
+            {where_clause}
+            GROUP BY p.primary_payment_type
+            ORDER BY total_sales DESC
+            """
         
-        return execute_query(query)
+        query = bind_query(
+            "payment_analysis", query,
+            year=year_param(year_filter), region=region_param(region_filter)
+        )
+        
+        return execute_query(query, use_cache=True)
         
     except Exception as e:
         logger.error(f"Failed to get payment analysis: {str(e)}")
         return pd.DataFrame()
 
-@st.cache_data(ttl=600)
+@marts_cached
+@result_schema(total_installments="int8")
 def get_installment_analysis(year_filter: Optional[str] = None, region_filter: Optional[str] = None) -> pd.DataFrame:
     """
     Get detailed installment usage analysis
@@ -525,96 +1152,169 @@ def get_installment_analysis(year_filter: Optional[str] = None, region_filter: O
         pd.DataFrame: Installment usage patterns and impact
     """
     try:
-        # Build query with optional filters
-        conditions = []
-        joins = ["JOIN `olist_marts.dim_payments` p ON f.payment_key = p.payment_key"]
+        aggregate = route_to_aggregate([
+            "year", "customer_region", "has_payment", "total_installments",
+            "order_count", "item_count", "total_item_value", "payment_value"
+        ])
+        
+        if aggregate:
+            conditions = ["a.has_payment"]
+            if year_filter and year_filter != "All Years":
+                conditions.append("a.year = @year")
+            if region_filter and region_filter != "All Regions":
+                conditions.append("a.customer_region = @region")
+            
+            query = f"""
+            SELECT 
+                a.total_installments,
+                SUM(a.order_count) as order_count,
+                ROUND(SUM(a.total_item_value), 2) as total_sales,
+                ROUND(SUM(a.total_item_value) / SUM(a.item_count), 2) as avg_order_value,
+                ROUND(SUM(a.payment_value), 2) as total_payments,
+                ROUND(SUM(a.payment_value) / SUM(a.item_count), 2) as avg_payment_value,
+                ROUND(SUM(a.item_count) * 100.0 / SUM(SUM(a.item_count)) OVER(), 1) as percentage_of_orders
+            FROM `olist_marts.{aggregate}` a
+            WHERE {' AND '.join(conditions)}
+            GROUP BY a.total_installments
+            ORDER BY a.total_installments
+            """
+        else:
+            # Build query with optional filters
+            conditions = []
+            joins = ["JOIN `olist_marts.dim_payments` p ON f.payment_key = p.payment_key"]
         
-        if year_filter and year_filter != "All Years":
-            joins.append("JOIN `olist_marts.dim_date` d ON f.date_key = d.date_key")
-            conditions.append(f"d.year = {year_filter}")
+            if year_filter and year_filter != "All Years":
+                joins.append("JOIN `olist_marts.dim_date` d ON f.date_key = d.date_key")
+                conditions.append("d.year = @year")
             
-        if region_filter and region_filter != "All Regions":
-            joins.append("JOIN `olist_marts.dim_customers` c ON f.customer_key = c.customer_key")
-            conditions.append(f"c.customer_region = '{region_filter}'")
+            if region_filter and region_filter != "All Regions":
+                joins.append("JOIN `olist_marts.dim_customers` c ON f.customer_key = c.customer_key")
+                conditions.append("c.customer_region = @region")
         
-        where_clause = ""
-        if conditions:
-            where_clause = "WHERE " + " AND ".join(conditions)
+            where_clause = ""
+            if conditions:
+                where_clause = "WHERE " + " AND ".join(conditions)
         
-        query = f"""
-        SELECT 
-            p.total_installments,
-            COUNT(DISTINCT f.order_key) as order_count,
-            ROUND(SUM(f.total_item_value), 2) as total_sales,
-            ROUND(AVG(f.total_item_value), 2) as avg_order_value,
-            ROUND(SUM(f.payment_value), 2) as total_payments,
-            ROUND(AVG(f.payment_value), 2) as avg_payment_value,
-            ROUND(COUNT(*) * 100.0 / SUM(COUNT(*)) OVER(), 1) as percentage_of_orders
-        FROM `olist_marts.fact_sales` f
-        {' '.join(joins)}
-        {where_clause}
-        GROUP BY p.total_installments
-        ORDER BY p.total_installments
-        """
+            query = f"""
+            SELECT 
+                p.total_installments,
+                COUNT(DISTINCT f.order_key) as order_count,
+                ROUND(SUM(f.total_item_value), 2) as total_sales,
+                ROUND(AVG(f.total_item_value), 2) as avg_order_value,
+                ROUND(SUM(f.payment_value), 2) as total_payments,
+                ROUND(AVG(f.payment_value), 2) as avg_payment_value,
+                ROUND(COUNT(*) * 100.0 / SUM(COUNT(*)) OVER(), 1) as percentage_of_orders
+            FROM `olist_marts.fact_sales` f
+            {' '.join(joins)}
+            {where_clause}
+            GROUP BY p.total_installments
+            ORDER BY p.total_installments
+            """
+        
+        query = bind_query(
+            "installment_analysis", query,
+            year=year_param(year_filter), region=region_param(region_filter)
+        )
         
-        return execute_query(query)
+        return execute_query(query, use_cache=True)
         
     except Exception as e:
         logger.error(f"Failed to get installment analysis: {str(e)}")
         return pd.DataFrame()
 
-@st.cache_data(ttl=600)
-def get_seller_performance(year_filter: Optional[str] = None, region_filter: Optional[str] = None) -> pd.DataFrame:
+@marts_cached
+@result_schema(seller_region="category")
+@composable(region_filter=concat_slices("total_revenue", ascending=False))
+def get_seller_performance(year_filter: Optional[str] = None, region_filter: Optional[str] = None,
+                           approximate: bool = False) -> pd.DataFrame:
     """
     Get seller performance analysis for business question 6
     
     Args:
         year_filter (str, optional): Filter by specific year
         region_filter (str, optional): Filter by specific region
+        approximate (bool): Estimate distinct counts by merging HyperLogLog sketches
         
     Returns:
         pd.DataFrame: Seller performance metrics by region
     """
     try:
-        # Build query with optional filters
-        conditions = ["s.seller_region IS NOT NULL"]
-        joins = ["JOIN `olist_marts.dim_sellers` s ON f.seller_key = s.seller_key"]
+        aggregate = route_to_aggregate([
+            "year", "seller_region", "item_count", "total_item_value", "freight_value",
+            "order_sketch", "seller_sketch", "product_sketch"
+        ]) if approximate else None
+        
+        if aggregate:
+            conditions = ["a.seller_region IS NOT NULL"]
+            if year_filter and year_filter != "All Years":
+                conditions.append("a.year = @year")
+            if region_filter and region_filter != "All Regions":
+                conditions.append("a.seller_region = @region")
+            
+            query = f"""
+            SELECT 
+                a.seller_region,
+                HLL_COUNT.MERGE(a.seller_sketch) as unique_sellers,
+                HLL_COUNT.MERGE(a.order_sketch) as total_orders,
+                SUM(a.item_count) as total_items,
+                ROUND(SUM(a.total_item_value), 2) as total_revenue,
+                ROUND(SUM(a.total_item_value) / SUM(a.item_count), 2) as avg_item_value,
+                ROUND(SUM(a.total_item_value) / HLL_COUNT.MERGE(a.seller_sketch), 2) as revenue_per_seller,
+                HLL_COUNT.MERGE(a.product_sketch) as unique_products_sold,
+                ROUND(SUM(a.freight_value) / SUM(a.item_count), 2) as avg_freight_value,
+                ROUND(SUM(a.freight_value), 2) as total_freight_revenue
+            FROM `olist_marts.{aggregate}` a
+            WHERE {' AND '.join(conditions)}
+            GROUP BY a.seller_region
+            ORDER BY total_revenue DESC
+            """
+        else:
+            # Build query with optional filters
+            conditions = ["s.seller_region IS NOT NULL"]
+            joins = ["JOIN `olist_marts.dim_sellers` s ON f.seller_key = s.seller_key"]
         
-        if year_filter and year_filter != "All Years":
-            joins.append("JOIN `olist_marts.dim_date` d ON f.date_key = d.date_key")
-            conditions.append(f"d.year = {year_filter}")
+            if year_filter and year_filter != "All Years":
+                joins.append("JOIN `olist_marts.dim_date` d ON f.date_key = d.date_key")
+                conditions.append("d.year = @year")
             
-        if region_filter and region_filter != "All Regions":
-            conditions.append(f"s.seller_region = '{region_filter}'")
+            if region_filter and region_filter != "All Regions":
+                conditions.append("s.seller_region = @region")
         
-        where_clause = "WHERE " + " AND ".join(conditions)
+            where_clause = "WHERE " + " AND ".join(conditions)
         
-        query = f"""
-        SELECT 
-            s.seller_region,
-            COUNT(DISTINCT s.seller_key) as unique_sellers,
-            COUNT(DISTINCT f.order_key) as total_orders,
-            COUNT(f.order_item_sk) as total_items,
-            ROUND(SUM(f.total_item_value), 2) as total_revenue,
-            ROUND(AVG(f.total_item_value), 2) as avg_item_value,
-            ROUND(SUM(f.total_item_value) / COUNT(DISTINCT s.seller_key), 2) as revenue_per_seller,
-            COUNT(DISTINCT f.product_key) as unique_products_sold,
-            ROUND(AVG(f.freight_value), 2) as avg_freight_value,
-            ROUND(SUM(f.freight_value), 2) as total_freight_revenue
-        FROM `olist_marts.fact_sales` f
-        {' '.join(joins)}
-        {where_clause}
-        GROUP BY s.seller_region
-        ORDER BY total_revenue DESC
-        """
+            query = f"""
+            SELECT 
+                s.seller_region,
+                COUNT(DISTINCT s.seller_key) as unique_sellers,
+                COUNT(DISTINCT f.order_key) as total_orders,
+                COUNT(f.order_item_sk) as total_items,
+                ROUND(SUM(f.total_item_value), 2) as total_revenue,
+                ROUND(AVG(f.total_item_value), 2) as avg_item_value,
+                ROUND(SUM(f.total_item_value) / COUNT(DISTINCT s.seller_key), 2) as revenue_per_seller,
+                COUNT(DISTINCT f.product_key) as unique_products_sold,
+                ROUND(AVG(f.freight_value), 2) as avg_freight_value,
+                ROUND(SUM(f.freight_value), 2) as total_freight_revenue
+            FROM `olist_marts.fact_sales` f
+            {' '.join(joins)}
+            {where_clause}
+            GROUP BY s.seller_region
+            ORDER BY total_revenue DESC
+            """
+        
+        query = bind_query(
+            "seller_performance", query,
+            year=year_param(year_filter), region=region_param(region_filter)
+        )
         
-        return execute_query(query)
+        return execute_query(query, use_cache=True)
         
     except Exception as e:
         logger.error(f"Failed to get seller performance: {str(e)}")
         return pd.DataFrame()
 
-@st.cache_data(ttl=600)
+@marts_cached
+@result_schema(seller_region="category", seller_state="category")
+@composable(region_filter=concat_slices("total_revenue", ascending=False))
 def get_top_sellers(limit: int = 20, year_filter: Optional[str] = None, region_filter: Optional[str] = None) -> pd.DataFrame:
     """
     Get top individual sellers by performance
@@ -634,10 +1334,10 @@ def get_top_sellers(limit: int = 20, year_filter: Optional[str] = None, region_f
         
         if year_filter and year_filter != "All Years":
             joins.append("JOIN `olist_marts.dim_date` d ON f.date_key = d.date_key")
-            conditions.append(f"d.year = {year_filter}")
+            conditions.append("d.year = @year")
             
         if region_filter and region_filter != "All Regions":
-            conditions.append(f"s.seller_region = '{region_filter}'")
+            conditions.append("s.seller_region = @region")
         
         where_clause = "WHERE " + " AND ".join(conditions)
         
@@ -659,16 +1359,23 @@ def get_top_sellers(limit: int = 20, year_filter: Optional[str] = None, region_f
         {where_clause}
         GROUP BY s.seller_key, s.seller_region, s.seller_state, s.seller_city
         ORDER BY total_revenue DESC
-        LIMIT {limit}
+        LIMIT @limit
         """
         
-        return execute_query(query)
+        query = bind_query(
+            "top_sellers", query,
+            limit=limit, year=year_param(year_filter), region=region_param(region_filter)
+        )
+        
+        return execute_query(query, use_cache=True)
         
     except Exception as e:
         logger.error(f"Failed to get top sellers: {str(e)}")
         return pd.DataFrame()
 
-@st.cache_data(ttl=600)
+@marts_cached
+@result_schema(seller_region="category")
+@composable(region_filter=concat_slices("avg_revenue_per_seller", ascending=False))
 def get_seller_product_diversity(year_filter: Optional[str] = None, region_filter: Optional[str] = None) -> pd.DataFrame:
     """
     Get seller product diversity analysis
@@ -690,10 +1397,10 @@ def get_seller_product_diversity(year_filter: Optional[str] = None, region_filte
         
         if year_filter and year_filter != "All Years":
             joins.append("JOIN `olist_marts.dim_date` d ON f.date_key = d.date_key")
-            conditions.append(f"d.year = {year_filter}")
+            conditions.append("d.year = @year")
             
         if region_filter and region_filter != "All Regions":
-            conditions.append(f"s.seller_region = '{region_filter}'")
+            conditions.append("s.seller_region = @region")
         
         where_clause = "WHERE " + " AND ".join(conditions)
         
@@ -723,13 +1430,19 @@ def get_seller_product_diversity(year_filter: Optional[str] = None, region_filte
         ORDER BY avg_revenue_per_seller DESC
         """
         
-        return execute_query(query)
+        query = bind_query(
+            "seller_product_diversity", query,
+            year=year_param(year_filter), region=region_param(region_filter)
+        )
+        
+        return execute_query(query, use_cache=True)
         
     except Exception as e:
         logger.error(f"Failed to get seller product diversity: {str(e)}")
         return pd.DataFrame()
 
-@st.cache_data(ttl=600)
+@marts_cached
+@result_schema(review_category="category")
 def get_reviews_sales_correlation(year_filter: Optional[str] = None, region_filter: Optional[str] = None) -> pd.DataFrame:
     """
     Get reviews and sales correlation analysis for business question 7
@@ -748,11 +1461,11 @@ def get_reviews_sales_correlation(year_filter: Optional[str] = None, region_filt
         
         if year_filter and year_filter != "All Years":
             joins.append("JOIN `olist_marts.dim_date` d ON f.date_key = d.date_key")
-            conditions.append(f"d.year = {year_filter}")
+            conditions.append("d.year = @year")
             
         if region_filter and region_filter != "All Regions":
             joins.append("JOIN `olist_marts.dim_customers` c ON f.customer_key = c.customer_key")
-            conditions.append(f"c.customer_region = '{region_filter}'")
+            conditions.append("c.customer_region = @region")
         
         where_clause = ""
         if conditions:
@@ -786,13 +1499,20 @@ def get_reviews_sales_correlation(year_filter: Optional[str] = None, region_filt
         ORDER BY total_sales DESC
         """
         
-        return execute_query(query)
+        query = bind_query(
+            "reviews_sales_correlation", query,
+            year=year_param(year_filter), region=region_param(region_filter)
+        )
+        
+        return execute_query(query, use_cache=True)
         
     except Exception as e:
         logger.error(f"Failed to get reviews sales correlation: {str(e)}")
         return pd.DataFrame()
 
-@st.cache_data(ttl=600)
+@marts_cached
+@result_schema(review_score="int8")
+@composable(region_filter=_merge_review_score_distribution, year_filter=_merge_review_score_distribution)
 def get_review_score_distribution(year_filter: Optional[str] = None, region_filter: Optional[str] = None) -> pd.DataFrame:
     """
     Get detailed review score distribution analysis
@@ -811,11 +1531,11 @@ def get_review_score_distribution(year_filter: Optional[str] = None, region_filt
         
         if year_filter and year_filter != "All Years":
             joins.append("JOIN `olist_marts.dim_date` d ON f.date_key = d.date_key")
-            conditions.append(f"d.year = {year_filter}")
+            conditions.append("d.year = @year")
             
         if region_filter and region_filter != "All Regions":
             joins.append("JOIN `olist_marts.dim_customers` c ON f.customer_key = c.customer_key")
-            conditions.append(f"c.customer_region = '{region_filter}'")
+            conditions.append("c.customer_region = @region")
         
         where_clause = ""
         if conditions:
@@ -837,13 +1557,19 @@ def get_review_score_distribution(year_filter: Optional[str] = None, region_filt
         ORDER BY review_score
         """
         
-        return execute_query(query)
+        query = bind_query(
+            "review_score_distribution", query,
+            year=year_param(year_filter), region=region_param(region_filter)
+        )
+        
+        return execute_query(query, use_cache=True)
         
     except Exception as e:
         logger.error(f"Failed to get review score distribution: {str(e)}")
         return pd.DataFrame()
 
-@st.cache_data(ttl=600)
+@marts_cached
+@result_schema(timing_category="category")
 def get_review_timing_analysis(year_filter: Optional[str] = None, region_filter: Optional[str] = None) -> pd.DataFrame:
     """
     Get review timing impact analysis
@@ -865,11 +1591,11 @@ def get_review_timing_analysis(year_filter: Optional[str] = None, region_filter:
         
         if year_filter and year_filter != "All Years":
             joins.append("JOIN `olist_marts.dim_date` d ON f.date_key = d.date_key")
-            conditions.append(f"d.year = {year_filter}")
+            conditions.append("d.year = @year")
             
         if region_filter and region_filter != "All Regions":
             joins.append("JOIN `olist_marts.dim_customers` c ON f.customer_key = c.customer_key")
-            conditions.append(f"c.customer_region = '{region_filter}'")
+            conditions.append("c.customer_region = @region")
         
         where_clause = "WHERE " + " AND ".join(conditions)
         
@@ -903,13 +1629,67 @@ def get_review_timing_analysis(year_filter: Optional[str] = None, region_filter:
         ORDER BY avg_days_to_review
         """
         
-        return execute_query(query)
+        query = bind_query(
+            "review_timing_analysis", query,
+            year=year_param(year_filter), region=region_param(region_filter)
+        )
+        
+        return execute_query(query, use_cache=True)
         
     except Exception as e:
         logger.error(f"Failed to get review timing analysis: {str(e)}")
         return pd.DataFrame()
 
-@st.cache_data(ttl=600)
+def _delivery_patterns_query(year_filter: Optional[str] = None, region_filter: Optional[str] = None) -> ParameterizedQuery:
+    """Build the delivery patterns query (see get_delivery_patterns)"""
+    # Build query with optional filters
+    conditions = ["o.days_to_delivery IS NOT NULL"]
+    joins = [
+        "JOIN `olist_marts.dim_orders` o ON f.order_key = o.order_key",
+        "JOIN `olist_marts.dim_customers` c ON f.customer_key = c.customer_key"
+    ]
+    
+    if year_filter and year_filter != "All Years":
+        joins.append("JOIN `olist_marts.dim_date` d ON f.date_key = d.date_key")
+        conditions.append("d.year = @year")
+        
+    if region_filter and region_filter != "All Regions":
+        conditions.append("c.customer_region = @region")
+    
+    where_clause = "WHERE " + " AND ".join(conditions)
+    
+    query = f"""
+    SELECT 
+        c.customer_region,
+        COUNT(DISTINCT f.order_key) as total_orders,
+        COUNT(f.order_item_sk) as total_items,
+        ROUND(SUM(f.total_item_value), 2) as total_sales,
+        ROUND(AVG(o.days_to_delivery), 1) as avg_delivery_days,
+        ROUND(AVG(o.delivery_vs_estimate_days), 1) as avg_delivery_vs_estimate,
+        SUM(CASE WHEN o.is_delivered_on_time THEN 1 ELSE 0 END) as on_time_deliveries,
+        SUM(CASE WHEN NOT o.is_delivered_on_time THEN 1 ELSE 0 END) as late_deliveries,
+        ROUND(
+            SUM(CASE WHEN o.is_delivered_on_time THEN 1 ELSE 0 END) * 100.0 / COUNT(DISTINCT f.order_key), 
+            1
+        ) as on_time_delivery_rate,
+        ROUND(MIN(o.days_to_delivery), 1) as min_delivery_days,
+        ROUND(MAX(o.days_to_delivery), 1) as max_delivery_days,
+        ROUND(STDDEV(o.days_to_delivery), 1) as delivery_days_stddev
+    FROM `olist_marts.fact_sales` f
+    {' '.join(joins)}
+    {where_clause}
+    GROUP BY c.customer_region
+    ORDER BY avg_delivery_days ASC
+    """
+    
+    return bind_query(
+        "delivery_patterns", query,
+        year=year_param(year_filter), region=region_param(region_filter)
+    )
+
+@marts_cached
+@result_schema(customer_region="category")
+@composable(region_filter=concat_slices("avg_delivery_days"))
 def get_delivery_patterns(year_filter: Optional[str] = None, region_filter: Optional[str] = None) -> pd.DataFrame:
     """
     Get delivery time patterns analysis for business question 8
@@ -922,53 +1702,70 @@ def get_delivery_patterns(year_filter: Optional[str] = None, region_filter: Opti
         pd.DataFrame: Delivery performance metrics by region
     """
     try:
-        # Build query with optional filters
-        conditions = ["o.days_to_delivery IS NOT NULL"]
-        joins = [
-            "JOIN `olist_marts.dim_orders` o ON f.order_key = o.order_key",
-            "JOIN `olist_marts.dim_customers` c ON f.customer_key = c.customer_key"
-        ]
-        
-        if year_filter and year_filter != "All Years":
-            joins.append("JOIN `olist_marts.dim_date` d ON f.date_key = d.date_key")
-            conditions.append(f"d.year = {year_filter}")
-            
-        if region_filter and region_filter != "All Regions":
-            conditions.append(f"c.customer_region = '{region_filter}'")
-        
-        where_clause = "WHERE " + " AND ".join(conditions)
-        
-        query = f"""
-        SELECT 
-            c.customer_region,
-            COUNT(DISTINCT f.order_key) as total_orders,
-            COUNT(f.order_item_sk) as total_items,
-            ROUND(SUM(f.total_item_value), 2) as total_sales,
-            ROUND(AVG(o.days_to_delivery), 1) as avg_delivery_days,
-            ROUND(AVG(o.delivery_vs_estimate_days), 1) as avg_delivery_vs_estimate,
-            SUM(CASE WHEN o.is_delivered_on_time THEN 1 ELSE 0 END) as on_time_deliveries,
-            SUM(CASE WHEN NOT o.is_delivered_on_time THEN 1 ELSE 0 END) as late_deliveries,
-            ROUND(
-                SUM(CASE WHEN o.is_delivered_on_time THEN 1 ELSE 0 END) * 100.0 / COUNT(DISTINCT f.order_key), 
-                1
-            ) as on_time_delivery_rate,
-            ROUND(MIN(o.days_to_delivery), 1) as min_delivery_days,
-            ROUND(MAX(o.days_to_delivery), 1) as max_delivery_days,
-            ROUND(STDDEV(o.days_to_delivery), 1) as delivery_days_stddev
-        FROM `olist_marts.fact_sales` f
-        {' '.join(joins)}
-        {where_clause}
-        GROUP BY c.customer_region
-        ORDER BY avg_delivery_days ASC
-        """
-        
-        return execute_query(query)
+        return execute_query(_delivery_patterns_query(year_filter, region_filter), use_cache=True)
         
     except Exception as e:
         logger.error(f"Failed to get delivery patterns: {str(e)}")
         return pd.DataFrame()
 
-@st.cache_data(ttl=600)
+def _delivery_time_distribution_query(year_filter: Optional[str] = None, region_filter: Optional[str] = None) -> ParameterizedQuery:
+    """Build the delivery time distribution query (see get_delivery_time_distribution)"""
+    # Build query with optional filters
+    conditions = ["o.days_to_delivery IS NOT NULL"]
+    joins = [
+        "JOIN `olist_marts.dim_orders` o ON f.order_key = o.order_key",
+        "JOIN `olist_marts.dim_customers` c ON f.customer_key = c.customer_key"
+    ]
+    
+    if year_filter and year_filter != "All Years":
+        joins.append("JOIN `olist_marts.dim_date` d ON f.date_key = d.date_key")
+        conditions.append("d.year = @year")
+        
+    if region_filter and region_filter != "All Regions":
+        conditions.append("c.customer_region = @region")
+    
+    where_clause = "WHERE " + " AND ".join(conditions)
+    
+    query = f"""
+    SELECT 
+        CASE 
+            WHEN o.days_to_delivery <= 5 THEN 'Very Fast (≤5 days)'
+            WHEN o.days_to_delivery <= 10 THEN 'Fast (6-10 days)'
+            WHEN o.days_to_delivery <= 20 THEN 'Normal (11-20 days)'
+            WHEN o.days_to_delivery <= 30 THEN 'Slow (21-30 days)'
+            ELSE 'Very Slow (>30 days)'
+        END as delivery_speed_category,
+        COUNT(DISTINCT f.order_key) as total_orders,
+        COUNT(f.order_item_sk) as total_items,
+        ROUND(SUM(f.total_item_value), 2) as total_sales,
+        ROUND(AVG(o.days_to_delivery), 1) as avg_days_in_category,
+        SUM(CASE WHEN o.is_delivered_on_time THEN 1 ELSE 0 END) as on_time_orders,
+        ROUND(
+            SUM(CASE WHEN o.is_delivered_on_time THEN 1 ELSE 0 END) * 100.0 / COUNT(DISTINCT f.order_key), 
+            1
+        ) as on_time_rate,
+        ROUND(AVG(o.delivery_vs_estimate_days), 1) as avg_vs_estimate
+    FROM `olist_marts.fact_sales` f
+    {' '.join(joins)}
+    {where_clause}
+    GROUP BY 
+        CASE 
+            WHEN o.days_to_delivery <= 5 THEN 'Very Fast (≤5 days)'
+            WHEN o.days_to_delivery <= 10 THEN 'Fast (6-10 days)'
+            WHEN o.days_to_delivery <= 20 THEN 'Normal (11-20 days)'
+            WHEN o.days_to_delivery <= 30 THEN 'Slow (21-30 days)'
+            ELSE 'Very Slow (>30 days)'
+        END
+    ORDER BY avg_days_in_category
+    """
+    
+    return bind_query(
+        "delivery_time_distribution", query,
+        year=year_param(year_filter), region=region_param(region_filter)
+    )
+
+@marts_cached
+@result_schema(delivery_speed_category="category")
 def get_delivery_time_distribution(year_filter: Optional[str] = None, region_filter: Optional[str] = None) -> pd.DataFrame:
     """
     Get delivery time distribution analysis
@@ -981,62 +1778,67 @@ def get_delivery_time_distribution(year_filter: Optional[str] = None, region_fil
         pd.DataFrame: Delivery time distribution by categories
     """
     try:
-        # Build query with optional filters
-        conditions = ["o.days_to_delivery IS NOT NULL"]
-        joins = [
-            "JOIN `olist_marts.dim_orders` o ON f.order_key = o.order_key",
-            "JOIN `olist_marts.dim_customers` c ON f.customer_key = c.customer_key"
-        ]
-        
-        if year_filter and year_filter != "All Years":
-            joins.append("JOIN `olist_marts.dim_date` d ON f.date_key = d.date_key")
-            conditions.append(f"d.year = {year_filter}")
-            
-        if region_filter and region_filter != "All Regions":
-            conditions.append(f"c.customer_region = '{region_filter}'")
-        
-        where_clause = "WHERE " + " AND ".join(conditions)
-        
-        query = f"""
-        SELECT 
-            CASE 
-                WHEN o.days_to_delivery <= 5 THEN 'Very Fast (≤5 days)'
-                WHEN o.days_to_delivery <= 10 THEN 'Fast (6-10 days)'
-                WHEN o.days_to_delivery <= 20 THEN 'Normal (11-20 days)'
-                WHEN o.days_to_delivery <= 30 THEN 'Slow (21-30 days)'
-                ELSE 'Very Slow (>30 days)'
-            END as delivery_speed_category,
-            COUNT(DISTINCT f.order_key) as total_orders,
-            COUNT(f.order_item_sk) as total_items,
-            ROUND(SUM(f.total_item_value), 2) as total_sales,
-            ROUND(AVG(o.days_to_delivery), 1) as avg_days_in_category,
-            SUM(CASE WHEN o.is_delivered_on_time THEN 1 ELSE 0 END) as on_time_orders,
-            ROUND(
-                SUM(CASE WHEN o.is_delivered_on_time THEN 1 ELSE 0 END) * 100.0 / COUNT(DISTINCT f.order_key), 
-                1
-            ) as on_time_rate,
-            ROUND(AVG(o.delivery_vs_estimate_days), 1) as avg_vs_estimate
-        FROM `olist_marts.fact_sales` f
-        {' '.join(joins)}
-        {where_clause}
-        GROUP BY 
-            CASE 
-                WHEN o.days_to_delivery <= 5 THEN 'Very Fast (≤5 days)'
-                WHEN o.days_to_delivery <= 10 THEN 'Fast (6-10 days)'
-                WHEN o.days_to_delivery <= 20 THEN 'Normal (11-20 days)'
-                WHEN o.days_to_delivery <= 30 THEN 'Slow (21-30 days)'
-                ELSE 'Very Slow (>30 days)'
-            END
-        ORDER BY avg_days_in_category
-        """
-        
-        return execute_query(query)
+        return execute_query(_delivery_time_distribution_query(year_filter, region_filter), use_cache=True)
         
     except Exception as e:
         logger.error(f"Failed to get delivery time distribution: {str(e)}")
         return pd.DataFrame()
 
-@st.cache_data(ttl=600)
+def _delivery_efficiency_analysis_query(year_filter: Optional[str] = None, region_filter: Optional[str] = None) -> ParameterizedQuery:
+    """Build the delivery efficiency analysis query (see get_delivery_efficiency_analysis)"""
+    # Build query with optional filters
+    conditions = ["o.days_to_delivery IS NOT NULL"]
+    joins = [
+        "JOIN `olist_marts.dim_orders` o ON f.order_key = o.order_key",
+        "JOIN `olist_marts.dim_customers` c ON f.customer_key = c.customer_key",
+        "JOIN `olist_marts.dim_sellers` s ON f.seller_key = s.seller_key"
+    ]
+    
+    if year_filter and year_filter != "All Years":
+        joins.append("JOIN `olist_marts.dim_date` d ON f.date_key = d.date_key")
+        conditions.append("d.year = @year")
+        
+    if region_filter and region_filter != "All Regions":
+        conditions.append("c.customer_region = @region")
+    
+    where_clause = "WHERE " + " AND ".join(conditions)
+    
+    query = f"""
+    SELECT 
+        c.customer_region,
+        s.seller_region,
+        CASE 
+            WHEN c.customer_region = s.seller_region THEN 'Same Region'
+            ELSE 'Cross Region'
+        END as delivery_type,
+        COUNT(DISTINCT f.order_key) as total_orders,
+        ROUND(AVG(o.days_to_delivery), 1) as avg_delivery_days,
+        ROUND(AVG(o.delivery_vs_estimate_days), 1) as avg_vs_estimate,
+        ROUND(
+            SUM(CASE WHEN o.is_delivered_on_time THEN 1 ELSE 0 END) * 100.0 / COUNT(DISTINCT f.order_key), 
+            1
+        ) as on_time_rate,
+        ROUND(SUM(f.total_item_value), 2) as total_sales,
+        ROUND(AVG(f.freight_value), 2) as avg_freight_cost
+    FROM `olist_marts.fact_sales` f
+    {' '.join(joins)}
+    {where_clause}
+    GROUP BY c.customer_region, s.seller_region, 
+        CASE 
+            WHEN c.customer_region = s.seller_region THEN 'Same Region'
+            ELSE 'Cross Region'
+        END
+    ORDER BY avg_delivery_days ASC
+    """
+    
+    return bind_query(
+        "delivery_efficiency_analysis", query,
+        year=year_param(year_filter), region=region_param(region_filter)
+    )
+
+@marts_cached
+@result_schema(customer_region="category", seller_region="category", delivery_type="category")
+@composable(region_filter=concat_slices("avg_delivery_days"))
 def get_delivery_efficiency_analysis(year_filter: Optional[str] = None, region_filter: Optional[str] = None) -> pd.DataFrame:
     """
     Get delivery efficiency analysis by customer-seller region combinations
@@ -1049,57 +1851,54 @@ def get_delivery_efficiency_analysis(year_filter: Optional[str] = None, region_f
         pd.DataFrame: Delivery efficiency by region combinations
     """
     try:
-        # Build query with optional filters
-        conditions = ["o.days_to_delivery IS NOT NULL"]
-        joins = [
-            "JOIN `olist_marts.dim_orders` o ON f.order_key = o.order_key",
-            "JOIN `olist_marts.dim_customers` c ON f.customer_key = c.customer_key",
-            "JOIN `olist_marts.dim_sellers` s ON f.seller_key = s.seller_key"
-        ]
-        
-        if year_filter and year_filter != "All Years":
-            joins.append("JOIN `olist_marts.dim_date` d ON f.date_key = d.date_key")
-            conditions.append(f"d.year = {year_filter}")
-            
-        if region_filter and region_filter != "All Regions":
-            conditions.append(f"c.customer_region = '{region_filter}'")
-        
-        where_clause = "WHERE " + " AND ".join(conditions)
-        
-        query = f"""
-        SELECT 
-            c.customer_region,
-            s.seller_region,
-            CASE 
-                WHEN c.customer_region = s.seller_region THEN 'Same Region'
-                ELSE 'Cross Region'
-            END as delivery_type,
-            COUNT(DISTINCT f.order_key) as total_orders,
-            ROUND(AVG(o.days_to_delivery), 1) as avg_delivery_days,
-            ROUND(AVG(o.delivery_vs_estimate_days), 1) as avg_vs_estimate,
-            ROUND(
-                SUM(CASE WHEN o.is_delivered_on_time THEN 1 ELSE 0 END) * 100.0 / COUNT(DISTINCT f.order_key), 
-                1
-            ) as on_time_rate,
-            ROUND(SUM(f.total_item_value), 2) as total_sales,
-            ROUND(AVG(f.freight_value), 2) as avg_freight_cost
-        FROM `olist_marts.fact_sales` f
-        {' '.join(joins)}
-        {where_clause}
-        GROUP BY c.customer_region, s.seller_region, 
-            CASE 
-                WHEN c.customer_region = s.seller_region THEN 'Same Region'
-                ELSE 'Cross Region'
-            END
-        ORDER BY avg_delivery_days ASC
-        """
-        
-        return execute_query(query)
+        return execute_query(_delivery_efficiency_analysis_query(year_filter, region_filter), use_cache=True)
         
     except Exception as e:
         logger.error(f"Failed to get delivery efficiency analysis: {str(e)}")
         return pd.DataFrame()
 
+def get_delivery_tab(year_filter: Optional[str] = None, region_filter: Optional[str] = None) -> Dict[str, pd.DataFrame]:
+    """
+    Get all result sets of the delivery tab (business question 8)
+    
+    Results that are not cached yet are fetched together as one multi-statement script,
+    so the tab waits for one warehouse job instead of three; if the script fails, each
+    query runs on its own.
+    
+    Args:
+        year_filter (str, optional): Filter by specific year
+        region_filter (str, optional): Filter by specific region
+        
+    Returns:
+        Dict[str, pd.DataFrame]: Results of get_delivery_patterns ("patterns"),
+            get_delivery_time_distribution ("distribution") and
+            get_delivery_efficiency_analysis ("efficiency")
+    """
+    kwargs = {"year_filter": year_filter, "region_filter": region_filter}
+    functions = {
+        "patterns": (get_delivery_patterns, _delivery_patterns_query),
+        "distribution": (get_delivery_time_distribution, _delivery_time_distribution_query),
+        "efficiency": (get_delivery_efficiency_analysis, _delivery_efficiency_analysis_query),
+    }
+    
+    # Serving extracts and the fact cube answer locally; a script only saves warehouse round trips
+    if not serving_extracts.SERVING_EXTRACTS_ENABLED and not fact_cube.FACT_CUBE_ENABLED:
+        try:
+            missing = {
+                name: build(**kwargs) for name, (func, build) in functions.items()
+                if not is_query_cached(func, **kwargs)
+            }
+            if len(missing) > 1:
+                for name, df in execute_script(missing, use_cache=True).items():
+                    prime_query_cache(functions[name][0], df, **kwargs)
+        except Exception as e:
+            logger.warning(f"Failed to fetch the delivery tab as one script, running its queries separately: {str(e)}")
+    
+    # Cached by now, unless the script failed and they must run concurrently after all
+    return fetch_concurrently({
+        name: (lambda func=func: func(**kwargs)) for name, (func, _) in functions.items()
+    })
+
 def get_dashboard_summary() -> Dict[str, Any]:
     """
     Get summary metrics for dashboard overview
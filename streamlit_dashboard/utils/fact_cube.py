@@ -0,0 +1,631 @@
+"""
+In-Memory Fact Cube for Olist Analytics Dashboard
+Answers the data_queries business-question functions locally from a denormalized,
+column-pruned copy of fact_sales loaded once per marts version
+"""
+
+import logging
+import os
+import threading
+import time
+from typing import Any, Callable, Dict, Optional
+
+import numpy as np
+import pandas as pd
+
+from .bigquery_client import arrow_to_dataframe, execute_query_arrow, get_marts_version
+from .query_telemetry import QueryStats, record_query
+from .query_templates import ParameterizedQuery, region_param, year_param
+
+logger = logging.getLogger(__name__)
+
+# Opt-in: answer get_* functions from the in-memory cube instead of the warehouse
+FACT_CUBE_ENABLED = os.getenv("FACT_CUBE_ENABLED", "false").lower() in ("1", "true", "yes")
+
+# One row per order item with every dimension attribute the dashboard filters or groups by.
+# Dimensions are LEFT JOINed and flagged with has_* so each function can reproduce the
+# INNER JOINs of its SQL counterpart.
+CUBE_QUERY = """
+SELECT
+    f.order_key,
+    f.order_item_sk,
+    f.customer_key,
+    f.seller_key,
+    f.product_key,
+    f.total_item_value,
+    f.payment_value,
+    f.freight_value,
+    f.item_price,
+    d.date_key IS NOT NULL as has_date,
+    d.year,
+    d.month,
+    d.month_name,
+    d.full_date,
+    c.customer_key IS NOT NULL as has_customer,
+    c.customer_region,
+    c.customer_state,
+    s.seller_key IS NOT NULL as has_seller,
+    s.seller_region,
+    s.seller_state,
+    s.seller_city,
+    p.product_key IS NOT NULL as has_product,
+    p.product_category_english,
+    pay.payment_key IS NOT NULL as has_payment,
+    pay.primary_payment_type,
+    pay.total_installments,
+    pay.uses_credit_card,
+    pay.uses_boleto,
+    pay.uses_voucher,
+    pay.payment_methods_count,
+    r.review_key IS NOT NULL as has_review,
+    r.review_score,
+    r.days_to_review,
+    o.order_key IS NOT NULL as has_order,
+    o.days_to_delivery,
+    o.delivery_vs_estimate_days,
+    o.is_delivered_on_time
+FROM `olist_marts.fact_sales` f
+LEFT JOIN `olist_marts.dim_date` d ON f.date_key = d.date_key
+LEFT JOIN `olist_marts.dim_customers` c ON f.customer_key = c.customer_key
+LEFT JOIN `olist_marts.dim_sellers` s ON f.seller_key = s.seller_key
+LEFT JOIN `olist_marts.dim_products` p ON f.product_key = p.product_key
+LEFT JOIN `olist_marts.dim_payments` pay ON f.payment_key = pay.payment_key
+LEFT JOIN `olist_marts.dim_reviews` r ON f.review_key = r.review_key
+LEFT JOIN `olist_marts.dim_orders` o ON f.order_key = o.order_key
+"""
+
+_cube_lock = threading.Lock()
+_cube_state: Dict[str, Any] = {"version": None, "frame": None}
+
+# data_queries function name -> local implementation with the same signature
+CUBE_QUERIES: Dict[str, Callable[..., pd.DataFrame]] = {}
+
+def cube_query(function_name: str) -> Callable:
+    """Register a local implementation of a data_queries function"""
+    def decorator(func: Callable[..., pd.DataFrame]) -> Callable[..., pd.DataFrame]:
+        CUBE_QUERIES[function_name] = func
+        return func
+    return decorator
+
+def _build_cube(df: pd.DataFrame) -> pd.DataFrame:
+    """Dictionary-encode the low-cardinality columns and precompute row-level flags"""
+    # Customer and seller columns share categories so they can be compared directly
+    for customer_column, seller_column in (("customer_region", "seller_region"),
+                                           ("customer_state", "seller_state")):
+        values = pd.concat([df[customer_column], df[seller_column]]).dropna().unique()
+        dtype = pd.CategoricalDtype(sorted(values))
+        df[customer_column] = df[customer_column].astype(dtype)
+        df[seller_column] = df[seller_column].astype(dtype)
+
+    for column in ("seller_city", "month_name", "product_category_english", "primary_payment_type"):
+        df[column] = df[column].astype("category")
+
+    df["full_date"] = pd.to_datetime(df["full_date"])
+
+    # SQL CASE WHEN flag THEN 1 ELSE 0 treats NULL as false
+    for column in ("uses_credit_card", "uses_boleto", "uses_voucher"):
+        df[column] = df[column].fillna(False).astype(bool)
+    df["is_on_time"] = df["is_delivered_on_time"].eq(True).fillna(False).astype(bool)
+    df["is_late"] = df["is_delivered_on_time"].eq(False).fillna(False).astype(bool)
+
+    return df
+
+def load_cube(force_reload: bool = False) -> pd.DataFrame:
+    """
+    Get the fact cube for the current marts version, loading it if needed
+
+    Args:
+        force_reload (bool): Reload even if the cached cube matches the marts version
+
+    Returns:
+        pd.DataFrame: One row per order item with dimension attributes
+
+    Raises:
+        Exception: If the cube cannot be loaded
+    """
+    version = get_marts_version()
+    with _cube_lock:
+        if not force_reload and _cube_state["version"] == version:
+            return _cube_state["frame"]
+
+        start = time.perf_counter()
+        table = execute_query_arrow(ParameterizedQuery("fact_cube", CUBE_QUERY))
+        frame = _build_cube(arrow_to_dataframe(table))
+
+        _cube_state["version"] = version
+        _cube_state["frame"] = frame
+        logger.info(
+            f"Fact cube loaded for marts version {version}: {len(frame):,} rows, "
+            f"{frame.memory_usage(deep=True).sum() / (1024 ** 2):.1f} MiB "
+            f"in {time.perf_counter() - start:.1f}s"
+        )
+        return frame
+
+def answer(function_name: str, arguments: Dict[str, Any]) -> Optional[pd.DataFrame]:
+    """
+    Answer a data_queries function from the fact cube
+
+    Args:
+        function_name (str): Name of the data_queries function, e.g. "get_payment_analysis"
+        arguments (Dict[str, Any]): Its bound arguments, including defaults
+
+    Returns:
+        pd.DataFrame: Query results, or None if the function is not supported or the
+            cube is unavailable (the caller then queries the warehouse)
+    """
+    implementation = CUBE_QUERIES.get(function_name)
+    if implementation is None:
+        return None
+    # Distinct counts are exact and cheap here, so sketch-based estimates are never needed
+    arguments = {name: value for name, value in arguments.items() if name != "approximate"}
+
+    start = time.perf_counter()
+    stats = QueryStats(caller=function_name, template_id=function_name[len("get_"):],
+                       backend="fact_cube", source="fact_cube")
+    try:
+        df = implementation(load_cube(), **arguments)
+        stats.rows = len(df)
+        return df
+    except Exception as e:
+        stats.error = str(e)
+        logger.warning(f"Fact cube could not answer {function_name}, using the warehouse: {str(e)}")
+        return None
+    finally:
+        stats.total_ms = (time.perf_counter() - start) * 1000
+        record_query(stats)
+
+def _slice(cube: pd.DataFrame, year_filter: Optional[str] = None, region_filter: Optional[str] = None,
+           region_column: str = "customer_region", require=()) -> pd.DataFrame:
+    """
+    Select the cube rows a query would see
+
+    Args:
+        cube (pd.DataFrame): Fact cube
+        year_filter (str, optional): Sidebar year selection
+        region_filter (str, optional): Sidebar region selection
+        region_column (str): Column the region filter applies to
+        require (Iterable[str]): Dimensions the query INNER JOINs (e.g. "customer")
+
+    Returns:
+        pd.DataFrame: Matching rows
+    """
+    mask = np.ones(len(cube), dtype=bool)
+    for dimension in require:
+        mask &= cube[f"has_{dimension}"].to_numpy(dtype=bool)
+
+    year = year_param(year_filter)
+    if year is not None:
+        mask &= (cube["has_date"] & cube["year"].eq(year)).fillna(False).to_numpy(dtype=bool)
+
+    region = region_param(region_filter)
+    if region is not None:
+        mask &= cube[region_column].eq(region).fillna(False).to_numpy(dtype=bool)
+
+    return cube[mask]
+
+def _group(frame: pd.DataFrame, keys, **aggregations) -> pd.DataFrame:
+    """GROUP BY with SQL semantics: NULL keys form their own group, no empty categories"""
+    return frame.groupby(keys, dropna=False, observed=True, sort=False).agg(**aggregations).reset_index()
+
+def _same_region(customer_region: pd.Series, seller_region: pd.Series) -> pd.Series:
+    """'Same Region' when both regions are known and equal, like SQL's NULL-aware equality"""
+    same = (customer_region == seller_region) & customer_region.notna() & seller_region.notna()
+    return pd.Series(np.where(same, "Same Region", "Cross Region"), index=customer_region.index)
+
+@cube_query("get_monthly_sales_trends")
+def monthly_sales_trends(cube: pd.DataFrame, year_filter=None, region_filter=None) -> pd.DataFrame:
+    rows = _slice(cube, year_filter, region_filter, require=("date", "customer"))
+    df = _group(
+        rows, ["year", "month", "month_name"],
+        first_date=("full_date", "min"),
+        total_orders=("order_key", "nunique"),
+        total_items=("order_item_sk", "count"),
+        sales=("total_item_value", "sum"),
+        payments=("payment_value", "sum")
+    )
+    df["month_year"] = df["first_date"].dt.strftime("%Y-%m")
+    df["total_sales"] = df["sales"].round(2)
+    df["total_payments"] = df["payments"].round(2)
+    df["avg_order_value"] = (df["sales"] / df["total_orders"]).round(2)
+    df["avg_payment_value"] = (df["payments"] / df["total_orders"]).round(2)
+    df = df.sort_values(["year", "month"]).reset_index(drop=True)
+    return df[["month_year", "year", "month", "month_name", "total_orders", "total_items",
+               "total_sales", "total_payments", "avg_order_value", "avg_payment_value"]]
+
+@cube_query("get_top_products_categories")
+def top_products_categories(cube: pd.DataFrame, limit=20, year_filter=None, region_filter=None) -> pd.DataFrame:
+    rows = _slice(cube, year_filter, region_filter, require=("product",))
+    rows = rows[rows["product_category_english"].notna()]
+    df = _group(
+        rows, ["product_category_english"],
+        unique_products=("product_key", "nunique"),
+        items_sold=("order_item_sk", "count"),
+        total_revenue=("total_item_value", "sum"),
+        avg_item_value=("total_item_value", "mean"),
+        total_freight=("freight_value", "sum"),
+        total_item_price=("item_price", "sum")
+    ).rename(columns={"product_category_english": "category"})
+    df = df.round({"total_revenue": 2, "avg_item_value": 2, "total_freight": 2, "total_item_price": 2})
+    return df.sort_values("total_revenue", ascending=False).head(limit).reset_index(drop=True)
+
+@cube_query("get_sales_by_region")
+def sales_by_region(cube: pd.DataFrame, year_filter=None) -> pd.DataFrame:
+    rows = _slice(cube, year_filter, require=("customer", "seller"))
+    rows = rows[rows["customer_region"].notna() & rows["seller_region"].notna()]
+    df = _group(
+        rows, ["customer_region", "seller_region"],
+        total_orders=("order_key", "nunique"),
+        total_items=("order_item_sk", "count"),
+        total_sales=("total_item_value", "sum"),
+        avg_order_value=("total_item_value", "mean"),
+        unique_customers=("customer_key", "nunique"),
+        unique_sellers=("seller_key", "nunique")
+    )
+    df = df.round({"total_sales": 2, "avg_order_value": 2})
+    return df.sort_values("total_sales", ascending=False).reset_index(drop=True)
+
+@cube_query("get_sales_by_state")
+def sales_by_state(cube: pd.DataFrame, year_filter=None, region_filter=None) -> pd.DataFrame:
+    rows = _slice(cube, year_filter, region_filter, require=("customer",))
+    rows = rows[rows["customer_state"].notna()]
+    df = _group(
+        rows, ["customer_state", "customer_region"],
+        total_orders=("order_key", "nunique"),
+        total_items=("order_item_sk", "count"),
+        total_sales=("total_item_value", "sum"),
+        avg_order_value=("total_item_value", "mean"),
+        unique_customers=("customer_key", "nunique")
+    )
+    df = df.round({"total_sales": 2, "avg_order_value": 2})
+    return df.sort_values("total_sales", ascending=False).reset_index(drop=True)
+
+@cube_query("get_customer_seller_flow")
+def customer_seller_flow(cube: pd.DataFrame, year_filter=None) -> pd.DataFrame:
+    rows = _slice(cube, year_filter, require=("customer", "seller"))
+    rows = rows[rows["customer_region"].notna() & rows["seller_region"].notna()]
+    rows = rows.assign(transaction_type=_same_region(rows["customer_region"], rows["seller_region"]))
+    df = _group(
+        rows, ["transaction_type", "customer_region", "seller_region"],
+        total_orders=("order_key", "nunique"),
+        total_sales=("total_item_value", "sum"),
+        unique_customers=("customer_key", "nunique"),
+        unique_sellers=("seller_key", "nunique")
+    )
+    df["total_sales"] = df["total_sales"].round(2)
+    return df.sort_values("total_sales", ascending=False).reset_index(drop=True)
+
+def _customer_lifetime_days(dates: pd.core.groupby.SeriesGroupBy) -> pd.Series:
+    """DATE_DIFF(MAX(date), MIN(date), DAY) per group"""
+    return (dates.max() - dates.min()).dt.days
+
+@cube_query("get_customer_behavior")
+def customer_behavior(cube: pd.DataFrame, year_filter=None, region_filter=None) -> pd.DataFrame:
+    rows = _slice(cube, year_filter, region_filter, require=("customer", "date"))
+
+    # Order level first, then customer level, as in the SQL
+    orders = _group(
+        rows, ["order_key", "customer_key", "customer_region", "full_date"],
+        order_total_value=("total_item_value", "sum")
+    )
+    by_customer = orders.groupby(["customer_key", "customer_region"], dropna=False, observed=True)
+    customers = by_customer.agg(
+        order_count=("order_key", "nunique"),
+        total_spent=("order_total_value", "sum"),
+        avg_order_value=("order_total_value", "mean")
+    )
+    customers["total_spent"] = customers["total_spent"].round(2)
+    customers["avg_order_value"] = customers["avg_order_value"].round(2)
+    customers["customer_lifetime_days"] = _customer_lifetime_days(by_customer["full_date"])
+    customers = customers.reset_index()
+    customers["is_one_time"] = customers["order_count"].eq(1)
+    customers["is_repeat"] = customers["order_count"].gt(1)
+
+    df = _group(
+        customers, ["customer_region"],
+        customer_count=("customer_key", "size"),
+        avg_orders_per_customer=("order_count", "mean"),
+        avg_customer_lifetime_value=("total_spent", "mean"),
+        avg_order_value=("avg_order_value", "mean"),
+        avg_customer_lifetime_days=("customer_lifetime_days", "mean"),
+        one_time_customers=("is_one_time", "sum"),
+        repeat_customers=("is_repeat", "sum")
+    )
+    df = df.round({"avg_orders_per_customer": 1, "avg_customer_lifetime_value": 2,
+                   "avg_order_value": 2, "avg_customer_lifetime_days": 1})
+    return df.sort_values("avg_customer_lifetime_value", ascending=False).reset_index(drop=True)
+
+@cube_query("get_customer_segmentation")
+def customer_segmentation(cube: pd.DataFrame, year_filter=None, region_filter=None) -> pd.DataFrame:
+    rows = _slice(cube, year_filter, region_filter, require=("customer", "date"))
+    by_customer = rows.groupby(["customer_key", "customer_region"], dropna=False, observed=True)
+    customers = by_customer.agg(
+        order_count=("order_key", "nunique"),
+        total_spent=("total_item_value", "sum"),
+        avg_order_value=("total_item_value", "mean")
+    )
+    customers["total_spent"] = customers["total_spent"].round(2)
+    customers["avg_order_value"] = customers["avg_order_value"].round(2)
+    customers["customer_lifetime_days"] = _customer_lifetime_days(by_customer["full_date"])
+    customers = customers.reset_index()
+
+    order_count = customers["order_count"]
+    total_spent = customers["total_spent"]
+    customers["customer_segment"] = np.select(
+        [order_count == 1, order_count.between(2, 5), order_count > 5],
+        ["One-Time Customer", "Regular Customer", "Loyal Customer"],
+        default=None
+    )
+    # Same gaps as the SQL: totals strictly between 100 and 101 fall in no segment
+    customers["value_segment"] = np.select(
+        [total_spent <= 100, total_spent.between(101, 500), total_spent > 500],
+        ["Low Value", "Medium Value", "High Value"],
+        default=None
+    )
+
+    df = _group(
+        customers, ["customer_segment", "value_segment"],
+        customer_count=("customer_key", "size"),
+        avg_orders=("order_count", "mean"),
+        avg_lifetime_value=("total_spent", "mean"),
+        avg_order_value=("avg_order_value", "mean"),
+        avg_lifetime_days=("customer_lifetime_days", "mean"),
+        segment_total_value=("total_spent", "sum")
+    )
+    df = df.round({"avg_orders": 1, "avg_lifetime_value": 2, "avg_order_value": 2,
+                   "avg_lifetime_days": 1, "segment_total_value": 2})
+    return df.sort_values("segment_total_value", ascending=False).reset_index(drop=True)
+
+@cube_query("get_customer_frequency_analysis")
+def customer_frequency_analysis(cube: pd.DataFrame, year_filter=None, region_filter=None) -> pd.DataFrame:
+    rows = _slice(cube, year_filter, region_filter, require=("customer", "date"))
+    customers = _group(
+        rows, ["customer_key"],
+        order_count=("order_key", "nunique"),
+        total_spent=("total_item_value", "sum")
+    )
+    customers["total_spent"] = customers["total_spent"].round(2)
+
+    df = _group(
+        customers, ["order_count"],
+        customer_count=("customer_key", "size"),
+        avg_customer_value=("total_spent", "mean"),
+        total_segment_value=("total_spent", "sum")
+    )
+    df["percentage_of_customers"] = (df["customer_count"] * 100.0 / df["customer_count"].sum()).round(1)
+    df = df.round({"avg_customer_value": 2, "total_segment_value": 2})
+    return df.sort_values("order_count").reset_index(drop=True)
+
+@cube_query("get_payment_analysis")
+def payment_analysis(cube: pd.DataFrame, year_filter=None, region_filter=None) -> pd.DataFrame:
+    rows = _slice(cube, year_filter, region_filter, require=("payment",))
+    df = _group(
+        rows, ["primary_payment_type"],
+        total_orders=("order_key", "nunique"),
+        total_sales=("total_item_value", "sum"),
+        avg_order_value=("total_item_value", "mean"),
+        avg_installments=("total_installments", "mean"),
+        credit_card_orders=("uses_credit_card", "sum"),
+        boleto_orders=("uses_boleto", "sum"),
+        voucher_orders=("uses_voucher", "sum"),
+        total_payments=("payment_value", "sum"),
+        avg_payment_methods_count=("payment_methods_count", "mean")
+    )
+    df = df.round({"total_sales": 2, "avg_order_value": 2, "avg_installments": 1,
+                   "total_payments": 2, "avg_payment_methods_count": 1})
+    return df.sort_values("total_sales", ascending=False).reset_index(drop=True)
+
+@cube_query("get_installment_analysis")
+def installment_analysis(cube: pd.DataFrame, year_filter=None, region_filter=None) -> pd.DataFrame:
+    rows = _slice(cube, year_filter, region_filter, require=("payment",))
+    df = _group(
+        rows, ["total_installments"],
+        order_count=("order_key", "nunique"),
+        total_sales=("total_item_value", "sum"),
+        avg_order_value=("total_item_value", "mean"),
+        total_payments=("payment_value", "sum"),
+        avg_payment_value=("payment_value", "mean"),
+        row_count=("order_key", "size")
+    )
+    df["percentage_of_orders"] = (df["row_count"] * 100.0 / df["row_count"].sum()).round(1)
+    df = df.drop(columns="row_count").round({"total_sales": 2, "avg_order_value": 2,
+                                              "total_payments": 2, "avg_payment_value": 2})
+    return df.sort_values("total_installments").reset_index(drop=True)
+
+@cube_query("get_seller_performance")
+def seller_performance(cube: pd.DataFrame, year_filter=None, region_filter=None) -> pd.DataFrame:
+    rows = _slice(cube, year_filter, region_filter, region_column="seller_region", require=("seller",))
+    rows = rows[rows["seller_region"].notna()]
+    df = _group(
+        rows, ["seller_region"],
+        unique_sellers=("seller_key", "nunique"),
+        total_orders=("order_key", "nunique"),
+        total_items=("order_item_sk", "count"),
+        total_revenue=("total_item_value", "sum"),
+        avg_item_value=("total_item_value", "mean"),
+        unique_products_sold=("product_key", "nunique"),
+        avg_freight_value=("freight_value", "mean"),
+        total_freight_revenue=("freight_value", "sum")
+    )
+    df.insert(6, "revenue_per_seller", (df["total_revenue"] / df["unique_sellers"]).round(2))
+    df = df.round({"total_revenue": 2, "avg_item_value": 2, "avg_freight_value": 2,
+                   "total_freight_revenue": 2})
+    return df.sort_values("total_revenue", ascending=False).reset_index(drop=True)
+
+@cube_query("get_top_sellers")
+def top_sellers(cube: pd.DataFrame, limit=20, year_filter=None, region_filter=None) -> pd.DataFrame:
+    rows = _slice(cube, year_filter, region_filter, region_column="seller_region", require=("seller",))
+    rows = rows[rows["seller_region"].notna()]
+    df = _group(
+        rows, ["seller_key", "seller_region", "seller_state", "seller_city"],
+        total_orders=("order_key", "nunique"),
+        total_items=("order_item_sk", "count"),
+        total_revenue=("total_item_value", "sum"),
+        avg_item_value=("total_item_value", "mean"),
+        unique_products_sold=("product_key", "nunique"),
+        total_freight_revenue=("freight_value", "sum"),
+        unique_customers_served=("customer_key", "nunique")
+    )
+    df = df.round({"total_revenue": 2, "avg_item_value": 2, "total_freight_revenue": 2})
+    return df.sort_values("total_revenue", ascending=False).head(limit).reset_index(drop=True)
+
+@cube_query("get_seller_product_diversity")
+def seller_product_diversity(cube: pd.DataFrame, year_filter=None, region_filter=None) -> pd.DataFrame:
+    rows = _slice(cube, year_filter, region_filter, region_column="seller_region",
+                  require=("seller", "product"))
+    rows = rows[rows["seller_region"].notna() & rows["product_category_english"].notna()]
+    sellers = _group(
+        rows, ["seller_region", "seller_key"],
+        category_count=("product_category_english", "nunique"),
+        product_count=("product_key", "nunique"),
+        total_revenue=("total_item_value", "sum")
+    )
+    sellers["total_revenue"] = sellers["total_revenue"].round(2)
+    sellers["is_single_category"] = sellers["category_count"].eq(1)
+    sellers["is_diverse"] = sellers["category_count"].gt(3)
+
+    df = _group(
+        sellers, ["seller_region"],
+        seller_count=("seller_key", "size"),
+        avg_categories_per_seller=("category_count", "mean"),
+        avg_products_per_seller=("product_count", "mean"),
+        avg_revenue_per_seller=("total_revenue", "mean"),
+        single_category_sellers=("is_single_category", "sum"),
+        diverse_sellers=("is_diverse", "sum")
+    )
+    df = df.round({"avg_categories_per_seller": 1, "avg_products_per_seller": 1,
+                   "avg_revenue_per_seller": 2})
+    return df.sort_values("avg_revenue_per_seller", ascending=False).reset_index(drop=True)
+
+def _review_category(rows: pd.DataFrame) -> np.ndarray:
+    """Review bucket per row; a review without a score falls through to 'Negative' like the SQL"""
+    return np.select(
+        [~rows["has_review"].to_numpy(dtype=bool),
+         rows["review_score"].ge(4).fillna(False).to_numpy(dtype=bool),
+         rows["review_score"].eq(3).fillna(False).to_numpy(dtype=bool)],
+        ["No Review", "Positive (4-5)", "Neutral (3)"],
+        default="Negative (1-2)"
+    )
+
+@cube_query("get_reviews_sales_correlation")
+def reviews_sales_correlation(cube: pd.DataFrame, year_filter=None, region_filter=None) -> pd.DataFrame:
+    rows = _slice(cube, year_filter, region_filter)
+    rows = rows.assign(
+        review_category=_review_category(rows),
+        score_or_zero=rows["review_score"].fillna(0)
+    )
+    df = _group(
+        rows, ["review_category"],
+        total_items=("order_item_sk", "count"),
+        total_sales=("total_item_value", "sum"),
+        avg_item_value=("total_item_value", "mean"),
+        avg_review_score=("score_or_zero", "mean"),
+        reviews_count=("has_review", "sum"),
+        row_count=("order_key", "size"),
+        total_orders=("order_key", "nunique")
+    )
+    df.insert(6, "no_review_count", df["row_count"] - df["reviews_count"])
+    df = df.drop(columns="row_count").round({"total_sales": 2, "avg_item_value": 2, "avg_review_score": 1})
+    return df.sort_values("total_sales", ascending=False).reset_index(drop=True)
+
+@cube_query("get_review_score_distribution")
+def review_score_distribution(cube: pd.DataFrame, year_filter=None, region_filter=None) -> pd.DataFrame:
+    rows = _slice(cube, year_filter, region_filter)
+    rows = rows.assign(score_or_zero=rows["review_score"].fillna(0))
+    df = _group(
+        rows, ["score_or_zero"],
+        total_items=("order_item_sk", "count"),
+        total_sales=("total_item_value", "sum"),
+        avg_item_value=("total_item_value", "mean"),
+        total_orders=("order_key", "nunique"),
+        actual_reviews=("has_review", "sum")
+    ).rename(columns={"score_or_zero": "review_score"})
+    df["percentage_of_items"] = (df["total_items"] * 100.0 / df["total_items"].sum()).round(1)
+    df = df.round({"total_sales": 2, "avg_item_value": 2})
+    return df.sort_values("review_score").reset_index(drop=True)
+
+@cube_query("get_review_timing_analysis")
+def review_timing_analysis(cube: pd.DataFrame, year_filter=None, region_filter=None) -> pd.DataFrame:
+    rows = _slice(cube, year_filter, region_filter, require=("review", "order"))
+    rows = rows[rows["days_to_review"].notna()]
+    days = rows["days_to_review"].to_numpy(dtype=float)
+    rows = rows.assign(timing_category=np.select(
+        [days <= 7, days <= 30, days <= 90],
+        ["Quick (≤7 days)", "Normal (8-30 days)", "Delayed (31-90 days)"],
+        default="Very Late (>90 days)"
+    ))
+    df = _group(
+        rows, ["timing_category"],
+        review_count=("order_key", "size"),
+        avg_review_score=("review_score", "mean"),
+        total_sales=("total_item_value", "sum"),
+        avg_item_value=("total_item_value", "mean"),
+        avg_days_to_review=("days_to_review", "mean")
+    )
+    df = df.round({"avg_review_score": 1, "total_sales": 2, "avg_item_value": 2, "avg_days_to_review": 1})
+    return df.sort_values("avg_days_to_review").reset_index(drop=True)
+
+def _delivered_rows(cube: pd.DataFrame, year_filter, region_filter, require) -> pd.DataFrame:
+    """Rows of delivered orders for the delivery queries"""
+    rows = _slice(cube, year_filter, region_filter, require=require)
+    return rows[rows["days_to_delivery"].notna()]
+
+@cube_query("get_delivery_patterns")
+def delivery_patterns(cube: pd.DataFrame, year_filter=None, region_filter=None) -> pd.DataFrame:
+    rows = _delivered_rows(cube, year_filter, region_filter, ("order", "customer"))
+    df = _group(
+        rows, ["customer_region"],
+        total_orders=("order_key", "nunique"),
+        total_items=("order_item_sk", "count"),
+        total_sales=("total_item_value", "sum"),
+        avg_delivery_days=("days_to_delivery", "mean"),
+        avg_delivery_vs_estimate=("delivery_vs_estimate_days", "mean"),
+        on_time_deliveries=("is_on_time", "sum"),
+        late_deliveries=("is_late", "sum"),
+        min_delivery_days=("days_to_delivery", "min"),
+        max_delivery_days=("days_to_delivery", "max"),
+        delivery_days_stddev=("days_to_delivery", "std")
+    )
+    df.insert(8, "on_time_delivery_rate", (df["on_time_deliveries"] * 100.0 / df["total_orders"]).round(1))
+    df = df.round({"total_sales": 2, "avg_delivery_days": 1, "avg_delivery_vs_estimate": 1,
+                   "min_delivery_days": 1, "max_delivery_days": 1, "delivery_days_stddev": 1})
+    return df.sort_values("avg_delivery_days").reset_index(drop=True)
+
+@cube_query("get_delivery_time_distribution")
+def delivery_time_distribution(cube: pd.DataFrame, year_filter=None, region_filter=None) -> pd.DataFrame:
+    rows = _delivered_rows(cube, year_filter, region_filter, ("order", "customer"))
+    days = rows["days_to_delivery"].to_numpy(dtype=float)
+    rows = rows.assign(delivery_speed_category=np.select(
+        [days <= 5, days <= 10, days <= 20, days <= 30],
+        ["Very Fast (≤5 days)", "Fast (6-10 days)", "Normal (11-20 days)", "Slow (21-30 days)"],
+        default="Very Slow (>30 days)"
+    ))
+    df = _group(
+        rows, ["delivery_speed_category"],
+        total_orders=("order_key", "nunique"),
+        total_items=("order_item_sk", "count"),
+        total_sales=("total_item_value", "sum"),
+        avg_days_in_category=("days_to_delivery", "mean"),
+        on_time_orders=("is_on_time", "sum"),
+        avg_vs_estimate=("delivery_vs_estimate_days", "mean")
+    )
+    df.insert(6, "on_time_rate", (df["on_time_orders"] * 100.0 / df["total_orders"]).round(1))
+    df = df.round({"total_sales": 2, "avg_days_in_category": 1, "avg_vs_estimate": 1})
+    return df.sort_values("avg_days_in_category").reset_index(drop=True)
+
+@cube_query("get_delivery_efficiency_analysis")
+def delivery_efficiency_analysis(cube: pd.DataFrame, year_filter=None, region_filter=None) -> pd.DataFrame:
+    rows = _delivered_rows(cube, year_filter, region_filter, ("order", "customer", "seller"))
+    rows = rows.assign(delivery_type=_same_region(rows["customer_region"], rows["seller_region"]))
+    df = _group(
+        rows, ["customer_region", "seller_region", "delivery_type"],
+        total_orders=("order_key", "nunique"),
+        avg_delivery_days=("days_to_delivery", "mean"),
+        avg_vs_estimate=("delivery_vs_estimate_days", "mean"),
+        on_time=("is_on_time", "sum"),
+        total_sales=("total_item_value", "sum"),
+        avg_freight_cost=("freight_value", "mean")
+    )
+    df.insert(6, "on_time_rate", (df["on_time"] * 100.0 / df["total_orders"]).round(1))
+    df = df.drop(columns="on_time").round({"avg_delivery_days": 1, "avg_vs_estimate": 1,
+                                           "total_sales": 2, "avg_freight_cost": 2})
+    return df.sort_values("avg_delivery_days").reset_index(drop=True)
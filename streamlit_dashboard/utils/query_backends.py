@@ -0,0 +1,632 @@
+"""
+Query Backends for Olist Analytics Dashboard
+Pluggable engines that execute the dashboard's BigQuery SQL: BigQuery itself, or DuckDB
+over local Parquet replicas of the marts tables
+"""
+
+import concurrent.futures
+import logging
+import re
+import threading
+import time
+from pathlib import Path
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+import pandas as pd
+import pyarrow as pa
+from google.cloud import bigquery
+
+try:
+    import duckdb
+except ImportError:  # Optional: only needed for QUERY_BACKEND=duckdb
+    duckdb = None
+
+from .query_telemetry import QueryStats
+
+logger = logging.getLogger(__name__)
+
+# Tables replicated for the local backend
+MARTS_TABLES = [
+    "fact_sales",
+    "dim_customers",
+    "dim_products",
+    "dim_sellers",
+    "dim_orders",
+    "dim_payments",
+    "dim_reviews",
+    "dim_date",
+]
+
+# Pre-aggregated marts tables (dbt models/marts/aggregates); optional, queries fall
+# back to fact_sales when they are missing. agg_sales_yearly_sketches is left out:
+# its HLL sketches can only be merged by BigQuery
+AGGREGATE_TABLES = [
+    "agg_sales_monthly_region",
+    "agg_sales_monthly_payment",
+]
+
+# How often the two jobs of a hedged query are polled for completion
+HEDGE_POLL_SECONDS = 0.25
+
+class QueryBackend:
+    """Base class for engines that run the dashboard's SQL"""
+
+    name = "base"
+
+    @property
+    def description(self) -> str:
+        """Human-readable description of where queries run"""
+        return self.name
+
+    def run_arrow(self, query: str, params: Optional[Dict[str, Any]] = None,
+                  stats: Optional[QueryStats] = None, max_bytes_billed: Optional[int] = None,
+                  timeout: Optional[float] = None, hedge_after: Optional[float] = None) -> pa.Table:
+        """
+        Execute a query and return results as a pyarrow Table
+
+        Args:
+            query (str): BigQuery Standard SQL query
+            params (Dict[str, Any], optional): Values for the ``@name`` query parameters
+            stats (QueryStats, optional): Filled in with job statistics and timings
+            max_bytes_billed (int, optional): Fail the query instead of billing more bytes
+                than this (ignored by engines that do not bill by bytes)
+            timeout (float, optional): Seconds to wait for the query before cancelling it
+            hedge_after (float, optional): Seconds after which a second copy of a still
+                running query is submitted; the first to finish wins and the other is cancelled
+
+        Returns:
+            pa.Table: Query results
+        """
+        raise NotImplementedError
+
+    def run_dataframe(self, query: str, params: Optional[Dict[str, Any]] = None,
+                      stats: Optional[QueryStats] = None, max_bytes_billed: Optional[int] = None,
+                      timeout: Optional[float] = None, hedge_after: Optional[float] = None) -> pd.DataFrame:
+        """
+        Execute a query and return results as a pandas DataFrame
+
+        Args:
+            query (str): BigQuery Standard SQL query
+            params (Dict[str, Any], optional): Values for the ``@name`` query parameters
+            stats (QueryStats, optional): Filled in with job statistics and timings
+            max_bytes_billed (int, optional): Fail the query instead of billing more bytes than this
+            timeout (float, optional): Seconds to wait for the query before cancelling it
+            hedge_after (float, optional): Seconds after which a second copy of the query is submitted
+
+        Returns:
+            pd.DataFrame: Query results
+        """
+        return self.run_arrow(query, params, stats, max_bytes_billed, timeout, hedge_after).to_pandas()
+
+    def run_script(self, statements: List[Tuple[str, Dict[str, Any]]],
+                   stats: Optional[QueryStats] = None, max_bytes_billed: Optional[int] = None,
+                   timeout: Optional[float] = None) -> List[pa.Table]:
+        """
+        Execute several SELECT statements as one request and return each one's results
+
+        The base implementation runs the statements one after another.
+
+        Args:
+            statements (List[Tuple[str, Dict[str, Any]]]): SQL and parameter values of each statement
+            stats (QueryStats, optional): Filled in with statistics and timings of the whole request
+            max_bytes_billed (int, optional): Fail the request instead of billing more bytes than this
+            timeout (float, optional): Seconds to wait for the request before cancelling it
+
+        Returns:
+            List[pa.Table]: Results of each statement, in order
+        """
+        exec_start = time.perf_counter()
+        tables = [
+            self.run_arrow(query, params, max_bytes_billed=max_bytes_billed, timeout=timeout)
+            for query, params in statements
+        ]
+        if stats is not None:
+            stats.exec_ms = (time.perf_counter() - exec_start) * 1000
+        return tables
+
+    def dry_run(self, query: str, params: Optional[Dict[str, Any]] = None) -> Optional[int]:
+        """
+        Estimate the bytes a query would process without running it
+
+        Args:
+            query (str): BigQuery Standard SQL query
+            params (Dict[str, Any], optional): Values for the ``@name`` query parameters
+
+        Returns:
+            int: Estimated bytes processed, or None if the engine cannot estimate
+        """
+        return None
+
+    def ensure_scratch_dataset(self, dataset: str, like_dataset: str, expiration_hours: Optional[int] = None) -> None:
+        """
+        Create the dataset fact slices are written to, if it does not exist yet
+
+        Args:
+            dataset (str): Scratch dataset name
+            like_dataset (str): Dataset whose location the scratch dataset is created in
+            expiration_hours (int, optional): Default expiration of the dataset's tables
+        """
+
+    def create_fact_slice(self, table: str, query: str, params: Optional[Dict[str, Any]] = None,
+                          expiration_hours: Optional[int] = None) -> None:
+        """
+        Materialize a query's result as a table later queries read as ``dataset.table``
+
+        Args:
+            table (str): Slice table name, qualified with its scratch dataset
+            query (str): BigQuery Standard SQL SELECT producing the slice
+            params (Dict[str, Any], optional): Values for the ``@name`` query parameters
+            expiration_hours (int, optional): Hours after which the engine may delete the table
+        """
+        raise NotImplementedError
+
+    def drop_fact_slice(self, table: str) -> None:
+        """
+        Drop a table created by create_fact_slice, if it still exists
+
+        Args:
+            table (str): Slice table name, qualified with its scratch dataset
+        """
+        raise NotImplementedError
+
+class BigQueryBackend(QueryBackend):
+    """Runs queries as BigQuery jobs"""
+
+    name = "bigquery"
+
+    def __init__(self, client: bigquery.Client,
+                 storage_client_factory: Optional[Callable[[], object]] = None,
+                 storage_api_min_rows: int = 10000):
+        """
+        Args:
+            client (bigquery.Client): Authenticated BigQuery client
+            storage_client_factory (Callable, optional): Returns a Storage Read API client, or None
+            storage_api_min_rows (int): Results with at least this many rows use the Storage Read API
+        """
+        self.client = client
+        self.storage_client_factory = storage_client_factory
+        self.storage_api_min_rows = storage_api_min_rows
+
+    @property
+    def description(self) -> str:
+        return f"BigQuery project {self.client.project}"
+
+    @staticmethod
+    def _job_config(params: Optional[Dict[str, Any]], max_bytes_billed: Optional[int]) -> bigquery.QueryJobConfig:
+        return bigquery.QueryJobConfig(
+            query_parameters=to_query_parameters(params or {}),
+            maximum_bytes_billed=max_bytes_billed
+        )
+
+    @staticmethod
+    def _cancel(query_job: bigquery.QueryJob) -> None:
+        """Cancel a job, ignoring jobs that already finished"""
+        try:
+            query_job.cancel()
+        except Exception as e:
+            logger.warning(f"Failed to cancel job {query_job.job_id}: {str(e)}")
+
+    def _wait(self, query_job: bigquery.QueryJob, timeout: Optional[float]) -> bigquery.table.RowIterator:
+        """Wait for a job's results, cancelling the job if it outlives the timeout"""
+        try:
+            return query_job.result(timeout=timeout)
+        except concurrent.futures.TimeoutError:
+            self._cancel(query_job)
+            raise TimeoutError(f"Job {query_job.job_id} did not finish within {timeout:.1f}s and was cancelled")
+
+    def _hedge(self, query: str, params: Optional[Dict[str, Any]], max_bytes_billed: Optional[int],
+               primary: bigquery.QueryJob, hedge_after: float, timeout: Optional[float],
+               stats: Optional[QueryStats]) -> bigquery.QueryJob:
+        """
+        Submit a second copy of a job still running after hedge_after seconds
+
+        Returns:
+            bigquery.QueryJob: Whichever job finishes first; the other one is cancelled
+        """
+        deadline = None if timeout is None else time.monotonic() + timeout
+        try:
+            primary.result(timeout=hedge_after)
+            return primary
+        except concurrent.futures.TimeoutError:
+            pass
+
+        backup = self.client.query(query, job_config=self._job_config(params, max_bytes_billed))
+        logger.info(f"Job {primary.job_id} still running after {hedge_after:.1f}s, hedged with {backup.job_id}")
+        if stats is not None:
+            stats.hedged = True
+
+        while deadline is None or time.monotonic() < deadline:
+            for winner, loser in ((primary, backup), (backup, primary)):
+                if winner.done():
+                    self._cancel(loser)
+                    return winner
+            time.sleep(HEDGE_POLL_SECONDS)
+
+        self._cancel(primary)
+        self._cancel(backup)
+        raise TimeoutError(f"Jobs {primary.job_id} and {backup.job_id} did not finish within {timeout:.1f}s and were cancelled")
+
+    def _submit(self, query: str, params: Optional[Dict[str, Any]],
+                max_bytes_billed: Optional[int] = None, timeout: Optional[float] = None,
+                hedge_after: Optional[float] = None,
+                stats: Optional[QueryStats] = None) -> Tuple[bigquery.QueryJob, bigquery.table.RowIterator]:
+        """Submit the query job and wait for it to finish"""
+        start = time.monotonic()
+        query_job = self.client.query(query, job_config=self._job_config(params, max_bytes_billed))
+        if hedge_after is not None and (timeout is None or hedge_after < timeout):
+            query_job = self._hedge(query, params, max_bytes_billed, query_job, hedge_after, timeout, stats)
+        remaining = None if timeout is None else max(timeout - (time.monotonic() - start), 0.0)
+        return query_job, self._wait(query_job, remaining)
+
+    def _run(self, query: str, params: Optional[Dict[str, Any]],
+             stats: Optional[QueryStats], max_bytes_billed: Optional[int] = None,
+             timeout: Optional[float] = None, hedge_after: Optional[float] = None) -> bigquery.table.RowIterator:
+        """Submit the query job and wait for its results"""
+        query_job, results = self._submit(query, params, max_bytes_billed, timeout, hedge_after, stats)
+        if stats is not None:
+            record_job_stats(query_job, stats)
+        return results
+
+    def _to_arrow(self, results: bigquery.table.RowIterator) -> pa.Table:
+        """Download a finished job's results as Arrow"""
+        # Small results fit in the first REST page or two; large ones stream in parallel
+        storage_client = None
+        if (self.storage_client_factory is not None and results.total_rows is not None
+                and results.total_rows >= self.storage_api_min_rows):
+            storage_client = self.storage_client_factory()
+
+        if storage_client is not None:
+            return results.to_arrow(bqstorage_client=storage_client)
+        return results.to_arrow(create_bqstorage_client=False)
+
+    def run_script(self, statements: List[Tuple[str, Dict[str, Any]]],
+                   stats: Optional[QueryStats] = None, max_bytes_billed: Optional[int] = None,
+                   timeout: Optional[float] = None) -> List[pa.Table]:
+        """
+        Run the statements as one multi-statement script job
+
+        The script is queued and scheduled once; each SELECT becomes a child job whose
+        results are read back in statement order. Parameters are shared by the whole
+        script, so statements must agree on the value of a parameter they both use.
+        """
+        params: Dict[str, Any] = {}
+        for _, statement_params in statements:
+            for name, value in statement_params.items():
+                if params.setdefault(name, value) != value:
+                    raise ValueError(f"Script statements bind different values to @{name}")
+
+        script = ";\n".join(query.strip().rstrip(";") for query, _ in statements)
+        script_job, _ = self._submit(script, params, max_bytes_billed, timeout)
+        if stats is not None:
+            record_job_stats(script_job, stats)
+
+        fetch_start = time.perf_counter()
+        # Child jobs run in statement order; SELECTs are the only statements here
+        children = sorted(
+            (job for job in self.client.list_jobs(parent_job=script_job)
+             if getattr(job, "statement_type", None) == "SELECT"),
+            key=lambda job: job.created
+        )
+        if len(children) != len(statements):
+            raise RuntimeError(f"Script {script_job.job_id} produced {len(children)} results for {len(statements)} statements")
+
+        tables = [self._to_arrow(child.result()) for child in children]
+        if stats is not None:
+            stats.fetch_ms = (time.perf_counter() - fetch_start) * 1000
+        return tables
+
+    def dry_run(self, query: str, params: Optional[Dict[str, Any]] = None) -> Optional[int]:
+        job_config = bigquery.QueryJobConfig(
+            query_parameters=to_query_parameters(params or {}),
+            dry_run=True,
+            use_query_cache=False
+        )
+        return self.client.query(query, job_config=job_config).total_bytes_processed
+
+    def ensure_scratch_dataset(self, dataset: str, like_dataset: str, expiration_hours: Optional[int] = None) -> None:
+        scratch = bigquery.Dataset(f"{self.client.project}.{dataset}")
+        # Queries cannot join tables across locations, so the slices live next to the marts
+        scratch.location = self.client.get_dataset(like_dataset).location
+        if expiration_hours:
+            scratch.default_table_expiration_ms = int(expiration_hours) * 3600 * 1000
+        self.client.create_dataset(scratch, exists_ok=True)
+
+    def create_fact_slice(self, table: str, query: str, params: Optional[Dict[str, Any]] = None,
+                          expiration_hours: Optional[int] = None) -> None:
+        # An ordinary table in a scratch dataset: any job can read it, so slice queries
+        # run (and are hedged) concurrently like every other query
+        options = ""
+        if expiration_hours:
+            options = (f"OPTIONS(expiration_timestamp = "
+                       f"TIMESTAMP_ADD(CURRENT_TIMESTAMP(), INTERVAL {int(expiration_hours)} HOUR))")
+        job_config = bigquery.QueryJobConfig(query_parameters=to_query_parameters(params or {}))
+        self.client.query(f"CREATE OR REPLACE TABLE `{table}` {options} AS {query}", job_config=job_config).result()
+
+    def drop_fact_slice(self, table: str) -> None:
+        self.client.delete_table(table, not_found_ok=True)
+
+    def run_arrow(self, query: str, params: Optional[Dict[str, Any]] = None,
+                  stats: Optional[QueryStats] = None, max_bytes_billed: Optional[int] = None,
+                  timeout: Optional[float] = None, hedge_after: Optional[float] = None) -> pa.Table:
+        results = self._run(query, params, stats, max_bytes_billed, timeout, hedge_after)
+        fetch_start = time.perf_counter()
+        table = self._to_arrow(results)
+        if stats is not None:
+            stats.fetch_ms = (time.perf_counter() - fetch_start) * 1000
+        return table
+
+    def run_dataframe(self, query: str, params: Optional[Dict[str, Any]] = None,
+                      stats: Optional[QueryStats] = None, max_bytes_billed: Optional[int] = None,
+                      timeout: Optional[float] = None, hedge_after: Optional[float] = None) -> pd.DataFrame:
+        results = self._run(query, params, stats, max_bytes_billed, timeout, hedge_after)
+        fetch_start = time.perf_counter()
+        df = results.to_dataframe()
+        if stats is not None:
+            stats.fetch_ms = (time.perf_counter() - fetch_start) * 1000
+        return df
+
+class DuckDBBackend(QueryBackend):
+    """
+    Runs queries in an in-process DuckDB database over Parquet copies of the marts tables
+
+    Each table in MARTS_TABLES and AGGREGATE_TABLES is exposed as a view over ``<parquet_dir>/<table>.parquet``
+    (or every Parquet file in ``<parquet_dir>/<table>/``), and a ``__TABLES__`` table
+    mirrors BigQuery's dataset metadata from the file sizes and modification times, so
+    metadata queries and the marts version keep working. Views are rebuilt whenever the
+    files change.
+    """
+
+    name = "duckdb"
+
+    def __init__(self, parquet_dir: str, threads: Optional[int] = None):
+        """
+        Args:
+            parquet_dir (str): Directory holding the Parquet replicas
+            threads (int, optional): DuckDB worker threads; defaults to DuckDB's own choice
+
+        Raises:
+            ImportError: If duckdb is not installed
+        """
+        if duckdb is None:
+            raise ImportError("QUERY_BACKEND=duckdb requires the duckdb package (pip install duckdb)")
+
+        self.parquet_dir = Path(parquet_dir)
+        self._conn = duckdb.connect(database=":memory:")
+        if threads:
+            self._conn.execute(f"SET threads TO {int(threads)}")
+        self._conn.execute("CREATE MACRO SAFE_DIVIDE(a, b) AS CASE WHEN b = 0 THEN NULL ELSE a / b END")
+        self._conn.execute("CREATE MACRO TIMESTAMP_MILLIS(ms) AS epoch_ms(ms)")
+        self._lock = threading.Lock()
+        self._signature: Optional[Tuple] = None
+
+    @property
+    def description(self) -> str:
+        return f"DuckDB over {self.parquet_dir}"
+
+    def _table_files(self) -> List[Tuple[str, List[Path]]]:
+        """Find the Parquet files backing each marts table"""
+        tables = []
+        for table in MARTS_TABLES + AGGREGATE_TABLES:
+            single_file = self.parquet_dir / f"{table}.parquet"
+            if single_file.exists():
+                tables.append((table, [single_file]))
+            elif (self.parquet_dir / table).is_dir():
+                files = sorted((self.parquet_dir / table).glob("*.parquet"))
+                if files:
+                    tables.append((table, files))
+        return tables
+
+    def _refresh_views(self) -> None:
+        """(Re)create the table views and __TABLES__ if the Parquet files changed"""
+        table_files = self._table_files()
+        stats = [(table, [(path, path.stat()) for path in files]) for table, files in table_files]
+        signature = tuple(
+            (table, tuple((str(path), stat.st_mtime_ns, stat.st_size) for path, stat in file_stats))
+            for table, file_stats in stats
+        )
+
+        with self._lock:
+            if signature == self._signature:
+                return
+
+            if not table_files:
+                logger.warning(f"No marts Parquet files found in {self.parquet_dir}")
+
+            rows = []
+            for table, file_stats in stats:
+                file_list = ", ".join("'" + str(path).replace("'", "''") + "'" for path, _ in file_stats)
+                self._conn.execute(
+                    f'CREATE OR REPLACE VIEW "{table}" AS SELECT * FROM read_parquet([{file_list}])'
+                )
+                row_count = self._conn.execute(f'SELECT COUNT(*) FROM "{table}"').fetchone()[0]
+                rows.append({
+                    "table_id": table,
+                    "row_count": row_count,
+                    "size_bytes": sum(stat.st_size for _, stat in file_stats),
+                    "creation_time": min(stat.st_mtime_ns for _, stat in file_stats) // 1_000_000,
+                    "last_modified_time": max(stat.st_mtime_ns for _, stat in file_stats) // 1_000_000,
+                })
+
+            tables_df = pd.DataFrame(rows, columns=[
+                "table_id", "row_count", "size_bytes", "creation_time", "last_modified_time"
+            ]).astype({"row_count": "int64", "size_bytes": "int64",
+                       "creation_time": "int64", "last_modified_time": "int64"})
+            self._conn.register("_tables_df", tables_df)
+            self._conn.execute('CREATE OR REPLACE TABLE "__TABLES__" AS SELECT * FROM _tables_df')
+            self._conn.unregister("_tables_df")
+
+            self._signature = signature
+            logger.info(f"DuckDB views refreshed from {self.parquet_dir} ({len(rows)} tables)")
+
+    def create_fact_slice(self, table: str, query: str, params: Optional[Dict[str, Any]] = None,
+                          expiration_hours: Optional[int] = None) -> None:
+        self._refresh_views()
+        # A plain table rather than TEMP: temp tables are private to one connection,
+        # and every query runs on its own cursor. The database lives only as long as the
+        # process, so there is nothing to expire; the dataset is dropped like in queries
+        cursor = self._conn.cursor()
+        try:
+            statement = f'CREATE OR REPLACE TABLE "{table.split(".")[-1]}" AS {bigquery_to_duckdb(query)}'
+            if params:
+                cursor.execute(statement, params)
+            else:
+                cursor.execute(statement)
+        finally:
+            cursor.close()
+
+    def drop_fact_slice(self, table: str) -> None:
+        cursor = self._conn.cursor()
+        try:
+            cursor.execute(f'DROP TABLE IF EXISTS "{table.split(".")[-1]}"')
+        finally:
+            cursor.close()
+
+    def run_arrow(self, query: str, params: Optional[Dict[str, Any]] = None,
+                  stats: Optional[QueryStats] = None, max_bytes_billed: Optional[int] = None,
+                  timeout: Optional[float] = None, hedge_after: Optional[float] = None) -> pa.Table:
+        self._refresh_views()
+        exec_start = time.perf_counter()
+
+        # A cursor is a separate connection to the same database, safe to use from this thread
+        cursor = self._conn.cursor()
+        try:
+            if params:
+                table = cursor.execute(bigquery_to_duckdb(query), params).arrow()
+            else:
+                table = cursor.execute(bigquery_to_duckdb(query)).arrow()
+        finally:
+            cursor.close()
+
+        if stats is not None:
+            stats.exec_ms = (time.perf_counter() - exec_start) * 1000
+        return _normalize_arrow_types(table)
+
+def record_job_stats(query_job: bigquery.QueryJob, stats: QueryStats) -> None:
+    """
+    Copy a finished query job's statistics into a QueryStats record
+
+    Args:
+        query_job (bigquery.QueryJob): Completed query job
+        stats (QueryStats): Record to fill in
+    """
+    stats.job_id = query_job.job_id
+    stats.total_bytes_processed = query_job.total_bytes_processed
+    stats.total_bytes_billed = query_job.total_bytes_billed
+    stats.slot_millis = query_job.slot_millis
+    stats.cache_hit = query_job.cache_hit
+    if query_job.created and query_job.started:
+        stats.queue_ms = (query_job.started - query_job.created).total_seconds() * 1000
+    if query_job.started and query_job.ended:
+        stats.exec_ms = (query_job.ended - query_job.started).total_seconds() * 1000
+
+def to_query_parameters(params: Dict[str, Any]) -> List[bigquery.ScalarQueryParameter]:
+    """
+    Convert named parameter values into BigQuery scalar query parameters
+
+    Args:
+        params (Dict[str, Any]): Parameter values (bool, int, float or str)
+
+    Returns:
+        List[bigquery.ScalarQueryParameter]: Typed query parameters
+
+    Raises:
+        TypeError: If a value has an unsupported type
+    """
+    query_parameters = []
+    for name, value in params.items():
+        # bool is checked first because it is a subclass of int
+        if isinstance(value, bool):
+            param_type = "BOOL"
+        elif isinstance(value, int):
+            param_type = "INT64"
+        elif isinstance(value, float):
+            param_type = "FLOAT64"
+        elif isinstance(value, str):
+            param_type = "STRING"
+        else:
+            raise TypeError(f"Unsupported type for query parameter '{name}': {type(value).__name__}")
+        query_parameters.append(bigquery.ScalarQueryParameter(name, param_type, value))
+    return query_parameters
+
+def _normalize_arrow_types(table: pa.Table) -> pa.Table:
+    """Cast DuckDB's integer-valued decimals (e.g. SUM of BIGINT) back to int64 like BigQuery returns"""
+    fields = []
+    changed = False
+    for field in table.schema:
+        if pa.types.is_decimal(field.type) and field.type.scale == 0:
+            fields.append(pa.field(field.name, pa.int64()))
+            changed = True
+        else:
+            fields.append(field)
+    return table.cast(pa.schema(fields)) if changed else table
+
+_BACKTICK_NAME = re.compile(r"`([^`]+)`")
+_NAMED_PARAMETER = re.compile(r"@(\w+)")
+
+def _split_call_args(sql: str, start: int) -> Tuple[List[str], int]:
+    """
+    Split the arguments of a function call whose opening parenthesis is at ``start``
+
+    Returns:
+        Tuple[List[str], int]: Stripped argument texts and the index after the closing parenthesis
+    """
+    args = []
+    depth = 0
+    quote = None
+    arg_start = start + 1
+    for i in range(start, len(sql)):
+        char = sql[i]
+        if quote:
+            if char == quote:
+                quote = None
+        elif char in ("'", '"'):
+            quote = char
+        elif char == "(":
+            depth += 1
+        elif char == ")":
+            depth -= 1
+            if depth == 0:
+                args.append(sql[arg_start:i].strip())
+                return args, i + 1
+        elif char == "," and depth == 1:
+            args.append(sql[arg_start:i].strip())
+            arg_start = i + 1
+    raise ValueError("Unbalanced parentheses in SQL")
+
+def _rewrite_calls(sql: str, function: str, build: Callable[[List[str]], str]) -> str:
+    """Replace every call of ``function`` with ``build(args)``, innermost arguments first"""
+    pattern = re.compile(rf"\b{function}\s*\(", re.IGNORECASE)
+    pos = 0
+    while True:
+        match = pattern.search(sql, pos)
+        if not match:
+            return sql
+        args, end = _split_call_args(sql, match.end() - 1)
+        args = [_rewrite_calls(arg, function, build) for arg in args]
+        replacement = build(args)
+        sql = sql[:match.start()] + replacement + sql[end:]
+        pos = match.start() + len(replacement)
+
+def bigquery_to_duckdb(sql: str) -> str:
+    """
+    Translate the BigQuery SQL used by the dashboard into DuckDB SQL
+
+    Handles backticked ``project.dataset.table`` names (reduced to the table name),
+    ``@name`` query parameters (DuckDB's ``$name``), ``FORMAT_DATE(fmt, date)`` and
+    ``DATE_DIFF(end, start, part)``. ``SAFE_DIVIDE`` and
+    ``TIMESTAMP_MILLIS`` are provided as DuckDB macros; ``ROUND``, ``STDDEV`` and window
+    functions behave the same in both engines.
+
+    Args:
+        sql (str): BigQuery Standard SQL
+
+    Returns:
+        str: Equivalent DuckDB SQL
+    """
+    sql = _BACKTICK_NAME.sub(lambda m: '"' + m.group(1).split(".")[-1] + '"', sql)
+    sql = _NAMED_PARAMETER.sub(r"$\1", sql)
+    sql = _rewrite_calls(sql, "FORMAT_DATE", lambda args: f"strftime({args[1]}, {args[0]})")
+    sql = _rewrite_calls(
+        sql, "DATE_DIFF", lambda args: f"date_diff('{args[2].lower()}', {args[1]}, {args[0]})"
+    )
+    return sql
@@ -0,0 +1,213 @@
+"""
+Query Telemetry for Olist Analytics Dashboard
+Collects per-query statistics (latency, bytes, slots, cache hits) in a bounded in-process buffer
+"""
+
+import logging
+import os
+import sys
+import threading
+import time
+from collections import deque
+from dataclasses import asdict, dataclass, field
+from typing import Deque, List, Optional
+
+import pandas as pd
+
+logger = logging.getLogger(__name__)
+
+# Number of most recent queries kept per process
+QUERY_TELEMETRY_MAX_ENTRIES = int(os.getenv("QUERY_TELEMETRY_MAX_ENTRIES", "1000"))
+
+# Modules whose frames are skipped when looking for the function that issued a query
+_INTERNAL_MODULES = (
+    "utils.bigquery_client",
+    "utils.query_backends",
+    "utils.query_templates",
+    "utils.query_telemetry",
+)
+
+@dataclass
+class QueryStats:
+    """
+    Statistics for one execute_query call
+
+    Attributes:
+        started_at (float): Epoch seconds when the call started
+        caller (str): Function that issued the query, e.g. "get_monthly_sales_trends"
+        template_id (str): Query template id
+        fingerprint (str): Short query fingerprint
+        backend (str): Engine that ran the query ("bigquery", "duckdb", "fact_cube")
+        source (str): "warehouse" if the backend ran it, "disk_cache" if served from disk,
+            "single_flight" if it waited for an identical query already running,
+            "fact_cube" if answered from the in-memory fact cube
+        job_id (str): BigQuery job id
+        total_bytes_processed (int): Bytes processed by the job
+        total_bytes_billed (int): Bytes billed for the job
+        slot_millis (int): Slot milliseconds consumed by the job
+        cache_hit (bool): Whether BigQuery served the job from its result cache
+        estimated_bytes (int): Bytes processed according to a dry run
+        bytes_budget (int): maximum_bytes_billed applied to the call site
+        over_budget (bool): Whether the query was refused or failed for exceeding its budget
+        attempts (int): Number of times the query was submitted (retries included)
+        hedged (bool): Whether a second copy of the job was submitted because it ran long
+        queue_ms (float): Time between job creation and start
+        exec_ms (float): Time between job start and end
+        fetch_ms (float): Time spent downloading results
+        conversion_ms (float): Time spent converting results to a DataFrame
+        total_ms (float): Wall-clock time of the whole call
+        rows (int): Rows returned
+        error (str): Error message if the query failed
+    """
+
+    started_at: float = field(default_factory=time.time)
+    caller: str = ""
+    template_id: str = ""
+    fingerprint: str = ""
+    backend: str = ""
+    source: str = "warehouse"
+    job_id: Optional[str] = None
+    total_bytes_processed: Optional[int] = None
+    total_bytes_billed: Optional[int] = None
+    slot_millis: Optional[int] = None
+    cache_hit: Optional[bool] = None
+    estimated_bytes: Optional[int] = None
+    bytes_budget: Optional[int] = None
+    over_budget: bool = False
+    attempts: int = 1
+    hedged: bool = False
+    queue_ms: Optional[float] = None
+    exec_ms: Optional[float] = None
+    fetch_ms: Optional[float] = None
+    conversion_ms: Optional[float] = None
+    total_ms: Optional[float] = None
+    rows: Optional[int] = None
+    error: Optional[str] = None
+
+_query_log: Deque[QueryStats] = deque(maxlen=QUERY_TELEMETRY_MAX_ENTRIES)
+_query_log_lock = threading.Lock()
+
+def calling_function() -> str:
+    """
+    Name of the nearest function on the call stack outside the query execution modules
+
+    Returns:
+        str: Function name, e.g. "get_payment_analysis", or "unknown"
+    """
+    frame = sys._getframe(1)
+    while frame is not None:
+        module = frame.f_globals.get("__name__", "")
+        if not module.endswith(_INTERNAL_MODULES):
+            return frame.f_code.co_name
+        frame = frame.f_back
+    return "unknown"
+
+def record_query(stats: QueryStats) -> None:
+    """
+    Add a query's statistics to the in-process ring buffer
+
+    Args:
+        stats (QueryStats): Completed query statistics
+    """
+    with _query_log_lock:
+        _query_log.append(stats)
+
+    logger.info(
+        f"Query stats {stats.caller} [{stats.fingerprint}] source={stats.source} "
+        f"total_ms={stats.total_ms} bytes_billed={stats.total_bytes_billed} "
+        f"slot_ms={stats.slot_millis} cache_hit={stats.cache_hit} rows={stats.rows}"
+    )
+
+def job_latency_percentile(template_id: str, quantile: float = 0.95, min_samples: int = 20) -> Optional[float]:
+    """
+    Get a percentile of the job time (queueing plus execution) of a query template
+    
+    Only successful warehouse runs that were not hedged are counted, so the percentile
+    reflects how long the job itself usually takes.
+    
+    Args:
+        template_id (str): Query template id
+        quantile (float): Percentile as a fraction, e.g. 0.95
+        min_samples (int): Fewest runs needed for a meaningful percentile
+        
+    Returns:
+        float: Job time in milliseconds, or None if there are fewer than min_samples runs
+    """
+    with _query_log_lock:
+        samples = [
+            stats.queue_ms + stats.exec_ms for stats in _query_log
+            if stats.template_id == template_id and stats.source == "warehouse" and stats.error is None
+            and not stats.hedged and stats.queue_ms is not None and stats.exec_ms is not None
+        ]
+    
+    if len(samples) < min_samples:
+        return None
+    return float(pd.Series(samples).quantile(quantile))
+
+def get_query_log() -> pd.DataFrame:
+    """
+    Get the recorded query statistics, most recent first
+
+    Returns:
+        pd.DataFrame: One row per query with the QueryStats fields
+    """
+    with _query_log_lock:
+        records: List[dict] = [asdict(stats) for stats in _query_log]
+
+    if not records:
+        return pd.DataFrame(columns=[f.name for f in QueryStats.__dataclass_fields__.values()])
+
+    df = pd.DataFrame(records)
+    df["started_at"] = pd.to_datetime(df["started_at"], unit="s", utc=True)
+    return df.sort_values("started_at", ascending=False).reset_index(drop=True)
+
+def summarize_query_log(df: Optional[pd.DataFrame] = None) -> pd.DataFrame:
+    """
+    Aggregate recorded query statistics per calling function
+
+    Args:
+        df (pd.DataFrame, optional): Query log to summarize; defaults to get_query_log()
+
+    Returns:
+        pd.DataFrame: Per-caller query counts, latency percentiles, bytes billed,
+            slot time, cache hits, single-flight waits, retries, hedged jobs, dry-run
+            estimates and budget violations, most expensive callers first
+    """
+    if df is None:
+        df = get_query_log()
+    if df.empty:
+        return pd.DataFrame()
+
+    df = df.assign(
+        from_disk=df["source"] == "disk_cache",
+        coalesced=df["source"] == "single_flight",
+        bq_cache_hit=df["cache_hit"].fillna(False).astype(bool),
+        failed=df["error"].notna(),
+        retried=df["attempts"] - 1
+    )
+    summary = df.groupby("caller").agg(
+        queries=("caller", "size"),
+        failures=("failed", "sum"),
+        disk_cache_hits=("from_disk", "sum"),
+        single_flight_waits=("coalesced", "sum"),
+        retries=("retried", "sum"),
+        hedged=("hedged", "sum"),
+        bigquery_cache_hits=("bq_cache_hit", "sum"),
+        p50_ms=("total_ms", "median"),
+        p95_ms=("total_ms", lambda s: s.quantile(0.95)),
+        max_ms=("total_ms", "max"),
+        bytes_billed=("total_bytes_billed", "sum"),
+        bytes_processed=("total_bytes_processed", "sum"),
+        slot_millis=("slot_millis", "sum"),
+        max_estimated_bytes=("estimated_bytes", "max"),
+        bytes_budget=("bytes_budget", "max"),
+        over_budget=("over_budget", "sum"),
+        rows=("rows", "sum")
+    ).reset_index()
+
+    return summary.sort_values(["bytes_billed", "p95_ms"], ascending=False).reset_index(drop=True)
+
+def clear_query_log() -> None:
+    """Drop all recorded query statistics"""
+    with _query_log_lock:
+        _query_log.clear()
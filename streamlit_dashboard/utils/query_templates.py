@@ -0,0 +1,105 @@
+"""
+Query Templates for Olist Analytics Dashboard
+Parameterized SQL with a stable fingerprint used for caching and telemetry
+"""
+
+import hashlib
+import json
+import re
+from dataclasses import dataclass, field
+from typing import Any, Dict, Optional, Union
+
+@dataclass(frozen=True)
+class ParameterizedQuery:
+    """
+    A SQL template plus the named parameter values it runs with
+
+    Filter values are passed as ``@name`` query parameters instead of being formatted
+    into the SQL, so every year or region selection shares the same query text.
+
+    Attributes:
+        template_id (str): Name of the query template, e.g. "monthly_sales_trends"
+        sql (str): BigQuery Standard SQL referencing parameters as ``@name``
+        params (Dict[str, Any]): Parameter values (int, float, str or bool)
+    """
+
+    template_id: str
+    sql: str
+    params: Dict[str, Any] = field(default_factory=dict)
+
+    @property
+    def normalized_sql(self) -> str:
+        """SQL with whitespace collapsed, so formatting changes do not change the fingerprint"""
+        return " ".join(self.sql.split())
+
+    @property
+    def fingerprint(self) -> str:
+        """Stable hash of the template id, its SQL text and the parameter values"""
+        payload = json.dumps(
+            [self.template_id, self.normalized_sql, sorted(self.params.items())],
+            default=str
+        )
+        return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+    @property
+    def short_fingerprint(self) -> str:
+        """First 12 characters of the fingerprint, for logs and display"""
+        return self.fingerprint[:12]
+
+def as_parameterized(query: Union[str, ParameterizedQuery]) -> ParameterizedQuery:
+    """Wrap plain SQL without parameters as an ad-hoc ParameterizedQuery"""
+    if isinstance(query, ParameterizedQuery):
+        return query
+    return ParameterizedQuery(template_id="adhoc", sql=query)
+
+def year_param(year_filter: Optional[str]) -> Optional[int]:
+    """
+    Convert the sidebar year selection into a query parameter value
+
+    Args:
+        year_filter (str, optional): Year such as "2017", or "All Years"
+
+    Returns:
+        int: The year, or None when no year filter applies
+
+    Raises:
+        ValueError: If the year is not a number
+    """
+    if not year_filter or year_filter == "All Years":
+        return None
+    return int(year_filter)
+
+def region_param(region_filter: Optional[str]) -> Optional[str]:
+    """
+    Convert the sidebar region selection into a query parameter value
+
+    Args:
+        region_filter (str, optional): Region such as "Southeast", or "All Regions"
+
+    Returns:
+        str: The region, or None when no region filter applies
+    """
+    if not region_filter or region_filter == "All Regions":
+        return None
+    return region_filter
+
+def bind_query(template_id: str, sql: str, **params: Any) -> ParameterizedQuery:
+    """
+    Build a ParameterizedQuery, keeping only the parameters the SQL references
+
+    Query functions add filter clauses conditionally, so a parameter such as ``region``
+    may be passed even when the chosen SQL variant does not use it.
+
+    Args:
+        template_id (str): Name of the query template
+        sql (str): SQL referencing parameters as ``@name``
+        **params: Candidate parameter values
+
+    Returns:
+        ParameterizedQuery: Query with the referenced parameters bound
+    """
+    used = {
+        name: value for name, value in params.items()
+        if re.search(rf"@{name}\b", sql)
+    }
+    return ParameterizedQuery(template_id=template_id, sql=sql, params=used)
@@ -0,0 +1,111 @@
+"""
+Result Dtypes for Olist Analytics Dashboard
+Shrinks query results before they are cached: low-cardinality strings become categoricals,
+other strings Arrow-backed strings, and integers the narrowest width that holds them
+"""
+
+import logging
+import os
+from typing import Dict, Optional
+
+import numpy as np
+import pandas as pd
+
+logger = logging.getLogger(__name__)
+
+# Compact query results before they enter the in-process result cache
+DTYPE_COMPACTION_ENABLED = os.getenv("DTYPE_COMPACTION_ENABLED", "true").lower() in ("1", "true", "yes")
+
+# A string column becomes a categorical when it has at most this many distinct values
+# and they repeat (at most half as many distinct values as rows)
+CATEGORY_MAX_UNIQUE = int(os.getenv("CATEGORY_MAX_UNIQUE", "64"))
+CATEGORY_MAX_RATIO = 0.5
+
+# Dtype of string columns that are not categoricals
+STRING_DTYPE = "string[pyarrow]"
+
+# Undeclared integer columns are narrowed to 32 bits at most, so element-wise arithmetic
+# in the dashboard (e.g. a count times 100) cannot overflow; narrower widths are declared
+_AUTO_INT_DTYPE = np.dtype("int32")
+
+def compact_dtypes(df: pd.DataFrame, schema: Optional[Dict[str, str]] = None) -> pd.DataFrame:
+    """
+    Convert a query result to compact dtypes
+
+    Columns declared in the schema are cast to their declared dtype; the others are
+    inferred: repeated strings become categoricals, other strings STRING_DTYPE and
+    64-bit integers 32-bit ones when their values fit. Existing categoricals drop
+    their unused categories. Floats are left at 64 bits,
+    since rounded amounts and percentages would not survive float32. A column that
+    cannot be cast (e.g. a declared integer column holding a larger value) is kept as is.
+
+    Args:
+        df (pd.DataFrame): Query result
+        schema (Dict[str, str], optional): Column name to dtype, e.g. {"customer_region": "category"}
+
+    Returns:
+        pd.DataFrame: Result with compacted columns (the input frame is not modified)
+    """
+    if not DTYPE_COMPACTION_ENABLED or len(df.columns) == 0:
+        return df
+
+    schema = schema or {}
+    compacted = {}
+    for column in df.columns:
+        series = df[column]
+        if isinstance(series.dtype, pd.CategoricalDtype) and schema.get(column, "category") == "category":
+            # Categoricals from the fact cube carry every value of the cube; keep only the
+            # result's own, so group-bys and charts show no empty categories
+            compacted[column] = series.cat.remove_unused_categories()
+            continue
+        dtype = schema.get(column) or _inferred_dtype(series)
+        if dtype is None or str(series.dtype) == dtype:
+            continue
+        try:
+            compacted[column] = _cast(series, dtype)
+        except (TypeError, ValueError, OverflowError) as e:
+            logger.warning(f"Kept {column} as {series.dtype} instead of {dtype}: {str(e)}")
+
+    return df.assign(**compacted) if compacted else df
+
+def _inferred_dtype(series: pd.Series) -> Optional[str]:
+    """Compact dtype for an undeclared column, or None to keep its dtype"""
+    dtype = series.dtype
+    if pd.api.types.is_bool_dtype(dtype):
+        return None
+
+    if pd.api.types.is_integer_dtype(dtype):
+        if dtype.itemsize <= _AUTO_INT_DTYPE.itemsize or not _fits(series, _AUTO_INT_DTYPE):
+            return None
+        # Nullable results (pandas' Int64) keep their missing values
+        return "Int32" if isinstance(dtype, pd.api.extensions.ExtensionDtype) else "int32"
+
+    if pd.api.types.is_object_dtype(dtype) or pd.api.types.is_string_dtype(dtype):
+        if pd.api.types.infer_dtype(series, skipna=True) != "string":
+            return None
+        unique = series.nunique(dropna=True)
+        if unique <= CATEGORY_MAX_UNIQUE and unique <= len(series) * CATEGORY_MAX_RATIO:
+            return "category"
+        return STRING_DTYPE
+
+    return None
+
+def _fits(series: pd.Series, dtype: np.dtype) -> bool:
+    """Whether every non-null value of an integer column fits the integer dtype"""
+    values = series.dropna()
+    if values.empty:
+        return True
+    info = np.iinfo(dtype)
+    return info.min <= values.min() and values.max() <= info.max
+
+def _cast(series: pd.Series, dtype: str) -> pd.Series:
+    """Cast a column, refusing integer casts that would wrap around"""
+    target = pd.api.types.pandas_dtype(dtype)
+    if pd.api.types.is_integer_dtype(target):
+        numpy_dtype = getattr(target, "numpy_dtype", target)
+        if not _fits(series, numpy_dtype):
+            raise OverflowError(f"values outside the {dtype} range")
+        if series.hasnans and not isinstance(target, pd.api.extensions.ExtensionDtype):
+            # NumPy integers have no missing value; use pandas' nullable equivalent
+            target = pd.api.types.pandas_dtype(dtype.capitalize())
+    return series.astype(target)
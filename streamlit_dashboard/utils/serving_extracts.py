@@ -0,0 +1,187 @@
+"""
+Serving Extracts for Olist Analytics Dashboard
+Versioned Parquet files holding every dashboard query result for every sidebar filter,
+so the dashboard can serve page loads from local files instead of the warehouse
+"""
+
+import json
+import logging
+import os
+import shutil
+import tempfile
+import threading
+import time
+from pathlib import Path
+from typing import Any, Dict, List, Optional
+
+import pandas as pd
+
+logger = logging.getLogger(__name__)
+
+# Serve dashboard queries from the current extract set instead of the warehouse
+SERVING_EXTRACTS_ENABLED = os.getenv("SERVING_EXTRACTS_ENABLED", "false").lower() in ("1", "true", "yes")
+
+# Directory holding one <marts_version>/ extract set per export and the CURRENT pointer
+SERVING_EXTRACTS_DIR = Path(
+    os.getenv("SERVING_EXTRACTS_DIR", str(Path(__file__).resolve().parent.parent / ".cache" / "serving_extracts"))
+)
+
+# Extract sets kept besides the current one, so running dashboards can finish reading
+EXTRACTS_KEEP_VERSIONS = int(os.getenv("EXTRACTS_KEEP_VERSIONS", "2"))
+
+# Top-N queries are extracted at the largest N the dashboard offers and cut down on read
+EXTRACT_LIMIT = 30
+
+# Columns recording the filter arguments each extracted row belongs to
+FILTER_COLUMNS = ("year_filter", "region_filter")
+
+_POINTER = "CURRENT"
+_MANIFEST = "manifest.json"
+
+_extract_lock = threading.Lock()
+_extract_state: Dict[str, Any] = {"pointer_mtime": None, "version": None, "manifest": {}, "frames": {}}
+
+def current_extract_version() -> Optional[str]:
+    """
+    Get the marts version of the current extract set
+
+    The CURRENT pointer is re-read whenever its modification time changes, so a new
+    extract set is picked up without restarting the dashboard.
+
+    Returns:
+        str: Marts version, or None if extracts are disabled or none were written yet
+    """
+    if not SERVING_EXTRACTS_ENABLED:
+        return None
+
+    pointer = SERVING_EXTRACTS_DIR / _POINTER
+    try:
+        mtime = pointer.stat().st_mtime_ns
+    except FileNotFoundError:
+        return None
+
+    with _extract_lock:
+        if mtime == _extract_state["pointer_mtime"]:
+            return _extract_state["version"]
+
+        version = pointer.read_text().strip()
+        try:
+            manifest = json.loads((SERVING_EXTRACTS_DIR / version / _MANIFEST).read_text())
+        except (OSError, ValueError) as e:
+            logger.warning(f"Ignoring extract set {version}: {str(e)}")
+            return _extract_state["version"]
+
+        _extract_state.update(pointer_mtime=mtime, version=version, manifest=manifest, frames={})
+        logger.info(f"Serving extracts for marts version {version}")
+        return version
+
+def read_extract(function_name: str, arguments: Dict[str, Any]) -> Optional[pd.DataFrame]:
+    """
+    Get a query function's result from the current extract set
+
+    Args:
+        function_name (str): Name of the data_queries function
+        arguments (Dict[str, Any]): Its bound arguments, including defaults
+
+    Returns:
+        pd.DataFrame: Extracted result, or None if the extract set does not cover the
+            function or these arguments (the caller then queries the warehouse)
+    """
+    version = current_extract_version()
+    if version is None:
+        return None
+
+    with _extract_lock:
+        if function_name not in _extract_state["manifest"].get("functions", {}):
+            return None
+        frame = _extract_state["frames"].get(function_name)
+
+    if frame is None:
+        try:
+            frame = pd.read_parquet(SERVING_EXTRACTS_DIR / version / f"{function_name}.parquet")
+        except Exception as e:
+            logger.warning(f"Failed to read extract {function_name}: {str(e)}")
+            return None
+        with _extract_lock:
+            if _extract_state["version"] == version:
+                _extract_state["frames"][function_name] = frame
+
+    manifest = _extract_state["manifest"]
+    limit = arguments.get("limit")
+    if limit is not None and limit > manifest.get("limit", 0):
+        return None
+
+    mask = pd.Series(True, index=frame.index)
+    for column in FILTER_COLUMNS:
+        if column in arguments:
+            # The query functions treat a missing filter like the "All" option
+            value = arguments[column] or manifest["filters"][column][0]
+            if value not in manifest["filters"][column]:
+                return None
+            mask &= frame[column] == value
+
+    df = frame[mask].drop(columns=[c for c in FILTER_COLUMNS if c in frame.columns]).reset_index(drop=True)
+    if limit is not None:
+        df = df.head(limit)
+    return df
+
+def write_extract_set(marts_version: str, frames: Dict[str, pd.DataFrame],
+                      filters: Dict[str, List[str]]) -> Path:
+    """
+    Write a complete extract set and make it current
+
+    The set is written to a temporary directory, renamed into place and only then
+    published through the CURRENT pointer, so readers never see a partial set.
+    Older sets beyond EXTRACTS_KEEP_VERSIONS are deleted.
+
+    Args:
+        marts_version (str): Marts version the results were computed from
+        frames (Dict[str, pd.DataFrame]): Function name to stacked results, one row group
+            per filter combination identified by the FILTER_COLUMNS
+        filters (Dict[str, List[str]]): Values extracted for each filter column,
+            starting with its "All" option
+
+    Returns:
+        Path: Directory of the new extract set
+    """
+    root = SERVING_EXTRACTS_DIR
+    root.mkdir(parents=True, exist_ok=True)
+    target = root / marts_version
+    tmp_dir = Path(tempfile.mkdtemp(dir=root, prefix=f".{marts_version}."))
+
+    try:
+        for function_name, df in frames.items():
+            df.to_parquet(tmp_dir / f"{function_name}.parquet", index=False, compression="zstd")
+
+        manifest = {
+            "marts_version": marts_version,
+            "created_at": time.time(),
+            "limit": EXTRACT_LIMIT,
+            "filters": filters,
+            "functions": {name: len(df) for name, df in frames.items()},
+        }
+        (tmp_dir / _MANIFEST).write_text(json.dumps(manifest, indent=2))
+
+        if target.exists():
+            shutil.rmtree(target)
+        os.replace(tmp_dir, target)
+    except Exception:
+        shutil.rmtree(tmp_dir, ignore_errors=True)
+        raise
+
+    tmp_pointer = root / f".{_POINTER}.tmp"
+    tmp_pointer.write_text(marts_version)
+    os.replace(tmp_pointer, root / _POINTER)
+
+    _prune_extract_sets(keep=marts_version)
+    return target
+
+def _prune_extract_sets(keep: str) -> None:
+    """Delete the oldest extract sets beyond EXTRACTS_KEEP_VERSIONS (never the current one)"""
+    sets = sorted(
+        (path for path in SERVING_EXTRACTS_DIR.iterdir() if path.is_dir() and not path.name.startswith(".") and path.name != keep),
+        key=lambda path: path.stat().st_mtime,
+        reverse=True
+    )
+    for path in sets[EXTRACTS_KEEP_VERSIONS:]:
+        shutil.rmtree(path, ignore_errors=True)
@@ -0,0 +1,74 @@
+#!/usr/bin/env python3
+"""
+Precompute every dashboard query into the shared on-disk result cache
+
+Runs each data_queries.get_* function for every sidebar year x region combination
+(top-N queries also at the serving extracts' N), so the first visitor after a pipeline run does not wait for cold queries. Results
+are stored under the current marts version and are picked up by every dashboard
+process on this host.
+
+Usage:
+    python warm_cache.py
+
+The last line of output is a JSON summary (marts version, query counts, duration).
+"""
+
+import inspect
+import json
+import sys
+import time
+
+from utils.bigquery_client import QUERY_BACKEND, DISK_CACHE_ENABLED, fetch_concurrently, get_marts_version
+from utils.data_queries import query_functions, filter_combinations
+from utils.serving_extracts import EXTRACT_LIMIT
+
+def _warm_calls():
+    """One zero-argument call per distinct (function, filters) combination"""
+    calls = {}
+    for name, func in query_functions().items():
+        for kwargs in filter_combinations(func):
+            label = f"{name}({', '.join(f'{k}={v}' for k, v in kwargs.items())})"
+            # Call the undecorated function so each query goes through
+            # execute_query's disk cache instead of being composed in memory
+            calls[label] = lambda func=func, kwargs=kwargs: func.__wrapped__(**kwargs)
+            # Top-N queries are also warmed at the extracts' N, so export_extracts.py
+            # reads every result from the cache
+            limit = inspect.signature(func).parameters.get("limit")
+            if limit is not None and limit.default != EXTRACT_LIMIT:
+                limited = {**kwargs, "limit": EXTRACT_LIMIT}
+                calls[f"{name}({', '.join(f'{k}={v}' for k, v in limited.items())})"] = (
+                    lambda func=func, limited=limited: func.__wrapped__(**limited)
+                )
+    return calls
+
+def warm_cache() -> dict:
+    """Run every dashboard query once and return a summary"""
+    if not DISK_CACHE_ENABLED:
+        raise EnvironmentError("DISK_CACHE_ENABLED is false; there is no shared cache to warm")
+
+    if QUERY_BACKEND == "bigquery":
+        from fix_secrets import fix_secrets
+        fix_secrets()
+
+    start = time.perf_counter()
+    marts_version = get_marts_version(force_refresh=True)
+    calls = _warm_calls()
+    results = fetch_concurrently(calls)
+
+    failed = sorted(label for label, df in results.items() if len(df.columns) == 0)
+    for label in failed:
+        print(f"❌ {label}")
+
+    summary = {
+        "marts_version": marts_version,
+        "queries": len(results),
+        "failed": len(failed),
+        "seconds": round(time.perf_counter() - start, 1),
+    }
+    print(f"✅ Warmed {len(results) - len(failed)}/{len(results)} queries for marts version {marts_version}")
+    return summary
+
+if __name__ == "__main__":
+    summary = warm_cache()
+    print(json.dumps(summary))
+    sys.exit(1 if summary["failed"] else 0)